@@ -0,0 +1,40 @@
+"""Add indexes for hierarchy, dependency, assignment and time entry lookups
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Databases created with create_tables() before this revision have no index on
+the foreign keys used by the hot queries. Every index is created with
+IF NOT EXISTS so the revision is also safe on databases that create_tables()
+built from the current models.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("idx_task_parent", "tasks", ["parent_id"]),
+    ("idx_task_project_created", "tasks", ["project_id", "created_at"]),
+    ("idx_task_dependency_successor", "task_dependencies", ["successor_id", "predecessor_id"]),
+    ("idx_task_assignment_user", "task_assignments", ["user_id", "unassigned_at"]),
+    ("idx_task_comment_task_created", "task_comments", ["task_id", "created_at"]),
+    ("idx_task_comment_user_created", "task_comments", ["user_id", "created_at"]),
+    ("idx_time_tracking_task_date", "time_tracking", ["task_id", "date"]),
+    ("idx_project_member_user_project", "project_members", ["user_id", "project_id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,68 @@
+"""Add the FTS5 search index over tasks, projects and users
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+Creates the search_index virtual table and the triggers that keep it in sync,
+then backfills it from the existing rows. No-op on databases other than SQLite.
+The DDL is spelled out here as of this revision rather than taken from
+app.models.search, so later changes to the index do not rewrite this step.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "rowid, entity_type, entity_id, project_id, title, body"
+# (table, rowid type code, watched columns, values over {row})
+SOURCES = [
+    ("tasks", 1, "name, description, project_id",
+     "{row}.id * 4 + 1, 'task', {row}.id, {row}.project_id, {row}.name, coalesce({row}.description, '')"),
+    ("projects", 2, "name, description",
+     "{row}.id * 4 + 2, 'project', {row}.id, {row}.id, {row}.name, coalesce({row}.description, '')"),
+    ("users", 3, "full_name, username, email",
+     "{row}.id * 4 + 3, 'user', {row}.id, NULL, {row}.full_name, {row}.username || ' ' || {row}.email"),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    exists = "search_index" in sa.inspect(bind).get_table_names()
+    if not exists:
+        op.execute(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "entity_type UNINDEXED, entity_id UNINDEXED, project_id UNINDEXED, "
+            "title, body, tokenize = 'trigram')"
+        )
+    for table, code, watched, values in SOURCES:
+        new = values.format(row="new")
+        op.execute(f"""CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO search_index ({COLUMNS}) VALUES ({new});
+        END""")
+        op.execute(f"""CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 4 + {code};
+        END""")
+        op.execute(f"""CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {watched} ON {table} BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 4 + {code};
+            INSERT INTO search_index ({COLUMNS}) VALUES ({new});
+        END""")
+    if not exists:
+        for table, _, _, values in SOURCES:
+            op.execute(f"INSERT INTO search_index ({COLUMNS}) SELECT {values.format(row=table)} FROM {table}")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table, *_ in SOURCES:
+        for suffix in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}")
+    op.execute("DROP TABLE IF EXISTS search_index")
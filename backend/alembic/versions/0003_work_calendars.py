@@ -0,0 +1,65 @@
+"""Add working calendars and calendar closures
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+Tables are defined here as of this revision and only created when missing, so
+the revision is also safe on databases that create_tables() already built from
+the current models.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+    if "work_calendars" not in existing:
+        op.create_table(
+            "work_calendars",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=True),
+            sa.Column("user_id", sa.Integer(), nullable=True),
+            sa.Column("weekmask", sa.String(length=7), nullable=False),
+            sa.Column("use_japanese_holidays", sa.Boolean(), nullable=True),
+            sa.Column("hours_per_day", sa.Float(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.CheckConstraint("hours_per_day > 0 AND hours_per_day <= 24"),
+            sa.CheckConstraint("project_id IS NULL OR user_id IS NULL"),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("project_id"),
+            sa.UniqueConstraint("user_id"),
+        )
+    op.create_index(op.f("ix_work_calendars_id"), "work_calendars", ["id"], if_not_exists=True)
+    if "calendar_closures" not in existing:
+        op.create_table(
+            "calendar_closures",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("calendar_id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=200), nullable=False),
+            sa.Column("start_date", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("end_date", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.CheckConstraint("end_date >= start_date"),
+            sa.ForeignKeyConstraint(["calendar_id"], ["work_calendars.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index("idx_calendar_closure_calendar", "calendar_closures", ["calendar_id", "start_date"], if_not_exists=True)
+    op.create_index(op.f("ix_calendar_closures_id"), "calendar_closures", ["id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("calendar_closures", if_exists=True)
+    op.drop_table("work_calendars", if_exists=True)
@@ -0,0 +1,49 @@
+"""Add notifications
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+The table is defined here as of this revision and only created when missing,
+so the revision is also safe on databases that create_tables() already built
+from the current models.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+    if "notifications" not in existing:
+        op.create_table(
+            "notifications",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("notification_type", sa.Enum("TASK_ASSIGNED", "TASK_COMPLETED", "TASK_OVERDUE", "PROJECT_MILESTONE", "RESOURCE_CONFLICT", name="notificationtype"), nullable=False),
+            sa.Column("title", sa.String(length=200), nullable=False),
+            sa.Column("message", sa.Text(), nullable=True),
+            sa.Column("project_id", sa.Integer(), nullable=True),
+            sa.Column("task_id", sa.Integer(), nullable=True),
+            sa.Column("reference", sa.String(length=100), nullable=True),
+            sa.Column("is_read", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("read_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+            sa.ForeignKeyConstraint(["task_id"], ["tasks.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index("idx_notification_user_read", "notifications", ["user_id", "is_read", "created_at"], if_not_exists=True)
+    op.create_index(op.f("ix_notifications_id"), "notifications", ["id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("notifications", if_exists=True)
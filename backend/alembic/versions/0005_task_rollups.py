@@ -0,0 +1,114 @@
+"""Add WBS rollup columns to tasks
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Columns are only added when missing, so the revision is also safe on
+databases that create_tables() already built from the current models. The
+rollups are then backfilled in one pass, like `python -m app.cli
+rebuild-rollups`, with the rules of this revision copied below so later
+changes to app/crud/rollup.py (or to the tasks table) cannot break it.
+"""
+from collections import defaultdict
+from typing import Dict, List, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ("rollup_start_date", sa.DateTime(timezone=True)),
+    ("rollup_end_date", sa.DateTime(timezone=True)),
+    ("rollup_estimated_hours", sa.Float()),
+    ("rollup_actual_hours", sa.Float()),
+    ("rollup_remaining_hours", sa.Float()),
+    ("rollup_progress", sa.Float()),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = {c["name"] for c in sa.inspect(bind).get_columns("tasks")}
+    with op.batch_alter_table("tasks") as batch:
+        for name, type_ in COLUMNS:
+            if name not in existing:
+                batch.add_column(sa.Column(name, type_))
+    _backfill(bind)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("tasks") as batch:
+        for name, _ in reversed(COLUMNS):
+            batch.drop_column(name)
+
+
+def _combine(own, children):
+    """Leaf values, or dates spanning and hours summing the children's rollups
+
+    Progress is weighted by estimated hours, falling back to a plain mean
+    when the children carry no estimate.
+    """
+    if not children:
+        start, end, estimated, actual, remaining, progress = own
+        return (start, end, round(estimated or 0.0, 6), round(actual or 0.0, 6),
+                round(remaining or 0.0, 6), round(progress or 0.0, 4))
+    starts = [c[0] for c in children if c[0] is not None]
+    ends = [c[1] for c in children if c[1] is not None]
+    estimated = sum(c[2] or 0.0 for c in children)
+    if estimated > 0:
+        progress = sum((c[2] or 0.0) * (c[5] or 0.0) for c in children) / estimated
+    else:
+        progress = sum(c[5] or 0.0 for c in children) / len(children)
+    return (
+        min(starts) if starts else None,
+        max(ends) if ends else None,
+        round(estimated, 6),
+        round(sum(c[3] or 0.0 for c in children), 6),
+        round(sum(c[4] or 0.0 for c in children), 6),
+        round(progress, 4),
+    )
+
+
+def _backfill(bind) -> None:
+    rows = bind.execute(sa.text("""
+        SELECT id, parent_id, datetime(planned_start_date), datetime(planned_end_date),
+               estimated_hours, actual_hours, remaining_hours, progress_percentage
+        FROM tasks
+    """)).fetchall()
+    by_id = {row[0]: row for row in rows}
+    children_of: Dict[int, List[int]] = defaultdict(list)
+    for row in rows:
+        if row[1] in by_id:
+            children_of[row[1]].append(row[0])
+
+    # Post-order walk from the roots so children are always computed first
+    values: Dict[int, tuple] = {}
+    for root in (row[0] for row in rows if row[1] not in by_id):
+        stack = [(root, False)]
+        while stack:
+            task_id, expanded = stack.pop()
+            if expanded:
+                kids = children_of.get(task_id)
+                values[task_id] = _combine(by_id[task_id][2:8], [values[k] for k in kids] if kids else None)
+                continue
+            stack.append((task_id, True))
+            stack.extend((k, False) for k in children_of.get(task_id, ()) if k not in values)
+    if values:
+        bind.execute(
+            sa.text("""
+                UPDATE tasks SET rollup_start_date = :start, rollup_end_date = :end,
+                                 rollup_estimated_hours = :estimated, rollup_actual_hours = :actual,
+                                 rollup_remaining_hours = :remaining, rollup_progress = :progress
+                WHERE id = :id
+            """),
+            [
+                {"id": i, "start": v[0], "end": v[1], "estimated": v[2],
+                 "actual": v[3], "remaining": v[4], "progress": v[5]}
+                for i, v in values.items()
+            ],
+        )
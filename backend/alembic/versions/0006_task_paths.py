@@ -0,0 +1,55 @@
+"""Add materialized hierarchy paths to tasks
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+Columns and the index are only added when missing, so the revision is also
+safe on databases that create_tables() already built from the current
+models. Paths ("/3/17/42/") and depths are then backfilled from parent_id
+in one recursive UPDATE; tasks whose parent is missing from their project
+become roots. WBS numbering follows in 0007, once its columns exist.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ("path", sa.String(255)),
+    ("depth", sa.Integer()),
+]
+
+_BACKFILL = """
+    WITH RECURSIVE tree(id, project_id, path, depth) AS (
+        SELECT t.id, t.project_id, '/' || t.id || '/', 0 FROM tasks t
+        WHERE NOT EXISTS (SELECT 1 FROM tasks p WHERE p.id = t.parent_id AND p.project_id = t.project_id)
+        UNION ALL
+        SELECT c.id, c.project_id, tree.path || c.id || '/', tree.depth + 1
+        FROM tasks c JOIN tree ON c.parent_id = tree.id AND c.project_id = tree.project_id
+    )
+    UPDATE tasks SET path = tree.path, depth = tree.depth FROM tree WHERE tasks.id = tree.id
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = {c["name"] for c in sa.inspect(bind).get_columns("tasks")}
+    with op.batch_alter_table("tasks") as batch:
+        for name, type_ in COLUMNS:
+            if name not in existing:
+                batch.add_column(sa.Column(name, type_))
+    op.create_index("idx_task_path", "tasks", ["path"], if_not_exists=True)
+    op.execute(_BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_task_path", table_name="tasks", if_exists=True)
+    with op.batch_alter_table("tasks") as batch:
+        for name, _ in reversed(COLUMNS):
+            batch.drop_column(name)
@@ -0,0 +1,61 @@
+"""Add WBS sibling order and sort key to tasks
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+Columns and the index are only added when missing, so the revision is also
+safe on databases that create_tables() already built from the current
+models. Existing tasks are then numbered in id order within their parent,
+which replaces free-text WBS codes, in one recursive UPDATE that derives
+sort_key ("00001.00003") and wbs_code ("1.3") like `python -m app.cli
+rebuild-hierarchy`; tasks whose parent is missing from their project are
+numbered as roots.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ("sort_order", sa.Integer()),
+    ("sort_key", sa.String(255)),
+]
+
+_BACKFILL = """
+    WITH RECURSIVE numbered(id, parent, number) AS (
+        SELECT t.id, p.id, row_number() OVER (PARTITION BY t.project_id, p.id ORDER BY t.id)
+        FROM tasks t LEFT JOIN tasks p ON p.id = t.parent_id AND p.project_id = t.project_id
+    ),
+    tree(id, sort_order, sort_key, wbs_code) AS (
+        SELECT id, number, printf('%05d', number), CAST(number AS TEXT) FROM numbered WHERE parent IS NULL
+        UNION ALL
+        SELECT n.id, n.number, tree.sort_key || '.' || printf('%05d', n.number), tree.wbs_code || '.' || n.number
+        FROM numbered n JOIN tree ON n.parent = tree.id
+    )
+    UPDATE tasks SET sort_order = tree.sort_order, sort_key = tree.sort_key, wbs_code = tree.wbs_code
+    FROM tree WHERE tasks.id = tree.id
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = {c["name"] for c in sa.inspect(bind).get_columns("tasks")}
+    with op.batch_alter_table("tasks") as batch:
+        for name, type_ in COLUMNS:
+            if name not in existing:
+                batch.add_column(sa.Column(name, type_))
+    op.create_index("idx_task_project_sort", "tasks", ["project_id", "sort_key"], if_not_exists=True)
+    op.execute(_BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_task_project_sort", table_name="tasks", if_exists=True)
+    with op.batch_alter_table("tasks") as batch:
+        for name, _ in reversed(COLUMNS):
+            batch.drop_column(name)
@@ -0,0 +1,34 @@
+"""Add indexes for the cascade deletes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+Deleting a task subtree or a project removes notifications by task and by
+project and resource assignments by resource; without these indexes each
+of those deletes scans its whole table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("idx_notification_task", "notifications", ["task_id"]),
+    ("idx_notification_project", "notifications", ["project_id"]),
+    ("idx_resource_assignment_resource", "resource_assignments", ["resource_id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
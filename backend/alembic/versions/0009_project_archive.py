@@ -0,0 +1,187 @@
+"""Add project archival
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+Adds projects.archived_at, the project_archives summary table and the
+archived_* tables mirroring the task tables, defined here as of this
+revision. The column and the tables are only added when missing, so the
+revision is also safe on databases that create_tables() already built from the
+current models.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if "archived_at" not in {c["name"] for c in sa.inspect(bind).get_columns("projects")}:
+        with op.batch_alter_table("projects") as batch:
+            batch.add_column(sa.Column("archived_at", sa.DateTime(timezone=True)))
+    existing = set(sa.inspect(bind).get_table_names())
+    if "project_archives" not in existing:
+        op.create_table(
+            "project_archives",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("archived_by", sa.Integer(), nullable=True),
+            sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("task_count", sa.Integer(), nullable=False),
+            sa.Column("completed_task_count", sa.Integer(), nullable=False),
+            sa.Column("start_date", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("end_date", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("estimated_hours", sa.Float(), nullable=True),
+            sa.Column("actual_hours", sa.Float(), nullable=True),
+            sa.Column("remaining_hours", sa.Float(), nullable=True),
+            sa.Column("progress_percentage", sa.Float(), nullable=True),
+            sa.Column("time_entry_count", sa.Integer(), nullable=False),
+            sa.Column("logged_hours", sa.Float(), nullable=True),
+            sa.ForeignKeyConstraint(["archived_by"], ["users.id"]),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("project_id"),
+        )
+    op.create_index(op.f("ix_project_archives_id"), "project_archives", ["id"], if_not_exists=True)
+    if "archived_tasks" not in existing:
+        op.create_table(
+            "archived_tasks",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("project_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("parent_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("path", sa.String(length=255), autoincrement=False, nullable=True),
+            sa.Column("depth", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("name", sa.String(length=200), autoincrement=False, nullable=True),
+            sa.Column("description", sa.Text(), autoincrement=False, nullable=True),
+            sa.Column("task_type", sa.Enum("PHASE", "TASK", "SUBTASK", name="tasktype"), autoincrement=False, nullable=True),
+            sa.Column("status", sa.Enum("NOT_STARTED", "IN_PROGRESS", "REVIEW", "COMPLETED", "ON_HOLD", name="taskstatus"), autoincrement=False, nullable=True),
+            sa.Column("priority", sa.Enum("VERY_LOW", "LOW", "MEDIUM", "HIGH", "CRITICAL", name="priority"), autoincrement=False, nullable=True),
+            sa.Column("planned_start_date", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("planned_end_date", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("actual_start_date", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("actual_end_date", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("baseline_start_date", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("baseline_end_date", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("estimated_hours", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("actual_hours", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("remaining_hours", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("progress_percentage", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("wbs_code", sa.String(length=50), autoincrement=False, nullable=True),
+            sa.Column("sort_order", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("sort_key", sa.String(length=255), autoincrement=False, nullable=True),
+            sa.Column("external_link", sa.String(length=500), autoincrement=False, nullable=True),
+            sa.Column("is_milestone", sa.Boolean(), autoincrement=False, nullable=True),
+            sa.Column("is_critical_path", sa.Boolean(), autoincrement=False, nullable=True),
+            sa.Column("must_start_on", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("must_finish_on", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("rollup_start_date", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("rollup_end_date", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("rollup_estimated_hours", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("rollup_actual_hours", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("rollup_remaining_hours", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("rollup_progress", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index("idx_archived_tasks_project", "archived_tasks", ["project_id"], if_not_exists=True)
+    if "archived_task_dependencies" not in existing:
+        op.create_table(
+            "archived_task_dependencies",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("predecessor_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("successor_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("dependency_type", sa.Enum("FINISH_TO_START", "START_TO_START", "FINISH_TO_FINISH", "START_TO_FINISH", name="dependencytype"), autoincrement=False, nullable=True),
+            sa.Column("lag_days", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index("idx_archived_task_dependencies_predecessor_id", "archived_task_dependencies", ["predecessor_id"], if_not_exists=True)
+    op.create_index("idx_archived_task_dependencies_successor_id", "archived_task_dependencies", ["successor_id"], if_not_exists=True)
+    if "archived_task_assignments" not in existing:
+        op.create_table(
+            "archived_task_assignments",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("task_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("user_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("allocation_percentage", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("hourly_rate", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("assigned_at", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("unassigned_at", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index("idx_archived_task_assignments_task_id", "archived_task_assignments", ["task_id"], if_not_exists=True)
+    if "archived_resource_assignments" not in existing:
+        op.create_table(
+            "archived_resource_assignments",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("task_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("resource_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("units_assigned", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("cost_override", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("assigned_at", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index("idx_archived_resource_assignments_task_id", "archived_resource_assignments", ["task_id"], if_not_exists=True)
+    if "archived_time_tracking" not in existing:
+        op.create_table(
+            "archived_time_tracking",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("task_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("user_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("date", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("hours", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("description", sa.Text(), autoincrement=False, nullable=True),
+            sa.Column("billable", sa.Boolean(), autoincrement=False, nullable=True),
+            sa.Column("hourly_rate", sa.Float(), autoincrement=False, nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index("idx_archived_time_tracking_task_id", "archived_time_tracking", ["task_id"], if_not_exists=True)
+    if "archived_task_comments" not in existing:
+        op.create_table(
+            "archived_task_comments",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("task_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("user_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("content", sa.Text(), autoincrement=False, nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index("idx_archived_task_comments_task_id", "archived_task_comments", ["task_id"], if_not_exists=True)
+    if "archived_task_history" not in existing:
+        op.create_table(
+            "archived_task_history",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("task_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("user_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("field_name", sa.String(length=100), autoincrement=False, nullable=True),
+            sa.Column("old_value", sa.Text(), autoincrement=False, nullable=True),
+            sa.Column("new_value", sa.Text(), autoincrement=False, nullable=True),
+            sa.Column("change_description", sa.String(length=500), autoincrement=False, nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index("idx_archived_task_history_task_id", "archived_task_history", ["task_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("archived_task_history", if_exists=True)
+    op.drop_table("archived_task_comments", if_exists=True)
+    op.drop_table("archived_time_tracking", if_exists=True)
+    op.drop_table("archived_resource_assignments", if_exists=True)
+    op.drop_table("archived_task_assignments", if_exists=True)
+    op.drop_table("archived_task_dependencies", if_exists=True)
+    op.drop_table("archived_tasks", if_exists=True)
+    op.drop_table("project_archives", if_exists=True)
+    with op.batch_alter_table("projects") as batch:
+        batch.drop_column("archived_at")
@@ -0,0 +1,62 @@
+"""Add project scenarios
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+
+Adds project_scenarios and scenario_task_overrides, which hold what-if
+branches of a project as per-task field overrides. The tables are defined here
+as of this revision and only created when missing, so the revision is also
+safe on databases that create_tables() already built from the current models.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+    if "project_scenarios" not in existing:
+        op.create_table(
+            "project_scenarios",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=200), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("created_by", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index(op.f("ix_project_scenarios_id"), "project_scenarios", ["id"], if_not_exists=True)
+    op.create_index(op.f("ix_project_scenarios_project_id"), "project_scenarios", ["project_id"], if_not_exists=True)
+    if "scenario_task_overrides" not in existing:
+        op.create_table(
+            "scenario_task_overrides",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("scenario_id", sa.Integer(), nullable=False),
+            sa.Column("task_id", sa.Integer(), nullable=False),
+            sa.Column("planned_start_date", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("planned_end_date", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("estimated_hours", sa.Float(), nullable=True),
+            sa.ForeignKeyConstraint(["scenario_id"], ["project_scenarios.id"]),
+            sa.ForeignKeyConstraint(["task_id"], ["tasks.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("scenario_id", "task_id", name="unique_scenario_task"),
+        )
+    op.create_index("idx_scenario_override_task", "scenario_task_overrides", ["task_id"], if_not_exists=True)
+    op.create_index(op.f("ix_scenario_task_overrides_id"), "scenario_task_overrides", ["id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("scenario_task_overrides", if_exists=True)
+    op.drop_table("project_scenarios", if_exists=True)
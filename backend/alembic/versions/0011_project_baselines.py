@@ -0,0 +1,49 @@
+"""Add named project baselines
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+
+Adds project_baselines, one row per project and baseline name holding the
+packed task schedule. The table is defined here as of this revision and only
+created when missing, so the revision is also safe on databases that
+create_tables() already built from the current models.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+    if "project_baselines" not in existing:
+        op.create_table(
+            "project_baselines",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("created_by", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("task_count", sa.Integer(), nullable=False),
+            sa.Column("start_date", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("end_date", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("estimated_hours", sa.Float(), nullable=True),
+            sa.Column("data", sa.LargeBinary(), nullable=False),
+            sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("project_id", "name", name="unique_project_baseline_name"),
+        )
+    op.create_index(op.f("ix_project_baselines_id"), "project_baselines", ["id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("project_baselines", if_exists=True)
@@ -0,0 +1,47 @@
+"""Add daily progress snapshots
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19
+
+Adds progress_snapshots, one row per project (and per phase) and day with the
+leaf task totals behind burndown and burnup, indexed for range scans by
+project, phase and date. The table is defined here as of this revision and
+only created when missing, so the revision is also safe on databases that
+create_tables() already built from the current models.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0012"
+down_revision: Union[str, None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+    if "progress_snapshots" not in existing:
+        op.create_table(
+            "progress_snapshots",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("phase_id", sa.Integer(), nullable=True),
+            sa.Column("snapshot_date", sa.Date(), nullable=False),
+            sa.Column("task_count", sa.Integer(), nullable=False),
+            sa.Column("completed_count", sa.Integer(), nullable=False),
+            sa.Column("estimated_hours", sa.Float(), nullable=False),
+            sa.Column("completed_hours", sa.Float(), nullable=False),
+            sa.Column("remaining_hours", sa.Float(), nullable=False),
+            sa.Column("actual_hours", sa.Float(), nullable=False),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index("idx_progress_snapshot_series", "progress_snapshots", ["project_id", "phase_id", "snapshot_date"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("progress_snapshots", if_exists=True)
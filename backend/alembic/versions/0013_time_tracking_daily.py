@@ -0,0 +1,53 @@
+"""Add daily time tracking totals
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19
+
+Adds time_tracking_daily, the logged hours per user, task and day that time
+entry writes keep up to date, with the billable hours and cost split. Existing
+entries are not summed here; run `python -m app.cli reconcile-time` after
+upgrading. The table is defined here as of this revision and only created when
+missing, so the revision is also safe on databases that create_tables()
+already built from the current models.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0013"
+down_revision: Union[str, None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+    if "time_tracking_daily" not in existing:
+        op.create_table(
+            "time_tracking_daily",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("task_id", sa.Integer(), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column("hours", sa.Float(), nullable=False),
+            sa.Column("billable_hours", sa.Float(), nullable=False),
+            sa.Column("rated_cost", sa.Float(), nullable=False),
+            sa.Column("unrated_hours", sa.Float(), nullable=False),
+            sa.Column("entry_count", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+            sa.ForeignKeyConstraint(["task_id"], ["tasks.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("user_id", "day", "task_id", name="uq_time_tracking_daily"),
+        )
+    op.create_index("idx_time_tracking_daily_day", "time_tracking_daily", ["day", "project_id"], if_not_exists=True)
+    op.create_index("idx_time_tracking_daily_project_day", "time_tracking_daily", ["project_id", "day"], if_not_exists=True)
+    op.create_index("idx_time_tracking_daily_task", "time_tracking_daily", ["task_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("time_tracking_daily", if_exists=True)
@@ -0,0 +1,26 @@
+"""Add an index on the children of each task within a project
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19
+
+A lazy Gantt view reads the roots of a project and the children of its
+expanded parents; without this index the roots come from a scan of every
+task in the project.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0014"
+down_revision: Union[str, None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_task_project_parent", "tasks", ["project_id", "parent_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_task_project_parent", table_name="tasks", if_exists=True)
@@ -0,0 +1,43 @@
+"""Archive scenario overrides with their project
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19
+
+Adds archived_scenario_task_overrides, so the what-if overrides of a project
+move to the archive with its tasks and come back on restore instead of being
+deleted with them. The table is defined here as of this revision and only
+created when missing.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0015"
+down_revision: Union[str, None] = "0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if "archived_scenario_task_overrides" not in set(sa.inspect(bind).get_table_names()):
+        op.create_table(
+            "archived_scenario_task_overrides",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("scenario_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("task_id", sa.Integer(), autoincrement=False, nullable=True),
+            sa.Column("planned_start_date", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("planned_end_date", sa.DateTime(timezone=True), autoincrement=False, nullable=True),
+            sa.Column("estimated_hours", sa.Float(), autoincrement=False, nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_index(
+        "idx_archived_scenario_task_overrides_task_id", "archived_scenario_task_overrides", ["task_id"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("archived_scenario_task_overrides", if_exists=True)
@@ -0,0 +1,73 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from ...crud import project_baseline
+from ...schemas.baseline import Baseline, BaselineCreate, BaselineVariance
+from ...schemas.user import User
+from ...api.deps import get_current_user
+from ...api.v1.projects import check_project_permission
+from ...models import ProjectBaseline, UserRole
+
+router = APIRouter()
+
+READ_ROLES = [UserRole.PROJECT_OWNER, UserRole.PROJECT_MANAGER, UserRole.TEAM_MEMBER, UserRole.VIEWER]
+
+
+def _get_baseline(db: Session, baseline_id: int, user: User, required_roles: List[UserRole] = None) -> ProjectBaseline:
+    baseline = project_baseline.get(db, id=baseline_id)
+    if baseline is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Baseline not found")
+    check_project_permission(baseline.project_id, user, db, required_roles=required_roles)
+    return baseline
+
+
+@router.get("/project/{project_id}", response_model=List[Baseline])
+def read_project_baselines(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    check_project_permission(project_id, current_user, db, required_roles=READ_ROLES)
+    return project_baseline.get_by_project(db, project_id=project_id)
+
+
+@router.post("/project/{project_id}", response_model=Baseline)
+def create_baseline(
+    project_id: int,
+    baseline_in: BaselineCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Snapshot the project's current schedule under a name"""
+    check_project_permission(project_id, current_user, db)
+    try:
+        return project_baseline.create_snapshot(
+            db, project_id=project_id, obj_in=baseline_in, created_by=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{baseline_id}/variance", response_model=BaselineVariance)
+def get_baseline_variance(
+    baseline_id: int,
+    changed_only: bool = Query(False, description="List only tasks that slipped, changed effort or were added"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Slip in working days and effort delta of the current schedule against a baseline"""
+    baseline = _get_baseline(db, baseline_id, current_user, required_roles=READ_ROLES)
+    return project_baseline.get_variance(db, baseline=baseline, changed_only=changed_only)
+
+
+@router.delete("/{baseline_id}")
+def delete_baseline(
+    baseline_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    _get_baseline(db, baseline_id, current_user)
+    project_baseline.remove(db, id=baseline_id)
+    return {"message": "Baseline deleted successfully"}
@@ -0,0 +1,174 @@
+from datetime import date
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+import numpy as np
+
+from ...database import get_db
+from ...crud import work_calendar, project
+from ...schemas.calendar import (
+    WorkCalendar, WorkCalendarUpdate, CalendarClosure, CalendarClosureCreate, Holiday, WorkdayRange
+)
+from ...schemas.user import User
+from ...api.deps import get_current_user, get_current_admin_user
+from ...api.v1.tasks import check_task_permission
+from ...models import UserRole, WorkCalendar as WorkCalendarModel
+from ...utils.jp_holidays import japanese_holidays
+from ...utils.work_calendar import to_datetime64
+
+router = APIRouter()
+
+READ_ROLES = [UserRole.PROJECT_OWNER, UserRole.PROJECT_MANAGER, UserRole.TEAM_MEMBER, UserRole.VIEWER]
+
+
+def check_calendar_permission(calendar: WorkCalendarModel, user: User, db: Session) -> None:
+    """Project calendars need owner/manager rights, personal ones their user"""
+    if user.role == UserRole.SYSTEM_ADMIN:
+        return
+    if calendar.project_id is not None:
+        check_task_permission(calendar.project_id, user, db)
+        return
+    if calendar.user_id is None or calendar.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to change this calendar"
+        )
+
+
+@router.get("/holidays", response_model=List[Holiday])
+def get_holidays(
+    year: int = Query(..., ge=2000, le=2099),
+) -> Any:
+    """Japanese public holidays of a year"""
+    return [{"date": day, "name": name} for day, name in japanese_holidays(year).items()]
+
+
+@router.get("/default", response_model=Optional[WorkCalendar])
+def get_default_calendar(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Get the organisation default calendar"""
+    return work_calendar.get_default(db)
+
+
+@router.put("/default", response_model=WorkCalendar)
+def update_default_calendar(
+    *,
+    db: Session = Depends(get_db),
+    calendar_in: WorkCalendarUpdate,
+    current_user: User = Depends(get_current_admin_user),
+) -> Any:
+    """Create or update the organisation default calendar (admin only)"""
+    return work_calendar.save(db, obj_in=calendar_in)
+
+
+@router.get("/project/{project_id}", response_model=Optional[WorkCalendar])
+def get_project_calendar(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Get the calendar of a project"""
+    check_task_permission(project_id, current_user, db, required_roles=READ_ROLES)
+    return work_calendar.get_by_project(db, project_id=project_id)
+
+
+@router.put("/project/{project_id}", response_model=WorkCalendar)
+def update_project_calendar(
+    *,
+    db: Session = Depends(get_db),
+    project_id: int,
+    calendar_in: WorkCalendarUpdate,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Create or update the calendar of a project"""
+    if not project.get(db, id=project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    check_task_permission(project_id, current_user, db)
+    return work_calendar.save(db, obj_in=calendar_in, project_id=project_id)
+
+
+@router.get("/project/{project_id}/workdays", response_model=WorkdayRange)
+def get_project_workdays(
+    project_id: int,
+    start_date: date,
+    end_date: date,
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Working days of a project (optionally narrowed to one member) in a date range"""
+    check_task_permission(project_id, current_user, db, required_roles=READ_ROLES)
+    if end_date < start_date or (end_date - start_date).days > 3660:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    calendar = work_calendar.get_working_calendar(db, project_id=project_id, user_id=user_id)
+    days = np.arange(to_datetime64(start_date), to_datetime64(end_date) + 1, dtype="datetime64[D]")
+    working = calendar.is_workday(days)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "workday_count": int(working.sum()),
+        "non_working_days": days[~working].tolist(),
+    }
+
+
+@router.get("/user/{user_id}", response_model=Optional[WorkCalendar])
+def get_user_calendar(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Get the personal calendar of a user"""
+    return work_calendar.get_by_user(db, user_id=user_id)
+
+
+@router.put("/user/{user_id}", response_model=WorkCalendar)
+def update_user_calendar(
+    *,
+    db: Session = Depends(get_db),
+    user_id: int,
+    calendar_in: WorkCalendarUpdate,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Create or update the personal calendar of a user (the user or an admin)"""
+    if current_user.role != UserRole.SYSTEM_ADMIN and current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to change this calendar"
+        )
+    return work_calendar.save(db, obj_in=calendar_in, user_id=user_id)
+
+
+@router.post("/{calendar_id}/closures", response_model=CalendarClosure)
+def add_calendar_closure(
+    *,
+    db: Session = Depends(get_db),
+    calendar_id: int,
+    closure_in: CalendarClosureCreate,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Add a non-working period (e.g. year-end closure) to a calendar"""
+    calendar = work_calendar.get(db, id=calendar_id)
+    if not calendar:
+        raise HTTPException(status_code=404, detail="Calendar not found")
+    check_calendar_permission(calendar, current_user, db)
+    return work_calendar.add_closure(db, calendar=calendar, obj_in=closure_in)
+
+
+@router.delete("/{calendar_id}/closures/{closure_id}")
+def delete_calendar_closure(
+    *,
+    db: Session = Depends(get_db),
+    calendar_id: int,
+    closure_id: int,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Remove a non-working period from a calendar"""
+    calendar = work_calendar.get(db, id=calendar_id)
+    if not calendar:
+        raise HTTPException(status_code=404, detail="Calendar not found")
+    check_calendar_permission(calendar, current_user, db)
+    if not work_calendar.remove_closure(db, calendar=calendar, closure_id=closure_id):
+        raise HTTPException(status_code=404, detail="Closure not found")
+    return {"message": "Closure deleted successfully"}
@@ -0,0 +1,48 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from ...crud import notification
+from ...schemas.notification import Notification
+from ...schemas.user import User
+from ...api.deps import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[Notification])
+def read_notifications(
+    unread_only: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Get notifications of the current user"""
+    return notification.get_by_user(
+        db, user_id=current_user.id, unread_only=unread_only, skip=skip, limit=limit
+    )
+
+
+@router.put("/read-all")
+def mark_all_notifications_read(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Mark all notifications of the current user as read"""
+    count = notification.mark_all_read(db, user_id=current_user.id)
+    return {"message": f"{count} notifications marked as read"}
+
+
+@router.put("/{notification_id}/read", response_model=Notification)
+def mark_notification_read(
+    notification_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Mark a notification as read"""
+    notification_obj = notification.get(db, id=notification_id)
+    if not notification_obj or notification_obj.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return notification.mark_read(db, notification=notification_obj)
@@ -1,18 +1,19 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 import io
 
 from ...database import get_db
-from ...crud import project, project_member
+from ...crud import project, project_member, cascade, project_archive, project_clone, resource_utilization
 from ...schemas.project import (
-    Project, ProjectCreate, ProjectUpdate, ProjectWithMembers,
+    Project, ProjectArchive, ProjectClone, ProjectCreate, ProjectUpdate, ProjectWithMembers,
     ProjectMember, ProjectMemberCreate, ProjectMemberUpdate
 )
 from ...schemas.user import User
 from ...api.deps import get_current_user
 from ...models import UserRole
+from ...utils.encoding import ORJSONResponse
 from ...utils.export import DataExporter, ProjectExporter
 
 router = APIRouter()
@@ -34,7 +35,8 @@ def get_project_statistics(
                     COUNT(CASE WHEN status = 'active' THEN 1 END) as active_projects,
                     COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_projects,
                     COUNT(CASE WHEN status = 'planning' THEN 1 END) as planning_projects,
-                    COUNT(CASE WHEN status = 'on_hold' THEN 1 END) as on_hold_projects
+                    COUNT(CASE WHEN status = 'on_hold' THEN 1 END) as on_hold_projects,
+                    COUNT(archived_at) as archived_projects
                 FROM projects
             """)
         ).fetchone()
@@ -60,15 +62,19 @@ def get_project_statistics(
                     p.id,
                     p.name,
                     p.status,
-                    COUNT(t.id) as total_tasks,
-                    COUNT(CASE WHEN t.status = 'completed' THEN 1 END) as completed_tasks,
+                    COALESCE(a.task_count, COUNT(t.id)) as total_tasks,
+                    COALESCE(a.completed_task_count, COUNT(CASE WHEN t.status = 'completed' THEN 1 END)) as completed_tasks,
                     CASE 
-                        WHEN COUNT(t.id) > 0 THEN 
-                            ROUND(COUNT(CASE WHEN t.status = 'completed' THEN 1 END) * 100.0 / COUNT(t.id))
+                        WHEN COALESCE(a.task_count, COUNT(t.id)) > 0 THEN 
+                            ROUND(COALESCE(a.completed_task_count, COUNT(CASE WHEN t.status = 'completed' THEN 1 END))
+                                  * 100.0 / COALESCE(a.task_count, COUNT(t.id)))
                         ELSE 0 
-                    END as progress_percentage
+                    END as progress_percentage,
+                    p.archived_at
                 FROM projects p
                 LEFT JOIN tasks t ON p.id = t.project_id
+                -- Archived projects report the totals kept at archival
+                LEFT JOIN project_archives a ON a.project_id = p.id
                 GROUP BY p.id, p.name, p.status
                 ORDER BY p.created_at DESC
             """)
@@ -80,7 +86,8 @@ def get_project_statistics(
                 "active_projects": project_stats[1] if project_stats else 0,
                 "completed_projects": project_stats[2] if project_stats else 0,
                 "planning_projects": project_stats[3] if project_stats else 0,
-                "on_hold_projects": project_stats[4] if project_stats else 0
+                "on_hold_projects": project_stats[4] if project_stats else 0,
+                "archived_projects": project_stats[5] if project_stats else 0
             },
             "task_stats": {
                 "total_tasks": task_stats[0] if task_stats else 0,
@@ -97,7 +104,8 @@ def get_project_statistics(
                     "status": row[2],
                     "total_tasks": row[3],
                     "completed_tasks": row[4],
-                    "progress": row[5]
+                    "progress": row[5],
+                    "archived_at": row[6]
                 }
                 for row in project_progress
             ]
@@ -111,7 +119,8 @@ def get_project_statistics(
                 "active_projects": 0,
                 "completed_projects": 0,
                 "planning_projects": 0,
-                "on_hold_projects": 0
+                "on_hold_projects": 0,
+                "archived_projects": 0
             },
             "task_stats": {
                 "total_tasks": 0,
@@ -125,6 +134,119 @@ def get_project_statistics(
         }
 
 
+@router.get("/export")
+def export_projects(
+    format: str = Query("csv", regex="^(csv|excel|pdf)$"),
+    project_id: int = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    """プロジェクトデータをエクスポート"""
+    try:
+        from sqlalchemy import text, bindparam, DateTime
+
+        # プロジェクトデータ取得
+        project_columns = "SELECT id, name, description, status, created_at, updated_at FROM projects"
+        if project_id:
+            # 特定のプロジェクト
+            project_query = text(f"{project_columns} WHERE id = :project_id")
+            params = {"project_id": project_id}
+        else:
+            # 全プロジェクト
+            project_query = text(f"{project_columns} ORDER BY created_at DESC")
+            params = {}
+        project_query = project_query.columns(created_at=DateTime, updated_at=DateTime)
+        project_result = db.execute(project_query, params).fetchall()
+
+        # プロジェクトオブジェクトに変換
+        projects = []
+        for row in project_result:
+            project_obj = type('Project', (), {
+                'id': row.id,
+                'name': row.name,
+                'description': row.description,
+                'status': row.status,
+                'created_at': row.created_at,
+                'updated_at': row.updated_at,
+            })()
+            projects.append(project_obj)
+
+        # タスクデータ取得（統計用）
+        tasks_by_project = {}
+        if projects:
+            project_ids = [p.id for p in projects]
+            tasks_query = text(
+                "SELECT id, project_id, status FROM tasks WHERE project_id IN :project_ids"
+            ).bindparams(bindparam("project_ids", expanding=True))
+            tasks_result = db.execute(tasks_query, {"project_ids": project_ids}).fetchall()
+
+            for row in tasks_result:
+                if row.project_id not in tasks_by_project:
+                    tasks_by_project[row.project_id] = []
+
+                task_obj = type('Task', (), {
+                    'id': row.id,
+                    'project_id': row.project_id,
+                    'status': row.status,
+                })()
+                tasks_by_project[row.project_id].append(task_obj)
+        
+        # データをフォーマット
+        formatted_data = ProjectExporter.format_project_data(projects, tasks_by_project)
+        
+        if not formatted_data:
+            raise HTTPException(status_code=404, detail="エクスポートするデータがありません")
+        
+        # フォーマットに応じてエクスポート
+        if format == "csv":
+            output = DataExporter.to_csv(formatted_data)
+            content = output.getvalue()
+            media_type = "text/csv"
+            filename = f"projects_export.csv"
+            
+            return StreamingResponse(
+                io.StringIO(content),
+                media_type=media_type,
+                headers={"Content-Disposition": f"attachment; filename={filename}"}
+            )
+            
+        elif format == "excel":
+            output = DataExporter.to_excel(formatted_data, "プロジェクト一覧")
+            content = output.getvalue()
+            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            filename = f"projects_export.xlsx"
+            
+            return StreamingResponse(
+                io.BytesIO(content),
+                media_type=media_type,
+                headers={"Content-Disposition": f"attachment; filename={filename}"}
+            )
+            
+        elif format == "pdf":
+            title = f"プロジェクト一覧レポート"
+            if project_id:
+                project_name = next((p.name for p in projects if p.id == project_id), "不明")
+                title = f"プロジェクトレポート - {project_name}"
+            
+            output = DataExporter.to_pdf(formatted_data, title)
+            content = output.getvalue()
+            media_type = "application/pdf"
+            filename = f"projects_export.pdf"
+            
+            return StreamingResponse(
+                io.BytesIO(content),
+                media_type=media_type,
+                headers={"Content-Disposition": f"attachment; filename={filename}"}
+            )
+            
+        else:
+            raise HTTPException(status_code=400, detail="サポートされていないフォーマットです")
+            
+    except Exception as e:
+        print(f"Export error: {e}")
+        raise HTTPException(status_code=500, detail=f"エクスポート中にエラーが発生しました: {str(e)}")
+
+
 def check_project_permission(
     project_id: int, user: User, db: Session, required_roles: List[UserRole] = None
 ) -> None:
@@ -155,7 +277,7 @@ def read_projects(
         from sqlalchemy import text
         
         result = db.execute(
-            text("SELECT id, name, description, status, created_at, updated_at FROM projects ORDER BY created_at DESC")
+            text("SELECT id, name, description, status, created_at, updated_at, archived_at FROM projects ORDER BY created_at DESC")
         )
         rows = result.fetchall()
         
@@ -167,10 +289,12 @@ def read_projects(
                 "description": row[2],
                 "status": row[3],
                 "created_at": row[4],
-                "updated_at": row[5]
+                "updated_at": row[5],
+                "archived_at": row[6]
             })
         
-        return projects
+        # Plain row values, so the response skips jsonable_encoder
+        return ORJSONResponse(projects)
         
     except Exception as e:
         print(f"Error fetching projects: {e}")
@@ -187,7 +311,7 @@ def get_project(
         from sqlalchemy import text
         
         result = db.execute(
-            text("SELECT id, name, description, status, created_at, updated_at FROM projects WHERE id = :project_id"),
+            text("SELECT id, name, description, status, created_at, updated_at, archived_at FROM projects WHERE id = :project_id"),
             {"project_id": project_id}
         )
         row = result.fetchone()
@@ -199,7 +323,8 @@ def get_project(
                 "description": row[2],
                 "status": row[3],
                 "created_at": row[4],
-                "updated_at": row[5]
+                "updated_at": row[5],
+                "archived_at": row[6]
             }
         else:
             raise HTTPException(status_code=404, detail="Project not found")
@@ -278,6 +403,8 @@ def update_project(
             }
         )
         db.commit()
+        # Only active projects count towards utilization
+        resource_utilization.invalidate()
         
         # Get updated project
         result = db.execute(
@@ -303,143 +430,122 @@ def update_project(
         raise HTTPException(status_code=500, detail="Failed to update project")
 
 
+@router.post("/{project_id}/archive", response_model=ProjectArchive)
+def archive_project(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Move a completed or cancelled project's tasks and their rows to the archive tables"""
+    check_project_permission(project_id, current_user, db)
+    try:
+        summary = project_archive.archive(db, project_id=project_id, archived_by=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    db.commit()
+    resource_utilization.invalidate()
+    return summary
+
+
+@router.get("/{project_id}/archive", response_model=ProjectArchive)
+def get_project_archive(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Summary kept for an archived project"""
+    check_project_permission(project_id, current_user, db, required_roles=list(UserRole))
+    summary = project_archive.get_by_project(db, project_id=project_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Project is not archived")
+    return summary
+
+
+@router.post("/{project_id}/restore")
+def restore_project(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Move an archived project's rows back to the live tables"""
+    check_project_permission(project_id, current_user, db)
+    restored = project_archive.restore(db, project_id=project_id)
+    if restored is None:
+        raise HTTPException(status_code=400, detail="Project is not archived")
+    db.commit()
+    resource_utilization.invalidate()
+    return {"message": "Project restored successfully", "restored": restored}
+
+
+@router.post("/{project_id}/clone")
+def clone_project(
+    project_id: int,
+    clone_in: ProjectClone,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Copy a project with its tasks, dependencies, assignments, resources and calendar"""
+    check_project_permission(project_id, current_user, db)
+    try:
+        copied = project_clone.clone(
+            db, project_id=project_id, name=clone_in.name, description=clone_in.description,
+            owner_id=current_user.id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if copied is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    db.commit()
+    resource_utilization.invalidate()
+    return {"project_id": copied.pop("project_id"), "copied": copied}
+
+
+@router.get("/deletions/{job_id}")
+def get_project_deletion(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Status of a background project deletion submitted by the current user"""
+    job = cascade.get_job(job_id, submitted_by=current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    return job
+
+
 @router.delete("/{project_id}")
 def delete_project(
     project_id: int,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    background: bool = Query(False, description="Delete in a background job and return 202 immediately"),
     db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ) -> Any:
-    """Delete project"""
-    try:
+    """Delete project with its tasks and every dependent row; project owners and admins only"""
+    check_project_permission(project_id, current_user, db, required_roles=[UserRole.PROJECT_OWNER])
+    if background:
         from sqlalchemy import text
-        
-        # Delete related tasks first
-        db.execute(
-            text("DELETE FROM tasks WHERE project_id = :project_id"),
-            {"project_id": project_id}
-        )
-        
-        # Delete project
-        result = db.execute(
-            text("DELETE FROM projects WHERE id = :project_id"),
-            {"project_id": project_id}
-        )
-        db.commit()
-        
-        if result.rowcount > 0:
-            return {"message": "Project deleted successfully"}
-        else:
+
+        exists = db.execute(
+            text("SELECT 1 FROM projects WHERE id = :project_id"), {"project_id": project_id}
+        ).first()
+        if exists is None:
             raise HTTPException(status_code=404, detail="Project not found")
-            
+        job = cascade.submit_project_deletion(project_id=project_id, submitted_by=current_user.id)
+        background_tasks.add_task(cascade.run_job, job["id"])
+        response.status_code = status.HTTP_202_ACCEPTED
+        return job
+
+    try:
+        deleted = cascade.delete_project(db, project_id=project_id)
+        db.commit()
+        resource_utilization.invalidate()
     except Exception as e:
         print(f"Error deleting project: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete project")
 
-
-@router.get("/export")
-def export_projects(
-    format: str = Query("csv", regex="^(csv|excel|pdf)$"),
-    project_id: int = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-) -> StreamingResponse:
-    """プロジェクトデータをエクスポート"""
-    try:
-        from sqlalchemy import text
-        
-        # プロジェクトデータ取得
-        if project_id:
-            # 特定のプロジェクト
-            project_query = text("SELECT * FROM projects WHERE id = :project_id")
-            project_result = db.execute(project_query, {"project_id": project_id}).fetchall()
-        else:
-            # 全プロジェクト
-            project_query = text("SELECT * FROM projects ORDER BY created_at DESC")
-            project_result = db.execute(project_query).fetchall()
-        
-        # プロジェクトオブジェクトに変換
-        projects = []
-        for row in project_result:
-            project_obj = type('Project', (), {
-                'id': row[0],
-                'name': row[1],
-                'description': row[2],
-                'status': row[3],
-                'created_at': row[7] if len(row) > 7 else None,
-                'updated_at': row[8] if len(row) > 8 else None,
-            })()
-            projects.append(project_obj)
-        
-        # タスクデータ取得（統計用）
-        tasks_by_project = {}
-        if projects:
-            project_ids = [p.id for p in projects]
-            placeholders = ','.join(['?' for _ in project_ids])
-            tasks_query = text(f"SELECT * FROM tasks WHERE project_id IN ({placeholders})")
-            tasks_result = db.execute(tasks_query, project_ids).fetchall()
-            
-            for row in tasks_result:
-                project_id = row[1]  # project_id column
-                if project_id not in tasks_by_project:
-                    tasks_by_project[project_id] = []
-                
-                task_obj = type('Task', (), {
-                    'id': row[0],
-                    'project_id': row[1],
-                    'status': row[5],  # status column
-                })()
-                tasks_by_project[project_id].append(task_obj)
-        
-        # データをフォーマット
-        formatted_data = ProjectExporter.format_project_data(projects, tasks_by_project)
-        
-        if not formatted_data:
-            raise HTTPException(status_code=404, detail="エクスポートするデータがありません")
-        
-        # フォーマットに応じてエクスポート
-        if format == "csv":
-            output = DataExporter.to_csv(formatted_data)
-            content = output.getvalue()
-            media_type = "text/csv"
-            filename = f"projects_export.csv"
-            
-            return StreamingResponse(
-                io.StringIO(content),
-                media_type=media_type,
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
-            
-        elif format == "excel":
-            output = DataExporter.to_excel(formatted_data, "プロジェクト一覧")
-            content = output.getvalue()
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            filename = f"projects_export.xlsx"
-            
-            return StreamingResponse(
-                io.BytesIO(content),
-                media_type=media_type,
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
-            
-        elif format == "pdf":
-            title = f"プロジェクト一覧レポート"
-            if project_id:
-                project_name = next((p.name for p in projects if p.id == project_id), "不明")
-                title = f"プロジェクトレポート - {project_name}"
-            
-            output = DataExporter.to_pdf(formatted_data, title)
-            content = output.getvalue()
-            media_type = "application/pdf"
-            filename = f"projects_export.pdf"
-            
-            return StreamingResponse(
-                io.BytesIO(content),
-                media_type=media_type,
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
-            
-        else:
-            raise HTTPException(status_code=400, detail="サポートされていないフォーマットです")
-            
-    except Exception as e:
-        print(f"Export error: {e}")
-        raise HTTPException(status_code=500, detail=f"エクスポート中にエラーが発生しました: {str(e)}")
\ No newline at end of file
+    if not deleted["projects"]:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return {"message": "Project deleted successfully", "deleted": deleted}
@@ -0,0 +1,118 @@
+from datetime import date, timedelta
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from ...crud import project, progress_snapshot, project_member, time_totals
+from ...schemas.report import Burndown, Burnup, ProgressSnapshotResult, TimesheetReport
+from ...schemas.user import User
+from ...api.deps import get_current_user
+from ...api.v1.projects import check_project_permission
+from ...models import UserRole
+
+router = APIRouter()
+
+READ_ROLES = [UserRole.PROJECT_OWNER, UserRole.PROJECT_MANAGER, UserRole.TEAM_MEMBER, UserRole.VIEWER]
+MANAGER_ROLES = [UserRole.PROJECT_OWNER, UserRole.PROJECT_MANAGER]
+HISTORY_DAYS = 365
+MAX_REPORT_DAYS = 366
+
+
+def _history_range(
+    db: Session, project_id: int, current_user: User, start_date: Optional[date], end_date: Optional[date]
+):
+    if not project.get(db, id=project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    check_project_permission(project_id, current_user, db, required_roles=READ_ROLES)
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=HISTORY_DAYS)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    return start_date, end_date
+
+
+@router.get("/project/{project_id}/burndown", response_model=Burndown)
+def get_burndown(
+    project_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    phase_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Remaining hours per daily snapshot (the last year by default), with the ideal line"""
+    start_date, end_date = _history_range(db, project_id, current_user, start_date, end_date)
+    return progress_snapshot.get_burndown(
+        db, project_id=project_id, start_date=start_date, end_date=end_date, phase_id=phase_id
+    )
+
+
+@router.get("/project/{project_id}/burnup", response_model=Burnup)
+def get_burnup(
+    project_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    phase_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Scope and completed hours per daily snapshot (the last year by default)"""
+    start_date, end_date = _history_range(db, project_id, current_user, start_date, end_date)
+    return progress_snapshot.get_burnup(
+        db, project_id=project_id, start_date=start_date, end_date=end_date, phase_id=phase_id
+    )
+
+
+@router.post("/project/{project_id}/snapshot", response_model=ProgressSnapshotResult)
+def take_progress_snapshot(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Record today's progress of the project now, replacing today's earlier snapshot"""
+    if not project.get(db, id=project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    check_project_permission(project_id, current_user, db)
+    today = date.today()
+    written = progress_snapshot.take(db, snapshot_date=today, project_ids=[project_id], replace=True)
+    db.commit()
+    return {"snapshot_date": today, "rows_written": written}
+
+
+@router.get("/timesheet", response_model=TimesheetReport)
+def get_timesheet_report(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    project_id: Optional[int] = None,
+    department: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Logged hours per user, week and project with the billable split, cost and utilization
+
+    Covers the current month by default. Administrators see everyone's
+    time; project owners and managers everyone's time on the projects they
+    manage; otherwise users see their own time.
+    """
+    end_date = end_date or date.today()
+    start_date = start_date or end_date.replace(day=1)
+    if end_date < start_date or (end_date - start_date).days >= MAX_REPORT_DAYS:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+
+    project_ids = [project_id] if project_id is not None else None
+    user_ids = None
+    if current_user.role != UserRole.SYSTEM_ADMIN:
+        managed = {
+            m.project_id for role in MANAGER_ROLES
+            for m in project_member.get_user_projects_with_role(db, user_id=current_user.id, role=role)
+        }
+        if project_id is None and managed:
+            project_ids = sorted(managed)
+        elif project_id not in managed:
+            user_ids = [current_user.id]
+
+    return time_totals.get_report(
+        db, start_date=start_date, end_date=end_date, project_ids=project_ids, user_ids=user_ids,
+        department=department,
+    )
@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from ...crud import project_member, resource_utilization
+from ...schemas.utilization import UtilizationHeatmap
+from ...schemas.user import User
+from ...api.deps import get_current_user
+from ...models import ProjectMember, UserRole
+
+router = APIRouter()
+
+MANAGER_ROLES = [UserRole.PROJECT_OWNER, UserRole.PROJECT_MANAGER]
+MAX_WINDOW_DAYS = 366
+DEFAULT_WINDOW_DAYS = 28
+
+
+@router.get("/utilization", response_model=UtilizationHeatmap)
+def get_utilization_heatmap(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """User x day utilization across all running projects
+
+    Administrators see every user; project owners and managers see the
+    members of the projects they manage, with their load from all projects.
+    """
+    start_date = start_date or date.today()
+    end_date = end_date or start_date + timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    if end_date < start_date or (end_date - start_date).days >= MAX_WINDOW_DAYS:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+
+    user_ids = None
+    if current_user.role != UserRole.SYSTEM_ADMIN:
+        managed = [
+            m.project_id for role in MANAGER_ROLES
+            for m in project_member.get_user_projects_with_role(db, user_id=current_user.id, role=role)
+        ]
+        if not managed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions to view utilization"
+            )
+        rows = (
+            db.query(ProjectMember.user_id)
+            .filter(ProjectMember.project_id.in_(managed), ProjectMember.left_at.is_(None))
+            .distinct()
+            .all()
+        )
+        user_ids = [row.user_id for row in rows]
+
+    return resource_utilization.get_heatmap(
+        db, start_date=start_date, end_date=end_date, department=department, user_ids=user_ids
+    )
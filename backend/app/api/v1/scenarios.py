@@ -0,0 +1,120 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from ...crud import project_scenario, project_clone, resource_utilization
+from ...schemas.project import ProjectClone
+from ...schemas.scenario import Scenario, ScenarioCreate, ScenarioOverride, ScenarioTask, ScenarioTaskOverride
+from ...schemas.user import User
+from ...api.deps import get_current_user
+from ...api.v1.projects import check_project_permission
+from ...models import ProjectScenario, UserRole
+
+router = APIRouter()
+
+READ_ROLES = [UserRole.PROJECT_OWNER, UserRole.PROJECT_MANAGER, UserRole.TEAM_MEMBER, UserRole.VIEWER]
+
+
+def _get_scenario(db: Session, scenario_id: int, user: User, required_roles: List[UserRole] = None) -> ProjectScenario:
+    scenario = project_scenario.get(db, id=scenario_id)
+    if scenario is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scenario not found")
+    check_project_permission(scenario.project_id, user, db, required_roles=required_roles)
+    return scenario
+
+
+@router.get("/project/{project_id}", response_model=List[Scenario])
+def read_project_scenarios(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    check_project_permission(project_id, current_user, db, required_roles=READ_ROLES)
+    return project_scenario.get_by_project(db, project_id=project_id)
+
+
+@router.post("/project/{project_id}", response_model=Scenario)
+def create_scenario(
+    project_id: int,
+    scenario_in: ScenarioCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Branch a project; the scenario starts with no overrides"""
+    check_project_permission(project_id, current_user, db)
+    return project_scenario.create_with_owner(
+        db, project_id=project_id, obj_in=scenario_in, created_by=current_user.id
+    )
+
+
+@router.get("/{scenario_id}/tasks", response_model=List[ScenarioTask])
+def read_scenario_tasks(
+    scenario_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """The project's tasks with the scenario's overrides applied"""
+    scenario = _get_scenario(db, scenario_id, current_user, required_roles=READ_ROLES)
+    return project_scenario.get_tasks(db, scenario=scenario)
+
+
+@router.put("/{scenario_id}/tasks/{task_id}", response_model=ScenarioTaskOverride)
+def override_scenario_task(
+    scenario_id: int,
+    task_id: int,
+    override_in: ScenarioOverride,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Change task fields in the scenario only; null restores the base value"""
+    scenario = _get_scenario(db, scenario_id, current_user)
+    override = project_scenario.set_override(db, scenario=scenario, task_id=task_id, obj_in=override_in)
+    if override is None:
+        raise HTTPException(status_code=404, detail="Task not found in the scenario's project")
+    return override
+
+
+@router.delete("/{scenario_id}/tasks/{task_id}")
+def reset_scenario_task(
+    scenario_id: int,
+    task_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    scenario = _get_scenario(db, scenario_id, current_user)
+    if not project_scenario.remove_override(db, scenario=scenario, task_id=task_id):
+        raise HTTPException(status_code=404, detail="Task is not overridden in this scenario")
+    return {"message": "Override removed successfully"}
+
+
+@router.delete("/{scenario_id}")
+def delete_scenario(
+    scenario_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    _get_scenario(db, scenario_id, current_user)
+    project_scenario.remove(db, id=scenario_id)
+    return {"message": "Scenario deleted successfully"}
+
+
+@router.post("/{scenario_id}/promote")
+def promote_scenario(
+    scenario_id: int,
+    clone_in: ProjectClone,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Copy the base project with the scenario's overrides into a new project"""
+    scenario = _get_scenario(db, scenario_id, current_user)
+    try:
+        copied = project_clone.clone(
+            db, project_id=scenario.project_id, name=clone_in.name, description=clone_in.description,
+            owner_id=current_user.id, scenario_id=scenario.id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    resource_utilization.invalidate()
+    return {"project_id": copied.pop("project_id"), "copied": copied}
@@ -0,0 +1,310 @@
+from datetime import date, datetime
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+import numpy as np
+
+from ...database import get_db
+from ...crud import project, work_calendar, resource_utilization, task_rollup, earned_value
+from ...schemas.schedule import (
+    ScheduleSimulationRequest, ScheduleSimulationResult, RescheduleRequest, ScheduleResult, OverdueTask,
+    ResourceLevelingRequest, PortfolioLevelingRequest, ResourceLevelingResult, EarnedValueReport
+)
+from ...schemas.user import User
+from ...api.deps import get_current_user
+from ...api.v1.tasks import check_task_permission
+from ...models import TaskStatus, UserRole
+from ...utils.schedule_network import CyclicDependencyError, load_schedule_network
+from ...utils.schedule_risk import simulate, simulation_inputs
+from ...utils.resource_leveling import level_resources, load_resource_pool
+from ...utils.scheduling import critical_path, overdue_workdays
+from ...utils.work_calendar import finish_offsets, to_date
+
+router = APIRouter()
+
+READ_ROLES = [UserRole.PROJECT_OWNER, UserRole.PROJECT_MANAGER, UserRole.TEAM_MEMBER, UserRole.VIEWER]
+
+
+def _load_network(
+    db: Session, project_ids: List[int], current_user: User, required_roles: Optional[List[UserRole]]
+):
+    for project_id in project_ids:
+        if not project.get(db, id=project_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        check_task_permission(project_id, current_user, db, required_roles=required_roles)
+    try:
+        return load_schedule_network(db, project_ids)
+    except CyclicDependencyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _write_planned_dates(db: Session, tasks: List[dict]) -> None:
+    """Store computed dates and critical flags in one executemany round trip"""
+    if not tasks:
+        return
+    db.execute(
+        text("""
+            UPDATE tasks SET planned_start_date = :start, planned_end_date = :end,
+                             is_critical_path = :critical, updated_at = CURRENT_TIMESTAMP
+            WHERE id = :id
+        """),
+        [
+            {
+                "id": t["task_id"],
+                "start": datetime.combine(t["planned_start_date"], datetime.min.time()),
+                "end": datetime.combine(t["planned_end_date"], datetime.min.time()),
+                "critical": t["is_critical"],
+            }
+            for t in tasks
+        ],
+    )
+    task_rollup.refresh(db, [t["task_id"] for t in tasks])
+    db.commit()
+    resource_utilization.invalidate()
+
+
+@router.post("/project/{project_id}/simulation", response_model=ScheduleSimulationResult)
+def simulate_project_schedule(
+    *,
+    db: Session = Depends(get_db),
+    project_id: int,
+    simulation_in: ScheduleSimulationRequest,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Monte Carlo completion date percentiles and task criticality for a project"""
+    network = _load_network(db, [project_id], current_user, READ_ROLES)
+    calendar = work_calendar.get_working_calendar(db, project_id=project_id)
+    origin = simulation_in.start_date or date.today()
+    low, mode, high, floor = simulation_inputs(
+        network,
+        calendar=calendar,
+        origin=origin,
+        hours_per_day=simulation_in.hours_per_day,
+        optimistic_factor=simulation_in.optimistic_factor,
+        pessimistic_factor=simulation_in.pessimistic_factor,
+        respect_planned_dates=simulation_in.respect_planned_dates,
+        overrides={
+            e.task_id: (e.optimistic_hours, e.most_likely_hours, e.pessimistic_hours)
+            for e in simulation_in.estimates
+        },
+    )
+    result = simulate(
+        network,
+        low=low,
+        mode=mode,
+        high=high,
+        floor=floor,
+        iterations=simulation_in.iterations,
+        distribution=simulation_in.distribution,
+        seed=simulation_in.seed,
+    )
+
+    finish_percentiles = np.percentile(result.finish_days, simulation_in.percentiles)
+    # Working-day offsets to dates in one vectorised call
+    summary_dates = calendar.offsets_to_dates(origin, finish_offsets(
+        [result.deterministic_finish_days, result.finish_days.mean(), *finish_percentiles]
+    ))
+    task_dates = calendar.offsets_to_dates(origin, finish_offsets(result.mean_finish_days))
+    order = np.argsort(-result.criticality, kind="stable")
+    order = order[~network.summary_node[order]]
+    return {
+        "project_id": project_id,
+        "iterations": simulation_in.iterations,
+        "distribution": simulation_in.distribution,
+        "start_date": to_date(calendar.roll_forward(origin)),
+        "deterministic_finish_date": to_date(summary_dates[0]),
+        "mean_finish_date": to_date(summary_dates[1]),
+        "percentiles": [
+            {
+                "percentile": p,
+                "finish_date": to_date(finish_date),
+                "duration_days": round(float(days), 2),
+            }
+            for p, days, finish_date in zip(simulation_in.percentiles, finish_percentiles, summary_dates[2:])
+        ],
+        "tasks": [
+            {
+                "task_id": int(network.task_ids[i]),
+                "name": network.names[i],
+                "wbs_code": network.wbs_codes[i],
+                "criticality": round(float(result.criticality[i]), 4),
+                "mean_finish_date": to_date(task_dates[i]),
+            }
+            for i in order.tolist()
+        ],
+    }
+
+
+@router.post("/project/{project_id}/reschedule", response_model=ScheduleResult)
+def reschedule_project(
+    *,
+    db: Session = Depends(get_db),
+    project_id: int,
+    schedule_in: RescheduleRequest,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Critical-path dates on the project calendar; written to the tasks when `apply` is set"""
+    network = _load_network(
+        db, [project_id], current_user, None if schedule_in.apply else READ_ROLES
+    )
+    calendar = work_calendar.get_working_calendar(db, project_id=project_id)
+    origin = schedule_in.start_date or date.today()
+    _, mode, _, floor = simulation_inputs(
+        network,
+        calendar=calendar,
+        origin=origin,
+        hours_per_day=schedule_in.hours_per_day,
+        respect_planned_dates=schedule_in.respect_planned_dates,
+    )
+    schedule = critical_path(network, mode, floor, calendar, origin)
+    pending = ~network.status_mask(TaskStatus.COMPLETED) & ~network.summary_node
+
+    tasks = [
+        {
+            "task_id": int(network.task_ids[i]),
+            "name": network.names[i],
+            "wbs_code": network.wbs_codes[i],
+            "planned_start_date": to_date(schedule.start_dates[i]),
+            "planned_end_date": to_date(schedule.end_dates[i]),
+            "total_float_days": round(float(schedule.total_float[i]), 2),
+            "is_critical": bool(schedule.critical[i]),
+        }
+        for i in np.flatnonzero(pending).tolist()
+    ]
+    if schedule_in.apply:
+        _write_planned_dates(db, tasks)
+
+    return {
+        "project_id": project_id,
+        "start_date": to_date(calendar.roll_forward(origin)),
+        "finish_date": to_date(schedule.finish_date),
+        "applied": schedule_in.apply,
+        "tasks": tasks,
+    }
+
+
+@router.get("/project/{project_id}/overdue", response_model=List[OverdueTask])
+def get_overdue_tasks(
+    project_id: int,
+    as_of: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Unfinished tasks past their planned end, with working days overdue"""
+    network = _load_network(db, [project_id], current_user, READ_ROLES)
+    calendar = work_calendar.get_working_calendar(db, project_id=project_id)
+    late = overdue_workdays(network, calendar, as_of or date.today())
+    order = np.flatnonzero(late > 0)
+    order = order[np.argsort(-late[order], kind="stable")]
+    return [
+        {
+            "task_id": int(network.task_ids[i]),
+            "name": network.names[i],
+            "wbs_code": network.wbs_codes[i],
+            "planned_end_date": to_date(network.planned_end[i]),
+            "workdays_overdue": int(late[i]),
+        }
+        for i in order.tolist()
+    ]
+
+
+@router.get("/project/{project_id}/evm", response_model=EarnedValueReport)
+def get_earned_value(
+    project_id: int,
+    as_of: Optional[date] = None,
+    interval: Literal["day", "week"] = "week",
+    unit: Literal["cost", "hours"] = "cost",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Planned value, earned value and actual cost over time, with SPI / CPI, per project and phase"""
+    if not project.get(db, id=project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    check_task_permission(project_id, current_user, db, required_roles=READ_ROLES)
+    return earned_value.get_report(db, project_id=project_id, as_of=as_of, interval=interval, unit=unit)
+
+
+def _level(
+    db: Session, project_ids: List[int], leveling_in: ResourceLevelingRequest, current_user: User
+) -> dict:
+    network = _load_network(db, project_ids, current_user, None if leveling_in.apply else READ_ROLES)
+    # A portfolio is levelled on the organisation calendar
+    calendar = work_calendar.get_working_calendar(
+        db, project_id=project_ids[0] if len(project_ids) == 1 else None
+    )
+    hours_per_day = leveling_in.hours_per_day or calendar.hours_per_day
+    origin = leveling_in.start_date or date.today()
+    _, mode, _, floor = simulation_inputs(
+        network,
+        calendar=calendar,
+        origin=origin,
+        hours_per_day=hours_per_day,
+        respect_planned_dates=leveling_in.respect_planned_dates,
+    )
+    pool = load_resource_pool(db, network, hours_per_day)
+    result = level_resources(
+        network, pool, mode, floor, calendar, origin,
+        rule=leveling_in.priority_rule,
+        allow_project_delay=leveling_in.allow_project_delay,
+    )
+    start_dates = calendar.offsets_to_dates(origin, result.start)
+    end_dates = calendar.offsets_to_dates(origin, result.finish)
+    early_end = calendar.offsets_to_dates(origin, result.early_start + np.maximum(result.durations - 1, 0))
+    leaves = ~network.summary_node
+    pending = ~network.status_mask(TaskStatus.COMPLETED) & leaves
+    delay = result.delay
+    remaining_float = np.maximum(result.total_float - delay, 0)
+
+    tasks = [
+        {
+            "task_id": int(network.task_ids[i]),
+            "project_id": int(network.project_ids[i]),
+            "name": network.names[i],
+            "wbs_code": network.wbs_codes[i],
+            "planned_start_date": to_date(start_dates[i]),
+            "planned_end_date": to_date(end_dates[i]),
+            "total_float_days": float(remaining_float[i]),
+            "is_critical": bool(remaining_float[i] == 0),
+            "delay_days": int(delay[i]),
+            "resource_conflict": bool(result.unresolved[i]),
+        }
+        for i in np.flatnonzero(pending).tolist()
+    ]
+    if leveling_in.apply:
+        _write_planned_dates(db, tasks)
+
+    return {
+        "project_ids": project_ids,
+        "start_date": to_date(calendar.roll_forward(origin)),
+        "early_finish_date": to_date(early_end[leaves].max()) if leaves.any() else None,
+        "finish_date": to_date(end_dates[leaves].max()) if leaves.any() else None,
+        "overallocated_hours_before": round(result.overallocated_hours_before, 2),
+        "overallocated_hours_after": round(result.overallocated_hours_after, 2),
+        "unresolved_count": int(result.unresolved.sum()),
+        "applied": leveling_in.apply,
+        "tasks": tasks,
+    }
+
+
+@router.post("/project/{project_id}/level", response_model=ResourceLevelingResult)
+def level_project_resources(
+    *,
+    db: Session = Depends(get_db),
+    project_id: int,
+    leveling_in: ResourceLevelingRequest,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Resource-levelled schedule of a project; written to the tasks when `apply` is set"""
+    return _level(db, [project_id], leveling_in, current_user)
+
+
+@router.post("/portfolio/level", response_model=ResourceLevelingResult)
+def level_portfolio_resources(
+    *,
+    db: Session = Depends(get_db),
+    leveling_in: PortfolioLevelingRequest,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Level users shared across several projects in one pass"""
+    return _level(db, sorted(set(leveling_in.project_ids)), leveling_in, current_user)
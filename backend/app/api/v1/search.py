@@ -0,0 +1,105 @@
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from ...crud import search as search_index, task, project, project_member, user as user_crud
+from ...models.search import ENTITY_TYPES
+from ...schemas.search import SearchResults
+from ...schemas.user import User
+from ...api.deps import get_current_user
+from ...models import UserRole
+
+router = APIRouter()
+
+
+def _parse_types(types: Optional[str]) -> List[str]:
+    if not types:
+        return list(ENTITY_TYPES)
+    requested = [t.strip() for t in types.split(",") if t.strip()]
+    unknown = [t for t in requested if t not in ENTITY_TYPES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown search types: {', '.join(unknown)}"
+        )
+    return requested
+
+
+def _fallback_search(
+    db: Session, *, q: str, entity_types: List[str], project_ids: Optional[List[int]], count: int
+) -> List[Dict]:
+    """Unranked LIKE search for databases without the FTS5 index"""
+    hits = []
+    if "project" in entity_types:
+        for p in project.search_projects(db, search_term=q, limit=count):
+            if project_ids is None or p.id in project_ids:
+                hits.append({"type": "project", "id": p.id, "project_id": p.id,
+                             "title": p.name, "snippet": (p.description or "")[:80]})
+    if "task" in entity_types:
+        scope = project_ids if project_ids is not None else [p.id for p in project.get_multi(db, limit=10000)]
+        for project_id in scope:
+            for t in task.search_tasks(db, project_id=project_id, search_term=q, limit=count):
+                hits.append({"type": "task", "id": t.id, "project_id": t.project_id,
+                             "title": t.name, "snippet": (t.description or "")[:80]})
+    if "user" in entity_types:
+        for u in user_crud.search_users(db, search_term=q, limit=count):
+            hits.append({"type": "user", "id": u.id, "project_id": None,
+                         "title": u.full_name, "snippet": u.username})
+    return hits[:count]
+
+
+@router.get("/", response_model=SearchResults)
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = Query(None, description="Comma separated: task,project,user"),
+    project_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Ranked search across tasks, projects and users"""
+    if not q.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must not be blank"
+        )
+    entity_types = _parse_types(types)
+
+    # Non-admins only see tasks and projects they are a member of
+    if current_user.role == UserRole.SYSTEM_ADMIN:
+        project_ids = None
+    else:
+        project_ids = project_member.get_project_ids_by_user(db, user_id=current_user.id)
+    if project_id is not None:
+        if project_ids is not None and project_id not in project_ids:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions to access this project"
+            )
+        project_ids = [project_id]
+        entity_types = [t for t in entity_types if t != "user"]
+
+    # Fetch one extra row to tell whether another page exists
+    if search_index.is_available(db):
+        hits = search_index.search(
+            db,
+            search_term=q,
+            entity_types=entity_types,
+            project_ids=project_ids,
+            skip=skip,
+            limit=limit + 1,
+        )
+    else:
+        hits = _fallback_search(
+            db, q=q, entity_types=entity_types, project_ids=project_ids, count=skip + limit + 1
+        )[skip:]
+
+    return {
+        "query": q,
+        "skip": skip,
+        "limit": limit,
+        "has_more": len(hits) > limit,
+        "items": hits[:limit],
+    }
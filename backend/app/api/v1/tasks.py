@@ -1,18 +1,25 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from ...database import get_db
-from ...crud import task, task_dependency, task_assignment, task_comment, time_tracking, project_member
+from ...crud import (
+    task, task_dependency, task_assignment, task_comment, time_tracking, project_member, resource_utilization,
+    task_rollup, task_tree, cascade, task_history,
+)
+from ...crud.history import AUDITED_FIELDS, diff_task
+from ...utils.encoding import ORJSONResponse
+from ...utils.gantt import GanttScope, load_compact_gantt, load_link_rows, load_task_rows
 from ...schemas.task import (
-    Task, TaskCreate, TaskUpdate, TaskWithDetails, TaskHierarchy, GanttData,
+    Task, TaskCreate, TaskUpdate, TaskMove, TaskWithDetails, TaskHierarchy, GanttData,
     TaskDependency, TaskDependencyCreate,
     TaskAssignment, TaskAssignmentCreate, TaskAssignmentUpdate,
     TaskComment, TaskCommentCreate, TaskCommentUpdate,
     TimeTracking, TimeTrackingCreate, TimeTrackingUpdate
 )
 from ...schemas.user import User
-from ...api.deps import get_current_user
+from ...api.deps import get_current_user, get_optional_current_user
 from ...models import UserRole
 
 router = APIRouter()
@@ -39,6 +46,28 @@ def check_task_permission(
         )
 
 
+def notify_resource_conflicts(db: Session, task_id: int) -> None:
+    """Notify assignees over-allocated while the task is planned to run"""
+    from sqlalchemy import text
+
+    # Read with raw SQL: tasks written by the raw endpoints store lowercase enum values
+    row = db.execute(
+        text("SELECT project_id, date(planned_start_date), date(planned_end_date) FROM tasks WHERE id = :task_id"),
+        {"task_id": task_id},
+    ).fetchone()
+    if not row or not row[1] or not row[2]:
+        return
+    user_ids = [a.user_id for a in task_assignment.get_by_task(db, task_id=task_id)]
+    resource_utilization.notify_conflicts(
+        db,
+        user_ids=user_ids,
+        start_date=date.fromisoformat(row[1]),
+        end_date=date.fromisoformat(row[2]),
+        project_id=row[0],
+        task_id=task_id,
+    )
+
+
 # Task endpoints
 @router.get("/project/{project_id}")
 def read_project_tasks(
@@ -73,7 +102,8 @@ def read_project_tasks(
                 "project_id": project_id
             })
         
-        return tasks
+        # Plain row values, so the response skips jsonable_encoder
+        return ORJSONResponse(tasks)
         
     except Exception as e:
         print(f"Error fetching tasks: {e}")
@@ -83,18 +113,37 @@ def read_project_tasks(
 @router.get("/project/{project_id}/gantt")
 def get_gantt_data(
     project_id: int,
+    format: Literal["full", "compact"] = "full",
+    start_date: Optional[date] = Query(None, description="Only tasks whose bars end on or after this day"),
+    end_date: Optional[date] = Query(None, description="Only tasks whose bars start on or before this day"),
+    expanded: Optional[str] = Query(
+        None, description="Comma separated expanded parent ids; given (even empty), collapsed subtrees are left out"
+    ),
     db: Session = Depends(get_db),
 ) -> Any:
-    """Get Gantt chart data for project - simplified version"""
+    """Get Gantt chart data for project - simplified version
+
+    `format=compact` returns column arrays without descriptions (see
+    app/utils/gantt.py).
+    With `expanded`, tasks also carry `child_count` and `collapsed`, which
+    marks the summary rows of collapsed parents.
+    """
+    try:
+        expanded_ids = None if expanded is None else {int(i) for i in expanded.split(",") if i.strip()}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="expanded must be comma separated task ids")
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    scope = GanttScope(project_id, start_date=start_date, end_date=end_date, expanded=expanded_ids)
+    if format == "compact":
+        return ORJSONResponse(load_compact_gantt(db, scope))
     try:
-        from sqlalchemy import text
-        
         # Get tasks for the project
-        result = db.execute(
-            text("SELECT id, name, description, task_type, status, priority, estimated_hours, actual_hours, planned_start_date, planned_end_date, progress_percentage, parent_id, created_at FROM tasks WHERE project_id = :project_id ORDER BY created_at"),
-            {"project_id": project_id}
+        rows = load_task_rows(
+            db,
+            "SELECT id, name, description, task_type, status, priority, estimated_hours, actual_hours, planned_start_date, planned_end_date, progress_percentage, parent_id, created_at, rollup_start_date, rollup_end_date, rollup_estimated_hours, rollup_actual_hours, rollup_remaining_hours, rollup_progress, wbs_code, sort_order{columns} FROM tasks t WHERE {scope} ORDER BY sort_key, id",
+            scope,
         )
-        rows = result.fetchall()
         
         tasks = []
         for row in rows:
@@ -111,21 +160,21 @@ def get_gantt_data(
                 "end_date": row[9],
                 "progress_percentage": row[10] or 0,
                 "parent_task_id": row[11],
-                "created_at": row[12]
+                "created_at": row[12],
+                "rollup_start_date": row[13],
+                "rollup_end_date": row[14],
+                "rollup_estimated_hours": row[15],
+                "rollup_actual_hours": row[16],
+                "rollup_remaining_hours": row[17],
+                "rollup_progress": row[18],
+                "wbs_code": row[19],
+                "sort_order": row[20]
             })
+            if scope.lazy:
+                tasks[-1].update(child_count=row[21], collapsed=row[22])
         
-        # Get dependencies for the project
-        deps_result = db.execute(
-            text("""
-                SELECT td.id, td.predecessor_id, td.successor_id, td.dependency_type, td.lag_days
-                FROM task_dependencies td
-                JOIN tasks t1 ON td.predecessor_id = t1.id
-                JOIN tasks t2 ON td.successor_id = t2.id
-                WHERE t1.project_id = :project_id AND t2.project_id = :project_id
-            """),
-            {"project_id": project_id}
-        )
-        deps_rows = deps_result.fetchall()
+        # Get dependencies between the tasks
+        deps_rows = load_link_rows(db, scope, {task["id"] for task in tasks})
         
         links = []
         for dep_row in deps_rows:
@@ -137,10 +186,10 @@ def get_gantt_data(
                 "lag": dep_row[4]      # lag_days
             })
         
-        return {
+        return ORJSONResponse({
             "tasks": tasks,
             "links": links
-        }
+        })
         
     except Exception as e:
         print(f"Error fetching gantt data: {e}")
@@ -179,6 +228,7 @@ def create_task(
         name = task_data.get("name", "Untitled Task")
         description = task_data.get("description", "")
         project_id = task_data.get("project_id")
+        parent_id = task_data.get("parent_id")
         task_type = task_data.get("task_type", "task")
         status = task_data.get("status", "not_started")
         priority = task_data.get("priority", "medium")
@@ -189,11 +239,12 @@ def create_task(
         
         # Simple SQL insert
         result = db.execute(
-            text("INSERT INTO tasks (name, description, project_id, task_type, status, priority, estimated_hours, actual_hours, planned_start_date, planned_end_date, created_at) VALUES (:name, :description, :project_id, :task_type, :status, :priority, :estimated_hours, :actual_hours, :start_date, :end_date, datetime('now'))"),
+            text("INSERT INTO tasks (name, description, project_id, parent_id, task_type, status, priority, estimated_hours, actual_hours, planned_start_date, planned_end_date, created_at) VALUES (:name, :description, :project_id, :parent_id, :task_type, :status, :priority, :estimated_hours, :actual_hours, :start_date, :end_date, datetime('now'))"),
             {
                 "name": name,
                 "description": description,
                 "project_id": project_id,
+                "parent_id": parent_id,
                 "task_type": task_type,
                 "status": status,
                 "priority": priority,
@@ -203,11 +254,14 @@ def create_task(
                 "end_date": end_date
             }
         )
+        task_tree.place(db, task_id=result.lastrowid, position=task_data.get("position"))
+        task_rollup.refresh(db, [result.lastrowid, parent_id])
         db.commit()
         
         # Get the created task
         task_result = db.execute(
-            text("SELECT id, name, description, task_type, status, priority, estimated_hours, actual_hours, planned_start_date, planned_end_date, created_at FROM tasks WHERE id = last_insert_rowid()")
+            text("SELECT id, name, description, task_type, status, priority, estimated_hours, actual_hours, planned_start_date, planned_end_date, created_at, parent_id FROM tasks WHERE id = :task_id"),
+            {"task_id": result.lastrowid}
         )
         row = task_result.fetchone()
         
@@ -223,7 +277,8 @@ def create_task(
             "start_date": row[8],
             "end_date": row[9],
             "created_at": row[10],
-            "project_id": project_id
+            "project_id": project_id,
+            "parent_task_id": row[11]
         }
         
     except Exception as e:
@@ -236,11 +291,15 @@ def update_task(
     task_id: int,
     task_data: dict,
     db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_current_user),
 ) -> Any:
     """Update task"""
     try:
         from sqlalchemy import text
         
+        before = db.execute(
+            text(f"SELECT {', '.join(AUDITED_FIELDS)} FROM tasks WHERE id = :task_id"), {"task_id": task_id}
+        ).mappings().first()
         name = task_data.get("name")
         description = task_data.get("description")
         task_type = task_data.get("task_type")
@@ -252,9 +311,11 @@ def update_task(
         end_date = task_data.get("end_date")
         progress_percentage = task_data.get("progress_percentage")
         
-        # Update task
+        # Update task; actual_hours is kept up to date from the time entries,
+        # so it is only overwritten when the body sets it explicitly
+        actual_hours_column = "actual_hours = :actual_hours, " if "actual_hours" in task_data else ""
         db.execute(
-            text("UPDATE tasks SET name = :name, description = :description, task_type = :task_type, status = :status, priority = :priority, estimated_hours = :estimated_hours, actual_hours = :actual_hours, planned_start_date = :start_date, planned_end_date = :end_date, progress_percentage = :progress_percentage, updated_at = datetime('now') WHERE id = :task_id"),
+            text(f"UPDATE tasks SET name = :name, description = :description, task_type = :task_type, status = :status, priority = :priority, estimated_hours = :estimated_hours, {actual_hours_column}planned_start_date = :start_date, planned_end_date = :end_date, progress_percentage = :progress_percentage, updated_at = datetime('now') WHERE id = :task_id"),
             {
                 "name": name,
                 "description": description,
@@ -269,7 +330,11 @@ def update_task(
                 "task_id": task_id
             }
         )
+        task_rollup.refresh(db, [task_id])
         db.commit()
+        resource_utilization.invalidate()
+        if start_date or end_date:
+            notify_resource_conflicts(db, task_id)
         
         # Get updated task
         result = db.execute(
@@ -279,6 +344,15 @@ def update_task(
         row = result.fetchone()
         
         if row:
+            after = {
+                "name": row[1], "description": row[2], "task_type": row[3], "status": row[4],
+                "priority": row[5], "estimated_hours": row[6], "actual_hours": row[7],
+                "planned_start_date": row[8], "planned_end_date": row[9], "progress_percentage": row[10],
+            }
+            task_history.record(
+                task_id=task_id, user_id=current_user.id if current_user else None,
+                changes=diff_task(before or {}, after),
+            )
             return {
                 "id": row[0],
                 "name": row[1],
@@ -312,14 +386,12 @@ def delete_task(
     try:
         from sqlalchemy import text
         
-        # Delete task
-        result = db.execute(
-            text("DELETE FROM tasks WHERE id = :task_id"),
-            {"task_id": task_id}
-        )
+        # Delete the task with its subtree and everything referencing them
+        deleted = cascade.delete_subtree(db, task_id=task_id)
         db.commit()
+        resource_utilization.invalidate()
         
-        if result.rowcount > 0:
+        if deleted.get("tasks"):
             return {"message": "Task deleted successfully"}
         else:
             raise HTTPException(status_code=404, detail="Task not found")
@@ -476,6 +548,105 @@ def read_task(
     return task_obj
 
 
+@router.get("/{task_id}/description")
+def read_task_description(
+    *,
+    db: Session = Depends(get_db),
+    task_id: int,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Get only the description of a task, for views loaded without descriptions"""
+    from sqlalchemy import text
+
+    row = db.execute(
+        text("SELECT project_id, description FROM tasks WHERE id = :task_id"), {"task_id": task_id}
+    ).fetchone()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+
+    check_task_permission(
+        row[0], current_user, db,
+        required_roles=[UserRole.PROJECT_OWNER, UserRole.PROJECT_MANAGER, UserRole.TEAM_MEMBER, UserRole.VIEWER]
+    )
+
+    return {"id": task_id, "description": row[1]}
+
+
+@router.get("/{task_id}/subtree", response_model=List[Task])
+def read_task_subtree(
+    *,
+    db: Session = Depends(get_db),
+    task_id: int,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Get a task and all its descendants, parents before children"""
+    task_obj = task.get(db, id=task_id)
+    if not task_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+
+    check_task_permission(
+        task_obj.project_id, current_user, db,
+        required_roles=[UserRole.PROJECT_OWNER, UserRole.PROJECT_MANAGER, UserRole.TEAM_MEMBER, UserRole.VIEWER]
+    )
+
+    return task_tree.get_subtree(db, task_id=task_id)
+
+
+@router.put("/{task_id}/move", response_model=Task)
+def move_task(
+    *,
+    db: Session = Depends(get_db),
+    task_id: int,
+    move_in: TaskMove,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Move a task with its subtree under another parent (or to the top level), or reorder it
+
+    Siblings after the old and new positions are renumbered together with
+    their subtrees.
+    """
+    task_obj = task.get(db, id=task_id)
+    if not task_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+
+    check_task_permission(task_obj.project_id, current_user, db)
+
+    if move_in.parent_id is not None:
+        parent_obj = task.get(db, id=move_in.parent_id)
+        if not parent_obj or parent_obj.project_id != task_obj.project_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parent task must belong to the same project"
+            )
+        if task_tree.is_in_subtree(db, root_id=task_id, task_id=move_in.parent_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot move a task under itself or its descendants"
+            )
+
+    old_parent_id = task_tree.move(
+        db, task_id=task_id, parent_id=move_in.parent_id, position=move_in.position
+    )
+    task_rollup.refresh(db, [task_id, old_parent_id])
+    db.commit()
+    resource_utilization.invalidate()
+    db.refresh(task_obj)
+    task_history.record(
+        task_id=task_id, user_id=current_user.id,
+        changes=diff_task({"parent_id": old_parent_id}, {"parent_id": task_obj.parent_id}),
+    )
+    return task_obj
+
+
 @router.put("/{task_id}", response_model=Task)
 def update_task(
     *,
@@ -494,7 +665,12 @@ def update_task(
     
     check_task_permission(task_obj.project_id, current_user, db)
     
+    before = {field: getattr(task_obj, field) for field in AUDITED_FIELDS}
     task_obj = task.update(db, db_obj=task_obj, obj_in=task_in)
+    task_history.record(
+        task_id=task_id, user_id=current_user.id,
+        changes=diff_task(before, {field: getattr(task_obj, field) for field in AUDITED_FIELDS}),
+    )
     return task_obj
 
 
@@ -598,6 +774,7 @@ def assign_task(
     
     assignment_in.task_id = task_id
     assignment_obj = task_assignment.create(db, obj_in=assignment_in)
+    notify_resource_conflicts(db, task_id)
     return assignment_obj
 
 
@@ -733,10 +910,7 @@ def log_time(
     )
     
     time_in.task_id = task_id
-    time_obj = time_tracking.create(db, obj_in=time_in)
-    time_obj.user_id = current_user.id
-    db.commit()
-    db.refresh(time_obj)
+    time_obj = time_tracking.create_with_user(db, obj_in=time_in, user_id=current_user.id)
     
     return time_obj
 
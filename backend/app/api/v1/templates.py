@@ -0,0 +1,88 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from ...crud import template, resource_utilization
+from ...schemas.template import (
+    Template, TemplateCreate, TemplateUpdate, TemplateInstantiate, TemplateInstantiateResult
+)
+from ...schemas.user import User
+from ...api.deps import get_current_user
+from ...models import UserRole
+
+router = APIRouter()
+
+
+def _get_readable(db: Session, template_id: int, user: User):
+    db_obj = template.get(db, id=template_id)
+    if db_obj is None or not (
+        db_obj.is_public or db_obj.created_by == user.id or user.role == UserRole.SYSTEM_ADMIN
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template not found")
+    return db_obj
+
+
+@router.get("/", response_model=List[Template])
+def read_templates(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Public templates and the current user's own"""
+    return template.get_accessible(
+        db, user_id=current_user.id, include_all=current_user.role == UserRole.SYSTEM_ADMIN
+    )
+
+
+@router.post("/", response_model=Template)
+def create_template(
+    template_in: TemplateCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Create a template; the task structure is validated on the way in"""
+    return template.create_with_owner(db, obj_in=template_in, created_by=current_user.id)
+
+
+@router.get("/{template_id}", response_model=Template)
+def read_template(
+    template_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    return _get_readable(db, template_id, current_user)
+
+
+@router.put("/{template_id}", response_model=Template)
+def update_template(
+    template_id: int,
+    template_in: TemplateUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    db_obj = _get_readable(db, template_id, current_user)
+    if db_obj.created_by != current_user.id and current_user.role != UserRole.SYSTEM_ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to edit this template"
+        )
+    return template.update(db, db_obj=db_obj, obj_in=template_in)
+
+
+@router.post("/{template_id}/instantiate", response_model=TemplateInstantiateResult)
+def instantiate_template(
+    template_id: int,
+    instantiate_in: TemplateInstantiate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Create a project from a template with its tasks, hierarchy and dependencies in one transaction"""
+    db_obj = _get_readable(db, template_id, current_user)
+    try:
+        result = template.instantiate(db, template=db_obj, obj_in=instantiate_in, owner_id=current_user.id)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid template data: {e.errors()[0]['msg']}")
+    db.commit()
+    resource_utilization.invalidate()
+    return result
@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from ...crud import project_member, time_tracking
+from ...schemas.timesheet import Timesheet, WeeklyTimesheet, WeeklyTimesheetResult
+from ...schemas.user import User
+from ...api.deps import get_current_user
+from ...models import UserRole
+
+router = APIRouter()
+
+WRITE_ROLES = [UserRole.PROJECT_OWNER, UserRole.PROJECT_MANAGER, UserRole.TEAM_MEMBER]
+
+
+@router.post("/week", response_model=WeeklyTimesheetResult)
+def submit_week(
+    *,
+    db: Session = Depends(get_db),
+    sheet: WeeklyTimesheet,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """Log the current user's week of time entries across any number of tasks in one transaction"""
+    week_end = sheet.week_start + timedelta(days=6)
+    outside = sorted({str(e.date) for e in sheet.entries if not sheet.week_start <= e.date <= week_end})
+    if outside:
+        raise HTTPException(status_code=400, detail=f"Entries outside the week: {', '.join(outside)}")
+
+    # Every referenced task and the user's role in its project, in one query
+    task_ids = sorted({e.task_id for e in sheet.entries})
+    roles = project_member.get_task_roles(db, user_id=current_user.id, task_ids=task_ids)
+    missing = [str(i) for i in task_ids if i not in roles]
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Tasks not found: {', '.join(missing)}")
+    if current_user.role != UserRole.SYSTEM_ADMIN:
+        denied = [str(i) for i, (_, role) in roles.items() if role not in WRITE_ROLES]
+        if denied:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Not enough permissions to log time on tasks: {', '.join(denied)}"
+            )
+
+    written = time_tracking.create_week(
+        db,
+        user_id=current_user.id,
+        week_start=sheet.week_start,
+        entries=sheet.entries,
+        project_ids={i: project_id for i, (project_id, _) in roles.items()},
+        replace=sheet.replace,
+    )
+    db.commit()
+    return {**time_tracking.get_week(db, user_id=current_user.id, week_start=sheet.week_start), **written}
+
+
+@router.get("/week", response_model=Timesheet)
+def read_week(
+    week_start: date,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """The current user's hours per task and day for the week starting at week_start"""
+    return time_tracking.get_week(db, user_id=current_user.id, week_start=week_start)
@@ -0,0 +1,114 @@
+"""Maintenance commands
+
+    python -m app.cli rebuild-hierarchy [--project-id ID]
+    python -m app.cli rebuild-rollups [--project-id ID]
+    python -m app.cli archive-projects [--project-id ID] [--ended-before YYYY-MM-DD]
+    python -m app.cli snapshot-progress [--project-id ID] [--date YYYY-MM-DD] [--replace]
+    python -m app.cli reconcile-time [--project-id ID]
+"""
+import argparse
+import sys
+from datetime import date, datetime
+from typing import List, Optional
+
+from .crud.archive import project_archive
+from .crud.hierarchy import task_tree
+from .crud.progress import progress_snapshot
+from .crud.rollup import task_rollup
+from .crud.time_totals import time_totals
+from .database import SessionLocal
+
+
+def rebuild_hierarchy(args: argparse.Namespace) -> int:
+    with SessionLocal() as db:
+        written = task_tree.rebuild(db, project_id=args.project_id)
+        db.commit()
+    print(f"hierarchy rebuilt: {written} tasks updated")
+    return 0
+
+
+def rebuild_rollups(args: argparse.Namespace) -> int:
+    with SessionLocal() as db:
+        written = task_rollup.rebuild(db, project_id=args.project_id)
+        db.commit()
+    print(f"rollups rebuilt: {written} tasks updated")
+    return 0
+
+
+def archive_projects(args: argparse.Namespace) -> int:
+    with SessionLocal() as db:
+        if args.project_id is not None:
+            project_ids = [args.project_id]
+        else:
+            project_ids = project_archive.get_archivable_project_ids(db, ended_before=args.ended_before)
+        archived = 0
+        for project_id in project_ids:
+            # One transaction per project keeps the write lock short
+            try:
+                summary = project_archive.archive(db, project_id=project_id)
+            except ValueError as e:
+                print(f"project {project_id}: {e}", file=sys.stderr)
+                continue
+            if summary is None:
+                print(f"project {project_id}: not found", file=sys.stderr)
+                continue
+            db.commit()
+            archived += 1
+    print(f"projects archived: {archived}")
+    return 0 if archived == len(project_ids) else 1
+
+
+def snapshot_progress(args: argparse.Namespace) -> int:
+    with SessionLocal() as db:
+        written = progress_snapshot.take(
+            db,
+            snapshot_date=args.date,
+            project_ids=[args.project_id] if args.project_id is not None else None,
+            replace=args.replace,
+        )
+        db.commit()
+    print(f"progress snapshot rows written: {written}")
+    return 0
+
+
+def reconcile_time(args: argparse.Namespace) -> int:
+    with SessionLocal() as db:
+        result = time_totals.reconcile(db, project_id=args.project_id)
+        db.commit()
+    print(f"time totals rebuilt: {result['daily_rows']} daily rows, {result['tasks_corrected']} tasks corrected")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="WBS maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    hierarchy = commands.add_parser("rebuild-hierarchy", help="recompute task paths, depths and WBS numbering from parent_id")
+    hierarchy.add_argument("--project-id", type=int, help="only rebuild this project")
+    hierarchy.set_defaults(handler=rebuild_hierarchy)
+
+    rollups = commands.add_parser("rebuild-rollups", help="recompute WBS rollup columns from the leaf tasks")
+    rollups.add_argument("--project-id", type=int, help="only rebuild this project")
+    rollups.set_defaults(handler=rebuild_rollups)
+
+    archive = commands.add_parser("archive-projects", help="move completed and cancelled projects to the archive tables")
+    archive.add_argument("--project-id", type=int, help="only archive this project")
+    archive.add_argument("--ended-before", type=datetime.fromisoformat, help="only projects that ended before this date")
+    archive.set_defaults(handler=archive_projects)
+
+    snapshot = commands.add_parser("snapshot-progress", help="record the daily progress snapshot of every open project")
+    snapshot.add_argument("--project-id", type=int, help="only snapshot this project")
+    snapshot.add_argument("--date", type=date.fromisoformat, help="snapshot date (default: today)")
+    snapshot.add_argument("--replace", action="store_true", help="overwrite rows already recorded for the date")
+    snapshot.set_defaults(handler=snapshot_progress)
+
+    reconcile = commands.add_parser("reconcile-time", help="recompute daily time totals and task actual hours from the entries")
+    reconcile.add_argument("--project-id", type=int, help="only reconcile this project")
+    reconcile.set_defaults(handler=reconcile_time)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
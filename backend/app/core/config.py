@@ -31,6 +31,19 @@ class Settings(BaseSettings):
     # SQLite fallback for development
     SQLITE_URL: str = "sqlite:///./project_management.db"
     USE_SQLITE: bool = True  # Switch to False when PostgreSQL is ready
+    SQLITE_JOURNAL_MODE: Optional[str] = None  # e.g. "wal" for concurrent readers
+    SQLITE_BUSY_TIMEOUT_MS: Optional[int] = None  # wait instead of failing on locks
+
+    # Task history (audit) writer
+    AUDIT_DURABILITY: str = "buffered"  # or "sync" to write each change before responding
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_MS: int = 1000
+    AUDIT_MAX_PENDING: int = 10000  # beyond this, requests write a batch themselves
+
+    # Response compression
+    COMPRESSION_MIN_BYTES: int = 1024  # smaller bodies are sent as they are
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4  # used when the optional brotli package is installed
     
     @field_validator("DATABASE_URL", mode="before")
     @classmethod
@@ -2,6 +2,22 @@ from .base import CRUDBase
 from .user import user
 from .project import project, project_member
 from .task import task, task_dependency, task_assignment, task_comment, time_tracking
+from .search import search
+from .calendar import work_calendar
+from .notification import notification
+from .utilization import resource_utilization
+from .hierarchy import task_tree
+from .rollup import task_rollup
+from .cascade import cascade
+from .archive import project_archive
+from .template import template
+from .clone import project_clone
+from .scenario import project_scenario
+from .baseline import project_baseline
+from .evm import earned_value
+from .progress import progress_snapshot
+from .history import task_history
+from .time_totals import time_totals
 
 __all__ = [
     "CRUDBase",
@@ -13,4 +29,20 @@ __all__ = [
     "task_assignment", 
     "task_comment",
     "time_tracking",
+    "search",
+    "work_calendar",
+    "notification",
+    "resource_utilization",
+    "task_tree",
+    "task_rollup",
+    "cascade",
+    "project_archive",
+    "template",
+    "project_clone",
+    "project_scenario",
+    "project_baseline",
+    "earned_value",
+    "progress_snapshot",
+    "task_history",
+    "time_totals",
 ]
\ No newline at end of file
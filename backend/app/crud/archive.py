@@ -0,0 +1,182 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..models import ProjectArchive
+from ..models.archive import ARCHIVE_TABLES, TASK_COLUMNS, columns_of, project_scope
+from .cascade import cascade
+from .hierarchy import task_tree
+from .rollup import combine
+from .time_totals import time_totals
+
+ARCHIVABLE_STATUSES = ("completed", "cancelled")
+_ARCHIVED_TASKS = ARCHIVE_TABLES["tasks"].name
+
+
+class CRUDProjectArchive:
+    """Archival of finished projects out of the hot task tables
+
+    `archive` copies a completed or cancelled project's tasks, dependencies,
+    assignments, time entries, comments, history and scenario overrides into
+    the archived_* tables with one INSERT ... SELECT per table, removes them from the hot
+    tables through the cascade engine and leaves a ProjectArchive summary
+    for reports. `restore` moves the rows back the same way. Rows keep their
+    ids unless new rows took them meanwhile, in which case the table's
+    restored ids are shifted past the current maximum and the references to
+    the shifted tasks follow. Nothing is committed here.
+    """
+
+    def get_by_project(self, db: Session, *, project_id: int) -> Optional[ProjectArchive]:
+        return db.query(ProjectArchive).filter(ProjectArchive.project_id == project_id).first()
+
+    def get_archivable_project_ids(self, db: Session, *, ended_before: Optional[datetime] = None) -> List[int]:
+        """Completed or cancelled projects still in the hot tables"""
+        query = """
+            SELECT id FROM projects
+            WHERE archived_at IS NULL AND lower(status) IN ('completed', 'cancelled')
+        """
+        params = {}
+        if ended_before is not None:
+            query += " AND end_date < :ended_before"
+            params["ended_before"] = ended_before
+        return db.execute(text(query + " ORDER BY id"), params).scalars().all()
+
+    def archive(self, db: Session, *, project_id: int, archived_by: Optional[int] = None) -> Optional[ProjectArchive]:
+        """Move a finished project's rows to the archive tables; None when the project does not exist
+
+        Raises ValueError when the project is still running or already archived.
+        """
+        project = db.execute(
+            text("SELECT lower(status), archived_at FROM projects WHERE id = :project_id"), {"project_id": project_id}
+        ).first()
+        if project is None:
+            return None
+        if project[1] is not None:
+            raise ValueError("Project is already archived")
+        if project[0] not in ARCHIVABLE_STATUSES:
+            raise ValueError("Only completed or cancelled projects can be archived")
+
+        summary = ProjectArchive(project_id=project_id, archived_by=archived_by, **self._summarize(db, project_id))
+        params = {"project_id": project_id}
+        for name, archive in ARCHIVE_TABLES.items():
+            columns = ", ".join(columns_of(name))
+            db.execute(
+                text(f"INSERT INTO {archive.name} ({columns}) SELECT {columns} FROM {name} "
+                     f"WHERE {project_scope(name, 'tasks')}"),
+                params,
+            )
+        cascade.delete_project_tasks(db, project_id=project_id)
+
+        db.add(summary)
+        db.flush()
+        db.execute(text("UPDATE projects SET archived_at = :archived_at WHERE id = :project_id"),
+                   {"project_id": project_id, "archived_at": summary.archived_at})
+        return summary
+
+    def restore(self, db: Session, *, project_id: int) -> Optional[Dict[str, int]]:
+        """Move an archived project's rows back; returns rows restored per table
+
+        None when the project is not archived.
+        """
+        summary = self.get_by_project(db, project_id=project_id)
+        if summary is None:
+            return None
+        params = {"project_id": project_id}
+        offsets = {name: self._id_offset(db, name, project_id) for name in ARCHIVE_TABLES}
+        archived_ids = f"(SELECT id FROM {_ARCHIVED_TASKS} WHERE project_id = :project_id)"
+
+        restored = Counter()
+        for name, archive in ARCHIVE_TABLES.items():
+            scope = f"({project_scope(name, _ARCHIVED_TASKS)})"
+            values, restorable, done = [], [scope], [scope]
+            for column in columns_of(name):
+                if column == "id":
+                    values.append("id + :id_offset")
+                elif column in TASK_COLUMNS[name]:
+                    values.append(f"CASE WHEN {column} IN {archived_ids} THEN {column} + :task_offset "
+                                  f"ELSE {column} END")
+                    # A dependency on a task deleted meanwhile is dropped; one on a task
+                    # of another archived project stays archived until that one returns
+                    restorable.append(f"({column} IS NULL OR {column} IN {archived_ids} "
+                                      f"OR {column} IN (SELECT id FROM tasks))")
+                    done.append(f"({column} IS NULL OR {column} IN {archived_ids} "
+                                f"OR {column} NOT IN (SELECT id FROM {_ARCHIVED_TASKS}))")
+                else:
+                    values.append(column)
+            restored[name] = db.execute(
+                text(f"INSERT INTO {name} ({', '.join(columns_of(name))}) SELECT {', '.join(values)} "
+                     f"FROM {archive.name} WHERE {' AND '.join(restorable)}"),
+                {**params, "id_offset": offsets[name], "task_offset": offsets["tasks"]},
+            ).rowcount
+            if name != "tasks":
+                db.execute(text(f"DELETE FROM {archive.name} WHERE {' AND '.join(done)}"), params)
+
+        # archived_tasks scopes the other archive tables, so it is cleared last
+        db.execute(text(f"DELETE FROM {_ARCHIVED_TASKS} WHERE project_id = :project_id"), params)
+        if offsets["tasks"]:
+            # Paths and WBS keys embed task ids
+            task_tree.rebuild(db, project_id=project_id)
+        # The daily time totals only cover hot entries
+        time_totals.rebuild_daily(db, project_id=project_id)
+        db.delete(summary)
+        db.execute(text("UPDATE projects SET archived_at = NULL WHERE id = :project_id"), params)
+        return dict(restored)
+
+    def _summarize(self, db: Session, project_id: int) -> dict:
+        params = {"project_id": project_id}
+        task_count, completed = db.execute(
+            text("""
+                SELECT count(*), coalesce(sum(lower(status) = 'completed'), 0)
+                FROM tasks WHERE project_id = :project_id
+            """),
+            params,
+        ).first()
+        # The root rollups already aggregate the whole tree
+        roots = db.execute(
+            text("""
+                SELECT datetime(rollup_start_date), datetime(rollup_end_date), rollup_estimated_hours,
+                       rollup_actual_hours, rollup_remaining_hours, rollup_progress
+                FROM tasks WHERE project_id = :project_id AND parent_id IS NULL
+            """),
+            params,
+        ).fetchall()
+        start, end, estimated, actual, remaining, progress = combine(
+            (None, None, 0.0, 0.0, 0.0, 0.0), [tuple(r) for r in roots]
+        )
+        entries, hours = db.execute(
+            text("""
+                SELECT count(*), coalesce(sum(hours), 0) FROM time_tracking
+                WHERE task_id IN (SELECT id FROM tasks WHERE project_id = :project_id)
+            """),
+            params,
+        ).first()
+        return {
+            "task_count": task_count, "completed_task_count": completed,
+            "start_date": datetime.fromisoformat(start) if start else None,
+            "end_date": datetime.fromisoformat(end) if end else None,
+            "estimated_hours": estimated, "actual_hours": actual, "remaining_hours": remaining,
+            "progress_percentage": progress, "time_entry_count": entries, "logged_hours": hours,
+        }
+
+    def _id_offset(self, db: Session, name: str, project_id: int) -> int:
+        """0 when the archived ids are still free, else a shift past every id in use"""
+        archive = ARCHIVE_TABLES[name].name
+        taken = db.execute(
+            text(f"""
+                SELECT 1 FROM {name}
+                WHERE id IN (SELECT id FROM {archive} WHERE {project_scope(name, _ARCHIVED_TASKS)})
+                LIMIT 1
+            """),
+            {"project_id": project_id},
+        ).first()
+        if taken is None:
+            return 0
+        return db.execute(
+            text(f"SELECT max(coalesce((SELECT max(id) FROM {name}), 0), coalesce((SELECT max(id) FROM {archive}), 0))")
+        ).scalar()
+
+
+project_archive = CRUDProjectArchive()
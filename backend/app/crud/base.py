@@ -30,6 +30,13 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """Get multiple records with pagination"""
         return db.query(self.model).offset(skip).limit(limit).all()
 
+    def get_multi_by_ids(self, db: Session, *, ids: List[Any]) -> List[ModelType]:
+        """Get records by ID, in the order the IDs are given"""
+        if not ids:
+            return []
+        by_id = {obj.id: obj for obj in db.query(self.model).filter(self.model.id.in_(ids)).all()}
+        return [by_id[id] for id in ids if id in by_id]
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         """Create a new record"""
         obj_in_data = jsonable_encoder(obj_in)
@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session, defer
+
+from ..models import ProjectBaseline
+from ..schemas.baseline import BaselineCreate
+from ..utils.baseline import TaskVectors, pack, unpack, variance
+from ..utils.work_calendar import to_date
+from .base import CRUDBase
+from .calendar import work_calendar
+
+
+def _load_tasks(db: Session, project_id: int) -> Tuple[TaskVectors, List[tuple]]:
+    """Rolled-up schedule of every task, plus (name, wbs_code, depth, sort_key) in the same id order"""
+    rows = db.execute(
+        text("""
+            SELECT id, date(rollup_start_date), date(rollup_end_date), rollup_estimated_hours,
+                   name, wbs_code, depth, sort_key
+            FROM tasks WHERE project_id = :project_id ORDER BY id
+        """),
+        {"project_id": project_id},
+    ).fetchall()
+    return TaskVectors.from_rows([row[:4] for row in rows]), [tuple(row[4:]) for row in rows]
+
+
+def _span(start: np.ndarray, end: np.ndarray, hours: np.ndarray) -> Tuple[np.datetime64, np.datetime64, float]:
+    """Earliest start, latest finish and total hours of some tasks"""
+    starts, ends = start[~np.isnat(start)], end[~np.isnat(end)]
+    return (
+        starts.min() if starts.size else np.datetime64("NaT"),
+        ends.max() if ends.size else np.datetime64("NaT"),
+        round(float(hours.sum()), 6),
+    )
+
+
+class CRUDProjectBaseline(CRUDBase[ProjectBaseline, BaselineCreate, BaselineCreate]):
+    """Named schedule snapshots of a project
+
+    A snapshot is one row per project and name, holding every task's
+    rolled-up start, finish and estimated hours packed into a compressed
+    column buffer (utils.baseline), so taking one costs a single read of the
+    project's tasks and one insert. Variance against any snapshot is
+    computed over whole arrays, in working days of the project calendar.
+    Task.baseline_* and Project.baseline_* keep the single current baseline.
+    """
+
+    def get_by_project(self, db: Session, *, project_id: int) -> List[ProjectBaseline]:
+        return (
+            db.query(ProjectBaseline)
+            .options(defer(ProjectBaseline.data))
+            .filter(ProjectBaseline.project_id == project_id)
+            .order_by(ProjectBaseline.created_at, ProjectBaseline.id)
+            .all()
+        )
+
+    def create_snapshot(
+        self, db: Session, *, project_id: int, obj_in: BaselineCreate, created_by: Optional[int] = None
+    ) -> ProjectBaseline:
+        """Snapshot the project's current schedule; raises ValueError when the name is taken"""
+        taken = db.query(ProjectBaseline.id).filter(
+            ProjectBaseline.project_id == project_id, ProjectBaseline.name == obj_in.name
+        ).first()
+        if taken is not None:
+            raise ValueError("A baseline with this name already exists")
+
+        vectors, details = _load_tasks(db, project_id)
+        roots = np.array([detail[2] == 0 for detail in details], dtype=bool)
+        start, end, hours = _span(vectors.start[roots], vectors.end[roots], vectors.hours[roots])
+        db_obj = ProjectBaseline(
+            **obj_in.model_dump(), project_id=project_id, created_by=created_by, task_count=vectors.size,
+            start_date=_datetime(start), end_date=_datetime(end), estimated_hours=hours, data=pack(vectors),
+        )
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def get_variance(self, db: Session, *, baseline: ProjectBaseline, changed_only: bool = False) -> Dict[str, Any]:
+        """Current schedule against a baseline, per task, per phase (top-level task) and for the project"""
+        current, details = _load_tasks(db, baseline.project_id)
+        calendar = work_calendar.get_working_calendar(db, project_id=baseline.project_id)
+        diff = variance(unpack(baseline.data), current, calendar)
+
+        columns = {
+            "task_id": current.task_ids.tolist(),
+            "name": [detail[0] for detail in details],
+            "wbs_code": [detail[1] for detail in details],
+            "in_baseline": diff.in_baseline.tolist(),
+            "baseline_start_date": diff.baseline_start.tolist(),
+            "baseline_end_date": diff.baseline_end.tolist(),
+            "current_start_date": current.start.tolist(),
+            "current_end_date": current.end.tolist(),
+            "start_slip_days": diff.start_slip.tolist(),
+            "finish_slip_days": diff.finish_slip.tolist(),
+            "baseline_hours": diff.baseline_hours.tolist(),
+            "current_hours": current.hours.tolist(),
+            "effort_delta": diff.effort_delta.tolist(),
+        }
+        rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        roots = np.array([detail[2] == 0 for detail in details], dtype=bool)
+        changed = (
+            (diff.start_slip != 0) | (diff.finish_slip != 0) | (diff.effort_delta != 0) | ~diff.in_baseline
+        ).tolist()
+        # Back to WBS order for the response
+        order = sorted(range(len(rows)), key=lambda i: (details[i][3] or "", i))
+        start, end, hours = _span(current.start[roots], current.end[roots], current.hours[roots])
+        baseline_start, baseline_end = _day(baseline.start_date), _day(baseline.end_date)
+        slips = calendar.count_workdays(
+            calendar.roll_forward(np.array([baseline_start, baseline_end], dtype="datetime64[D]")),
+            calendar.roll_forward(np.array([start, end], dtype="datetime64[D]")),
+        ).tolist()
+        return {
+            "baseline_id": baseline.id,
+            "baseline_name": baseline.name,
+            "baseline_created_at": baseline.created_at,
+            "project": {
+                "baseline_start_date": to_date(baseline_start), "baseline_end_date": to_date(baseline_end),
+                "current_start_date": to_date(start), "current_end_date": to_date(end),
+                "start_slip_days": slips[0], "finish_slip_days": slips[1],
+                "baseline_hours": baseline.estimated_hours or 0.0, "current_hours": hours,
+                "effort_delta": round(hours - (baseline.estimated_hours or 0.0), 6),
+            },
+            "phases": [rows[i] for i in order if roots[i]],
+            "tasks": [rows[i] for i in order if changed[i] or not changed_only],
+            "added_task_count": int((~diff.in_baseline).sum()),
+            "removed_task_ids": diff.removed_task_ids.tolist(),
+        }
+
+
+def _datetime(day: np.datetime64) -> Optional[datetime]:
+    value = to_date(day)
+    return datetime.combine(value, datetime.min.time()) if value else None
+
+
+def _day(value: Optional[datetime]) -> np.datetime64:
+    return np.datetime64(value.date(), "D") if value else np.datetime64("NaT")
+
+
+project_baseline = CRUDProjectBaseline(ProjectBaseline)
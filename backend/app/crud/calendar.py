@@ -0,0 +1,152 @@
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session, selectinload
+from ..crud.base import CRUDBase
+from ..models import WorkCalendar, CalendarClosure
+from ..schemas.calendar import WorkCalendarCreate, WorkCalendarUpdate, CalendarClosureCreate
+from ..utils.work_calendar import WorkingCalendar, default_calendar
+
+# Compiled calendars keyed by (calendar id, updated_at); writes bump updated_at
+_compiled: Dict[Tuple[int, Optional[datetime]], WorkingCalendar] = {}
+MAX_COMPILED = 256
+
+
+class CRUDWorkCalendar(CRUDBase[WorkCalendar, WorkCalendarCreate, WorkCalendarUpdate]):
+    def get_by_project(self, db: Session, *, project_id: int) -> Optional[WorkCalendar]:
+        """Get the calendar of a project"""
+        return db.query(WorkCalendar).filter(WorkCalendar.project_id == project_id).first()
+
+    def get_by_user(self, db: Session, *, user_id: int) -> Optional[WorkCalendar]:
+        """Get the personal calendar of a user"""
+        return db.query(WorkCalendar).filter(WorkCalendar.user_id == user_id).first()
+
+    def get_default(self, db: Session) -> Optional[WorkCalendar]:
+        """Get the organisation default calendar"""
+        return (
+            db.query(WorkCalendar)
+            .filter(WorkCalendar.project_id.is_(None), WorkCalendar.user_id.is_(None))
+            .order_by(WorkCalendar.id)
+            .first()
+        )
+
+    def save(
+        self,
+        db: Session,
+        *,
+        obj_in: WorkCalendarUpdate,
+        project_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+    ) -> WorkCalendar:
+        """Create or update the calendar of a project, a user or the organisation"""
+        if project_id is not None:
+            db_obj = self.get_by_project(db, project_id=project_id)
+        elif user_id is not None:
+            db_obj = self.get_by_user(db, user_id=user_id)
+        else:
+            db_obj = self.get_default(db)
+        if db_obj is None:
+            db_obj = WorkCalendar(project_id=project_id, user_id=user_id, **WorkCalendarCreate().model_dump())
+        for field, value in obj_in.model_dump(exclude_unset=True).items():
+            setattr(db_obj, field, value)
+        db_obj.updated_at = datetime.utcnow()
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def add_closure(
+        self, db: Session, *, calendar: WorkCalendar, obj_in: CalendarClosureCreate
+    ) -> CalendarClosure:
+        """Add a non-working period to a calendar"""
+        closure = CalendarClosure(
+            calendar_id=calendar.id,
+            name=obj_in.name,
+            start_date=datetime.combine(obj_in.start_date, datetime.min.time()),
+            end_date=datetime.combine(obj_in.end_date, datetime.min.time()),
+        )
+        calendar.updated_at = datetime.utcnow()
+        db.add(closure)
+        db.commit()
+        db.refresh(closure)
+        return closure
+
+    def remove_closure(
+        self, db: Session, *, calendar: WorkCalendar, closure_id: int
+    ) -> Optional[CalendarClosure]:
+        """Remove a non-working period from a calendar"""
+        closure = (
+            db.query(CalendarClosure)
+            .filter(CalendarClosure.id == closure_id, CalendarClosure.calendar_id == calendar.id)
+            .first()
+        )
+        if closure:
+            calendar.updated_at = datetime.utcnow()
+            db.delete(closure)
+            db.commit()
+        return closure
+
+    def get_working_calendar(
+        self, db: Session, *, project_id: Optional[int] = None, user_id: Optional[int] = None
+    ) -> WorkingCalendar:
+        """Compiled calendar for a project, narrowed by a user's personal calendar
+
+        The project calendar falls back to the organisation default and then to
+        Monday-Friday with Japanese public holidays.
+        """
+        scopes = [and_(WorkCalendar.project_id.is_(None), WorkCalendar.user_id.is_(None))]
+        if project_id is not None:
+            scopes.append(WorkCalendar.project_id == project_id)
+        if user_id is not None:
+            scopes.append(WorkCalendar.user_id == user_id)
+        rows = (
+            db.query(WorkCalendar.id, WorkCalendar.project_id, WorkCalendar.user_id,
+                     WorkCalendar.created_at, WorkCalendar.updated_at)
+            .filter(or_(*scopes))
+            .order_by(WorkCalendar.id)
+            .all()
+        )
+        project_row = next((r for r in rows if r.project_id is not None), None)
+        default_row = next((r for r in rows if r.project_id is None and r.user_id is None), None)
+        user_row = next((r for r in rows if r.user_id is not None), None)
+
+        base_row = project_row or default_row
+        calendar = self._compile(db, base_row) if base_row else default_calendar()
+        if user_row:
+            calendar = calendar.merge(self._compile(db, user_row))
+        return calendar
+
+    def get_user_calendars(self, db: Session, *, user_ids: Sequence[int]) -> Dict[int, WorkingCalendar]:
+        """Compiled personal calendars of the users that have one"""
+        if not user_ids:
+            return {}
+        rows = (
+            db.query(WorkCalendar.id, WorkCalendar.user_id, WorkCalendar.created_at, WorkCalendar.updated_at)
+            .filter(WorkCalendar.user_id.in_(list(user_ids)))
+            .all()
+        )
+        return {row.user_id: self._compile(db, row) for row in rows}
+
+    def _compile(self, db: Session, row) -> WorkingCalendar:
+        key = (row.id, row.updated_at or row.created_at)
+        compiled = _compiled.get(key)
+        if compiled is None:
+            db_obj = (
+                db.query(WorkCalendar)
+                .options(selectinload(WorkCalendar.closures))
+                .filter(WorkCalendar.id == row.id)
+                .one()
+            )
+            compiled = WorkingCalendar.build(
+                weekmask=db_obj.weekmask,
+                use_japanese_holidays=db_obj.use_japanese_holidays,
+                closures=[(c.start_date, c.end_date) for c in db_obj.closures],
+                hours_per_day=db_obj.hours_per_day or 8.0,
+            )
+            if len(_compiled) >= MAX_COMPILED:
+                _compiled.clear()
+            _compiled[key] = compiled
+        return compiled
+
+
+work_calendar = CRUDWorkCalendar(WorkCalendar)
@@ -0,0 +1,157 @@
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.archive import ARCHIVE_TABLES, project_scope
+from .hierarchy import _SUBTREE, task_tree
+from .rollup import task_rollup
+from .utilization import resource_utilization
+
+# Rows referencing a task, as (table, column); deleted before the tasks themselves
+TASK_DEPENDENTS = (
+    ("task_dependencies", "predecessor_id"),
+    ("task_dependencies", "successor_id"),
+    ("task_assignments", "task_id"),
+    ("resource_assignments", "task_id"),
+    ("time_tracking", "task_id"),
+    ("time_tracking_daily", "task_id"),
+    ("task_comments", "task_id"),
+    ("task_history", "task_id"),
+    ("notifications", "task_id"),
+    ("scenario_task_overrides", "task_id"),
+)
+
+# Rows owned by a project besides its tasks, as (table, condition), in delete order
+PROJECT_DEPENDENTS = (
+    ("resource_assignments", "resource_id IN (SELECT id FROM resources WHERE project_id = :project_id)"),
+    ("resources", "project_id = :project_id"),
+    ("calendar_closures", "calendar_id IN (SELECT id FROM work_calendars WHERE project_id = :project_id)"),
+    ("work_calendars", "project_id = :project_id"),
+    ("project_members", "project_id = :project_id"),
+    ("notifications", "project_id = :project_id"),
+    ("project_archives", "project_id = :project_id"),
+    ("project_baselines", "project_id = :project_id"),
+    ("progress_snapshots", "project_id = :project_id"),
+    ("scenario_task_overrides", "scenario_id IN (SELECT id FROM project_scenarios WHERE project_id = :project_id)"),
+    ("project_scenarios", "project_id = :project_id"),
+    # Rows of an archived project; archived_tasks goes last as it scopes the others
+    *[
+        (archive.name, project_scope(name, ARCHIVE_TABLES["tasks"].name))
+        for name, archive in reversed(ARCHIVE_TABLES.items())
+    ],
+)
+
+_PROJECT_TASKS = "project_id = :project_id"
+
+
+class CRUDCascade:
+    """Deletion of task subtrees and whole projects with everything hanging off them
+
+    Each dependent table is cleared with one set-based
+    `DELETE ... WHERE column IN (SELECT id FROM tasks WHERE <scope>)`, where the
+    scope is the subtree's path range or the project's tasks, so the cost is
+    a fixed number of statements whatever the size of the tree. Nothing is
+    committed here; callers commit the whole cascade as one transaction.
+    Search index rows go with the tasks and projects through their triggers.
+
+    Huge projects can be deleted as a background job (`submit_project_deletion`
+    + `run_job`), which uses its own session and reports through `get_job` to
+    the user who submitted it. The job registry is held in memory, so a job is
+    only visible to the worker process that accepted it: run the API as a
+    single worker process.
+    """
+    MAX_JOBS = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+
+    def delete_subtree(self, db: Session, *, task_id: int) -> Dict[str, int]:
+        """Delete a task, its descendants and their dependent rows; returns rows deleted per table
+
+        The numbering of the remaining siblings and the parent's rollup are
+        updated too. An unknown task deletes nothing.
+        """
+        parent = db.execute(text("SELECT parent_id FROM tasks WHERE id = :task_id"), {"task_id": task_id}).first()
+        if parent is None:
+            return {}
+        deleted = self._delete_dependents(db, _SUBTREE, {"task_id": task_id})
+        deleted["tasks"] = task_tree.delete_subtree(db, task_id=task_id)
+        task_rollup.refresh(db, [parent[0]])
+        return dict(deleted)
+
+    def delete_project(self, db: Session, *, project_id: int) -> Dict[str, int]:
+        """Delete a project with its tasks and every dependent row; returns rows deleted per table
+
+        `deleted["projects"]` is 0 when the project does not exist.
+        """
+        params = {"project_id": project_id}
+        deleted = self.delete_project_tasks(db, project_id=project_id)
+        for table, condition in PROJECT_DEPENDENTS:
+            deleted[table] += db.execute(text(f"DELETE FROM {table} WHERE {condition}"), params).rowcount
+        deleted["projects"] = db.execute(text("DELETE FROM projects WHERE id = :project_id"), params).rowcount
+        return dict(deleted)
+
+    def delete_project_tasks(self, db: Session, *, project_id: int) -> Counter:
+        """Delete every task of a project with its dependent rows, keeping the project"""
+        params = {"project_id": project_id}
+        deleted = self._delete_dependents(db, _PROJECT_TASKS, params)
+        deleted["tasks"] = db.execute(text(f"DELETE FROM tasks WHERE {_PROJECT_TASKS}"), params).rowcount
+        return deleted
+
+    def _delete_dependents(self, db: Session, scope: str, params: dict) -> Counter:
+        deleted = Counter()
+        for table, column in TASK_DEPENDENTS:
+            deleted[table] += db.execute(
+                text(f"DELETE FROM {table} WHERE {column} IN (SELECT id FROM tasks WHERE {scope})"), params
+            ).rowcount
+        return deleted
+
+    def submit_project_deletion(self, *, project_id: int, submitted_by: int) -> dict:
+        """Register a pending deletion job; the caller schedules `run_job` with its id"""
+        job = {
+            "id": uuid.uuid4().hex, "project_id": project_id, "submitted_by": submitted_by,
+            "status": "pending", "deleted": None, "error": None,
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            # Forget the oldest finished jobs once the registry is full
+            for job_id in [i for i, j in self._jobs.items() if j["status"] in ("completed", "failed")]:
+                if len(self._jobs) <= self.MAX_JOBS:
+                    break
+                del self._jobs[job_id]
+        return dict(job)
+
+    def run_job(self, job_id: str) -> None:
+        """Run a submitted project deletion in its own session and transaction"""
+        job = self._jobs[job_id]
+        self._update(job_id, status="running")
+        try:
+            with SessionLocal() as db:
+                deleted = self.delete_project(db, project_id=job["project_id"])
+                db.commit()
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e))
+            return
+        resource_utilization.invalidate()
+        self._update(job_id, status="completed", deleted=deleted)
+
+    def get_job(self, job_id: str, *, submitted_by: Optional[int] = None) -> Optional[dict]:
+        """A job by id; None when unknown or, given `submitted_by`, submitted by someone else"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or (submitted_by is not None and job["submitted_by"] != submitted_by):
+                return None
+            return dict(job)
+
+    def _update(self, job_id: str, **values) -> None:
+        with self._lock:
+            self._jobs[job_id].update(values)
+
+
+cascade = CRUDCascade()
@@ -0,0 +1,196 @@
+from collections import Counter
+from typing import Dict, Optional
+
+from sqlalchemy import Table, text
+from sqlalchemy.orm import Session
+
+from ..models import (
+    CalendarClosure, ProjectMember, ProjectStatus, Resource, ResourceAssignment, Task, TaskAssignment,
+    TaskDependency, UserRole,
+)
+from .rollup import task_rollup
+
+# Task fields a scenario can override, see ScenarioTaskOverride
+OVERRIDE_FIELDS = ("planned_start_date", "planned_end_date", "estimated_hours")
+
+# Left to their column defaults on the copies
+_FRESH_COLUMNS = ("id", "created_at", "updated_at")
+
+_SOURCE_TASKS = "(SELECT id FROM tasks WHERE project_id = :project_id)"
+
+
+def _copy(db: Session, table: Table, values: Dict[str, str], where: str, params: dict) -> int:
+    """INSERT ... SELECT of `table` into itself; `values` replaces the SQL of some columns"""
+    columns = [c.name for c in table.columns if c.name in values or c.name not in _FRESH_COLUMNS]
+    select = ", ".join(values.get(c, c) for c in columns)
+    return db.execute(
+        text(f"INSERT INTO {table.name} ({', '.join(columns)}) "
+             f"SELECT {select} FROM {table.name} {where}"),
+        params,
+    ).rowcount
+
+
+class CRUDProjectClone:
+    """Copies of a project made entirely in SQL
+
+    The project, its members, calendar, resources, tasks, dependencies and
+    assignments are copied with one INSERT ... SELECT per table, without
+    loading rows into Python. Task and resource ids are remapped by a fixed
+    offset past the current maximum, so every reference between the copied
+    rows is shifted the same way; task paths are rebuilt by a recursive CTE
+    in the task copy itself. Time entries, comments, history and
+    notifications stay with the original. Nothing is committed here.
+
+    Given a scenario, the copy takes that scenario's overridden task fields,
+    which is how a what-if branch becomes a project of its own.
+    """
+
+    def clone(
+        self, db: Session, *, project_id: int, name: str, owner_id: int,
+        description: Optional[str] = None, scenario_id: Optional[int] = None,
+    ) -> Optional[Dict[str, int]]:
+        """Copy a project; returns the new `project_id` and rows copied per table
+
+        None when the project does not exist. Raises ValueError for an archived
+        project, whose tasks are not in the task tables.
+        """
+        source = db.execute(
+            text("SELECT archived_at FROM projects WHERE id = :project_id"), {"project_id": project_id}
+        ).first()
+        if source is None:
+            return None
+        if source[0] is not None:
+            raise ValueError("Archived projects must be restored before they can be copied")
+
+        copied = Counter()
+        new_id = db.execute(
+            text("""
+                INSERT INTO projects (name, description, status, start_date, end_date, baseline_start_date,
+                                      baseline_end_date, budget, owner_id, is_template, template_type)
+                SELECT :name, coalesce(:description, description), :status, start_date, end_date,
+                       baseline_start_date, baseline_end_date, budget, :owner_id, 0, template_type
+                FROM projects WHERE id = :project_id
+            """),
+            {"project_id": project_id, "name": name, "description": description, "owner_id": owner_id,
+             "status": ProjectStatus.PLANNING.name},
+        ).lastrowid
+        copied["projects"] = 1
+        params = {"project_id": project_id, "new_project_id": new_id}
+
+        copied["project_members"] = _copy(
+            db, ProjectMember.__table__, {"project_id": ":new_project_id"},
+            "WHERE project_id = :project_id AND left_at IS NULL", params,
+        )
+        copied["project_members"] += db.execute(
+            text("""
+                INSERT INTO project_members (project_id, user_id, role, allocation_percentage)
+                SELECT :new_project_id, :owner_id, :role, 100.0
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM project_members WHERE project_id = :new_project_id AND user_id = :owner_id
+                )
+            """),
+            {**params, "owner_id": owner_id, "role": UserRole.PROJECT_OWNER.name},
+        ).rowcount
+
+        calendar_id = db.execute(
+            text("SELECT id FROM work_calendars WHERE project_id = :project_id"), params
+        ).scalar()
+        if calendar_id is not None:
+            new_calendar_id = db.execute(
+                text("""
+                    INSERT INTO work_calendars (name, project_id, weekmask, use_japanese_holidays, hours_per_day)
+                    SELECT name, :new_project_id, weekmask, use_japanese_holidays, hours_per_day
+                    FROM work_calendars WHERE id = :calendar_id
+                """),
+                {**params, "calendar_id": calendar_id},
+            ).lastrowid
+            copied["work_calendars"] = 1
+            copied["calendar_closures"] = _copy(
+                db, CalendarClosure.__table__, {"calendar_id": ":new_calendar_id"},
+                "WHERE calendar_id = :calendar_id", {"calendar_id": calendar_id, "new_calendar_id": new_calendar_id},
+            )
+
+        params["resource_offset"] = self._id_offset(db, "resources", "project_id = :project_id", params)
+        copied["resources"] = _copy(
+            db, Resource.__table__, {"id": "id + :resource_offset", "project_id": ":new_project_id"},
+            "WHERE project_id = :project_id", params,
+        )
+
+        params["task_offset"] = self._id_offset(db, "tasks", "project_id = :project_id", params)
+        copied["tasks"] = self._copy_tasks(db, params, scenario_id)
+        copied["task_dependencies"] = _copy(
+            db, TaskDependency.__table__,
+            {"predecessor_id": "predecessor_id + :task_offset", "successor_id": "successor_id + :task_offset"},
+            # Links to tasks of other projects are not copied
+            f"WHERE predecessor_id IN {_SOURCE_TASKS} AND successor_id IN {_SOURCE_TASKS}", params,
+        )
+        copied["task_assignments"] = _copy(
+            db, TaskAssignment.__table__, {"task_id": "task_id + :task_offset"},
+            f"WHERE task_id IN {_SOURCE_TASKS} AND unassigned_at IS NULL", params,
+        )
+        copied["resource_assignments"] = _copy(
+            db, ResourceAssignment.__table__,
+            {
+                "task_id": "task_id + :task_offset",
+                # Resources of another project keep pointing at that project's rows
+                "resource_id": "CASE WHEN resource_id IN (SELECT id FROM resources WHERE project_id = :project_id) "
+                               "THEN resource_id + :resource_offset ELSE resource_id END",
+            },
+            f"WHERE task_id IN {_SOURCE_TASKS}", params,
+        )
+
+        if scenario_id is not None:
+            # Overridden fields change the rollups copied with the tasks
+            task_rollup.rebuild(db, project_id=new_id)
+            db.execute(
+                text("""
+                    UPDATE projects SET end_date = coalesce(
+                        (SELECT max(planned_end_date) FROM tasks WHERE project_id = :new_project_id), end_date
+                    )
+                    WHERE id = :new_project_id
+                """),
+                params,
+            )
+        return {"project_id": new_id, **copied}
+
+    def _copy_tasks(self, db: Session, params: dict, scenario_id: Optional[int]) -> int:
+        values = {
+            "id": "t.id + :task_offset",
+            "project_id": ":new_project_id",
+            "parent_id": "t.parent_id + :task_offset",
+            "path": "tree.path",
+        }
+        join = ""
+        if scenario_id is not None:
+            values.update({field: f"coalesce(o.{field}, t.{field})" for field in OVERRIDE_FIELDS})
+            join = "LEFT JOIN scenario_task_overrides o ON o.task_id = t.id AND o.scenario_id = :scenario_id"
+        columns = [c.name for c in Task.__table__.columns if c.name in values or c.name not in _FRESH_COLUMNS]
+        # Paths embed the task ids, so they are rebuilt from the roots down with the new ids
+        return db.execute(
+            text(f"""
+                INSERT INTO tasks ({', '.join(columns)})
+                WITH RECURSIVE tree(id, path) AS (
+                    SELECT id, '/' || (id + :task_offset) || '/' FROM tasks
+                    WHERE project_id = :project_id AND parent_id IS NULL
+                    UNION ALL
+                    SELECT t.id, tree.path || (t.id + :task_offset) || '/'
+                    FROM tasks t JOIN tree ON t.parent_id = tree.id
+                )
+                SELECT {', '.join(values.get(c, f't.{c}') for c in columns)}
+                FROM tasks t JOIN tree ON tree.id = t.id {join}
+            """),
+            {**params, "scenario_id": scenario_id},
+        ).rowcount
+
+    def _id_offset(self, db: Session, table: str, scope: str, params: dict) -> int:
+        """Shift moving the ids of the scoped rows just past every id in use"""
+        return db.execute(
+            text(f"""
+                SELECT coalesce((SELECT max(id) FROM {table}), 0) + 1
+                       - coalesce((SELECT min(id) FROM {table} WHERE {scope}), 0)
+            """),
+            params,
+        ).scalar()
+
+
+project_clone = CRUDProjectClone()
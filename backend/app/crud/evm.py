@@ -0,0 +1,128 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..utils.evm import earned_value_curves, load_evm_inputs, ratio, to_list
+from ..utils.work_calendar import to_date
+from .calendar import work_calendar
+
+# One row of aggregates over everything an EVM report reads; any write changes it
+_VERSION_SQL = text("""
+    SELECT
+        (SELECT count(*) || '/' || coalesce(max(id), 0) || '/' || coalesce(max(updated_at), '')
+                || '/' || total(estimated_hours) || '/' || total(progress_percentage)
+                || '/' || total(julianday(planned_start_date)) || '/' || total(julianday(planned_end_date))
+         FROM tasks WHERE project_id = :project_id),
+        (SELECT count(*) || '/' || coalesce(max(id), 0) || '/' || coalesce(max(updated_at), '')
+                || '/' || total(hours) || '/' || total(hourly_rate)
+         FROM time_tracking WHERE task_id IN (SELECT id FROM tasks WHERE project_id = :project_id)),
+        (SELECT count(*) || '/' || coalesce(max(id), 0) || '/' || count(unassigned_at) || '/' || total(hourly_rate)
+         FROM task_assignments WHERE task_id IN (SELECT id FROM tasks WHERE project_id = :project_id)),
+        (SELECT count(*) || '/' || count(pm.left_at) || '/' || total(pm.hourly_rate)
+                || '/' || total(u.hourly_rate) || '/' || coalesce(max(u.updated_at), '')
+         FROM project_members pm JOIN users u ON u.id = pm.user_id WHERE pm.project_id = :project_id),
+        (SELECT count(*) || '/' || coalesce(max(id), 0) FROM task_history
+         WHERE field_name = 'progress_percentage'
+           AND task_id IN (SELECT id FROM tasks WHERE project_id = :project_id))
+""")
+
+
+class CRUDEarnedValue:
+    """Earned value reports cached per project version
+
+    The version is a single aggregate query over the project's tasks, time
+    entries, assignments, member rates and progress history, plus the
+    project's working calendar, so any change to the inputs - through the
+    ORM or raw SQL - makes a new key, and a repeated request costs that one
+    query instead of the loads and curve computation.
+    """
+    MAX_CACHED = 64
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reports: "OrderedDict[tuple, dict]" = OrderedDict()
+
+    def get_version(self, db: Session, *, project_id: int) -> tuple:
+        calendar = work_calendar.get_working_calendar(db, project_id=project_id)
+        row = db.execute(_VERSION_SQL, {"project_id": project_id}).fetchone()
+        return (*row, calendar.weekmask, hash(calendar.holidays.tobytes()))
+
+    def get_report(
+        self,
+        db: Session,
+        *,
+        project_id: int,
+        as_of: Optional[date] = None,
+        interval: str = "week",
+        unit: str = "cost",
+    ) -> Dict[str, Any]:
+        """PV / EV / AC curves and indices for the project and each phase (top-level task)"""
+        as_of = as_of or date.today()
+        key = (project_id, as_of, interval, unit, self.get_version(db, project_id=project_id))
+        with self._lock:
+            cached = self._reports.get(key)
+            if cached is not None:
+                self._reports.move_to_end(key)
+                return cached
+        report = self._build(db, project_id, as_of, interval, unit)
+        with self._lock:
+            self._reports[key] = report
+            while len(self._reports) > self.MAX_CACHED:
+                self._reports.popitem(last=False)
+        return report
+
+    def _build(self, db: Session, project_id: int, as_of: date, interval: str, unit: str) -> Dict[str, Any]:
+        inputs = load_evm_inputs(db, project_id, unit)
+        calendar = work_calendar.get_working_calendar(db, project_id=project_id)
+        curves = earned_value_curves(inputs, calendar, as_of, interval)
+        names = dict(db.execute(
+            text("SELECT id, name FROM tasks WHERE project_id = :project_id AND parent_id IS NULL"),
+            {"project_id": project_id},
+        ).fetchall())
+
+        def series(pv, ev, ac):
+            return {
+                "pv": to_list(pv), "ev": to_list(ev), "ac": to_list(ac),
+                "spi": to_list(ratio(ev, pv), 3), "cpi": to_list(ratio(ev, ac), 3),
+            }
+
+        def summary(bac, pv, ev, ac):
+            cpi, spi = ratio(ev, ac), ratio(ev, pv)
+            eac = np.where(np.isnan(cpi), ac + (bac - ev), ratio(bac, cpi))
+            values = {
+                "bac": bac, "pv": pv, "ev": ev, "ac": ac, "sv": ev - pv, "cv": ev - ac,
+                "eac": eac, "etc": eac - ac, "vac": bac - eac, "percent_complete": ratio(ev, bac) * 100,
+            }
+            result = {name: to_list(np.atleast_1d(value)) for name, value in values.items()}
+            result.update(spi=to_list(np.atleast_1d(spi), 3), cpi=to_list(np.atleast_1d(cpi), 3))
+            return result
+
+        pv, ev, ac = curves.at_status
+        project_values = summary(curves.bac.sum(), pv.sum(), ev.sum(), ac.sum())
+        phase_values = summary(curves.bac, pv, ev, ac)
+        return {
+            "project_id": project_id,
+            "as_of": as_of,
+            "interval": interval,
+            "unit": unit,
+            "dates": [to_date(day) for day in curves.labels],
+            "summary": {name: values[0] for name, values in project_values.items()},
+            "series": series(curves.pv.sum(axis=0), curves.ev.sum(axis=0), curves.ac.sum(axis=0)),
+            "phases": [
+                {
+                    "task_id": task_id,
+                    "name": names.get(task_id),
+                    "summary": {name: values[i] for name, values in phase_values.items()},
+                    "series": series(curves.pv[i], curves.ev[i], curves.ac[i]),
+                }
+                for i, task_id in enumerate(inputs.phase_ids.tolist())
+            ],
+        }
+
+
+earned_value = CRUDEarnedValue()
@@ -0,0 +1,366 @@
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..models import Task
+
+SEPARATOR = "/"
+ROOT_PATH = SEPARATOR
+# Sibling numbers are zero-padded in sort_key so that it sorts like the WBS code
+SORT_KEY_WIDTH = 5
+CODE_SEPARATOR = "."
+
+
+class Placement(NamedTuple):
+    """Where a task sits in the tree"""
+    path: str
+    depth: int
+    sort_order: int
+    sort_key: str
+    wbs_code: str
+
+
+class _Row(NamedTuple):
+    project_id: int
+    parent_id: Optional[int]
+    path: Optional[str]
+    depth: Optional[int]
+    sort_key: Optional[str]
+    wbs_code: Optional[str]
+
+
+def child_path(parent_path: Optional[str], task_id: int) -> str:
+    return f"{parent_path or ROOT_PATH}{task_id}{SEPARATOR}"
+
+
+def path_ids(path: Optional[str]) -> List[int]:
+    """Ids on a path, root first and the task itself last"""
+    return [int(part) for part in (path or "").split(SEPARATOR) if part]
+
+
+def subtree_bounds(path: str) -> Tuple[str, str]:
+    """Half-open [low, high) range of the paths in a subtree
+
+    Paths only contain digits and separators and "0" sorts right after "/",
+    so every path starting with "/3/17/" lies in ["/3/17/", "/3/170").
+    """
+    return path, path[:-1] + "0"
+
+
+def sort_segment(number: int) -> str:
+    return f"{number:0{SORT_KEY_WIDTH}d}"
+
+
+def child_prefixes(parent: Optional[_Row]) -> Tuple[str, str]:
+    """sort_key and wbs_code prefixes shared by the children of `parent`"""
+    if parent is None:
+        return "", ""
+    return parent.sort_key + CODE_SEPARATOR, parent.wbs_code + CODE_SEPARATOR
+
+
+# The subtree of :task_id as an index range over tasks.path
+_SUBTREE = """
+    path >= (SELECT path FROM tasks WHERE id = :task_id)
+    AND path < (SELECT substr(path, 1, length(path) - 1) || '0' FROM tasks WHERE id = :task_id)
+"""
+_MOVE = """
+    UPDATE tasks SET path = :new_path || substr(path, :old_path_length + 1), depth = depth + :delta,
+                     sort_key = :new_key || substr(sort_key, :old_key_length + 1),
+                     wbs_code = :new_code || substr(wbs_code, :old_code_length + 1),
+                     parent_id = CASE WHEN id = :task_id THEN :parent_id ELSE parent_id END,
+                     sort_order = CASE WHEN id = :task_id THEN :sort_order ELSE sort_order END
+    WHERE path >= :low AND path < :high
+"""
+# Renumber the siblings under one prefix, with their subtrees: sibling
+# :moved becomes :target and every other one is shifted by :shift. SET
+# expressions see the row as it was, so the segment is read consistently.
+_SEGMENT = f"CAST(substr(sort_key, :key_length - {SORT_KEY_WIDTH - 1}, {SORT_KEY_WIDTH}) AS INTEGER)"
+_NUMBER = f"(CASE WHEN {_SEGMENT} = :moved THEN :target ELSE {_SEGMENT} + :shift END)"
+_RENUMBER = f"""
+    UPDATE tasks SET
+        sort_order = CASE WHEN length(sort_key) = :key_length THEN {_NUMBER} ELSE sort_order END,
+        sort_key = :key_prefix || printf('%0{SORT_KEY_WIDTH}d', {_NUMBER}) || substr(sort_key, :key_length + 1),
+        wbs_code = :code_prefix || {_NUMBER} || substr(wbs_code, length(:code_prefix) + length({_SEGMENT}) + 1)
+    WHERE project_id = :project_id AND sort_key >= :low AND sort_key < :high
+"""
+
+
+class CRUDTaskTree:
+    """Materialized-path index and WBS numbering of the task hierarchy
+
+    Every task stores the ids from its root down to itself, so a subtree is
+    one range scan on idx_task_path, the ancestors of a task are read from
+    its own row, and moving a subtree rewrites its rows in a single UPDATE.
+
+    Siblings are numbered 1..n by sort_order; wbs_code ("1.3.2") and the
+    zero-padded sort_key ("00001.00003.00002") are derived from the numbers
+    on the way down, so ordered tree reads are an index range on
+    (project_id, sort_key). An insert, removal or reorder renumbers only the
+    siblings after the affected position, subtrees included, in one UPDATE.
+
+    ORM inserts and parent changes are handled by the mapper events below;
+    raw SQL writers call `place` / `move` / `delete_subtree` themselves.
+    """
+
+    def get_subtree(self, db: Session, *, task_id: int, include_self: bool = True) -> List[Task]:
+        """The task and all its descendants in WBS order"""
+        query = db.query(Task).filter(text(_SUBTREE).bindparams(task_id=task_id))
+        if not include_self:
+            query = query.filter(Task.id != task_id)
+        return query.order_by(Task.sort_key).all()
+
+    def get_subtree_ids(self, db: Session, *, task_id: int) -> List[int]:
+        return db.execute(text(f"SELECT id FROM tasks WHERE {_SUBTREE}"), {"task_id": task_id}).scalars().all()
+
+    def get_ancestor_ids(self, db: Session, *, task_id: int) -> List[int]:
+        """Ancestors of a task, root first"""
+        path = db.execute(text("SELECT path FROM tasks WHERE id = :task_id"), {"task_id": task_id}).scalar()
+        return path_ids(path)[:-1]
+
+    def is_in_subtree(self, db: Session, *, root_id: int, task_id: int) -> bool:
+        """Whether `task_id` is `root_id` or one of its descendants"""
+        return task_id == root_id or root_id in self.get_ancestor_ids(db, task_id=task_id)
+
+    def place(self, db: Session, *, task_id: int, position: Optional[int] = None) -> Placement:
+        """Index and number a newly inserted task, appended to its siblings by default"""
+        return _place(db.connection(), task_id, position)
+
+    def move(
+        self, db: Session, *, task_id: int, parent_id: Optional[int], position: Optional[int] = None
+    ) -> Optional[int]:
+        """Move a task with its subtree, or reorder it among its siblings
+
+        `position` is the 1-based place among the new siblings (appended
+        when omitted). The caller checks that `parent_id` is not inside the
+        subtree. Returns the previous parent id.
+        """
+        old_parent_id = db.execute(
+            text("SELECT parent_id FROM tasks WHERE id = :task_id"), {"task_id": task_id}
+        ).scalar()
+        _relocate(db.connection(), task_id, old_parent_id, parent_id, position)
+        return old_parent_id
+
+    def delete_subtree(self, db: Session, *, task_id: int) -> int:
+        """Delete a task and all its descendants, closing the gap in the numbering
+
+        Returns the number of tasks removed.
+        """
+        connection = db.connection()
+        row = _read(connection, task_id)
+        if row is None:
+            return 0
+        deleted = connection.execute(text(f"DELETE FROM tasks WHERE {_SUBTREE}"), {"task_id": task_id}).rowcount
+        if row.sort_key:
+            key_prefix, code_prefix = _own_prefixes(row)
+            _renumber(connection, row.project_id, key_prefix, code_prefix, first=_number(row) + 1, shift=-1)
+        return deleted
+
+    def rebuild(self, db: Session, *, project_id: Optional[int] = None) -> int:
+        """Recompute paths, depths and WBS numbering from parent_id; returns rows written
+
+        Siblings keep their current order (sort_order, then id). Tasks whose
+        parent is missing from the project become roots.
+        """
+        where, params = "", {}
+        if project_id is not None:
+            where, params = "WHERE project_id = :project_id", {"project_id": project_id}
+        rows = db.execute(
+            text(f"SELECT id, parent_id, project_id, sort_order, path, depth, sort_key, wbs_code FROM tasks {where}"),
+            params,
+        ).fetchall()
+        by_id = {row[0]: row for row in rows}
+        children_of: Dict[object, List] = defaultdict(list)
+        for row in rows:
+            parent = row[1] if row[1] in by_id and by_id[row[1]][2] == row[2] else ("root", row[2])
+            children_of[parent].append(row)
+        for siblings in children_of.values():
+            siblings.sort(key=lambda r: (r[3] is None, r[3] or 0, r[0]))
+
+        changes = []
+        stack = [(("root", pid), None) for pid in sorted({row[2] for row in rows})]
+        while stack:
+            parent, placement = stack.pop()
+            for number, row in enumerate(children_of.get(parent, ()), start=1):
+                if placement is None:
+                    value = Placement(child_path(None, row[0]), 0, number, sort_segment(number), str(number))
+                else:
+                    value = Placement(
+                        child_path(placement.path, row[0]), placement.depth + 1, number,
+                        placement.sort_key + CODE_SEPARATOR + sort_segment(number),
+                        placement.wbs_code + CODE_SEPARATOR + str(number),
+                    )
+                if value != (row[4], row[5], row[3], row[6], row[7]):
+                    changes.append({"id": row[0], **value._asdict()})
+                stack.append((row[0], value))
+        if changes:
+            db.execute(
+                text("""
+                    UPDATE tasks SET path = :path, depth = :depth, sort_order = :sort_order,
+                                     sort_key = :sort_key, wbs_code = :wbs_code
+                    WHERE id = :id
+                """),
+                changes,
+            )
+        return len(changes)
+
+
+def _read(connection, task_id: Optional[int]) -> Optional[_Row]:
+    if task_id is None:
+        return None
+    row = connection.execute(
+        text("SELECT project_id, parent_id, path, depth, sort_key, wbs_code FROM tasks WHERE id = :task_id"),
+        {"task_id": task_id},
+    ).first()
+    return _Row(*row) if row else None
+
+
+def _number(row: _Row) -> int:
+    """Sibling number as recorded in the key (sort_order may already be overwritten)"""
+    return int(row.sort_key[-SORT_KEY_WIDTH:])
+
+
+def _own_prefixes(row: _Row) -> Tuple[str, str]:
+    """Prefixes shared by `row` and its siblings"""
+    number = str(_number(row))
+    return row.sort_key[:-SORT_KEY_WIDTH], row.wbs_code[:len(row.wbs_code) - len(number)]
+
+
+def _sibling_count(connection, project_id: int, parent_id: Optional[int], exclude: int) -> int:
+    """Numbered siblings under `parent_id`, not counting `exclude`"""
+    return connection.execute(
+        text("""
+            SELECT count(*) FROM tasks
+            WHERE project_id = :project_id AND parent_id IS :parent_id AND id != :exclude
+              AND sort_key IS NOT NULL
+        """),
+        {"project_id": project_id, "parent_id": parent_id, "exclude": exclude},
+    ).scalar()
+
+
+def _renumber(
+    connection,
+    project_id: int,
+    key_prefix: str,
+    code_prefix: str,
+    *,
+    first: int,
+    last: Optional[int] = None,
+    shift: int = 0,
+    moved: int = -1,
+    target: int = 0,
+) -> None:
+    """Renumber siblings first..last (open ended by default) under one prefix"""
+    # ":" sorts right after "9", so the open range ends after the last sibling
+    high = key_prefix + (sort_segment(last + 1) if last is not None else ":")
+    connection.execute(text(_RENUMBER), {
+        "project_id": project_id, "key_prefix": key_prefix, "code_prefix": code_prefix,
+        "key_length": len(key_prefix) + SORT_KEY_WIDTH, "low": key_prefix + sort_segment(first), "high": high,
+        "shift": shift, "moved": moved, "target": target,
+    })
+
+
+def _child_placement(parent: Optional[_Row], task_id: int, number: int) -> Placement:
+    key_prefix, code_prefix = child_prefixes(parent)
+    return Placement(
+        child_path(parent.path if parent else None, task_id),
+        parent.depth + 1 if parent else 0,
+        number,
+        key_prefix + sort_segment(number),
+        code_prefix + str(number),
+    )
+
+
+def _open_slot(connection, row_project_id: int, parent: Optional[_Row], parent_id: Optional[int],
+               task_id: int, position: Optional[int]) -> int:
+    """Shift the siblings from `position` on to make room; returns the number to use"""
+    count = _sibling_count(connection, row_project_id, parent_id, task_id)
+    number = count + 1 if position is None else min(max(position, 1), count + 1)
+    if number <= count:
+        key_prefix, code_prefix = child_prefixes(parent)
+        _renumber(connection, row_project_id, key_prefix, code_prefix, first=number, shift=1)
+    return number
+
+
+def _place(connection, task_id: int, position: Optional[int] = None) -> Placement:
+    row = _read(connection, task_id)
+    parent = _read(connection, row.parent_id)
+    number = _open_slot(connection, row.project_id, parent, row.parent_id, task_id, position)
+    placement = _child_placement(parent, task_id, number)
+    connection.execute(
+        text("""
+            UPDATE tasks SET path = :path, depth = :depth, sort_order = :sort_order,
+                             sort_key = :sort_key, wbs_code = :wbs_code
+            WHERE id = :task_id
+        """),
+        {"task_id": task_id, **placement._asdict()},
+    )
+    return placement
+
+
+def _relocate(
+    connection, task_id: int, old_parent_id: Optional[int], parent_id: Optional[int], position: Optional[int]
+) -> Placement:
+    row = _read(connection, task_id)
+    if row.sort_key is None or row.path is None:
+        connection.execute(text("UPDATE tasks SET parent_id = :parent_id WHERE id = :task_id"),
+                           {"task_id": task_id, "parent_id": parent_id})
+        return _place(connection, task_id, position)
+
+    old_number = _number(row)
+    key_prefix, code_prefix = _own_prefixes(row)
+    if old_parent_id == parent_id:
+        count = _sibling_count(connection, row.project_id, parent_id, task_id) + 1
+        number = count if position is None else min(max(position, 1), count)
+        if number < old_number:
+            _renumber(connection, row.project_id, key_prefix, code_prefix,
+                      first=number, last=old_number, shift=1, moved=old_number, target=number)
+        elif number > old_number:
+            _renumber(connection, row.project_id, key_prefix, code_prefix,
+                      first=old_number, last=number, shift=-1, moved=old_number, target=number)
+        placement = _read(connection, task_id)
+        return Placement(placement.path, placement.depth, number, placement.sort_key, placement.wbs_code)
+
+    # Close the gap under the old parent, then open one under the new parent.
+    # Either step can renumber the other side, so rows are re-read in between.
+    _renumber(connection, row.project_id, key_prefix, code_prefix, first=old_number + 1, shift=-1)
+    parent = _read(connection, parent_id)
+    number = _open_slot(connection, row.project_id, parent, parent_id, task_id, position)
+    row = _read(connection, task_id)
+    placement = _child_placement(parent, task_id, number)
+    low, high = subtree_bounds(row.path)
+    connection.execute(text(_MOVE), {
+        "new_path": placement.path, "old_path_length": len(row.path), "delta": placement.depth - (row.depth or 0),
+        "new_key": placement.sort_key, "old_key_length": len(row.sort_key),
+        "new_code": placement.wbs_code, "old_code_length": len(row.wbs_code),
+        "task_id": task_id, "parent_id": parent_id, "sort_order": number, "low": low, "high": high,
+    })
+    return placement
+
+
+def _set_placement(target: Task, placement: Placement) -> None:
+    # Keep the flushed object consistent with the row without reloading it
+    for name, value in placement._asdict().items():
+        set_committed_value(target, name, value)
+
+
+@event.listens_for(Task, "after_insert")
+def _place_inserted_task(mapper, connection, target):
+    _set_placement(target, _place(connection, target.id))
+
+
+@event.listens_for(Task, "after_update")
+def _move_updated_task(mapper, connection, target):
+    state = inspect(target)
+    parent = state.attrs.parent_id.history
+    if parent.has_changes():
+        old_parent_id = parent.deleted[0] if parent.deleted else None
+        _set_placement(target, _relocate(connection, target.id, old_parent_id, target.parent_id, None))
+    elif state.attrs.sort_order.history.has_changes() and target.sort_order is not None:
+        _set_placement(target, _relocate(connection, target.id, target.parent_id, target.parent_id,
+                                         target.sort_order))
+
+
+task_tree = CRUDTaskTree()
@@ -0,0 +1,225 @@
+import atexit
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Any, Dict, List, Mapping, Optional
+
+from sqlalchemy import DateTime, bindparam, text
+
+from ..core.config import settings
+from ..database import SessionLocal
+
+# Task columns whose changes are audited
+AUDITED_FIELDS = (
+    "name", "description", "task_type", "status", "priority", "parent_id",
+    "planned_start_date", "planned_end_date", "estimated_hours", "actual_hours",
+    "remaining_hours", "progress_percentage",
+)
+# Stored by enum name through the ORM and by value through raw SQL
+_ENUM_FIELDS = ("task_type", "status", "priority")
+
+# Rows of tasks deleted while their history was queued are dropped
+_INSERT_SQL = text("""
+    INSERT INTO task_history (task_id, user_id, field_name, old_value, new_value, created_at)
+    SELECT :task_id, :user_id, :field_name, :old_value, :new_value, :created_at
+    WHERE EXISTS (SELECT 1 FROM tasks WHERE id = :task_id)
+""").bindparams(bindparam("created_at", type_=DateTime()))
+
+
+def _text(field: str, value: Any) -> Optional[str]:
+    """A task value as history text, normalised so equal values compare equal"""
+    if value is None:
+        return None
+    if isinstance(value, Enum):
+        value = value.value
+    if field in _ENUM_FIELDS:
+        return str(value).lower()
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    if isinstance(value, str) and field.endswith("_date"):
+        # Raw rows give "YYYY-MM-DD HH:MM:SS[.ffffff]"
+        try:
+            return _text(field, datetime.fromisoformat(value))
+        except ValueError:
+            return value
+    return str(value)
+
+
+def diff_task(old: Mapping[str, Any], new: Mapping[str, Any]) -> List[tuple]:
+    """(field, old text, new text) for every audited field present in both and changed"""
+    changes = []
+    for field in AUDITED_FIELDS:
+        if field not in old or field not in new:
+            continue
+        before, after = _text(field, old[field]), _text(field, new[field])
+        if before != after:
+            changes.append((field, before, after))
+    return changes
+
+
+class TaskHistoryWriter:
+    """Buffered writer of TaskHistory rows
+
+    Update handlers diff a task before and after the change and `record` the
+    changed fields. In the default "buffered" durability the rows only go
+    into an in-process queue, so a request adds no INSERT; a daemon thread
+    writes them with one executemany per batch once BATCH_SIZE rows are
+    waiting or FLUSH_INTERVAL has passed, and at shutdown. When MAX_PENDING
+    rows are waiting the recording request writes a batch itself instead of
+    growing the queue (counted as `backpressure_flushes`). A batch that fails
+    to write goes back to the front of the queue and is retried on the next
+    flush, the thread waiting FLUSH_INTERVAL between attempts. With "sync"
+    durability every record is written before `record` returns, which raises
+    when it could not be.
+
+    Rows keep the time of the change, not of the flush, and are dropped when
+    the task has been deleted before they are written.
+    """
+
+    def __init__(
+        self,
+        durability: str = settings.AUDIT_DURABILITY,
+        batch_size: int = settings.AUDIT_BATCH_SIZE,
+        flush_interval: float = settings.AUDIT_FLUSH_INTERVAL_MS / 1000,
+        max_pending: int = settings.AUDIT_MAX_PENDING,
+    ):
+        self.durability = durability
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: "deque[dict]" = deque()
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # one batch at a time, from the thread or a caller
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {
+            "written": 0, "batches": 0, "backpressure_flushes": 0, "failed": 0,
+            "max_pending_seen": 0, "last_batch_ms": 0.0,
+        }
+
+    def record(self, *, task_id: int, user_id: Optional[int], changes: List[tuple]) -> int:
+        """Queue history rows for the changes from `diff_task`; returns the number of rows
+
+        Changes without a user are not recorded, as task_history.user_id is
+        required.
+        """
+        if not changes or user_id is None:
+            return 0
+        now = datetime.now(timezone.utc)
+        rows = [
+            {"task_id": task_id, "user_id": user_id, "field_name": field, "old_value": before,
+             "new_value": after, "created_at": now}
+            for field, before, after in changes
+        ]
+        if self.durability == "sync":
+            self._write(rows)
+            return len(rows)
+
+        with self._condition:
+            self._pending.extend(rows)
+            pending = len(self._pending)
+            self._stats["max_pending_seen"] = max(self._stats["max_pending_seen"], pending)
+            if pending >= self.batch_size:
+                self._condition.notify()
+        self._ensure_thread()
+        if pending > self.max_pending:
+            with self._condition:
+                self._stats["backpressure_flushes"] += 1
+            self._flush_batch()
+        return len(rows)
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of rows written"""
+        written = 0
+        while True:
+            count = self._flush_batch()
+            if not count:
+                return written
+            written += count
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            pending = len(self._pending)
+        return {
+            **self._stats,
+            "durability": self.durability,
+            "pending": pending,
+            "max_pending": self.max_pending,
+            "saturation": round(pending / self.max_pending, 4) if self.max_pending else 0.0,
+        }
+
+    def close(self) -> None:
+        """Stop the writer thread after writing what is queued"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self._stopping = False
+        if self._pending:
+            print(f"Task history writer stopped with {len(self._pending)} rows it could not write")
+
+    def _flush_batch(self) -> int:
+        with self._condition:
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        if not batch:
+            return 0
+        try:
+            self._write(batch)
+        except Exception as e:
+            print(f"Error writing task history, {len(batch)} rows kept for retry: {e}")
+            with self._condition:
+                self._pending.extendleft(reversed(batch))
+            return 0
+        return len(batch)
+
+    def _write(self, rows: List[dict]) -> None:
+        """Insert `rows` in one executemany; raises when they could not be written"""
+        started = time.perf_counter()
+        with self._write_lock:
+            try:
+                with SessionLocal() as db:
+                    db.execute(_INSERT_SQL, rows)
+                    db.commit()
+            except Exception:
+                self._stats["failed"] += len(rows)
+                raise
+            self._stats["written"] += len(rows)
+            self._stats["batches"] += 1
+            self._stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="task-history-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        retrying = False
+        while True:
+            with self._condition:
+                # After a failed batch, wait out the interval before the next attempt
+                self._condition.wait_for(
+                    lambda: self._stopping or (not retrying and len(self._pending) >= self.batch_size),
+                    timeout=self.flush_interval,
+                )
+                stopping = self._stopping
+            failed = self._stats["failed"]
+            self.flush()
+            retrying = self._stats["failed"] != failed
+            if stopping:
+                return
+
+
+task_history = TaskHistoryWriter()
+atexit.register(task_history.close)
@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from ..crud.base import CRUDBase
+from ..models import Notification
+from ..schemas.notification import NotificationCreate, NotificationUpdate
+
+
+class CRUDNotification(CRUDBase[Notification, NotificationCreate, NotificationUpdate]):
+    def get_by_user(
+        self, db: Session, *, user_id: int, unread_only: bool = False, skip: int = 0, limit: int = 100
+    ) -> List[Notification]:
+        """Get notifications of a user, newest first"""
+        query = db.query(Notification).filter(Notification.user_id == user_id)
+        if unread_only:
+            query = query.filter(Notification.is_read.is_(False))
+        return query.order_by(Notification.created_at.desc(), Notification.id.desc()).offset(skip).limit(limit).all()
+
+    def create_once(self, db: Session, *, obj_in: NotificationCreate) -> Optional[Notification]:
+        """Create a notification unless an unread one with the same reference exists"""
+        if obj_in.reference is not None:
+            existing = (
+                db.query(Notification.id)
+                .filter(Notification.user_id == obj_in.user_id)
+                .filter(Notification.notification_type == obj_in.notification_type)
+                .filter(Notification.reference == obj_in.reference)
+                .filter(Notification.is_read.is_(False))
+                .first()
+            )
+            if existing:
+                return None
+        return self.create(db, obj_in=obj_in)
+
+    def mark_read(self, db: Session, *, notification: Notification) -> Notification:
+        """Mark one notification as read"""
+        notification.is_read = True
+        notification.read_at = datetime.utcnow()
+        db.commit()
+        db.refresh(notification)
+        return notification
+
+    def mark_all_read(self, db: Session, *, user_id: int) -> int:
+        """Mark every unread notification of a user as read"""
+        count = (
+            db.query(Notification)
+            .filter(Notification.user_id == user_id, Notification.is_read.is_(False))
+            .update({"is_read": True, "read_at": datetime.utcnow()}, synchronize_session=False)
+        )
+        db.commit()
+        return count
+
+
+notification = CRUDNotification(Notification)
@@ -0,0 +1,173 @@
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from ..utils.work_calendar import to_datetime64
+from .calendar import work_calendar
+
+# Projects that are still being worked on and keep their tasks in the hot tables
+_OPEN_PROJECTS = """
+    p.archived_at IS NULL AND coalesce(p.is_template, 0) = 0
+    AND lower(p.status) IN ('planning', 'active', 'on_hold')
+"""
+
+_SNAPSHOT_SQL = """
+    INSERT INTO progress_snapshots (
+        project_id, phase_id, snapshot_date, task_count, completed_count,
+        estimated_hours, completed_hours, remaining_hours, actual_hours
+    )
+    WITH leaves AS (
+        SELECT t.project_id,
+               coalesce(CAST(substr(t.path, 2, instr(substr(t.path, 2), '/') - 1) AS INTEGER), t.id) AS phase_id,
+               lower(t.status) = 'completed' AS done,
+               coalesce(t.estimated_hours, 0) AS estimated,
+               -- Nothing maintains remaining_hours yet, so unset means estimate less time logged
+               coalesce(t.remaining_hours, max(coalesce(t.estimated_hours, 0) - coalesce(t.actual_hours, 0), 0))
+                   AS remaining,
+               coalesce(t.actual_hours, 0) AS actual
+        FROM projects p
+        JOIN tasks t ON t.project_id = p.id
+        WHERE {scope}
+          AND NOT EXISTS (SELECT 1 FROM tasks c WHERE c.parent_id = t.id)
+          AND NOT EXISTS (
+              SELECT 1 FROM progress_snapshots s
+              WHERE s.project_id = p.id AND s.phase_id IS NULL AND s.snapshot_date = :day
+          )
+    )
+    -- Phase rows, then the project totals (phase_id NULL) from the same leaves
+    SELECT project_id, phase_id, :day, count(*), sum(done), total(estimated),
+           total(CASE WHEN done THEN estimated END), total(CASE WHEN done THEN 0 ELSE remaining END), total(actual)
+    FROM leaves GROUP BY project_id, phase_id
+    UNION ALL
+    SELECT project_id, NULL, :day, count(*), sum(done), total(estimated),
+           total(CASE WHEN done THEN estimated END), total(CASE WHEN done THEN 0 ELSE remaining END), total(actual)
+    FROM leaves GROUP BY project_id
+"""
+
+_SNAPSHOT_COLUMNS = (
+    "task_count", "completed_count", "estimated_hours", "completed_hours", "remaining_hours", "actual_hours"
+)
+
+
+class CRUDProgressSnapshot:
+    """Daily progress totals per project and phase (top-level task)
+
+    A snapshot is one INSERT ... SELECT over the leaf tasks of every open
+    project, grouped by project and by phase, so a nightly run costs a single
+    statement whatever the number of projects. Rows are only appended: a
+    project that already has rows for the day is skipped unless `replace` is
+    asked for. Burndown and burnup read the history back with one range scan
+    of (project_id, phase_id, snapshot_date).
+    """
+
+    def take(
+        self,
+        db: Session,
+        *,
+        snapshot_date: Optional[date] = None,
+        project_ids: Optional[List[int]] = None,
+        replace: bool = False,
+    ) -> int:
+        """Record the day's totals; returns the number of rows written. Not committed"""
+        day = snapshot_date or date.today()
+        if project_ids is not None:
+            scope, params = "p.id IN :project_ids", {"day": day, "project_ids": list(project_ids)}
+            if replace:
+                db.execute(
+                    text("DELETE FROM progress_snapshots WHERE project_id IN :project_ids AND snapshot_date = :day")
+                    .bindparams(bindparam("project_ids", expanding=True)),
+                    params,
+                )
+        else:
+            scope, params = _OPEN_PROJECTS, {"day": day}
+            if replace:
+                db.execute(text("DELETE FROM progress_snapshots WHERE snapshot_date = :day"), params)
+
+        statement = text(_SNAPSHOT_SQL.format(scope=scope))
+        if project_ids is not None:
+            statement = statement.bindparams(bindparam("project_ids", expanding=True))
+        return db.execute(statement, params).rowcount
+
+    def get_history(
+        self,
+        db: Session,
+        *,
+        project_id: int,
+        start_date: date,
+        end_date: date,
+        phase_id: Optional[int] = None,
+    ) -> Dict[str, List[Any]]:
+        """Snapshot columns of the project (or one phase) in [start_date, end_date], oldest first"""
+        rows = db.execute(
+            text(f"""
+                SELECT snapshot_date, {", ".join(_SNAPSHOT_COLUMNS)} FROM progress_snapshots
+                WHERE project_id = :project_id AND phase_id IS :phase_id
+                  AND snapshot_date BETWEEN :start_date AND :end_date
+                ORDER BY snapshot_date
+            """),
+            {"project_id": project_id, "phase_id": phase_id, "start_date": start_date, "end_date": end_date},
+        ).fetchall()
+        columns = list(zip(*rows)) if rows else [()] * (len(_SNAPSHOT_COLUMNS) + 1)
+        history = {"dates": [date.fromisoformat(day) for day in columns[0]]}
+        history.update((name, list(values)) for name, values in zip(_SNAPSHOT_COLUMNS, columns[1:]))
+        return history
+
+    def get_burndown(self, db: Session, *, project_id: int, start_date: date, end_date: date,
+                     phase_id: Optional[int] = None) -> Dict[str, Any]:
+        """Remaining hours per snapshot, with the ideal line from the first snapshot to the planned finish
+
+        The ideal line falls evenly per working day of the project calendar
+        and is null when the project (or phase) has no planned finish.
+        """
+        history = self.get_history(
+            db, project_id=project_id, start_date=start_date, end_date=end_date, phase_id=phase_id
+        )
+        finish = db.execute(
+            text("SELECT date(rollup_end_date) FROM tasks WHERE id = :phase_id AND project_id = :project_id")
+            if phase_id is not None else
+            text("SELECT date(coalesce(end_date, (SELECT max(t.rollup_end_date) FROM tasks t "
+                 "WHERE t.project_id = p.id AND t.parent_id IS NULL))) FROM projects p WHERE p.id = :project_id"),
+            {"project_id": project_id, "phase_id": phase_id},
+        ).scalar()
+        finish = date.fromisoformat(finish) if finish else None
+        ideal: List[Optional[float]] = [None] * len(history["dates"])
+        if history["dates"] and finish is not None:
+            calendar = work_calendar.get_working_calendar(db, project_id=project_id)
+            days = to_datetime64(history["dates"])
+            total = calendar.count_workdays(days[0], np.datetime64(finish, "D") + 1)
+            elapsed = calendar.count_workdays(days[0], days)
+            if total > 0:
+                left = np.clip(1.0 - elapsed / total, 0.0, 1.0)
+                ideal = np.round(history["remaining_hours"][0] * left, 2).tolist()
+        return {
+            "project_id": project_id,
+            "phase_id": phase_id,
+            "planned_end_date": finish,
+            "dates": history["dates"],
+            "remaining_hours": history["remaining_hours"],
+            "ideal_remaining_hours": ideal,
+            "open_task_count": [n - done for n, done in zip(history["task_count"], history["completed_count"])],
+        }
+
+    def get_burnup(self, db: Session, *, project_id: int, start_date: date, end_date: date,
+                   phase_id: Optional[int] = None) -> Dict[str, Any]:
+        """Scope (estimated hours) against completed work per snapshot"""
+        history = self.get_history(
+            db, project_id=project_id, start_date=start_date, end_date=end_date, phase_id=phase_id
+        )
+        return {
+            "project_id": project_id,
+            "phase_id": phase_id,
+            "dates": history["dates"],
+            "scope_hours": history["estimated_hours"],
+            "completed_hours": history["completed_hours"],
+            "actual_hours": history["actual_hours"],
+            "task_count": history["task_count"],
+            "completed_count": history["completed_count"],
+        }
+
+
+progress_snapshot = CRUDProgressSnapshot()
@@ -1,6 +1,9 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session, joinedload
 from ..crud.base import CRUDBase
+from ..crud.cascade import cascade
+from ..crud.utilization import resource_utilization
+from ..crud.search import search as search_index
 from ..models import Project, ProjectMember, User, Task
 from ..schemas.project import ProjectCreate, ProjectUpdate, ProjectMemberCreate, ProjectMemberUpdate
 
@@ -48,6 +51,11 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
         self, db: Session, *, search_term: str, skip: int = 0, limit: int = 100
     ) -> List[Project]:
         """Search projects by name or description"""
+        if search_index.can_use_index(db, search_term):
+            ids = search_index.match_ids(
+                db, entity_type="project", search_term=search_term, skip=skip, limit=limit
+            )
+            return self.get_multi_by_ids(db, ids=ids)
         return (
             db.query(Project)
             .filter(
@@ -93,6 +101,17 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
         
         return db_obj
 
+    def remove(self, db: Session, *, id: int) -> Optional[Project]:
+        """Delete a project with its tasks and every dependent row"""
+        obj = self.get(db, id=id)
+        if obj is None:
+            return None
+        db.expunge(obj)
+        cascade.delete_project(db, project_id=id)
+        db.commit()
+        resource_utilization.invalidate()
+        return obj
+
 
 class CRUDProjectMember(CRUDBase[ProjectMember, ProjectMemberCreate, ProjectMemberUpdate]):
     def get_by_project(
@@ -146,6 +165,35 @@ class CRUDProjectMember(CRUDBase[ProjectMember, ProjectMemberCreate, ProjectMemb
             db.refresh(member)
         return member
 
+    def get_project_ids_by_user(self, db: Session, *, user_id: int) -> List[int]:
+        """Get ids of projects the user is currently a member of"""
+        rows = (
+            db.query(ProjectMember.project_id)
+            .filter(ProjectMember.user_id == user_id)
+            .filter(ProjectMember.left_at.is_(None))
+            .all()
+        )
+        return [row.project_id for row in rows]
+
+    def get_task_roles(
+        self, db: Session, *, user_id: int, task_ids: List[int]
+    ) -> Dict[int, Tuple[int, Optional[str]]]:
+        """Map each existing task to (project_id, the user's role in that project or None), in one query"""
+        if not task_ids:
+            return {}
+        rows = (
+            db.query(Task.id, Task.project_id, ProjectMember.role)
+            .outerjoin(
+                ProjectMember,
+                (ProjectMember.project_id == Task.project_id)
+                & (ProjectMember.user_id == user_id)
+                & ProjectMember.left_at.is_(None),
+            )
+            .filter(Task.id.in_(task_ids))
+            .all()
+        )
+        return {row.id: (row.project_id, row.role) for row in rows}
+
     def get_user_projects_with_role(
         self, db: Session, *, user_id: int, role: str
     ) -> List[ProjectMember]:
@@ -0,0 +1,197 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, event, inspect, text
+from sqlalchemy.orm import Session
+
+from ..models import Task
+from .hierarchy import path_ids
+
+# Task attributes the rollup is computed from
+ROLLUP_SOURCES = (
+    "planned_start_date", "planned_end_date", "estimated_hours", "actual_hours",
+    "remaining_hours", "progress_percentage", "parent_id",
+)
+
+# (start, end, estimated, actual, remaining, progress); dates are normalised
+# 'YYYY-MM-DD HH:MM:SS' strings so min/max compare them correctly
+Rollup = Tuple[Optional[str], Optional[str], float, float, float, float]
+
+_OWN_COLUMNS = """
+    id, parent_id, datetime(planned_start_date), datetime(planned_end_date),
+    estimated_hours, actual_hours, remaining_hours, progress_percentage
+"""
+_ROLLUP_COLUMNS = """
+    datetime(rollup_start_date), datetime(rollup_end_date), rollup_estimated_hours,
+    rollup_actual_hours, rollup_remaining_hours, rollup_progress
+"""
+
+
+def combine(own: Sequence, children: Optional[List[Rollup]]) -> Rollup:
+    """Rollup of a task from its own values (leaf) or its children's rollups
+
+    Progress is weighted by estimated hours, falling back to a plain mean
+    when the children carry no estimate.
+    """
+    if not children:
+        start, end, estimated, actual, remaining, progress = own
+        return (start, end, round(estimated or 0.0, 6), round(actual or 0.0, 6),
+                round(remaining or 0.0, 6), round(progress or 0.0, 4))
+    starts = [c[0] for c in children if c[0] is not None]
+    ends = [c[1] for c in children if c[1] is not None]
+    estimated = sum(c[2] or 0.0 for c in children)
+    if estimated > 0:
+        progress = sum((c[2] or 0.0) * (c[5] or 0.0) for c in children) / estimated
+    else:
+        progress = sum(c[5] or 0.0 for c in children) / len(children)
+    return (
+        min(starts) if starts else None,
+        max(ends) if ends else None,
+        round(estimated, 6),
+        round(sum(c[3] or 0.0 for c in children), 6),
+        round(sum(c[4] or 0.0 for c in children), 6),
+        round(progress, 4),
+    )
+
+
+class CRUDTaskRollup:
+    """Rollup columns of the WBS tree
+
+    `refresh` recomputes the given tasks and their ancestors, which are read
+    off the tasks' materialized paths, so a change costs three statements
+    whatever the depth and only rows whose rollup changed are written.
+    `rebuild` recomputes whole projects bottom-up and is the repair path
+    (`python -m app.cli rebuild-rollups`).
+    """
+
+    def refresh(self, db: Session, task_ids: Iterable[Optional[int]]) -> int:
+        """Update the rollup of `task_ids` and their ancestors; returns rows written"""
+        targets = sorted({i for i in task_ids if i is not None})
+        if not targets:
+            return 0
+        nodes = set(targets)
+        for row in db.execute(
+            text("SELECT parent_id, path FROM tasks WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": targets},
+        ):
+            nodes.update(path_ids(row[1]))
+            nodes.add(row[0])
+        nodes.discard(None)
+        ids = sorted(nodes)
+
+        own = db.execute(
+            text(f"SELECT {_OWN_COLUMNS}, {_ROLLUP_COLUMNS}, depth FROM tasks WHERE id IN :ids")
+            .bindparams(bindparam("ids", expanding=True)),
+            {"ids": ids},
+        ).fetchall()
+        children: Dict[int, List[Tuple[int, Rollup]]] = defaultdict(list)
+        for row in db.execute(
+            text(f"SELECT parent_id, id, {_ROLLUP_COLUMNS} FROM tasks WHERE parent_id IN :ids")
+            .bindparams(bindparam("ids", expanding=True)),
+            {"ids": ids},
+        ):
+            children[row[0]].append((row[1], tuple(row[2:])))
+
+        # Deepest first, so every parent sees the new values of its children
+        values: Dict[int, Rollup] = {}
+        changes = []
+        for row in sorted(own, key=lambda r: -(r[14] or 0)):
+            kids = [values.get(child_id, stored) for child_id, stored in children.get(row[0], ())]
+            value = values[row[0]] = combine(row[2:8], kids)
+            if value != tuple(row[8:14]):
+                changes.append((row[0], value))
+        return self._write(db, changes)
+
+    def rebuild(self, db: Session, *, project_id: Optional[int] = None) -> int:
+        """Recompute every rollup (of one project) in a single pass; returns rows written"""
+        where, params = "", {}
+        if project_id is not None:
+            where, params = "WHERE project_id = :project_id", {"project_id": project_id}
+        rows = db.execute(text(f"SELECT {_OWN_COLUMNS}, {_ROLLUP_COLUMNS} FROM tasks {where}"), params).fetchall()
+        by_id = {row[0]: row for row in rows}
+        children_of: Dict[int, List[int]] = defaultdict(list)
+        for row in rows:
+            if row[1] in by_id:
+                children_of[row[1]].append(row[0])
+
+        # Post-order walk from the roots so children are always computed first
+        values: Dict[int, Rollup] = {}
+        roots = [row[0] for row in rows if row[1] not in by_id]
+        for root in roots:
+            stack = [(root, False)]
+            while stack:
+                task_id, expanded = stack.pop()
+                if expanded:
+                    kids = children_of.get(task_id)
+                    values[task_id] = combine(by_id[task_id][2:8], [values[k] for k in kids] if kids else None)
+                    continue
+                stack.append((task_id, True))
+                stack.extend((k, False) for k in children_of.get(task_id, ()) if k not in values)
+
+        changes = [(i, v) for i, v in values.items() if v != tuple(by_id[i][8:14])]
+        return self._write(db, changes)
+
+    def _write(self, db: Session, changes: List[Tuple[int, Rollup]]) -> int:
+        if changes:
+            db.execute(
+                text("""
+                    UPDATE tasks SET rollup_start_date = :start, rollup_end_date = :end,
+                                     rollup_estimated_hours = :estimated, rollup_actual_hours = :actual,
+                                     rollup_remaining_hours = :remaining, rollup_progress = :progress
+                    WHERE id = :id
+                """),
+                [
+                    {"id": i, "start": v[0], "end": v[1], "estimated": v[2],
+                     "actual": v[3], "remaining": v[4], "progress": v[5]}
+                    for i, v in changes
+                ],
+            )
+        return len(changes)
+
+
+def mark_for_refresh(session: Session, task_ids: Iterable[Optional[int]]) -> None:
+    """Refresh the rollup of `task_ids` when the session commits, for changes made in SQL"""
+    targets = {i for i in task_ids if i is not None}
+    if targets:
+        session.info.setdefault("rollup_task_ids", set()).update(targets)
+
+
+def _moved_or_changed(obj: Task) -> List[Optional[int]]:
+    """Tasks whose rollup an update of `obj` affects"""
+    state = inspect(obj)
+    if not any(state.attrs[name].history.has_changes() for name in ROLLUP_SOURCES):
+        return []
+    # A moved task changes the rollup of the parent it left and the one it joined
+    parent = state.attrs.parent_id.history
+    return [obj.id, *(parent.added or ()), *(parent.deleted or ())]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_rollup_changes(session, flush_context):
+    # new, dirty and deleted still describe the flushed changes at this point
+    targets = set()
+    for obj in session.new:
+        if isinstance(obj, Task):
+            # A parent gains a child even when the child's own rollup is empty
+            targets.update((obj.id, obj.parent_id))
+    targets.update(obj.parent_id for obj in session.deleted if isinstance(obj, Task))
+    for obj in session.dirty:
+        if isinstance(obj, Task):
+            targets.update(_moved_or_changed(obj))
+    mark_for_refresh(session, targets)
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_before_commit(session):
+    # commit() flushes after this hook, so flush here to collect the last changes
+    session.flush()
+    if session.info.get("rollup_task_ids"):
+        task_rollup.refresh(session, session.info.pop("rollup_task_ids"))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("rollup_task_ids", None)
+
+
+task_rollup = CRUDTaskRollup()
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from ..models import ProjectScenario, ScenarioTaskOverride
+from ..schemas.scenario import ScenarioCreate, ScenarioOverride, ScenarioUpdate
+from .base import CRUDBase
+from .clone import OVERRIDE_FIELDS
+
+
+class CRUDProjectScenario(CRUDBase[ProjectScenario, ScenarioCreate, ScenarioUpdate]):
+    """What-if branches of a project
+
+    A scenario stores one ScenarioTaskOverride row per changed task, holding
+    only the changed fields, so a branch of a 10k-task project costs a few
+    rows rather than a copy. Its tasks are read as the base tasks with the
+    overrides applied in the same query; `project_clone.clone` with the
+    scenario turns the branch into a real project.
+    """
+
+    def get_by_project(self, db: Session, *, project_id: int) -> List[ProjectScenario]:
+        return (
+            db.query(ProjectScenario)
+            .filter(ProjectScenario.project_id == project_id)
+            .order_by(ProjectScenario.id)
+            .all()
+        )
+
+    def create_with_owner(
+        self, db: Session, *, project_id: int, obj_in: ScenarioCreate, created_by: int
+    ) -> ProjectScenario:
+        db_obj = ProjectScenario(**obj_in.model_dump(), project_id=project_id, created_by=created_by)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def get_tasks(self, db: Session, *, scenario: ProjectScenario) -> List[Dict[str, Any]]:
+        """The project's tasks as the scenario sees them, in WBS order"""
+        fields = ", ".join(f"coalesce(o.{f}, t.{f}) AS {f}" for f in OVERRIDE_FIELDS)
+        rows = db.execute(
+            text(f"""
+                SELECT t.id, t.parent_id, t.name, t.wbs_code, t.depth, t.is_milestone, {fields},
+                       o.id IS NOT NULL AS overridden
+                FROM tasks t
+                LEFT JOIN scenario_task_overrides o ON o.task_id = t.id AND o.scenario_id = :scenario_id
+                WHERE t.project_id = :project_id
+                ORDER BY t.sort_key, t.id
+            """),
+            {"scenario_id": scenario.id, "project_id": scenario.project_id},
+        ).mappings().all()
+        return [dict(row) for row in rows]
+
+    def set_override(
+        self, db: Session, *, scenario: ProjectScenario, task_id: int, obj_in: ScenarioOverride
+    ) -> Optional[Dict[str, Any]]:
+        """Set the given fields of a task in the scenario; None when the task is not in its project
+
+        Fields left out keep their current override, a field set to null
+        falls back to the base task's value. An override left with no field
+        set is dropped. Returns the task's overridden fields.
+        """
+        in_project = db.execute(
+            text("SELECT 1 FROM tasks WHERE id = :task_id AND project_id = :project_id"),
+            {"task_id": task_id, "project_id": scenario.project_id},
+        ).first()
+        if in_project is None:
+            return None
+        override = (
+            db.query(ScenarioTaskOverride)
+            .filter(ScenarioTaskOverride.scenario_id == scenario.id, ScenarioTaskOverride.task_id == task_id)
+            .first()
+        ) or ScenarioTaskOverride(scenario_id=scenario.id, task_id=task_id)
+        for field, value in obj_in.model_dump(exclude_unset=True).items():
+            setattr(override, field, value)
+        fields = {f: getattr(override, f) for f in OVERRIDE_FIELDS}
+
+        if all(value is None for value in fields.values()):
+            if override.id is not None:
+                db.delete(override)
+        else:
+            db.add(override)
+        scenario.updated_at = func.now()
+        db.commit()
+        return {"task_id": task_id, **fields}
+
+    def remove_override(self, db: Session, *, scenario: ProjectScenario, task_id: int) -> int:
+        deleted = db.execute(
+            text("DELETE FROM scenario_task_overrides WHERE scenario_id = :scenario_id AND task_id = :task_id"),
+            {"scenario_id": scenario.id, "task_id": task_id},
+        ).rowcount
+        db.commit()
+        return deleted
+
+    def remove(self, db: Session, *, id: int) -> Optional[ProjectScenario]:
+        db.execute(text("DELETE FROM scenario_task_overrides WHERE scenario_id = :id"), {"id": id})
+        return super().remove(db, id=id)
+
+
+project_scenario = CRUDProjectScenario(ProjectScenario)
@@ -0,0 +1,144 @@
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from ..models.search import SEARCH_TABLE, ENTITY_TYPES, ROWID_FACTOR
+
+# The trigram tokenizer cannot match shorter terms through the index
+MIN_TERM_LENGTH = 3
+
+# Source rows of each entity within projects :project_ids, for short-term scans
+_SCOPED_SOURCES = {
+    "task": "tasks WHERE project_id IN :project_ids",
+    "project": "projects WHERE id IN :project_ids",
+    "user": "users",
+}
+
+
+class CRUDSearch:
+    def is_available(self, db: Session) -> bool:
+        """Check that the FTS5 index exists on this database"""
+        if db.get_bind().dialect.name != "sqlite":
+            return False
+        return db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SEARCH_TABLE},
+        ).first() is not None
+
+    def build_match_query(self, search_term: str) -> Optional[str]:
+        """Quote every term the index can match as an FTS5 phrase; None if there is none
+
+        Shorter terms are left out and have to be filtered separately.
+        """
+        terms = [term for term in search_term.split() if len(term) >= MIN_TERM_LENGTH]
+        if not terms:
+            return None
+        return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+    def can_use_index(self, db: Session, search_term: str) -> bool:
+        return self.build_match_query(search_term) is not None and self.is_available(db)
+
+    def search(
+        self,
+        db: Session,
+        *,
+        search_term: str,
+        entity_types: Optional[Sequence[str]] = None,
+        project_ids: Optional[Sequence[int]] = None,
+        include_users: bool = True,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> List[Dict]:
+        """Ranked cross-entity search
+
+        `project_ids` restricts task/project hits to those projects (users are
+        not project scoped and are controlled by `include_users`).
+        """
+        match = self.build_match_query(search_term)
+        where, params = [], {}
+        if match is not None:
+            where.append(f"{SEARCH_TABLE} MATCH :match")
+            params["match"] = match
+            snippet = f"snippet({SEARCH_TABLE}, 4, '<mark>', '</mark>', '…', 12)"
+        else:
+            snippet = "substr(body, 1, 80)"
+        # The trigram index cannot match terms below three characters, so they
+        # are checked with instr() on the rows the longer terms matched. With
+        # only short terms the stored content is scanned in rowid order, which
+        # lets LIMIT end the scan, and a project scope narrows it to the rows
+        # of those projects' tasks.
+        short_terms = [term for term in search_term.lower().split() if len(term) < MIN_TERM_LENGTH]
+        for i, term in enumerate(short_terms):
+            where.append(f"instr(lower(title || ' ' || body), :term{i}) > 0")
+            params[f"term{i}"] = term
+
+        types = list(entity_types or ENTITY_TYPES)
+        where.append(f"(rowid % {ROWID_FACTOR}) IN :codes")
+        params["codes"] = [ENTITY_TYPES[t] for t in types]
+        binds = [bindparam("codes", expanding=True)]
+
+        if project_ids is not None:
+            scope = "project_id IN :project_ids" if project_ids else "0"
+            if include_users:
+                scope = f"({scope} OR project_id IS NULL)"
+            where.append(scope)
+            if project_ids:
+                params["project_ids"] = list(project_ids)
+                binds.append(bindparam("project_ids", expanding=True))
+                if match is None:
+                    where.append(f"rowid IN ({self._scoped_rowids(types, include_users)})")
+
+        rank = f"bm25({SEARCH_TABLE}, 0, 0, 0, 10.0, 1.0)" if match is not None else "0"
+        query = text(f"""
+            SELECT entity_type, entity_id, project_id, title,
+                   {snippet} AS snippet,
+                   {rank} AS score
+            FROM {SEARCH_TABLE}
+            WHERE {' AND '.join(where)}
+            ORDER BY {'score, ' if match is not None else ''}rowid
+            LIMIT :limit OFFSET :skip
+        """).bindparams(*binds)
+        params.update(limit=limit, skip=skip)
+        rows = db.execute(query, params).fetchall()
+        return [
+            {
+                "type": row.entity_type,
+                "id": row.entity_id,
+                "project_id": row.project_id,
+                "title": row.title,
+                "snippet": row.snippet,
+                "score": -row.score if row.score else 0.0,
+            }
+            for row in rows
+        ]
+
+    def _scoped_rowids(self, entity_types: Sequence[str], include_users: bool) -> str:
+        """Index rowids of the requested entities in projects :project_ids, read through their own indexes"""
+        return " UNION ALL ".join(
+            f"SELECT id * {ROWID_FACTOR} + {ENTITY_TYPES[t]} FROM {_SCOPED_SOURCES[t]}"
+            for t in entity_types if t != "user" or include_users
+        ) or "NULL"
+
+    def match_ids(
+        self,
+        db: Session,
+        *,
+        entity_type: str,
+        search_term: str,
+        project_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[int]:
+        """Ids of one entity type matching the term, best match first"""
+        hits = self.search(
+            db,
+            search_term=search_term,
+            entity_types=[entity_type],
+            project_ids=[project_id] if project_id is not None else None,
+            include_users=False,
+            skip=skip,
+            limit=limit,
+        )
+        return [hit["id"] for hit in hits]
+
+
+search = CRUDSearch()
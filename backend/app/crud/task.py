@@ -1,8 +1,14 @@
-from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Sequence
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 from ..crud.base import CRUDBase
+from ..crud.cascade import cascade
+from ..crud.utilization import resource_utilization
+from ..crud.search import search as search_index
+from ..crud.time_totals import time_totals
 from ..models import (
-    Task, TaskDependency, TaskAssignment, TaskComment, TimeTracking
+    Task, TaskDependency, TaskAssignment, TaskComment, TimeTracking, TimeTrackingDaily
 )
 from ..schemas.task import (
     TaskCreate, TaskUpdate, TaskDependencyCreate, TaskAssignmentCreate, 
@@ -11,6 +17,11 @@ from ..schemas.task import (
 )
 
 
+def _day(value):
+    """The date of a date or datetime bound"""
+    return value.date() if isinstance(value, datetime) else value
+
+
 class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
     def get_by_project(
         self, db: Session, *, project_id: int, skip: int = 0, limit: int = 100
@@ -25,17 +36,19 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
         )
 
     def get_hierarchy_by_project(self, db: Session, *, project_id: int) -> List[Task]:
-        """Get task hierarchy for project (for Gantt chart)"""
-        return (
+        """Get task hierarchy for project (for Gantt chart)
+
+        The whole tree is read in one query and `children` is filled in
+        memory, instead of lazy loading one level at a time.
+        """
+        tasks = (
             db.query(Task)
-            .options(
-                joinedload(Task.assignments).joinedload(TaskAssignment.user),
-                joinedload(Task.children)
-            )
+            .options(joinedload(Task.assignments).joinedload(TaskAssignment.user))
             .filter(Task.project_id == project_id)
-            .order_by(Task.wbs_code, Task.id)
+            .order_by(Task.sort_key, Task.id)
             .all()
         )
+        return link_children(tasks)
 
     def get_by_parent(
         self, db: Session, *, parent_id: int, skip: int = 0, limit: int = 100
@@ -111,6 +124,12 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
         self, db: Session, *, project_id: int, search_term: str, skip: int = 0, limit: int = 100
     ) -> List[Task]:
         """Search tasks by name or description"""
+        if search_index.can_use_index(db, search_term):
+            ids = search_index.match_ids(
+                db, entity_type="task", search_term=search_term,
+                project_id=project_id, skip=skip, limit=limit,
+            )
+            return self.get_multi_by_ids(db, ids=ids)
         return (
             db.query(Task)
             .filter(Task.project_id == project_id)
@@ -124,6 +143,29 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
         )
 
 
+    def remove(self, db: Session, *, id: int) -> Optional[Task]:
+        """Delete a task together with its subtree and their dependent rows"""
+        obj = self.get(db, id=id)
+        if obj is None:
+            return None
+        db.expunge(obj)
+        cascade.delete_subtree(db, task_id=id)
+        db.commit()
+        resource_utilization.invalidate()
+        return obj
+
+
+def link_children(tasks: List[Task]) -> List[Task]:
+    """Populate `children` of a loaded tree without further queries"""
+    children = {t.id: [] for t in tasks}
+    for t in tasks:
+        if t.parent_id in children:
+            children[t.parent_id].append(t)
+    for t in tasks:
+        set_committed_value(t, "children", children[t.id])
+    return tasks
+
+
 class CRUDTaskDependency(CRUDBase[TaskDependency, TaskDependencyCreate, TaskDependencyCreate]):
     def get_by_project(self, db: Session, *, project_id: int) -> List[TaskDependency]:
         """Get all dependencies for project tasks"""
@@ -246,6 +288,95 @@ class CRUDTaskComment(CRUDBase[TaskComment, TaskCommentCreate, TaskCommentUpdate
 
 
 class CRUDTimeTracking(CRUDBase[TimeTracking, TimeTrackingCreate, TimeTrackingUpdate]):
+    def create_with_user(self, db: Session, *, obj_in: TimeTrackingCreate, user_id: int) -> TimeTracking:
+        """Log a time entry for a user"""
+        db_obj = TimeTracking(**obj_in.model_dump(), user_id=user_id)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def create_week(
+        self,
+        db: Session,
+        *,
+        user_id: int,
+        week_start: date,
+        entries: Sequence[Any],
+        project_ids: Dict[int, int],
+        replace: bool = False,
+    ) -> Dict[str, int]:
+        """Insert a user's week of entries with one executemany; not committed
+
+        `entries` carry task_id, date, hours, description, billable and
+        hourly_rate, and `project_ids` maps their tasks to projects. With
+        `replace` the user's entries of the week in those projects are deleted
+        first; entries in other projects are left alone. The daily
+        totals, actual hours and rollups are updated once for the whole week.
+        """
+        removed_ids: List[int] = []
+        if replace:
+            removed_ids = [
+                row[0] for row in db.query(TimeTracking.id)
+                .join(Task, Task.id == TimeTracking.task_id)
+                .filter(TimeTracking.user_id == user_id)
+                .filter(Task.project_id.in_(set(project_ids.values())))
+                .filter(TimeTracking.date >= datetime.combine(week_start, time()))
+                .filter(TimeTracking.date < datetime.combine(week_start + timedelta(days=7), time()))
+                .all()
+            ]
+        removed = time_totals.entry_rows(db, removed_ids)
+        if removed_ids:
+            db.query(TimeTracking).filter(TimeTracking.id.in_(removed_ids)).delete(synchronize_session=False)
+
+        rows = [
+            {"task_id": e.task_id, "user_id": user_id, "date": datetime.combine(e.date, time()), "hours": e.hours,
+             "description": e.description, "billable": e.billable, "hourly_rate": e.hourly_rate}
+            for e in entries
+        ]
+        if rows:
+            db.execute(TimeTracking.__table__.insert(), rows)
+        time_totals.apply(
+            db,
+            added=[
+                (user_id, e.task_id, project_ids[e.task_id], e.date.isoformat(), e.hours, e.billable, e.hourly_rate)
+                for e in entries
+            ],
+            removed=removed,
+        )
+        return {"created": len(rows), "replaced": len(removed_ids)}
+
+    def get_week(self, db: Session, *, user_id: int, week_start: date) -> Dict[str, Any]:
+        """A user's hours per task and day for the seven days from week_start, from the daily totals"""
+        from sqlalchemy import text
+        days = [week_start + timedelta(days=i) for i in range(7)]
+        rows = db.execute(
+            text("""
+                SELECT d.task_id, d.project_id, t.name, d.day, d.hours, d.billable_hours
+                FROM time_tracking_daily d JOIN tasks t ON t.id = d.task_id
+                WHERE d.user_id = :user_id AND d.day BETWEEN :start AND :end
+                ORDER BY d.project_id, d.task_id
+            """),
+            {"user_id": user_id, "start": days[0].isoformat(), "end": days[-1].isoformat()},
+        ).fetchall()
+        by_task: Dict[int, Dict[str, Any]] = {}
+        for task_id, project_id, name, day, hours, billable_hours in rows:
+            row = by_task.setdefault(task_id, {
+                "task_id": task_id, "project_id": project_id, "task_name": name,
+                "hours": [0.0] * 7, "billable_hours": 0.0,
+            })
+            row["hours"][(date.fromisoformat(day) - week_start).days] = hours
+            row["billable_hours"] += billable_hours
+        daily = [round(sum(row["hours"][i] for row in by_task.values()), 6) for i in range(7)]
+        return {
+            "user_id": user_id,
+            "week_start": days[0],
+            "week_end": days[-1],
+            "rows": list(by_task.values()),
+            "daily_hours": daily,
+            "total_hours": round(sum(daily), 6),
+        }
+
     def get_by_task(
         self, db: Session, *, task_id: int, skip: int = 0, limit: int = 100
     ) -> List[TimeTracking]:
@@ -288,11 +419,11 @@ class CRUDTimeTracking(CRUDBase[TimeTracking, TimeTrackingCreate, TimeTrackingUp
         )
 
     def get_total_hours_by_task(self, db: Session, *, task_id: int) -> float:
-        """Get total hours logged for a task"""
+        """Get total hours logged for a task, from the daily totals"""
         from sqlalchemy import func
         result = (
-            db.query(func.sum(TimeTracking.hours))
-            .filter(TimeTracking.task_id == task_id)
+            db.query(func.sum(TimeTrackingDaily.hours))
+            .filter(TimeTrackingDaily.task_id == task_id)
             .scalar()
         )
         return result or 0.0
@@ -300,13 +431,13 @@ class CRUDTimeTracking(CRUDBase[TimeTracking, TimeTrackingCreate, TimeTrackingUp
     def get_total_hours_by_user_and_date_range(
         self, db: Session, *, user_id: int, start_date, end_date
     ) -> float:
-        """Get total hours by user within date range"""
+        """Get total hours by user over the days from start_date to end_date, from the daily totals"""
         from sqlalchemy import func
         result = (
-            db.query(func.sum(TimeTracking.hours))
-            .filter(TimeTracking.user_id == user_id)
-            .filter(TimeTracking.date >= start_date)
-            .filter(TimeTracking.date <= end_date)
+            db.query(func.sum(TimeTrackingDaily.hours))
+            .filter(TimeTrackingDaily.user_id == user_id)
+            .filter(TimeTrackingDaily.day >= _day(start_date))
+            .filter(TimeTrackingDaily.day <= _day(end_date))
             .scalar()
         )
         return result or 0.0
@@ -0,0 +1,221 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, or_, text
+from sqlalchemy.orm import Session
+
+from ..crud.base import CRUDBase
+from ..crud.calendar import work_calendar
+from ..crud.hierarchy import sort_segment
+from ..crud.rollup import task_rollup
+from ..models import Project, ProjectMember, ProjectStatus, Task, TaskDependency, TaskStatus, Template, UserRole
+from ..schemas.template import TemplateCreate, TemplateData, TemplateInstantiate, TemplateUpdate
+from ..utils.work_calendar import WorkingCalendar, finish_offsets, to_date
+
+# Compiled templates keyed by (template id, updated_at); `update` evicts its template
+_compiled: Dict[Tuple[int, Optional[datetime]], "CompiledTemplate"] = {}
+MAX_COMPILED = 64
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """template_data validated and flattened into pre-order arrays
+
+    Instantiating only adds the ids, paths and calendar dates.
+    """
+    columns:List[Dict[str, Any]]  # static task columns in pre-order
+    parents: np.ndarray  # index of the parent task, -1 for roots
+    depths: np.ndarray
+    sort_orders: np.ndarray
+    sort_keys: List[str]
+    wbs_codes: List[str]
+    start_offsets: np.ndarray  # working days from the project start
+    end_offsets: np.ndarray
+    dependencies: List[Tuple[int, int, Any, int]]  # (predecessor index, successor index, type, lag)
+
+    @property
+    def task_count(self) -> int:
+        return len(self.columns)
+
+
+def compile_template(raw: str) -> CompiledTemplate:
+    """Validate template JSON and flatten it; raises pydantic.ValidationError on bad data"""
+    data = TemplateData.model_validate_json(raw)
+    columns, parents, depths, orders, sort_keys, codes, starts, durations = [], [], [], [], [], [], [], []
+    index_of_key: Dict[str, int] = {}
+
+    # Pre-order walk: a parent always precedes its children
+    stack = [(task, -1, number) for number, task in reversed(list(enumerate(data.tasks, start=1)))]
+    while stack:
+        task, parent, number = stack.pop()
+        index = len(columns)
+        if task.key is not None:
+            index_of_key[task.key] = index
+        duration = 0.0 if task.is_milestone else task.duration
+        columns.append({
+            "name": task.name, "description": task.description, "task_type": task.task_type,
+            "status": TaskStatus.NOT_STARTED, "priority": task.priority, "is_milestone": task.is_milestone,
+            "estimated_hours": task.estimated_hours, "actual_hours": 0.0,
+            "remaining_hours": task.estimated_hours, "progress_percentage": 0.0,
+        })
+        parents.append(parent)
+        depths.append(0 if parent < 0 else depths[parent] + 1)
+        orders.append(number)
+        segment = sort_segment(number)
+        sort_keys.append(segment if parent < 0 else f"{sort_keys[parent]}.{segment}")
+        codes.append(str(number) if parent < 0 else f"{codes[parent]}.{number}")
+        starts.append(task.start_offset)
+        durations.append(duration)
+        stack.extend((child, index, n) for n, child in reversed(list(enumerate(task.children, start=1))))
+
+    starts = np.asarray(starts, dtype=np.int64)
+    return CompiledTemplate(
+        columns=columns,
+        parents=np.asarray(parents, dtype=np.int64),
+        depths=np.asarray(depths, dtype=np.int64),
+        sort_orders=np.asarray(orders, dtype=np.int64),
+        sort_keys=sort_keys,
+        wbs_codes=codes,
+        start_offsets=starts,
+        end_offsets=starts + finish_offsets(durations),
+        dependencies=[
+            (index_of_key[d.predecessor], index_of_key[d.successor], d.dependency_type, d.lag_days)
+            for d in data.dependencies
+        ],
+    )
+
+
+def task_rows(
+    compiled: CompiledTemplate, *, project_id: int, first_id: int, start_date: date, calendar: WorkingCalendar
+) -> Tuple[List[dict], List[dict], date]:
+    """Task and dependency rows for a project, tasks taking ids from `first_id` on
+
+    Returns the rows and the last planned end date.
+    """
+    midnight = datetime.min.time()
+    starts = calendar.offsets_to_dates(start_date, compiled.start_offsets)
+    ends = calendar.offsets_to_dates(start_date, compiled.end_offsets)
+    start_dates = [datetime.combine(d, midnight) for d in starts.astype("datetime64[D]").tolist()]
+    end_dates = [datetime.combine(d, midnight) for d in ends.astype("datetime64[D]").tolist()]
+
+    tasks, paths = [], []
+    for index, columns in enumerate(compiled.columns):
+        task_id = first_id + index
+        parent = int(compiled.parents[index])
+        path = f"{paths[parent] if parent >= 0 else '/'}{task_id}/"
+        paths.append(path)
+        tasks.append({
+            **columns, "id": task_id, "project_id": project_id,
+            "parent_id": first_id + parent if parent >= 0 else None,
+            "path": path, "depth": int(compiled.depths[index]), "sort_order": int(compiled.sort_orders[index]),
+            "sort_key": compiled.sort_keys[index], "wbs_code": compiled.wbs_codes[index],
+            "planned_start_date": start_dates[index], "planned_end_date": end_dates[index],
+        })
+    dependencies = [
+        {"predecessor_id": first_id + p, "successor_id": first_id + s, "dependency_type": kind, "lag_days": lag}
+        for p, s, kind, lag in compiled.dependencies
+    ]
+    end_date = to_date(ends.max()) if len(ends) else start_date
+    return tasks, dependencies, end_date
+
+
+class CRUDTemplate(CRUDBase[Template, TemplateCreate, TemplateUpdate]):
+    """Project templates and their bulk instantiation
+
+    Instantiating reads the compiled template from the cache, assigns task
+    ids up front and writes the project, its tasks (hierarchy and WBS
+    numbering included) and dependencies with one bulk insert each, then
+    computes the rollups in one pass. Nothing is committed here.
+    """
+
+    def get_accessible(self, db: Session, *, user_id: int, include_all: bool = False) -> List[Template]:
+        """Public templates and the user's own (every template with `include_all`)"""
+        query = db.query(Template)
+        if not include_all:
+            query = query.filter(or_(Template.is_public.is_(True), Template.created_by == user_id))
+        return query.order_by(Template.usage_count.desc(), Template.id).all()
+
+    def create_with_owner(self, db: Session, *, obj_in: TemplateCreate, created_by: int) -> Template:
+        db_obj = Template(
+            **obj_in.model_dump(exclude={"template_data"}),
+            template_data=obj_in.template_data.model_dump_json(),
+            created_by=created_by,
+        )
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(self, db: Session, *, db_obj: Template, obj_in: TemplateUpdate) -> Template:
+        values = obj_in.model_dump(exclude_unset=True)
+        if values.get("template_data") is not None:
+            values["template_data"] = obj_in.template_data.model_dump_json()
+        for field, value in values.items():
+            setattr(db_obj, field, value)
+        db.commit()
+        db.refresh(db_obj)
+        # updated_at has a one second resolution, so drop the old entries outright
+        for key in [k for k in _compiled if k[0] == db_obj.id]:
+            _compiled.pop(key, None)
+        return db_obj
+
+    def get_compiled(self, db: Session, *, template: Template) -> CompiledTemplate:
+        """Parsed and flattened template_data, cached per template version"""
+        key = (template.id, template.updated_at or template.created_at)
+        compiled = _compiled.get(key)
+        if compiled is None:
+            compiled = compile_template(template.template_data)
+            if len(_compiled) >= MAX_COMPILED:
+                _compiled.clear()
+            _compiled[key] = compiled
+        return compiled
+
+    def instantiate(
+        self, db: Session, *, template: Template, obj_in: TemplateInstantiate, owner_id: int
+    ) -> Dict[str, Any]:
+        """Create a project with the template's tasks and dependencies starting at `obj_in.start_date`
+
+        Dates are placed on the working days of the organisation calendar.
+        """
+        compiled = self.get_compiled(db, template=template)
+        project_id = db.execute(Project.__table__.insert().values(
+            name=obj_in.name, description=obj_in.description, status=ProjectStatus.PLANNING,
+            start_date=datetime.combine(obj_in.start_date, datetime.min.time()), budget=obj_in.budget,
+            owner_id=owner_id, is_template=False, template_type=template.template_type,
+        )).inserted_primary_key[0]
+        db.execute(ProjectMember.__table__.insert().values(
+            project_id=project_id, user_id=owner_id, role=UserRole.PROJECT_OWNER, allocation_percentage=100.0,
+        ))
+
+        # The project insert holds the write lock, so no other writer can take these ids
+        first_id = (db.query(func.max(Task.id)).scalar() or 0) + 1
+        calendar = work_calendar.get_working_calendar(db, project_id=project_id)
+        tasks, dependencies, end_date = task_rows(
+            compiled, project_id=project_id, first_id=first_id, start_date=obj_in.start_date, calendar=calendar
+        )
+        if tasks:
+            db.execute(Task.__table__.insert(), tasks)
+        if dependencies:
+            db.execute(TaskDependency.__table__.insert(), dependencies)
+        # Bulk inserts bypass the incremental rollup, so compute it in one pass
+        task_rollup.rebuild(db, project_id=project_id)
+
+        db.execute(
+            text("UPDATE projects SET end_date = :end_date WHERE id = :project_id"),
+            {"project_id": project_id, "end_date": datetime.combine(end_date, datetime.min.time())},
+        )
+        # Plain UPDATE so updated_at, and with it the cache key, stays unchanged
+        db.execute(text("UPDATE templates SET usage_count = coalesce(usage_count, 0) + 1 WHERE id = :id"),
+                   {"id": template.id})
+        return {
+            "project_id": project_id,
+            "start_date": to_date(calendar.roll_forward(obj_in.start_date)),
+            "end_date": end_date,
+            "task_count": len(tasks),
+            "dependency_count": len(dependencies),
+        }
+
+
+template = CRUDTemplate(Template)
@@ -0,0 +1,328 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import bindparam, event, inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from ..models import Project, Task, TimeTracking, User
+from ..utils.utilization import working_mask
+from ..utils.work_calendar import to_date, to_datetime64
+from .calendar import work_calendar
+from .rollup import mark_for_refresh, task_rollup
+
+# (user_id, task_id, project_id, day, hours, billable, hourly_rate) of time entries
+_ENTRY_SQL = text("""
+    SELECT tt.user_id, tt.task_id, t.project_id, date(tt.date), tt.hours,
+           coalesce(tt.billable, 1), tt.hourly_rate
+    FROM time_tracking tt JOIN tasks t ON t.id = tt.task_id
+    WHERE tt.id IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
+_UPSERT_SQL = text("""
+    INSERT INTO time_tracking_daily (
+        user_id, task_id, project_id, day, hours, billable_hours, rated_cost, unrated_hours, entry_count
+    )
+    VALUES (:user_id, :task_id, :project_id, :day, :hours, :billable_hours, :rated_cost, :unrated_hours, :entry_count)
+    ON CONFLICT (user_id, day, task_id) DO UPDATE SET
+        hours = round(hours + excluded.hours, 6),
+        billable_hours = round(billable_hours + excluded.billable_hours, 6),
+        rated_cost = round(rated_cost + excluded.rated_cost, 6),
+        unrated_hours = round(unrated_hours + excluded.unrated_hours, 6),
+        entry_count = entry_count + excluded.entry_count
+""")
+
+_DAILY_SQL = """
+    INSERT INTO time_tracking_daily (
+        user_id, task_id, project_id, day, hours, billable_hours, rated_cost, unrated_hours, entry_count
+    )
+    SELECT tt.user_id, tt.task_id, t.project_id, date(tt.date),
+           round(total(tt.hours), 6),
+           round(total(CASE WHEN coalesce(tt.billable, 1) THEN tt.hours END), 6),
+           round(total(tt.hours * tt.hourly_rate), 6),
+           round(total(CASE WHEN tt.hourly_rate IS NULL THEN tt.hours END), 6),
+           count(*)
+    FROM time_tracking tt JOIN tasks t ON t.id = tt.task_id
+    {where}
+    GROUP BY tt.user_id, date(tt.date), tt.task_id
+"""
+
+_TOTALS = ("hours", "billable_hours", "rated_cost", "unrated_hours", "entry_count")
+
+# Hours, billable hours and cost per user, week (from Monday) and project. Hours
+# logged without a rate of their own are costed at the effective rate of the
+# user on the task: assignment -> project member -> user
+_REPORT_SQL = """
+    SELECT d.user_id, date(d.day, 'weekday 0', '-6 days') AS week, d.project_id,
+           total(d.hours), total(d.billable_hours),
+           total(d.rated_cost + d.unrated_hours * coalesce(ta.hourly_rate, pm.hourly_rate, u.hourly_rate, 0))
+    FROM time_tracking_daily d
+    JOIN users u ON u.id = d.user_id
+    LEFT JOIN task_assignments ta ON ta.task_id = d.task_id AND ta.user_id = d.user_id
+    LEFT JOIN project_members pm ON pm.project_id = d.project_id AND pm.user_id = d.user_id
+    WHERE d.day BETWEEN :start AND :end {filters}
+    GROUP BY d.user_id, week, d.project_id
+"""
+
+
+class CRUDTimeTotals:
+    """Logged time kept summed per user, task and day, and on tasks.actual_hours
+
+    Every flush that creates, changes or deletes TimeTracking rows through
+    the ORM applies the difference to time_tracking_daily (one upsert per
+    touched user, task and day) and to the actual_hours of the touched tasks
+    in the same transaction, so timesheets and task totals never sum raw
+    entries at read time. Writers that insert entries in SQL call `apply`
+    themselves.
+
+    actual_hours moves by the logged difference, so hours entered by hand on
+    a task are kept until `reconcile` (`python -m app.cli reconcile-time`)
+    sets every task with logged time to the sum of its entries.
+
+    `get_report` serves the timesheet and utilization report from the same
+    table.
+    """
+
+    def entry_rows(self, db: Session, entry_ids: Sequence[int]) -> List[tuple]:
+        """The rows `apply` takes for the given time entries, read from the database"""
+        if not entry_ids:
+            return []
+        return db.connection().execute(_ENTRY_SQL, {"ids": list(entry_ids)}).fetchall()
+
+    def apply(self, db: Session, *, added: Iterable[tuple] = (), removed: Iterable[tuple] = ()) -> int:
+        """Add `added` entry rows to the totals and take `removed` ones off; returns days touched
+
+        Rows are (user_id, task_id, project_id, day, hours, billable,
+        hourly_rate) as given by `entry_rows`. Not committed.
+        """
+        days: Dict[tuple, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(_TOTALS, 0))
+        for rows, sign in ((added, 1), (removed, -1)):
+            for user_id, task_id, project_id, day, hours, billable, rate in rows:
+                totals = days[(user_id, task_id, project_id, str(day))]
+                totals["hours"] += sign * hours
+                totals["billable_hours"] += sign * hours if billable else 0
+                totals["rated_cost"] += sign * hours * rate if rate is not None else 0
+                totals["unrated_hours"] += sign * hours if rate is None else 0
+                totals["entry_count"] += sign
+        # An entry edited back to its old values changes nothing
+        changes = [
+            {"user_id": key[0], "task_id": key[1], "project_id": key[2], "day": key[3], **totals}
+            for key, totals in days.items() if any(totals.values())
+        ]
+        if not changes:
+            return 0
+
+        connection = db.connection()
+        connection.execute(_UPSERT_SQL, changes)
+        emptied = [change for change in changes if change["entry_count"] < 0]
+        if emptied:
+            connection.execute(
+                text("DELETE FROM time_tracking_daily "
+                     "WHERE user_id = :user_id AND day = :day AND task_id = :task_id AND entry_count <= 0"),
+                emptied,
+            )
+
+        task_hours: Dict[int, float] = defaultdict(float)
+        for change in changes:
+            task_hours[change["task_id"]] += change["hours"]
+        moved = [{"task_id": i, "hours": hours} for i, hours in task_hours.items() if hours]
+        if moved:
+            connection.execute(
+                text("UPDATE tasks SET actual_hours = round(coalesce(actual_hours, 0) + :hours, 6) "
+                     "WHERE id = :task_id"),
+                moved,
+            )
+            self._expire_actual_hours(db, task_hours)
+            mark_for_refresh(db, task_hours)
+        return len(changes)
+
+    def rebuild_daily(self, db: Session, *, project_id: Optional[int] = None) -> int:
+        """Recompute time_tracking_daily (of one project) from the entries; returns rows written"""
+        if project_id is None:
+            db.execute(text("DELETE FROM time_tracking_daily"))
+            return db.execute(text(_DAILY_SQL.format(where=""))).rowcount
+        params = {"project_id": project_id}
+        db.execute(text("DELETE FROM time_tracking_daily WHERE project_id = :project_id"), params)
+        return db.execute(text(_DAILY_SQL.format(where="WHERE t.project_id = :project_id")), params).rowcount
+
+    def reconcile(self, db: Session, *, project_id: Optional[int] = None) -> Dict[str, int]:
+        """Recompute the daily totals in one grouped query and correct drifted actual_hours
+
+        Tasks with logged time get the sum of their entries; tasks without
+        any keep their actual_hours. Not committed.
+        """
+        daily_rows = self.rebuild_daily(db, project_id=project_id)
+        where, params = "", {}
+        if project_id is not None:
+            where, params = "WHERE d.project_id = :project_id", {"project_id": project_id}
+        drifted = db.execute(
+            text(f"""
+                SELECT t.id, logged.hours
+                FROM (SELECT d.task_id, round(total(d.hours), 6) AS hours
+                      FROM time_tracking_daily d {where} GROUP BY d.task_id) logged
+                JOIN tasks t ON t.id = logged.task_id
+                WHERE t.actual_hours IS NOT logged.hours
+            """),
+            params,
+        ).fetchall()
+        if drifted:
+            db.execute(
+                text("UPDATE tasks SET actual_hours = :hours WHERE id = :task_id"),
+                [{"task_id": task_id, "hours": hours} for task_id, hours in drifted],
+            )
+            self._expire_actual_hours(db, [task_id for task_id, _ in drifted])
+            task_rollup.refresh(db, [task_id for task_id, _ in drifted])
+        return {"daily_rows": daily_rows, "tasks_corrected": len(drifted)}
+
+    def get_report(
+        self,
+        db: Session,
+        *,
+        start_date: date,
+        end_date: date,
+        project_ids: Optional[Sequence[int]] = None,
+        user_ids: Optional[Sequence[int]] = None,
+        department: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """User x week x project hours, billable split, cost and utilization over [start_date, end_date]
+
+        The grouping is one SQL aggregate over the daily totals; the result
+        is only pivoted here. Weeks start on Monday and are cut to the
+        window. Utilization is logged hours against the user's daily capacity
+        on the working days of their calendar.
+        """
+        filters, params = [], {"start": start_date.isoformat(), "end": end_date.isoformat()}
+        if project_ids is not None:
+            filters.append("AND d.project_id IN :project_ids")
+            params["project_ids"] = list(project_ids)
+        if user_ids is not None:
+            filters.append("AND d.user_id IN :user_ids")
+            params["user_ids"] = list(user_ids)
+        if department is not None:
+            filters.append("AND u.department = :department")
+            params["department"] = department
+        statement = text(_REPORT_SQL.format(filters=" ".join(filters)))
+        for name in ("project_ids", "user_ids"):
+            if name in params:
+                statement = statement.bindparams(bindparam(name, expanding=True))
+        rows = db.execute(statement, params).fetchall()
+
+        first = to_datetime64(start_date - timedelta(days=start_date.weekday()))
+        days = np.arange(to_datetime64(start_date), to_datetime64(end_date) + 1, dtype="datetime64[D]")
+        day_week = (days - first).astype(np.int64) // 7
+        weeks = first + 7 * np.arange(day_week[-1] + 1)
+
+        columns = list(zip(*rows)) if rows else [()] * 6
+        users = np.unique(np.array(columns[0], dtype=np.int64))
+        projects = np.unique(np.array(columns[2], dtype=np.int64))
+        # (hours, billable, cost) x users x weeks x projects
+        cube = np.zeros((3, len(users), len(weeks), len(projects)))
+        if rows:
+            at = (
+                np.searchsorted(users, np.array(columns[0], dtype=np.int64)),
+                (np.array(columns[1], dtype="datetime64[D]") - first).astype(np.int64) // 7,
+                np.searchsorted(projects, np.array(columns[2], dtype=np.int64)),
+            )
+            cube[(slice(None), *at)] = np.array(columns[3:], dtype=np.float64)
+        per_user = cube.sum(axis=3)
+
+        profiles = {
+            u.id: u for u in db.query(User.id, User.username, User.full_name, User.department, User.daily_capacity)
+            .filter(User.id.in_(users.tolist())).all()
+        }
+        calendar = work_calendar.get_working_calendar(db)
+        working = working_mask(users, days, calendar, work_calendar.get_user_calendars(db, user_ids=users.tolist()))
+        capacity = np.array([
+            calendar.hours_per_day if profiles[i].daily_capacity is None else profiles[i].daily_capacity
+            for i in users.tolist()
+        ], dtype=np.float64)
+        starts = np.searchsorted(day_week, np.arange(len(weeks)))
+        capacity_hours = (
+            np.add.reduceat(working.astype(np.float64), starts, axis=1) * capacity[:, None]
+            if len(users) else np.zeros((0, len(weeks)))
+        )
+        utilization = np.divide(
+            per_user[0], capacity_hours, out=np.zeros_like(capacity_hours), where=capacity_hours > 0
+        ) * 100
+
+        def split(values: np.ndarray) -> Dict[str, List[float]]:
+            hours, billable, cost = np.round(values, 2)
+            return {
+                "hours": hours.tolist(),
+                "billable_hours": billable.tolist(),
+                "non_billable_hours": np.round(hours - billable, 2).tolist(),
+                "cost": cost.tolist(),
+            }
+
+        names = dict(db.query(Project.id, Project.name).filter(Project.id.in_(projects.tolist())).all())
+        totals = np.round(cube.sum(axis=(1, 2, 3)), 2)
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "weeks": [to_date(w) for w in weeks],
+            "projects": [{"project_id": i, "name": names.get(i)} for i in projects.tolist()],
+            "users": [
+                {
+                    "user_id": user_id,
+                    "username": profiles[user_id].username,
+                    "full_name": profiles[user_id].full_name,
+                    "department": profiles[user_id].department,
+                    **split(per_user[:, row]),
+                    "capacity_hours": np.round(capacity_hours[row], 2).tolist(),
+                    "utilization": np.round(utilization[row], 1).tolist(),
+                    "projects": [
+                        {"project_id": project_id, **split(cube[:, row, :, col])}
+                        for col, project_id in enumerate(projects.tolist())
+                        if cube[0, row, :, col].any()
+                    ],
+                }
+                for row, user_id in enumerate(users.tolist())
+            ],
+            "totals": {
+                "hours": float(totals[0]),
+                "billable_hours": float(totals[1]),
+                "non_billable_hours": float(round(totals[0] - totals[1], 2)),
+                "cost": float(totals[2]),
+            },
+        }
+
+    def _expire_actual_hours(self, db: Session, task_ids: Iterable[int]) -> None:
+        # Loaded tasks would otherwise keep showing the old total
+        for task_id in task_ids:
+            obj = db.identity_map.get(identity_key(Task, task_id))
+            if obj is not None:
+                db.expire(obj, ["actual_hours"])
+
+
+time_totals = CRUDTimeTotals()
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_time_entry_changes(session, flush_context, instances):
+    added = [obj for obj in session.new if isinstance(obj, TimeTracking)]
+    changed = [obj for obj in session.dirty if isinstance(obj, TimeTracking) and session.is_modified(obj)]
+    removed = [obj for obj in session.deleted if isinstance(obj, TimeTracking)]
+    if not (added or changed or removed):
+        return
+    pending = session.info.setdefault("time_entry_changes", {"removed": [], "written": []})
+    # Changed and deleted entries are taken off with the values still in the database
+    pending["removed"].extend(time_totals.entry_rows(
+        session, [inspect(obj).identity[0] for obj in changed + removed]
+    ))
+    pending["written"].extend(added + changed)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _apply_time_entry_changes(session, flush_context):
+    pending = session.info.pop("time_entry_changes", None)
+    if not pending:
+        return
+    written = [inspect(obj).identity[0] for obj in pending["written"] if inspect(obj).persistent]
+    time_totals.apply(session, added=time_totals.entry_rows(session, written), removed=pending["removed"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_time_entry_changes(session):
+    session.info.pop("time_entry_changes", None)
@@ -2,6 +2,7 @@ from typing import Any, Dict, Optional, Union
 from sqlalchemy.orm import Session
 from ..core.security import get_password_hash, verify_password
 from ..crud.base import CRUDBase
+from ..crud.search import search as search_index
 from ..models import User
 from ..schemas.user import UserCreate, UserUpdate
 
@@ -85,6 +86,11 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         self, db: Session, *, search_term: str, skip: int = 0, limit: int = 100
     ) -> list[User]:
         """Search users by username, email, or full name"""
+        if search_index.can_use_index(db, search_term):
+            ids = search_index.match_ids(
+                db, entity_type="user", search_term=search_term, skip=skip, limit=limit
+            )
+            return self.get_multi_by_ids(db, ids=ids)
         return (
             db.query(User)
             .filter(
@@ -0,0 +1,229 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from itertools import chain
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..crud.calendar import work_calendar
+from ..crud.notification import notification
+from ..models import (
+    CalendarClosure, NotificationType, Project, Task, TaskAssignment, User, WorkCalendar
+)
+from ..schemas.notification import NotificationCreate
+from ..utils.utilization import (
+    AssignmentIntervals, allocation_matrix, load_assignment_intervals, overallocated, working_mask
+)
+from ..utils.work_calendar import to_date, to_datetime64
+
+# Attributes whose changes alter utilization; any change to the other watched models does
+WATCHED_ATTRIBUTES = {
+    Task: ("planned_start_date", "planned_end_date", "status", "parent_id", "project_id"),
+    User: ("daily_capacity", "department", "is_active"),
+    Project: ("status", "is_template"),
+}
+WATCHED_MODELS = (TaskAssignment, WorkCalendar, CalendarClosure, *WATCHED_ATTRIBUTES)
+
+
+class CRUDUtilization:
+    """Utilization heatmaps cached per window and filter
+
+    Cache entries carry the version current when their data was read, so an
+    invalidation during a computation is never masked by its result. ORM
+    commits touching assignments, task dates or capacities invalidate through
+    the session listeners below; raw SQL writers call `invalidate` themselves.
+
+    The cache lives in the process, so an invalidation only reaches the
+    worker that made the write: run the API as a single worker process.
+    """
+    MAX_CACHED = 64
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._intervals: Optional[Tuple[int, AssignmentIntervals]] = None
+        self._heatmaps: "OrderedDict[tuple, dict]" = OrderedDict()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._intervals = None
+            self._heatmaps.clear()
+
+    def get_intervals(self, db: Session) -> AssignmentIntervals:
+        """Interval index of all active assignments, rebuilt after an invalidation"""
+        version, cached = self._version, self._intervals
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        intervals = load_assignment_intervals(db)
+        with self._lock:
+            if self._version == version:
+                self._intervals = (version, intervals)
+        return intervals
+
+    def get_heatmap(
+        self,
+        db: Session,
+        *,
+        start_date: date,
+        end_date: date,
+        department: Optional[str] = None,
+        user_ids: Optional[Sequence[int]] = None,
+    ) -> dict:
+        """User x day utilization in [start_date, end_date]"""
+        version = self._version
+        key = (version, start_date, end_date, department, tuple(sorted(user_ids)) if user_ids is not None else None)
+        with self._lock:
+            cached = self._heatmaps.get(key)
+            if cached is not None:
+                self._heatmaps.move_to_end(key)
+                return cached
+        heatmap = self._build(db, start_date, end_date, department, user_ids)
+        with self._lock:
+            if self._version == version:
+                self._heatmaps[key] = heatmap
+                while len(self._heatmaps) > self.MAX_CACHED:
+                    self._heatmaps.popitem(last=False)
+        return heatmap
+
+    def _build(
+        self,
+        db: Session,
+        start_date: date,
+        end_date: date,
+        department: Optional[str],
+        user_ids: Optional[Sequence[int]],
+    ) -> dict:
+        query = db.query(User.id, User.username, User.full_name, User.department, User.daily_capacity)
+        query = query.filter(User.is_active.isnot(False))
+        if department is not None:
+            query = query.filter(User.department == department)
+        if user_ids is not None:
+            query = query.filter(User.id.in_(list(user_ids)))
+        users = query.order_by(User.id).all()
+
+        ids = np.array([u.id for u in users], dtype=np.int64)
+        days = np.arange(to_datetime64(start_date), to_datetime64(end_date) + 1, dtype="datetime64[D]")
+        calendar = work_calendar.get_working_calendar(db)
+        share = allocation_matrix(self.get_intervals(db), ids, start_date, end_date)
+        working = working_mask(ids, days, calendar, work_calendar.get_user_calendars(db, user_ids=ids.tolist()))
+
+        # Demand is a standard working day scaled by allocation, measured against each user's capacity
+        capacity = np.array(
+            [calendar.hours_per_day if u.daily_capacity is None else u.daily_capacity for u in users],
+            dtype=np.float64,
+        )
+        demand = np.where(working, share, 0.0) * calendar.hours_per_day
+        ratio = demand / np.where(capacity > 0, capacity, calendar.hours_per_day)[:, None]
+        over = overallocated(ratio) | ((capacity <= 0)[:, None] & (demand > 0))
+        percent = np.round(ratio * 100, 1)
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "department": department,
+            "days": [to_date(d) for d in days],
+            "users": [
+                {
+                    "user_id": u.id,
+                    "username": u.username,
+                    "full_name": u.full_name,
+                    "department": u.department,
+                    "daily_capacity": float(capacity[row]),
+                    "utilization": percent[row].tolist(),
+                    "overallocated_days": int(over[row].sum()),
+                    "peak_utilization": float(percent[row].max()) if len(days) else 0.0,
+                }
+                for row, u in enumerate(users)
+            ],
+            "overallocated_user_count": int(over.any(axis=1).sum()),
+        }
+
+    def notify_conflicts(
+        self,
+        db: Session,
+        *,
+        user_ids: Sequence[int],
+        start_date: date,
+        end_date: date,
+        project_id: Optional[int] = None,
+        task_id: Optional[int] = None,
+    ) -> int:
+        """Send RESOURCE_CONFLICT notifications for users over-allocated in the window
+
+        The user and the project owner are notified once per conflict until
+        they read it. Returns the number of notifications created.
+        """
+        if not user_ids or end_date < start_date:
+            return 0
+        heatmap = self.get_heatmap(db, start_date=start_date, end_date=end_date, user_ids=user_ids)
+        owner_id = None
+        if project_id is not None:
+            owner_id = db.query(Project.owner_id).filter(Project.id == project_id).scalar()
+
+        created = 0
+        for entry in heatmap["users"]:
+            if not entry["overallocated_days"]:
+                continue
+            over_days = [
+                day for day, value in zip(heatmap["days"], entry["utilization"]) if value > 100
+            ] or heatmap["days"]
+            reference = f"task:{task_id}:user:{entry['user_id']}" if task_id else (
+                f"user:{entry['user_id']}:{over_days[0].isoformat()}"
+            )
+            message = (
+                f"{entry['full_name']} さんの稼働率が {over_days[0]} 〜 {over_days[-1]} の "
+                f"{entry['overallocated_days']} 日で上限を超えています（最大 {entry['peak_utilization']:g}%）"
+            )
+            for recipient in {entry["user_id"], owner_id} - {None}:
+                if notification.create_once(db, obj_in=NotificationCreate(
+                    user_id=recipient,
+                    notification_type=NotificationType.RESOURCE_CONFLICT,
+                    title=f"リソース競合: {entry['full_name']}",
+                    message=message,
+                    project_id=project_id,
+                    task_id=task_id,
+                    reference=reference,
+                )):
+                    created += 1
+        return created
+
+
+def _changes_utilization(obj) -> bool:
+    """Whether a dirty object changed an attribute the heatmap depends on"""
+    if not isinstance(obj, WATCHED_MODELS):
+        return False
+    attributes = WATCHED_ATTRIBUTES.get(type(obj))
+    if attributes is None:
+        return True
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_utilization_changes(session, flush_context):
+    # new, dirty and deleted still describe the flushed changes at this point
+    if session.info.get("utilization_changed"):
+        return
+    if (
+        any(isinstance(obj, WATCHED_MODELS) for obj in chain(session.new, session.deleted))
+        or any(_changes_utilization(obj) for obj in session.dirty)
+    ):
+        session.info["utilization_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("utilization_changed", False):
+        resource_utilization.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("utilization_changed", None)
+
+
+resource_utilization = CRUDUtilization()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .core.config import settings
@@ -14,6 +14,16 @@ if settings.USE_SQLITE:
         connect_args={"check_same_thread": False},  # SQLite specific
         echo=False  # Set to True for SQL logging during development
     )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Apply optional journal mode / busy timeout to every new connection"""
+        cursor = dbapi_connection.cursor()
+        if settings.SQLITE_JOURNAL_MODE:
+            cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        if settings.SQLITE_BUSY_TIMEOUT_MS is not None:
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.close()
 else:
     # PostgreSQL settings
     engine = create_engine(
@@ -3,14 +3,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from .core.config import settings
 from .database import create_tables
-from .api.v1 import users, projects, tasks
+from .crud.history import task_history
+from .utils.encoding import CompressionMiddleware, ORJSONResponse
+from .api.v1 import users, projects, tasks, search, schedule, calendars, resources, notifications, templates, scenarios, baselines, reports, timesheets
 
 # Create FastAPI application
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description="プロジェクト管理・WBSツール API",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
 )
 
 # Set up CORS - More explicit configuration
@@ -27,6 +30,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress bodies of at least COMPRESSION_MIN_BYTES (Brotli or gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -34,6 +40,16 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
 app.include_router(projects.router, prefix=f"{settings.API_V1_STR}/projects", tags=["projects"])
 app.include_router(tasks.router, prefix=f"{settings.API_V1_STR}/tasks", tags=["tasks"])
+app.include_router(search.router, prefix=f"{settings.API_V1_STR}/search", tags=["search"])
+app.include_router(schedule.router, prefix=f"{settings.API_V1_STR}/schedule", tags=["schedule"])
+app.include_router(calendars.router, prefix=f"{settings.API_V1_STR}/calendars", tags=["calendars"])
+app.include_router(resources.router, prefix=f"{settings.API_V1_STR}/resources", tags=["resources"])
+app.include_router(notifications.router, prefix=f"{settings.API_V1_STR}/notifications", tags=["notifications"])
+app.include_router(templates.router, prefix=f"{settings.API_V1_STR}/templates", tags=["templates"])
+app.include_router(scenarios.router, prefix=f"{settings.API_V1_STR}/scenarios", tags=["scenarios"])
+app.include_router(baselines.router, prefix=f"{settings.API_V1_STR}/baselines", tags=["baselines"])
+app.include_router(reports.router, prefix=f"{settings.API_V1_STR}/reports", tags=["reports"])
+app.include_router(timesheets.router, prefix=f"{settings.API_V1_STR}/timesheets", tags=["timesheets"])
 
 
 @app.on_event("startup")
@@ -42,6 +58,12 @@ async def startup_event():
     create_tables()
 
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """Write task history still waiting in the audit buffer"""
+    task_history.close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint - redirect to GUI"""
@@ -51,8 +73,8 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "version": settings.VERSION}
+    """Health check endpoint, with the task history writer's queue (backpressure) metrics"""
+    return {"status": "healthy", "version": settings.VERSION, "task_history": task_history.get_stats()}
 
 
 @app.options("/{path:path}")
@@ -1,6 +1,11 @@
 from .models import (
     User,
     Project,
+    ProjectArchive,
+    ProjectBaseline,
+    ProgressSnapshot,
+    ProjectScenario,
+    ScenarioTaskOverride,
     ProjectMember,
     Task,
     TaskDependency,
@@ -8,9 +13,13 @@ from .models import (
     Resource,
     ResourceAssignment,
     TimeTracking,
+    TimeTrackingDaily,
     TaskComment,
     TaskHistory,
     Template,
+    WorkCalendar,
+    CalendarClosure,
+    Notification,
     # Enums
     UserRole,
     ProjectStatus,
@@ -27,6 +36,11 @@ from .models import (
 __all__ = [
     "User",
     "Project", 
+    "ProjectArchive",
+    "ProjectBaseline",
+    "ProgressSnapshot",
+    "ProjectScenario",
+    "ScenarioTaskOverride",
     "ProjectMember",
     "Task",
     "TaskDependency",
@@ -34,9 +48,13 @@ __all__ = [
     "Resource",
     "ResourceAssignment",
     "TimeTracking",
+    "TimeTrackingDaily",
     "TaskComment",
     "TaskHistory",
     "Template",
+    "WorkCalendar",
+    "CalendarClosure",
+    "Notification",
     "UserRole",
     "ProjectStatus",
     "TaskType",
@@ -47,4 +65,9 @@ __all__ = [
     "Priority",
     "TemplateType",
     "NotificationType",
-]
\ No newline at end of file
+]
+
+# Registers the FTS5 search index DDL on Base.metadata
+from . import search  # noqa: E402,F401
+# Registers the archive tables of archived projects
+from . import archive  # noqa: E402,F401
@@ -0,0 +1,67 @@
+"""Archive tables holding the task rows of archived projects.
+
+Every archive table mirrors the columns of a hot table, without its foreign
+keys and constraints, so a project's rows move between the two with one
+INSERT ... SELECT over the same column list. The rows of a project are found
+through archived_tasks.project_id and the task columns indexed below.
+"""
+from typing import Dict, Tuple
+
+from sqlalchemy import Column, Index, Table
+
+from ..database import Base
+from .models import (
+    ResourceAssignment, ScenarioTaskOverride, Task, TaskAssignment, TaskComment, TaskDependency, TaskHistory,
+    TimeTracking,
+)
+
+ARCHIVE_PREFIX = "archived_"
+
+# Hot tables moved on archival, with their columns referencing tasks.id.
+# tasks comes first: the other tables are scoped through archived_tasks.
+TASK_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "tasks": ("parent_id",),
+    "task_dependencies": ("predecessor_id", "successor_id"),
+    "task_assignments": ("task_id",),
+    "resource_assignments": ("task_id",),
+    "time_tracking": ("task_id",),
+    "task_comments": ("task_id",),
+    "task_history": ("task_id",),
+    "scenario_task_overrides": ("task_id",),
+}
+_SOURCES = (
+    Task, TaskDependency, TaskAssignment, ResourceAssignment, TimeTracking, TaskComment, TaskHistory,
+    ScenarioTaskOverride,
+)
+
+
+def _mirror(source: Table) -> Table:
+    table = Table(
+        ARCHIVE_PREFIX + source.name,
+        Base.metadata,
+        *[Column(c.name, c.type.copy(), primary_key=c.primary_key, autoincrement=False) for c in source.columns],
+    )
+    if source.name == "tasks":
+        Index(f"idx_{table.name}_project", table.c.project_id)
+    else:
+        for column in TASK_COLUMNS[source.name]:
+            Index(f"idx_{table.name}_{column}", table.c[column])
+    return table
+
+
+ARCHIVE_TABLES: Dict[str, Table] = {model.__tablename__: _mirror(model.__table__) for model in _SOURCES}
+
+
+def columns_of(table_name: str) -> Tuple[str, ...]:
+    """Column names shared by a hot table and its archive, in table order"""
+    return tuple(c.name for c in ARCHIVE_TABLES[table_name].columns)
+
+
+def project_scope(table_name: str, tasks_table: str) -> str:
+    """Condition selecting the rows of project :project_id, tasks being read from `tasks_table`"""
+    if table_name == "tasks":
+        return "project_id = :project_id"
+    return " OR ".join(
+        f"{column} IN (SELECT id FROM {tasks_table} WHERE project_id = :project_id)"
+        for column in TASK_COLUMNS[table_name]
+    )
@@ -2,8 +2,8 @@ from datetime import datetime
 from typing import Optional
 import enum
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey,
-    Enum, Table, UniqueConstraint, Index, CheckConstraint
+    Column, Integer, String, Text, Date, DateTime, Boolean, Float, ForeignKey,
+    Enum, Table, UniqueConstraint, Index, CheckConstraint, LargeBinary
 )
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
@@ -151,6 +151,7 @@ class Project(Base):
     # Settings
     is_template = Column(Boolean, default=False)
     template_type = Column(Enum(TemplateType))
+    archived_at = Column(DateTime(timezone=True))  # set while the tasks live in the archive tables
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -161,11 +162,131 @@ class Project(Base):
     members = relationship("ProjectMember", back_populates="project")
     tasks = relationship("Task", back_populates="project")
     resources = relationship("Resource", back_populates="project")
+    calendar = relationship("WorkCalendar", back_populates="project", uselist=False)
 
     def __repr__(self):
         return f"<Project(name='{self.name}', status='{self.status}')>"
 
 
+class ProjectArchive(Base):
+    """Summary of an archived project, kept for reports while its rows are archived"""
+    __tablename__ = "project_archives"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, unique=True)
+    archived_by = Column(Integer, ForeignKey("users.id"))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Totals at the time of archival
+    task_count = Column(Integer, nullable=False, default=0)
+    completed_task_count = Column(Integer, nullable=False, default=0)
+    start_date = Column(DateTime(timezone=True))
+    end_date = Column(DateTime(timezone=True))
+    estimated_hours = Column(Float, default=0.0)
+    actual_hours = Column(Float, default=0.0)
+    remaining_hours = Column(Float, default=0.0)
+    progress_percentage = Column(Float, default=0.0)
+    time_entry_count = Column(Integer, nullable=False, default=0)
+    logged_hours = Column(Float, default=0.0)
+
+    def __repr__(self):
+        return f"<ProjectArchive(project_id={self.project_id}, tasks={self.task_count})>"
+
+
+class ProjectBaseline(Base):
+    """Named snapshot of a project's schedule, packed by utils.baseline"""
+    __tablename__ = "project_baselines"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    name = Column(String(100), nullable=False)
+    description = Column(Text)
+    created_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Project totals at the time of the snapshot
+    task_count = Column(Integer, nullable=False, default=0)
+    start_date = Column(DateTime(timezone=True))
+    end_date = Column(DateTime(timezone=True))
+    estimated_hours = Column(Float, default=0.0)
+
+    data = Column(LargeBinary, nullable=False)  # compressed task id / start / end / hours columns
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('project_id', 'name', name='unique_project_baseline_name'),
+    )
+
+    def __repr__(self):
+        return f"<ProjectBaseline(project_id={self.project_id}, name='{self.name}')>"
+
+
+class ProgressSnapshot(Base):
+    """Daily progress totals of a project (phase_id NULL) and of each phase, for burndown / burnup"""
+    __tablename__ = "progress_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    phase_id = Column(Integer)  # top-level task; not a foreign key so history outlives the task
+    snapshot_date = Column(Date, nullable=False)
+
+    # Totals over the leaf tasks
+    task_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    estimated_hours = Column(Float, nullable=False, default=0.0)
+    completed_hours = Column(Float, nullable=False, default=0.0)  # estimated hours of completed tasks
+    remaining_hours = Column(Float, nullable=False, default=0.0)
+    actual_hours = Column(Float, nullable=False, default=0.0)
+
+    # Constraints
+    __table_args__ = (
+        Index('idx_progress_snapshot_series', 'project_id', 'phase_id', 'snapshot_date'),
+    )
+
+    def __repr__(self):
+        return f"<ProgressSnapshot(project_id={self.project_id}, phase_id={self.phase_id}, date={self.snapshot_date})>"
+
+
+class ProjectScenario(Base):
+    """What-if branch of a project, storing only the task fields it overrides"""
+    __tablename__ = "project_scenarios"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    name = Column(String(200), nullable=False)
+    description = Column(Text)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ProjectScenario(project_id={self.project_id}, name='{self.name}')>"
+
+
+class ScenarioTaskOverride(Base):
+    """Task fields changed in a scenario; NULL keeps the base task's value"""
+    __tablename__ = "scenario_task_overrides"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scenario_id = Column(Integer, ForeignKey("project_scenarios.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+
+    planned_start_date = Column(DateTime(timezone=True))
+    planned_end_date = Column(DateTime(timezone=True))
+    estimated_hours = Column(Float)
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('scenario_id', 'task_id', name='unique_scenario_task'),
+        Index('idx_scenario_override_task', 'task_id'),
+    )
+
+    def __repr__(self):
+        return f"<ScenarioTaskOverride(scenario_id={self.scenario_id}, task_id={self.task_id})>"
+
+
 class ProjectMember(Base):
     __tablename__ = "project_members"
 
@@ -190,6 +311,7 @@ class ProjectMember(Base):
     __table_args__ = (
         UniqueConstraint('project_id', 'user_id', name='unique_project_member'),
         CheckConstraint('allocation_percentage >= 0 AND allocation_percentage <= 100'),
+        Index('idx_project_member_user_project', 'user_id', 'project_id'),
     )
 
     def __repr__(self):
@@ -202,6 +324,9 @@ class Task(Base):
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
     parent_id = Column(Integer, ForeignKey("tasks.id"))  # Self-referencing for hierarchy
+    # Materialized path of ancestor ids ("/3/17/42/") and level (roots are 0), kept by crud.task_tree
+    path = Column(String(255))
+    depth = Column(Integer, default=0)
     
     # Task basic info
     name = Column(String(200), nullable=False)
@@ -225,7 +350,9 @@ class Task(Base):
     progress_percentage = Column(Float, default=0.0)
     
     # Task attributes
-    wbs_code = Column(String(50))  # Work Breakdown Structure code
+    wbs_code = Column(String(50))  # Work Breakdown Structure code, numbered by crud.task_tree
+    sort_order = Column(Integer)  # 1-based position among siblings
+    sort_key = Column(String(255))  # Zero-padded sibling numbers ("00001.00003"), orders the tree
     external_link = Column(String(500))  # Link to deliverables
     is_milestone = Column(Boolean, default=False)
     is_critical_path = Column(Boolean, default=False)
@@ -233,6 +360,14 @@ class Task(Base):
     # Constraints
     must_start_on = Column(DateTime(timezone=True))
     must_finish_on = Column(DateTime(timezone=True))
+
+    # Rollup over the subtree (a leaf mirrors its own values), kept by crud.task_rollup
+    rollup_start_date = Column(DateTime(timezone=True))
+    rollup_end_date = Column(DateTime(timezone=True))
+    rollup_estimated_hours = Column(Float, default=0.0)
+    rollup_actual_hours = Column(Float, default=0.0)
+    rollup_remaining_hours = Column(Float, default=0.0)
+    rollup_progress = Column(Float, default=0.0)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -257,6 +392,11 @@ class Task(Base):
         CheckConstraint('remaining_hours >= 0'),
         Index('idx_task_project_status', 'project_id', 'status'),
         Index('idx_task_dates', 'planned_start_date', 'planned_end_date'),
+        Index('idx_task_project_created', 'project_id', 'created_at'),
+        Index('idx_task_parent', 'parent_id'),
+        Index('idx_task_path', 'path'),
+        Index('idx_task_project_sort', 'project_id', 'sort_key'),
+        Index('idx_task_project_parent', 'project_id', 'parent_id'),
     )
 
     def __repr__(self):
@@ -283,6 +423,8 @@ class TaskDependency(Base):
     __table_args__ = (
         UniqueConstraint('predecessor_id', 'successor_id', name='unique_task_dependency'),
         CheckConstraint('predecessor_id != successor_id'),
+        # predecessor lookups use the unique constraint's index
+        Index('idx_task_dependency_successor', 'successor_id', 'predecessor_id'),
     )
 
     def __repr__(self):
@@ -312,6 +454,7 @@ class TaskAssignment(Base):
     __table_args__ = (
         UniqueConstraint('task_id', 'user_id', name='unique_task_assignment'),
         CheckConstraint('allocation_percentage >= 0 AND allocation_percentage <= 100'),
+        Index('idx_task_assignment_user', 'user_id', 'unassigned_at'),
     )
 
     def __repr__(self):
@@ -371,6 +514,7 @@ class ResourceAssignment(Base):
     __table_args__ = (
         UniqueConstraint('task_id', 'resource_id', name='unique_resource_assignment'),
         CheckConstraint('units_assigned > 0'),
+        Index('idx_resource_assignment_resource', 'resource_id'),
     )
 
     def __repr__(self):
@@ -406,12 +550,42 @@ class TimeTracking(Base):
         CheckConstraint('hours > 0'),
         Index('idx_time_tracking_date', 'date'),
         Index('idx_time_tracking_user_date', 'user_id', 'date'),
+        Index('idx_time_tracking_task_date', 'task_id', 'date'),
     )
 
     def __repr__(self):
         return f"<TimeTracking(task_id={self.task_id}, user_id={self.user_id}, hours={self.hours}, date={self.date})>"
 
 
+class TimeTrackingDaily(Base):
+    """Logged time per user, task and day, kept in step with time_tracking"""
+    __tablename__ = "time_tracking_daily"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    day = Column(Date, nullable=False)
+
+    # Totals over the day's entries
+    hours = Column(Float, nullable=False, default=0.0)
+    billable_hours = Column(Float, nullable=False, default=0.0)
+    rated_cost = Column(Float, nullable=False, default=0.0)  # hours * hourly_rate of entries with their own rate
+    unrated_hours = Column(Float, nullable=False, default=0.0)  # hours of entries without one
+    entry_count = Column(Integer, nullable=False, default=0)
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('user_id', 'day', 'task_id', name='uq_time_tracking_daily'),
+        Index('idx_time_tracking_daily_task', 'task_id'),
+        Index('idx_time_tracking_daily_day', 'day', 'project_id'),
+        Index('idx_time_tracking_daily_project_day', 'project_id', 'day'),
+    )
+
+    def __repr__(self):
+        return f"<TimeTrackingDaily(user_id={self.user_id}, task_id={self.task_id}, day={self.day}, hours={self.hours})>"
+
+
 class TaskComment(Base):
     __tablename__ = "task_comments"
 
@@ -430,6 +604,12 @@ class TaskComment(Base):
     task = relationship("Task", back_populates="comments")
     user = relationship("User", back_populates="task_comments")
 
+    # Constraints
+    __table_args__ = (
+        Index('idx_task_comment_task_created', 'task_id', 'created_at'),
+        Index('idx_task_comment_user_created', 'user_id', 'created_at'),
+    )
+
     def __repr__(self):
         return f"<TaskComment(task_id={self.task_id}, user_id={self.user_id})>"
 
@@ -487,4 +667,97 @@ class Template(Base):
     creator = relationship("User")
 
     def __repr__(self):
-        return f"<Template(name='{self.name}', type='{self.template_type}')>"
\ No newline at end of file
+        return f"<Template(name='{self.name}', type='{self.template_type}')>"
+
+
+class WorkCalendar(Base):
+    __tablename__ = "work_calendars"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)
+    # Project calendar, personal calendar, or the organisation default when both are NULL
+    project_id = Column(Integer, ForeignKey("projects.id"), unique=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True)
+
+    # Working pattern
+    weekmask = Column(String(7), nullable=False, default="1111100")  # Monday..Sunday, 1 = working
+    use_japanese_holidays = Column(Boolean, default=True)
+    hours_per_day = Column(Float, default=8.0)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    project = relationship("Project", back_populates="calendar")
+    user = relationship("User")
+    closures = relationship("CalendarClosure", back_populates="calendar", cascade="all, delete-orphan")
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint('project_id IS NULL OR user_id IS NULL'),
+        CheckConstraint('hours_per_day > 0 AND hours_per_day <= 24'),
+    )
+
+    def __repr__(self):
+        return f"<WorkCalendar(name='{self.name}', weekmask='{self.weekmask}')>"
+
+
+class CalendarClosure(Base):
+    __tablename__ = "calendar_closures"
+
+    id = Column(Integer, primary_key=True, index=True)
+    calendar_id = Column(Integer, ForeignKey("work_calendars.id"), nullable=False)
+
+    # Non-working period, both ends inclusive
+    name = Column(String(200), nullable=False)
+    start_date = Column(DateTime(timezone=True), nullable=False)
+    end_date = Column(DateTime(timezone=True), nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    calendar = relationship("WorkCalendar", back_populates="closures")
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint('end_date >= start_date'),
+        Index('idx_calendar_closure_calendar', 'calendar_id', 'start_date'),
+    )
+
+    def __repr__(self):
+        return f"<CalendarClosure(calendar_id={self.calendar_id}, name='{self.name}')>"
+
+
+class Notification(Base):
+    __tablename__ = "notifications"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    notification_type = Column(Enum(NotificationType), nullable=False)
+
+    # Content
+    title = Column(String(200), nullable=False)
+    message = Column(Text)
+    project_id = Column(Integer, ForeignKey("projects.id"))
+    task_id = Column(Integer, ForeignKey("tasks.id"))
+    reference = Column(String(100))  # identifies the event so it is not notified twice while unread
+
+    # Status
+    is_read = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    read_at = Column(DateTime(timezone=True))
+
+    # Relationships
+    user = relationship("User")
+
+    # Constraints
+    __table_args__ = (
+        Index('idx_notification_user_read', 'user_id', 'is_read', 'created_at'),
+        Index('idx_notification_task', 'task_id'),
+        Index('idx_notification_project', 'project_id'),
+    )
+
+    def __repr__(self):
+        return f"<Notification(user_id={self.user_id}, type='{self.notification_type}')>"
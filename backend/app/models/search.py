@@ -0,0 +1,107 @@
+"""FTS5 search index over tasks, projects and users (SQLite only).
+
+One contentful FTS5 table holds a row per searchable entity. The rowid packs
+the entity type into the low bits (``id * 4 + type``) so triggers can update
+and delete entries by rowid instead of scanning the index. The trigram
+tokenizer matches substrings of three or more characters, which works for
+Japanese names without word segmentation.
+"""
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+
+from ..database import Base
+
+SEARCH_TABLE = "search_index"
+
+ENTITY_TYPES = {"task": 1, "project": 2, "user": 3}
+ROWID_FACTOR = 4
+
+_SOURCES = {
+    # entity: (table, project_id expression, title, body)
+    "task": ("tasks", "{row}.project_id", "{row}.name", "coalesce({row}.description, '')"),
+    "project": ("projects", "{row}.id", "{row}.name", "coalesce({row}.description, '')"),
+    "user": ("users", "NULL", "{row}.full_name", "{row}.username || ' ' || {row}.email"),
+}
+# Only changes to these columns touch the index
+_WATCHED_COLUMNS = {
+    "task": "name, description, project_id",
+    "project": "name, description",
+    "user": "full_name, username, email",
+}
+
+
+def _values(entity: str, row: str) -> str:
+    _, project_id, title, body = _SOURCES[entity]
+    code = ENTITY_TYPES[entity]
+    return (
+        f"{row}.id * {ROWID_FACTOR} + {code}, '{entity}', {row}.id, "
+        f"{project_id.format(row=row)}, {title.format(row=row)}, {body.format(row=row)}"
+    )
+
+
+def _trigger_ddl(entity: str) -> list:
+    table = _SOURCES[entity][0]
+    code = ENTITY_TYPES[entity]
+    columns = "rowid, entity_type, entity_id, project_id, title, body"
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {SEARCH_TABLE} ({columns}) VALUES ({_values(entity, 'new')});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id * {ROWID_FACTOR} + {code};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {_WATCHED_COLUMNS[entity]} ON {table} BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id * {ROWID_FACTOR} + {code};
+            INSERT INTO {SEARCH_TABLE} ({columns}) VALUES ({_values(entity, 'new')});
+        END""",
+    ]
+
+
+def rebuild_search_index(connection: Connection) -> None:
+    """Repopulate the index from the source tables in one pass per entity"""
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    for entity, (table, *_rest) in _SOURCES.items():
+        connection.execute(text(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, entity_type, entity_id, project_id, title, body) "
+            f"SELECT {_values(entity, table)} FROM {table}"
+        ))
+
+
+def install_search_index(connection: Connection) -> None:
+    """Create the FTS5 table and sync triggers if missing, backfilling a new table"""
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SEARCH_TABLE},
+    ).first()
+    if not exists:
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+            "entity_type UNINDEXED, entity_id UNINDEXED, project_id UNINDEXED, "
+            "title, body, tokenize = 'trigram')"
+        ))
+    for entity in _SOURCES:
+        for ddl in _trigger_ddl(entity):
+            connection.execute(text(ddl))
+    if not exists:
+        rebuild_search_index(connection)
+
+
+def drop_search_index(connection: Connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    for table, *_rest in _SOURCES.values():
+        for suffix in ("insert", "delete", "update"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}"))
+    connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _after_create(target, connection, **kw):
+    install_search_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _before_drop(target, connection, **kw):
+    drop_search_index(connection)
@@ -1,17 +1,55 @@
 from .user import *
 from .project import *
 from .task import *
+from .search import *
+from .schedule import *
+from .calendar import *
+from .notification import *
+from .utilization import *
+from .template import *
+from .scenario import *
+from .baseline import *
+from .report import *
+from .timesheet import *
 
 __all__ = [
     # User schemas
     "UserBase", "UserCreate", "UserUpdate", "UserInDB", "User", "UserLogin", "Token",
     # Project schemas  
-    "ProjectBase", "ProjectCreate", "ProjectUpdate", "ProjectInDB", "Project",
+    "ProjectBase", "ProjectCreate", "ProjectUpdate", "ProjectInDB", "Project", "ProjectArchive", "ProjectClone",
     "ProjectMemberBase", "ProjectMemberCreate", "ProjectMemberUpdate", "ProjectMember",
     # Task schemas
-    "TaskBase", "TaskCreate", "TaskUpdate", "TaskInDB", "Task",
+    "TaskBase", "TaskCreate", "TaskUpdate", "TaskMove", "TaskInDB", "Task",
     "TaskDependencyBase", "TaskDependencyCreate", "TaskDependency",
     "TaskAssignmentBase", "TaskAssignmentCreate", "TaskAssignment",
     "TaskCommentBase", "TaskCommentCreate", "TaskComment",
     "TimeTrackingBase", "TimeTrackingCreate", "TimeTracking",
+    # Search schemas
+    "SearchHit", "SearchResults",
+    # Schedule schemas
+    "TaskEstimate", "ScheduleSimulationRequest", "CompletionPercentile", "TaskCriticality",
+    "ScheduleSimulationResult", "RescheduleRequest", "ScheduledTask", "ScheduleResult", "OverdueTask",
+    "ResourceLevelingRequest", "PortfolioLevelingRequest", "LeveledTask", "ResourceLevelingResult",
+    "EarnedValueSeries", "EarnedValueSummary", "PhaseEarnedValue", "EarnedValueReport",
+    # Calendar schemas
+    "CalendarClosureBase", "CalendarClosureCreate", "CalendarClosure",
+    "WorkCalendarBase", "WorkCalendarCreate", "WorkCalendarUpdate", "WorkCalendar",
+    "Holiday", "WorkdayRange",
+    # Notification schemas
+    "NotificationCreate", "NotificationUpdate", "Notification",
+    # Utilization schemas
+    "UserUtilization", "UtilizationHeatmap",
+    # Template schemas
+    "TemplateTask", "TemplateDependency", "TemplateData", "TemplateBase", "TemplateCreate", "TemplateUpdate",
+    "Template", "TemplateInstantiate", "TemplateInstantiateResult",
+    # Scenario schemas
+    "ScenarioBase", "ScenarioCreate", "ScenarioUpdate", "Scenario", "ScenarioOverride", "ScenarioTaskOverride",
+    "ScenarioTask",
+    # Baseline schemas
+    "BaselineCreate", "Baseline", "ScheduleVariance", "TaskVariance", "BaselineVariance",
+    # Report schemas
+    "Burndown", "Burnup", "ProgressSnapshotResult",
+    "TimesheetProjectHours", "TimesheetUserHours", "TimesheetProject", "TimesheetTotals", "TimesheetReport",
+    # Timesheet schemas
+    "TimesheetEntry", "WeeklyTimesheet", "TimesheetRow", "Timesheet", "WeeklyTimesheetResult",
 ]
\ No newline at end of file
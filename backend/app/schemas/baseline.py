@@ -0,0 +1,55 @@
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Baseline schemas
+class BaselineCreate(BaseModel):
+    name: str = Field(..., max_length=100)
+    description: Optional[str] = None
+
+
+class Baseline(BaseModel):
+    id: int
+    project_id: int
+    name: str
+    description: Optional[str] = None
+    created_by: Optional[int] = None
+    created_at: datetime
+    task_count: int
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    estimated_hours: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Variance against a baseline; slips are working days, positive when later
+class ScheduleVariance(BaseModel):
+    baseline_start_date: Optional[date] = None
+    baseline_end_date: Optional[date] = None
+    current_start_date: Optional[date] = None
+    current_end_date: Optional[date] = None
+    start_slip_days: int
+    finish_slip_days: int
+    baseline_hours: float
+    current_hours: float
+    effort_delta: float
+
+
+class TaskVariance(ScheduleVariance):
+    task_id: int
+    name: str
+    wbs_code: Optional[str] = None
+    in_baseline: bool  # False for tasks added after the snapshot
+
+
+class BaselineVariance(BaseModel):
+    baseline_id: int
+    baseline_name: str
+    baseline_created_at: datetime
+    project: ScheduleVariance
+    phases: List[TaskVariance]
+    tasks: List[TaskVariance]
+    added_task_count: int
+    removed_task_ids: List[int]
@@ -0,0 +1,69 @@
+from datetime import date, datetime
+from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+# Calendar closure schemas
+class CalendarClosureBase(BaseModel):
+    name: str
+    start_date: date
+    end_date: date
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        return self
+
+
+class CalendarClosureCreate(CalendarClosureBase):
+    pass
+
+
+class CalendarClosure(CalendarClosureBase):
+    id: int
+    calendar_id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Work calendar schemas
+class WorkCalendarBase(BaseModel):
+    name: str = "標準カレンダー"
+    weekmask: str = Field("1111100", pattern="^[01]{7}$")  # Monday..Sunday, 1 = working day
+    use_japanese_holidays: bool = True
+    hours_per_day: float = Field(8.0, gt=0, le=24)
+
+
+class WorkCalendarCreate(WorkCalendarBase):
+    pass
+
+
+class WorkCalendarUpdate(BaseModel):
+    name: Optional[str] = None
+    weekmask: Optional[str] = Field(None, pattern="^[01]{7}$")
+    use_japanese_holidays: Optional[bool] = None
+    hours_per_day: Optional[float] = Field(None, gt=0, le=24)
+
+
+class WorkCalendar(WorkCalendarBase):
+    id: int
+    project_id: Optional[int] = None
+    user_id: Optional[int] = None
+    closures: List[CalendarClosure] = []
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class Holiday(BaseModel):
+    date: date
+    name: str
+
+
+class WorkdayRange(BaseModel):
+    start_date: date
+    end_date: date
+    workday_count: int
+    non_working_days: List[date]
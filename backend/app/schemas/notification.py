@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from ..models import NotificationType
+
+
+class NotificationCreate(BaseModel):
+    user_id: int
+    notification_type: NotificationType
+    title: str
+    message: Optional[str] = None
+    project_id: Optional[int] = None
+    task_id: Optional[int] = None
+    reference: Optional[str] = None
+
+
+class NotificationUpdate(BaseModel):
+    is_read: Optional[bool] = None
+
+
+class Notification(BaseModel):
+    id: int
+    notification_type: NotificationType
+    title: str
+    message: Optional[str] = None
+    project_id: Optional[int] = None
+    task_id: Optional[int] = None
+    is_read: bool = False
+    created_at: datetime
+    read_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
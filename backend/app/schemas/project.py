@@ -41,6 +41,7 @@ class ProjectInDB(ProjectBase):
     baseline_end_date: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -52,11 +53,36 @@ class Project(ProjectBase):
     baseline_end_date: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None
     owner: User
     
     model_config = ConfigDict(from_attributes=True)
 
 
+# Summary of an archived project
+class ProjectArchive(BaseModel):
+    project_id: int
+    archived_by: Optional[int] = None
+    archived_at: datetime
+    task_count: int
+    completed_task_count: int
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    estimated_hours: float
+    actual_hours: float
+    remaining_hours: float
+    progress_percentage: float
+    time_entry_count: int
+    logged_hours: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProjectClone(BaseModel):
+    name: str
+    description: Optional[str] = None  # the original's when omitted
+
+
 # Project Member schemas
 class ProjectMemberBase(BaseModel):
     user_id: int
@@ -0,0 +1,74 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+# Progress history schemas; one list entry per daily snapshot
+class Burndown(BaseModel):
+    project_id: int
+    phase_id: Optional[int] = None
+    planned_end_date: Optional[date] = None
+    dates: List[date]
+    remaining_hours: List[float]
+    ideal_remaining_hours: List[Optional[float]]
+    open_task_count: List[int]
+
+
+class Burnup(BaseModel):
+    project_id: int
+    phase_id: Optional[int] = None
+    dates: List[date]
+    scope_hours: List[float]
+    completed_hours: List[float]
+    actual_hours: List[float]
+    task_count: List[int]
+    completed_count: List[int]
+
+
+class ProgressSnapshotResult(BaseModel):
+    snapshot_date: date
+    rows_written: int
+
+
+# Timesheet report schemas; one list entry per week of TimesheetReport.weeks
+class TimesheetProjectHours(BaseModel):
+    project_id: int
+    hours: List[float]
+    billable_hours: List[float]
+    non_billable_hours: List[float]
+    cost: List[float]
+
+
+class TimesheetUserHours(BaseModel):
+    user_id: int
+    username: str
+    full_name: str
+    department: Optional[str] = None
+    hours: List[float]
+    billable_hours: List[float]
+    non_billable_hours: List[float]
+    cost: List[float]
+    capacity_hours: List[float]
+    utilization: List[float]  # percent of capacity_hours
+    projects: List[TimesheetProjectHours]
+
+
+class TimesheetProject(BaseModel):
+    project_id: int
+    name: Optional[str] = None
+
+
+class TimesheetTotals(BaseModel):
+    hours: float
+    billable_hours: float
+    non_billable_hours: float
+    cost: float
+
+
+class TimesheetReport(BaseModel):
+    start_date: date
+    end_date: date
+    weeks: List[date]  # Mondays
+    projects: List[TimesheetProject]
+    users: List[TimesheetUserHours]
+    totals: TimesheetTotals
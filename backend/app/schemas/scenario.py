@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Scenario schemas
+class ScenarioBase(BaseModel):
+    name: str = Field(..., max_length=200)
+    description: Optional[str] = None
+
+
+class ScenarioCreate(ScenarioBase):
+    pass
+
+
+class ScenarioUpdate(BaseModel):
+    name: Optional[str] = Field(None, max_length=200)
+    description: Optional[str] = None
+
+
+class Scenario(ScenarioBase):
+    id: int
+    project_id: int
+    created_by: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Task overrides; null falls back to the base task's value
+class ScenarioOverride(BaseModel):
+    planned_start_date: Optional[datetime] = None
+    planned_end_date: Optional[datetime] = None
+    estimated_hours: Optional[float] = Field(None, ge=0)
+
+
+class ScenarioTaskOverride(ScenarioOverride):
+    task_id: int
+
+
+class ScenarioTask(BaseModel):
+    id: int
+    parent_id: Optional[int] = None
+    name: str
+    wbs_code: Optional[str] = None
+    depth: int = 0
+    is_milestone: bool = False
+    planned_start_date: Optional[datetime] = None
+    planned_end_date: Optional[datetime] = None
+    estimated_hours: Optional[float] = None
+    overridden: bool
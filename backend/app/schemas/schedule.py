@@ -0,0 +1,165 @@
+from datetime import date
+from typing import Annotated, Optional, List, Literal
+from pydantic import BaseModel, Field, model_validator
+
+
+# Schedule risk simulation schemas
+class TaskEstimate(BaseModel):
+    """Three-point estimate in hours, overriding the spread derived from the task"""
+    task_id: int
+    optimistic_hours: float = Field(ge=0)
+    most_likely_hours: float = Field(ge=0)
+    pessimistic_hours: float = Field(ge=0)
+
+    @model_validator(mode="after")
+    def check_order(self):
+        if not self.optimistic_hours <= self.most_likely_hours <= self.pessimistic_hours:
+            raise ValueError("Estimates must satisfy optimistic <= most likely <= pessimistic")
+        return self
+
+
+class ScheduleSimulationRequest(BaseModel):
+    iterations: int = Field(10_000, ge=100, le=100_000)
+    distribution: Literal["pert", "triangular"] = "pert"
+    optimistic_factor: float = Field(0.8, ge=0, le=1)
+    pessimistic_factor: float = Field(1.5, ge=1)
+    hours_per_day: Optional[float] = Field(None, gt=0, le=24)  # calendar default when omitted
+    start_date: Optional[date] = None
+    respect_planned_dates: bool = True
+    percentiles: List[Annotated[float, Field(ge=0, le=100)]] = [50, 80, 95]
+    seed: Optional[int] = None
+    estimates: List[TaskEstimate] = []
+
+
+class CompletionPercentile(BaseModel):
+    percentile: float
+    finish_date: date
+    duration_days: float
+
+
+class TaskCriticality(BaseModel):
+    task_id: int
+    name: str
+    wbs_code: Optional[str] = None
+    criticality: float
+    mean_finish_date: date
+
+
+class ScheduleSimulationResult(BaseModel):
+    project_id: int
+    iterations: int
+    distribution: str
+    start_date: date
+    deterministic_finish_date: date
+    mean_finish_date: date
+    percentiles: List[CompletionPercentile]
+    tasks: List[TaskCriticality]
+
+
+# Deterministic scheduling schemas
+class RescheduleRequest(BaseModel):
+    start_date: Optional[date] = None
+    hours_per_day: Optional[float] = Field(None, gt=0, le=24)
+    respect_planned_dates: bool = False
+    apply: bool = False
+
+
+class ScheduledTask(BaseModel):
+    task_id: int
+    name: str
+    wbs_code: Optional[str] = None
+    planned_start_date: date
+    planned_end_date: date
+    total_float_days: float
+    is_critical: bool
+
+
+class ScheduleResult(BaseModel):
+    project_id: int
+    start_date: date
+    finish_date: Optional[date] = None
+    applied: bool
+    tasks: List[ScheduledTask]
+
+
+class OverdueTask(BaseModel):
+    task_id: int
+    name: str
+    wbs_code: Optional[str] = None
+    planned_end_date: date
+    workdays_overdue: int
+
+
+# Resource leveling schemas
+class ResourceLevelingRequest(BaseModel):
+    start_date: Optional[date] = None
+    hours_per_day: Optional[float] = Field(None, gt=0, le=24)
+    priority_rule: Literal["priority", "float", "wbs"] = "priority"
+    allow_project_delay: bool = False  # otherwise tasks only move within their float
+    respect_planned_dates: bool = False
+    apply: bool = False
+
+
+class PortfolioLevelingRequest(ResourceLevelingRequest):
+    project_ids: List[int] = Field(..., min_length=1)
+
+
+class LeveledTask(ScheduledTask):
+    project_id: int
+    delay_days: int
+    resource_conflict: bool
+
+
+class ResourceLevelingResult(BaseModel):
+    project_ids: List[int]
+    start_date: date
+    early_finish_date: Optional[date] = None
+    finish_date: Optional[date] = None
+    overallocated_hours_before: float
+    overallocated_hours_after: float
+    unresolved_count: int
+    applied: bool
+    tasks: List[LeveledTask]
+
+
+# Earned value schemas
+class EarnedValueSeries(BaseModel):
+    """Cumulative values per bucket; EV and AC are null after the status date"""
+    pv: List[float]
+    ev: List[Optional[float]]
+    ac: List[Optional[float]]
+    spi: List[Optional[float]]
+    cpi: List[Optional[float]]
+
+
+class EarnedValueSummary(BaseModel):
+    bac: float
+    pv: float
+    ev: float
+    ac: float
+    sv: float
+    cv: float
+    spi: Optional[float] = None
+    cpi: Optional[float] = None
+    eac: Optional[float] = None
+    etc: Optional[float] = None
+    vac: Optional[float] = None
+    percent_complete: Optional[float] = None
+
+
+class PhaseEarnedValue(BaseModel):
+    task_id: int
+    name: Optional[str] = None
+    summary: EarnedValueSummary
+    series: EarnedValueSeries
+
+
+class EarnedValueReport(BaseModel):
+    project_id: int
+    as_of: date
+    interval: Literal["day", "week"]
+    unit: Literal["cost", "hours"]
+    dates: List[date]
+    summary: EarnedValueSummary
+    series: EarnedValueSeries
+    phases: List[PhaseEarnedValue]
@@ -0,0 +1,19 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    type: str
+    id: int
+    project_id: Optional[int] = None
+    title: str
+    snippet: Optional[str] = None
+    score: float = 0.0
+
+
+class SearchResults(BaseModel):
+    query: str
+    skip: int
+    limit: int
+    has_more: bool
+    items: List[SearchHit]
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from ..models import TaskType, TaskStatus, Priority, DependencyType
 from .user import User
 
@@ -29,6 +29,11 @@ class TaskCreate(TaskBase):
     parent_id: Optional[int] = None
 
 
+class TaskMove(BaseModel):
+    parent_id: Optional[int] = None
+    position: Optional[int] = Field(None, ge=1)  # 1-based among the new siblings; appended if omitted
+
+
 class TaskUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
@@ -64,6 +69,16 @@ class TaskInDB(TaskBase):
     baseline_end_date: Optional[datetime] = None
     actual_hours: float = 0.0
     is_critical_path: bool = False
+    path: Optional[str] = None
+    depth: Optional[int] = None
+    sort_order: Optional[int] = None
+    sort_key: Optional[str] = None
+    rollup_start_date: Optional[datetime] = None
+    rollup_end_date: Optional[datetime] = None
+    rollup_estimated_hours: Optional[float] = None
+    rollup_actual_hours: Optional[float] = None
+    rollup_remaining_hours: Optional[float] = None
+    rollup_progress: Optional[float] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -80,6 +95,16 @@ class Task(TaskBase):
     baseline_end_date: Optional[datetime] = None
     actual_hours: float = 0.0
     is_critical_path: bool = False
+    path: Optional[str] = None
+    depth: Optional[int] = None
+    sort_order: Optional[int] = None
+    sort_key: Optional[str] = None
+    rollup_start_date: Optional[datetime] = None
+    rollup_end_date: Optional[datetime] = None
+    rollup_estimated_hours: Optional[float] = None
+    rollup_actual_hours: Optional[float] = None
+    rollup_remaining_hours: Optional[float] = None
+    rollup_progress: Optional[float] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
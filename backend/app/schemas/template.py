@@ -0,0 +1,104 @@
+from datetime import date, datetime
+from graphlib import CycleError, TopologicalSorter
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from ..models import DependencyType, Priority, TaskType, TemplateType
+
+
+# Structure stored as JSON in Template.template_data
+class TemplateTask(BaseModel):
+    key: Optional[str] = None  # referenced by TemplateDependency
+    name: str = Field(..., max_length=200)
+    description: Optional[str] = None
+    task_type: TaskType = TaskType.TASK
+    priority: Priority = Priority.MEDIUM
+    is_milestone: bool = False
+    start_offset: int = Field(0, ge=0)  # working days from the project start
+    duration: float = Field(1.0, ge=0)  # working days; 0 for milestones
+    estimated_hours: float = Field(0.0, ge=0)
+    children: List["TemplateTask"] = []
+
+
+class TemplateDependency(BaseModel):
+    predecessor: str
+    successor: str
+    dependency_type: DependencyType = DependencyType.FINISH_TO_START
+    lag_days: int = 0
+
+
+class TemplateData(BaseModel):
+    tasks: List[TemplateTask] = []
+    dependencies: List[TemplateDependency] = []
+
+    @model_validator(mode="after")
+    def check_keys(self):
+        keys = set()
+        stack = list(self.tasks)
+        while stack:
+            task = stack.pop()
+            if task.key is not None:
+                if task.key in keys:
+                    raise ValueError(f"Duplicate task key: {task.key}")
+                keys.add(task.key)
+            stack.extend(task.children)
+        for dependency in self.dependencies:
+            for key in (dependency.predecessor, dependency.successor):
+                if key not in keys:
+                    raise ValueError(f"Unknown task key in dependency: {key}")
+            if dependency.predecessor == dependency.successor:
+                raise ValueError("A task cannot depend on itself")
+        # Instantiation inserts the links in bulk, past the per-link cycle check
+        graph = TopologicalSorter()
+        for dependency in self.dependencies:
+            graph.add(dependency.successor, dependency.predecessor)
+        try:
+            graph.prepare()
+        except CycleError as e:
+            raise ValueError(f"Circular dependency between task keys: {' -> '.join(e.args[1])}")
+        return self
+
+
+# Template schemas
+class TemplateBase(BaseModel):
+    name: str
+    description: Optional[str] = None
+    template_type: TemplateType = TemplateType.CUSTOM
+    is_public: bool = False
+
+
+class TemplateCreate(TemplateBase):
+    template_data: TemplateData
+
+
+class TemplateUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    template_type: Optional[TemplateType] = None
+    is_public: Optional[bool] = None
+    template_data: Optional[TemplateData] = None
+
+
+class Template(TemplateBase):
+    id: int
+    created_by: int
+    usage_count: int = 0
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Instantiation
+class TemplateInstantiate(BaseModel):
+    name: str
+    description: Optional[str] = None
+    start_date: date
+    budget: float = 0.0
+
+
+class TemplateInstantiateResult(BaseModel):
+    project_id: int
+    start_date: date
+    end_date: Optional[date] = None
+    task_count: int
+    dependency_count: int
@@ -0,0 +1,41 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+# Weekly timesheet schemas
+class TimesheetEntry(BaseModel):
+    task_id: int
+    date: date
+    hours: float = Field(..., gt=0, le=24)
+    description: Optional[str] = None
+    billable: bool = True
+    hourly_rate: Optional[float] = Field(None, ge=0)
+
+
+class WeeklyTimesheet(BaseModel):
+    week_start: date
+    entries: List[TimesheetEntry] = Field(..., max_length=1000)
+    replace: bool = False  # delete the user's entries of the week in the submitted tasks' projects first
+
+
+class TimesheetRow(BaseModel):
+    task_id: int
+    project_id: int
+    task_name: str
+    hours: List[float]  # one per day from week_start
+    billable_hours: float
+
+
+class Timesheet(BaseModel):
+    user_id: int
+    week_start: date
+    week_end: date
+    rows: List[TimesheetRow]
+    daily_hours: List[float]
+    total_hours: float
+
+
+class WeeklyTimesheetResult(Timesheet):
+    created: int
+    replaced: int
@@ -0,0 +1,23 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class UserUtilization(BaseModel):
+    user_id: int
+    username: str
+    full_name: str
+    department: Optional[str] = None
+    daily_capacity: float
+    utilization: List[float]  # percent of capacity per day, aligned with UtilizationHeatmap.days
+    overallocated_days: int
+    peak_utilization: float
+
+
+class UtilizationHeatmap(BaseModel):
+    start_date: date
+    end_date: date
+    department: Optional[str] = None
+    days: List[date]
+    users: List[UserUtilization]
+    overallocated_user_count: int
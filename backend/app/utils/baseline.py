@@ -0,0 +1,135 @@
+"""Baseline snapshots packed as compressed columns, and their variance.
+
+A snapshot holds, for every task of a project, its rolled-up start, finish
+and estimated hours (the task's own values for a leaf, its subtree's for a
+parent). The columns are stored as one zlib-compressed buffer: a small
+header, the sorted task ids delta-encoded, the dates as int32 days since
+1970-01-01 and the hours as float64. Sorted ids differ by small steps and
+dates cluster, so a project costs a few bytes per task.
+
+Comparing two snapshots (or a snapshot with the current tasks) matches the
+ids with ``searchsorted`` and computes every slip and effort delta as one
+array operation.
+"""
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from .work_calendar import WorkingCalendar
+
+FORMAT_VERSION = 1
+_HEADER = np.dtype("<u4")
+_NAT_DAY = np.iinfo(np.int32).min  # stored for tasks without a date
+
+
+@dataclass
+class TaskVectors:
+    """Per-task columns, sorted by task id"""
+    task_ids: np.ndarray  # (N,) int64
+    start: np.ndarray     # (N,) datetime64[D], NaT when unscheduled
+    end: np.ndarray
+    hours: np.ndarray     # (N,) float64
+
+    @property
+    def size(self) -> int:
+        return len(self.task_ids)
+
+    @classmethod
+    def from_rows(cls, rows) -> "TaskVectors":
+        """(id, 'YYYY-MM-DD' or None, 'YYYY-MM-DD' or None, hours) rows, in any order"""
+        ids, starts, ends, hours = zip(*rows) if rows else ((),) * 4
+        ids = np.array(ids, dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        return cls(
+            task_ids=ids[order],
+            start=np.array(starts, dtype="datetime64[D]")[order],
+            end=np.array(ends, dtype="datetime64[D]")[order],
+            hours=np.array([h or 0.0 for h in hours], dtype=np.float64)[order],
+        )
+
+
+def _days(dates: np.ndarray) -> np.ndarray:
+    days = dates.astype(np.int64)
+    return np.where(np.isnat(dates), _NAT_DAY, days).astype("<i4")
+
+
+def _dates(days: np.ndarray) -> np.ndarray:
+    dates = days.astype(np.int64).astype("datetime64[D]")
+    dates[days == _NAT_DAY] = np.datetime64("NaT")
+    return dates
+
+
+def pack(vectors: TaskVectors) -> bytes:
+    header = np.array([FORMAT_VERSION, vectors.size], dtype=_HEADER)
+    id_steps = np.diff(vectors.task_ids, prepend=0).astype("<i8")
+    return zlib.compress(b"".join([
+        header.tobytes(), id_steps.tobytes(), _days(vectors.start).tobytes(), _days(vectors.end).tobytes(),
+        vectors.hours.astype("<f8").tobytes(),
+    ]))
+
+
+def unpack(blob: bytes) -> TaskVectors:
+    raw = zlib.decompress(blob)
+    version, n = np.frombuffer(raw, dtype=_HEADER, count=2)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported baseline format: {version}")
+    offset = 2 * _HEADER.itemsize
+    columns = []
+    for dtype in ("<i8", "<i4", "<i4", "<f8"):
+        columns.append(np.frombuffer(raw, dtype=dtype, count=int(n), offset=offset))
+        offset += int(n) * np.dtype(dtype).itemsize
+    id_steps, starts, ends, hours = columns
+    return TaskVectors(
+        task_ids=np.cumsum(id_steps),
+        start=_dates(starts),
+        end=_dates(ends),
+        hours=hours.astype(np.float64),
+    )
+
+
+@dataclass
+class Variance:
+    """Current tasks against a baseline
+
+    The per-task arrays are aligned with the current vectors; `in_baseline`
+    is False for tasks added since. Slips are in working days, positive when
+    the current date is later, and 0 where either date is missing.
+    """
+    in_baseline: np.ndarray         # (N,) bool
+    baseline_start: np.ndarray      # (N,) datetime64[D], NaT for added tasks
+    baseline_end: np.ndarray
+    baseline_hours: np.ndarray      # (N,) float64, 0 for added tasks
+    start_slip: np.ndarray          # (N,) int64
+    finish_slip: np.ndarray
+    effort_delta: np.ndarray        # (N,) float64, 0 for added tasks
+    removed_task_ids: np.ndarray    # baseline tasks that no longer exist
+
+
+def variance(baseline: TaskVectors, current: TaskVectors, calendar: WorkingCalendar) -> Variance:
+    found = np.isin(current.task_ids, baseline.task_ids, assume_unique=True)
+    position = np.searchsorted(baseline.task_ids, current.task_ids[found])
+
+    baseline_start = np.full(current.size, np.datetime64("NaT"), dtype="datetime64[D]")
+    baseline_end = baseline_start.copy()
+    baseline_hours = np.zeros(current.size, dtype=np.float64)
+    baseline_start[found] = baseline.start[position]
+    baseline_end[found] = baseline.end[position]
+    baseline_hours[found] = baseline.hours[position]
+    return Variance(
+        in_baseline=found,
+        baseline_start=baseline_start,
+        baseline_end=baseline_end,
+        baseline_hours=baseline_hours,
+        start_slip=_slip(calendar, baseline_start, current.start),
+        finish_slip=_slip(calendar, baseline_end, current.end),
+        effort_delta=np.where(found, np.round(current.hours - baseline_hours, 6), 0.0),
+        removed_task_ids=baseline.task_ids[~np.isin(baseline.task_ids, current.task_ids, assume_unique=True)],
+    )
+
+
+def _slip(calendar: WorkingCalendar, before: np.ndarray, after: np.ndarray) -> np.ndarray:
+    """Signed working days from `before` to `after`; a date on a non-working day counts as the next working day"""
+    before = calendar.roll_forward(before)
+    after = calendar.roll_forward(after)
+    return calendar.count_workdays(before, after).astype(np.int64)
@@ -0,0 +1,139 @@
+"""Fast JSON encoding and response compression.
+
+Bodies are encoded with orjson (`ORJSONResponse`, the app's default response
+class), which writes bytes directly and handles datetimes, dates, enums and
+numpy arrays natively. `CompressionMiddleware` compresses them with Brotli
+when the client accepts it and the optional ``brotli`` package is installed,
+otherwise with gzip, and sends them as they are below COMPRESSION_MIN_BYTES.
+"""
+import zlib
+from typing import Any, Optional
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is used instead
+    brotli = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+# Content types worth compressing; Excel and PDF exports already are
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def _default(value: Any) -> Any:
+    # Decimals, sets, Pydantic models and the other types orjson leaves out
+    return jsonable_encoder(value)
+
+
+def dumps(payload: Any) -> bytes:
+    return orjson.dumps(payload, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response encoded with orjson
+
+    Routes get content that jsonable_encoder or their response model already
+    converted; handlers of large plain payloads (rows of str, int and float)
+    can return this directly to skip that walk. Datetimes come out as
+    ``datetime.isoformat()`` and enums as their values, like the encoder's.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def accepted_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The best supported content coding listed in an Accept-Encoding header"""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q=") and quality[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental gzip or Brotli compression of a body sent in chunks"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def write(self, data: bytes) -> bytes:
+        return self._brotli.process(data) if self._brotli is not None else self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        return self._brotli.finish() if self._brotli is not None else self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """Compress response bodies of at least `minimum_size` bytes
+
+    Like Starlette's GZipMiddleware, but picks Brotli when it can, and leaves
+    responses that already carry a Content-Encoding, or whose content type is
+    not in COMPRESSIBLE_TYPES, alone.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = accepted_encoding(Headers(scope=scope).get("accept-encoding")) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk decides the headers
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                compressible = headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                if compressible and "content-encoding" not in headers and (more_body or len(body) >= self.minimum_size):
+                    compressor = _Compressor(encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    if more_body:
+                        del headers["Content-Length"]
+                    else:
+                        body = compressor.write(body) + compressor.finish()
+                        headers["Content-Length"] = str(len(body))
+                        compressor = None
+                        message = {**message, "body": body}
+                await send(start)
+                start = None
+            if compressor is not None:
+                chunk = compressor.write(body)
+                if not more_body:
+                    chunk += compressor.finish()
+                message = {**message, "body": chunk}
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
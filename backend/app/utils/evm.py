@@ -0,0 +1,245 @@
+"""Earned value management over the planned schedule and logged time.
+
+Planned value spreads each leaf task's budget at completion (estimated hours
+times its planned rate) evenly over the working days of its planned span.
+Earned value is the budget times the progress recorded in task_history, with
+the current progress earned at the status date. Actual cost is logged hours
+times the effective rate, summed per task and day in SQL.
+
+Every curve is built with difference arrays on a (phase, day) matrix: each
+task, progress change or daily actual adds its amount at a day index with
+``np.add.at``, and a cumulative sum along the days gives the S-curves of all
+phases at once. The project curve is the sum over phases, and date buckets
+sample the cumulative curves, so nothing iterates per day or time entry.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .work_calendar import WorkingCalendar, to_datetime64
+
+INTERVALS = ("day", "week")
+UNITS = ("cost", "hours")
+
+# Effective rate of a time entry: entry -> assignment -> project member -> user
+_ENTRY_RATE = "coalesce(tt.hourly_rate, ta.hourly_rate, pm.hourly_rate, u.hourly_rate, 0)"
+# Planned rate of an assignee: assignment -> project member -> user
+_ASSIGNEE_RATE = "coalesce(ta.hourly_rate, pm.hourly_rate, u.hourly_rate, 0)"
+
+
+@dataclass
+class EVMInputs:
+    """Tasks of a project with their budgets, and the per-day facts about them
+
+    Task arrays are in WBS order; `bac` is 0 for parent tasks, whose budget
+    is their leaves'.
+    """
+    task_ids: np.ndarray        # (N,) int64
+    phase_of: np.ndarray        # (N,) index into phase_ids of the task's top-level ancestor
+    phase_ids: np.ndarray       # (G,) int64, top-level tasks
+    start: np.ndarray           # (N,) datetime64[D], planned
+    end: np.ndarray
+    bac: np.ndarray             # (N,) float64, budget at completion
+    progress: np.ndarray        # (N,) float64, current progress percentage
+    actual_task: np.ndarray     # (E,) index into the tasks
+    actual_day: np.ndarray      # (E,) datetime64[D]
+    actual_amount: np.ndarray   # (E,) cost or hours logged on that task and day
+    history_task: np.ndarray    # (H,) index into the tasks, ordered by task then time
+    history_day: np.ndarray     # (H,) datetime64[D]
+    history_old: np.ndarray     # (H,) float64, NaN when unknown
+    history_new: np.ndarray     # (H,) float64
+
+
+def load_evm_inputs(db: Session, project_id: int, unit: str = "cost") -> EVMInputs:
+    params = {"project_id": project_id}
+    hours_only = unit == "hours"
+    default_rate = 1.0 if hours_only else db.execute(
+        text("""
+            SELECT avg(coalesce(pm.hourly_rate, u.hourly_rate, 0)) FROM project_members pm
+            JOIN users u ON u.id = pm.user_id
+            WHERE pm.project_id = :project_id AND pm.left_at IS NULL
+        """),
+        params,
+    ).scalar() or 0.0
+    planned_rate = "1.0" if hours_only else f"""(
+        SELECT avg({_ASSIGNEE_RATE}) FROM task_assignments ta
+        JOIN users u ON u.id = ta.user_id
+        LEFT JOIN project_members pm ON pm.project_id = t.project_id AND pm.user_id = ta.user_id
+        WHERE ta.task_id = t.id AND ta.unassigned_at IS NULL
+    )"""
+    tasks = db.execute(
+        text(f"""
+            SELECT t.id, t.path, date(t.planned_start_date), date(t.planned_end_date),
+                   t.estimated_hours, t.progress_percentage,
+                   NOT EXISTS (SELECT 1 FROM tasks c WHERE c.parent_id = t.id) AS is_leaf,
+                   {planned_rate} AS rate
+            FROM tasks t WHERE t.project_id = :project_id
+            ORDER BY t.sort_key, t.id
+        """),
+        params,
+    ).fetchall()
+    ids, paths, starts, ends, estimates, progress, leaves, rates = zip(*tasks) if tasks else ((),) * 8
+    task_ids = np.array(ids, dtype=np.int64)
+    roots = np.array([int(p.split("/")[1]) if p else i for i, p in zip(ids, paths)], dtype=np.int64)
+    phase_ids, first_seen = np.unique(roots, return_index=True)
+    phase_ids = phase_ids[np.argsort(first_seen)]  # WBS order
+    by_id = np.argsort(phase_ids)
+    rate = np.array([default_rate if r is None else r for r in rates], dtype=np.float64)
+    bac = np.array([e or 0.0 for e in estimates], dtype=np.float64) * rate * np.array(leaves, dtype=bool)
+    index_of = {task_id: i for i, task_id in enumerate(ids)}
+
+    entry_amount = "tt.hours" if hours_only else f"tt.hours * {_ENTRY_RATE}"
+    actuals = db.execute(
+        text(f"""
+            SELECT tt.task_id, date(tt.date) AS day, sum({entry_amount})
+            FROM time_tracking tt
+            JOIN users u ON u.id = tt.user_id
+            LEFT JOIN task_assignments ta ON ta.task_id = tt.task_id AND ta.user_id = tt.user_id
+            LEFT JOIN project_members pm ON pm.project_id = :project_id AND pm.user_id = tt.user_id
+            WHERE tt.task_id IN (SELECT id FROM tasks WHERE project_id = :project_id)
+            GROUP BY tt.task_id, day
+        """),
+        params,
+    ).fetchall()
+    history = db.execute(
+        text("""
+            SELECT h.task_id, date(h.created_at), CAST(h.old_value AS REAL), CAST(h.new_value AS REAL)
+            FROM task_history h
+            WHERE h.field_name = 'progress_percentage' AND h.new_value IS NOT NULL
+              AND h.task_id IN (SELECT id FROM tasks WHERE project_id = :project_id)
+            ORDER BY h.task_id, h.created_at, h.id
+        """),
+        params,
+    ).fetchall()
+    a_tasks, a_days, a_amounts = zip(*actuals) if actuals else ((),) * 3
+    h_tasks, h_days, h_old, h_new = zip(*history) if history else ((),) * 4
+    return EVMInputs(
+        task_ids=task_ids,
+        phase_of=by_id[np.searchsorted(phase_ids[by_id], roots)],
+        phase_ids=phase_ids,
+        start=np.array(starts, dtype="datetime64[D]"),
+        end=np.array(ends, dtype="datetime64[D]"),
+        bac=bac,
+        progress=np.array([p or 0.0 for p in progress], dtype=np.float64),
+        actual_task=np.array([index_of[t] for t in a_tasks], dtype=np.int64),
+        actual_day=np.array(a_days, dtype="datetime64[D]"),
+        actual_amount=np.array(a_amounts, dtype=np.float64),
+        history_task=np.array([index_of[t] for t in h_tasks], dtype=np.int64),
+        history_day=np.array(h_days, dtype="datetime64[D]"),
+        history_old=np.array([np.nan if v is None else v for v in h_old], dtype=np.float64),
+        history_new=np.array(h_new, dtype=np.float64),
+    )
+
+
+@dataclass
+class EVMCurves:
+    """Cumulative PV / EV / AC per phase at each bucket, NaN where EV and AC lie in the future"""
+    labels: np.ndarray          # (B,) datetime64[D], first day of each bucket
+    pv: np.ndarray              # (G, B)
+    ev: np.ndarray
+    ac: np.ndarray
+    bac: np.ndarray             # (G,)
+    at_status: np.ndarray       # (3, G) PV, EV, AC at the status date
+
+
+def earned_value_curves(
+    inputs: EVMInputs, calendar: WorkingCalendar, as_of: date, interval: str = "week"
+) -> EVMCurves:
+    as_of_day = to_datetime64(as_of)
+    scheduled = ~(np.isnat(inputs.start) | np.isnat(inputs.end)) & (inputs.bac > 0)
+    candidates = [inputs.start[scheduled], inputs.actual_day, inputs.history_day]
+    first = min([c.min() for c in candidates if c.size] + [as_of_day])
+    # Far enough for a task ending on a holiday to be planned on the next working day
+    finishes = [calendar.roll_forward(inputs.end[scheduled]), inputs.actual_day, inputs.history_day]
+    last = max([c.max() for c in finishes if c.size] + [as_of_day])
+    days = np.arange(first, last + 1, dtype="datetime64[D]")
+    n_phases, n_days = len(inputs.phase_ids), len(days)
+    status = int((as_of_day - first).astype(np.int64))  # first <= as_of <= last
+
+    pv_daily = _planned_daily(inputs, calendar, scheduled, first, n_phases, days)
+
+    ev_daily = np.zeros((n_phases, n_days + 1))
+    # Each recorded change earns the budget times the progress it added...
+    task, recorded = inputs.history_task, inputs.history_new
+    opens_task = np.r_[True, task[1:] != task[:-1]] if task.size else np.zeros(0, dtype=bool)
+    before = np.where(opens_task, np.nan_to_num(inputs.history_old), np.r_[0.0, recorded[:-1]])
+    np.add.at(ev_daily, (inputs.phase_of[task], _index(inputs.history_day, first, n_days)),
+              inputs.bac[task] * (recorded - before) / 100.0)
+    # ...and the status date settles every task at its current progress
+    last_recorded = np.zeros(len(inputs.task_ids))
+    if task.size:
+        closes_task = np.r_[task[1:] != task[:-1], True]
+        last_recorded[task[closes_task]] = recorded[closes_task]
+    np.add.at(ev_daily, (inputs.phase_of, status),
+              inputs.bac * (inputs.progress - last_recorded) / 100.0)
+
+    ac_daily = np.zeros((n_phases, n_days + 1))
+    np.add.at(ac_daily, (inputs.phase_of[inputs.actual_task], _index(inputs.actual_day, first, n_days)),
+              inputs.actual_amount)
+
+    pv, ev, ac = (np.cumsum(d[:, :n_days], axis=1) for d in (pv_daily, ev_daily, ac_daily))
+    labels, starts, samples = _buckets(days, interval)
+    # The bucket holding the status date is sampled at it; EV and AC are unknown after it
+    current = (starts <= status) & (samples > status)
+    samples = np.where(current, status, samples)
+    future = starts > status
+    return EVMCurves(
+        labels=labels,
+        pv=pv[:, samples],
+        ev=np.where(future, np.nan, ev[:, samples]),
+        ac=np.where(future, np.nan, ac[:, samples]),
+        bac=np.bincount(inputs.phase_of, weights=inputs.bac, minlength=n_phases),
+        at_status=np.array([pv[:, status], ev[:, status], ac[:, status]]).reshape(3, n_phases),
+    )
+
+
+def _index(days: np.ndarray, first: np.datetime64, n_days: int) -> np.ndarray:
+    return np.clip((days - first).astype(np.int64), 0, n_days)
+
+
+def _planned_daily(inputs, calendar, scheduled, first, n_phases, days) -> np.ndarray:
+    """Budget spent per phase and day, spread evenly over each task's working days"""
+    n_days = len(days)
+    daily = np.zeros((n_phases, n_days + 1))
+    start, end = inputs.start[scheduled], np.maximum(inputs.start[scheduled], inputs.end[scheduled])
+    phase, bac = inputs.phase_of[scheduled], inputs.bac[scheduled]
+    workdays = calendar.count_workdays(start, end + 1)
+
+    spread = workdays > 0
+    rate = np.zeros(len(bac))
+    rate[spread] = bac[spread] / workdays[spread]
+    steps = np.zeros((n_phases, n_days + 1))
+    np.add.at(steps, (phase[spread], _index(start[spread], first, n_days)), rate[spread])
+    np.add.at(steps, (phase[spread], _index(end[spread] + 1, first, n_days)), -rate[spread])
+    daily[:, :n_days] = np.cumsum(steps[:, :n_days], axis=1) * calendar.is_workday(days)
+    # A span without a working day is planned in one go on the next working day
+    lump = calendar.roll_forward(end[~spread])
+    np.add.at(daily, (phase[~spread], _index(lump, first, n_days)), bac[~spread])
+    return daily
+
+
+def _buckets(days: np.ndarray, interval: str):
+    """First day, first day index and sampled (last) day index of each bucket"""
+    positions = np.arange(len(days))
+    if interval == "day":
+        return days, positions, positions
+    # Weeks run Monday to Sunday; 1970-01-01 was a Thursday
+    weekday = (days.astype(np.int64) + 3) % 7
+    starts = np.flatnonzero((weekday == 0) | (positions == 0))
+    ends = np.r_[starts[1:] - 1, len(days) - 1]
+    labels = days[starts] - weekday[starts].astype("timedelta64[D]")
+    return labels, starts, ends
+
+
+def ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator, NaN where the denominator is 0 or unknown"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def to_list(values: np.ndarray, digits: int = 2) -> List[Optional[float]]:
+    return [None if np.isnan(v) else v for v in np.round(values, digits).tolist()]
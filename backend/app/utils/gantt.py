@@ -0,0 +1,196 @@
+"""Compact (columnar) Gantt payload.
+
+The default Gantt response repeats every key for every task. The compact one
+holds one array per column instead: enum columns are dictionary-encoded as
+indexes into fixed code lists (lower-case enum names, so the lists only grow
+when a row holds a value outside the enum), dates are whole days since
+1970-01-01, and descriptions are left out, to be fetched per task with
+``GET /tasks/{id}/description`` when one is opened.
+
+Either payload can be narrowed to what a view shows (`GanttScope`): the
+tasks whose bars cross a date window and, given the expanded parents, only
+the roots and the children of expanded parents. A collapsed parent is then
+a summary row, drawn from its rollup columns, so a view of a large program
+reads a few hundred rows however many tasks lie below its collapsed phases.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from ..crud.hierarchy import path_ids
+from ..models import DependencyType, Priority, TaskStatus, TaskType
+
+COMPACT_FORMAT = "compact-v1"
+
+# Days since 1970-01-01 of a stored date or datetime
+_EPOCH_DAY = "CAST(julianday(date({})) - 2440587.5 AS INTEGER)"
+
+TASK_COLUMNS = (
+    "id", "name", "task_type", "status", "priority", "estimated_hours", "actual_hours",
+    "start_date", "end_date", "progress_percentage", "parent_task_id",
+    "rollup_start_date", "rollup_end_date", "rollup_estimated_hours", "rollup_actual_hours",
+    "rollup_remaining_hours", "rollup_progress", "wbs_code", "sort_order",
+)
+_TASK_SQL = f"""
+    SELECT id, name, task_type, status, priority, estimated_hours, actual_hours,
+           {_EPOCH_DAY.format("planned_start_date")}, {_EPOCH_DAY.format("planned_end_date")},
+           coalesce(progress_percentage, 0), parent_id,
+           {_EPOCH_DAY.format("rollup_start_date")}, {_EPOCH_DAY.format("rollup_end_date")},
+           rollup_estimated_hours, rollup_actual_hours, rollup_remaining_hours, rollup_progress,
+           wbs_code, sort_order{{columns}}
+    FROM tasks t WHERE {{scope}} ORDER BY sort_key, id
+"""
+
+# Appended to the task columns of a lazy view
+LAZY_COLUMNS = ("child_count", "collapsed")
+
+LINK_COLUMNS = ("id", "source", "target", "type", "lag")
+_LINK_SQL = """
+    SELECT td.id, td.predecessor_id, td.successor_id, td.dependency_type, td.lag_days
+    FROM task_dependencies td
+    JOIN tasks t1 ON td.predecessor_id = t1.id
+    JOIN tasks t2 ON td.successor_id = t2.id
+    WHERE {scope}
+"""
+
+# Dictionary-encoded columns of tasks and links, with the enum giving their codes
+TASK_ENUMS = {"task_type": TaskType, "status": TaskStatus, "priority": Priority}
+LINK_ENUMS = {"type": DependencyType}
+
+
+def dictionary_encode(values: Sequence[Any], dictionary: List[str]) -> List[Optional[int]]:
+    """Indexes of `values` in `dictionary`, which unknown values are appended to"""
+    index = {value: i for i, value in enumerate(dictionary)}
+    codes: List[Optional[int]] = []
+    for value in values:
+        if value is None:
+            codes.append(None)
+            continue
+        # The ORM stores enum names and the raw endpoints lower-case values
+        key = str(value).lower()
+        if key not in index:
+            index[key] = len(dictionary)
+            dictionary.append(key)
+        codes.append(index[key])
+    return codes
+
+
+def columnar(rows: Sequence[Sequence[Any]], names: Sequence[str], enums: Dict[str, Any],
+             dictionaries: Dict[str, List[str]]) -> Dict[str, list]:
+    """Rows as one list per column, enum columns encoded against `dictionaries`"""
+    columns = [list(values) for values in zip(*rows)] if rows else [[] for _ in names]
+    encoded = dict(zip(names, columns))
+    for name in enums:
+        encoded[name] = dictionary_encode(encoded[name], dictionaries[name])
+    return encoded
+
+
+class GanttScope:
+    """Tasks of a project that a Gantt view shows
+
+    A date window keeps the tasks whose rollup bar (the planned dates, for a
+    leaf) crosses it. Expanded parents, when given, make the view lazy: it
+    holds the roots and the children of parents that are expanded along with
+    all their ancestors, each with its number of children and whether it is
+    a collapsed summary row.
+    """
+
+    def __init__(self, project_id: int, *, start_date: Optional[date] = None,
+                 end_date: Optional[date] = None, expanded: Optional[Set[int]] = None):
+        self.project_id = project_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.expanded = expanded
+
+    @property
+    def lazy(self) -> bool:
+        return self.expanded is not None
+
+    @property
+    def columns(self) -> str:
+        """Task columns a lazy view reads on top of the payload's own"""
+        if not self.lazy:
+            return ""
+        return ", t.path, (SELECT count(*) FROM tasks c WHERE c.parent_id = t.id)"
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"project_id": self.project_id}
+        if self.start_date is not None:
+            params["window_start"] = self.start_date.isoformat()
+        if self.end_date is not None:
+            params["window_end"] = (self.end_date + timedelta(days=1)).isoformat()
+        if self.lazy:
+            params["expanded"] = sorted(self.expanded)
+        return params
+
+    def where(self, alias: str) -> str:
+        # Rollup dates are stored as 'YYYY-MM-DD HH:MM:SS', so day strings bound them
+        if self.lazy:
+            # The roots and the children of expanded parents, each read from the hierarchy index
+            clauses = [f"""{alias}.id IN (
+                SELECT id FROM tasks WHERE project_id = :project_id AND parent_id IS NULL
+                UNION ALL
+                SELECT id FROM tasks WHERE project_id = :project_id AND parent_id IN :expanded
+            )"""]
+        else:
+            clauses = [f"{alias}.project_id = :project_id"]
+        if self.start_date is not None:
+            clauses.append(f"{alias}.rollup_end_date >= :window_start")
+        if self.end_date is not None:
+            clauses.append(f"{alias}.rollup_start_date < :window_end")
+        return " AND ".join(clauses)
+
+    def statement(self, sql: str):
+        statement = text(sql)
+        if self.lazy:
+            statement = statement.bindparams(bindparam("expanded", expanding=True))
+        return statement
+
+    def visible(self, path: Optional[str]) -> bool:
+        """Whether every ancestor on `path` is expanded"""
+        return all(ancestor in self.expanded for ancestor in path_ids(path)[:-1])
+
+
+def load_task_rows(db: Session, sql: str, scope: GanttScope) -> List[tuple]:
+    """Rows of a task query with `{columns}` and `{scope}` placeholders over `tasks t`
+
+    Rows start with the task id; a lazy scope appends child_count and collapsed.
+    """
+    sql = sql.format(columns=scope.columns, scope=scope.where("t"))
+    rows = db.execute(scope.statement(sql), scope.params).fetchall()
+    if not scope.lazy:
+        return rows
+    return [
+        (*values, child_count, bool(child_count) and values[0] not in scope.expanded)
+        for *values, path, child_count in rows
+        if scope.visible(path)
+    ]
+
+
+def load_link_rows(db: Session, scope: GanttScope, task_ids: Set[int]) -> List[tuple]:
+    """Links between the tasks `scope` returned, `task_ids`"""
+    sql = _LINK_SQL.format(scope=f"{scope.where('t1')} AND {scope.where('t2')}")
+    rows = db.execute(scope.statement(sql), scope.params).fetchall()
+    if not scope.lazy:
+        return rows
+    return [row for row in rows if row[1] in task_ids and row[2] in task_ids]
+
+
+def load_compact_gantt(db: Session, scope: GanttScope) -> Dict[str, Any]:
+    """Tasks (in WBS order) and links of a project as a compact payload"""
+    task_rows = load_task_rows(db, _TASK_SQL, scope)
+    link_rows = load_link_rows(db, scope, {row[0] for row in task_rows})
+    dictionaries = {
+        name: [member.name.lower() for member in enum] for name, enum in {**TASK_ENUMS, **LINK_ENUMS}.items()
+    }
+    columns = TASK_COLUMNS + LAZY_COLUMNS if scope.lazy else TASK_COLUMNS
+    return {
+        "format": COMPACT_FORMAT,
+        "count": len(task_rows),
+        "tasks": columnar(task_rows, columns, TASK_ENUMS, dictionaries),
+        "links": columnar(link_rows, LINK_COLUMNS, LINK_ENUMS, dictionaries),
+        "dictionaries": dictionaries,
+    }
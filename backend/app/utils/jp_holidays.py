@@ -0,0 +1,102 @@
+"""日本の祝日（国民の祝日に関する法律）の計算
+
+2000年以降の規則（ハッピーマンデー、振替休日、国民の休日、2019〜2021年の特例）を
+実装しています。春分・秋分の日は天文計算の近似式で求めるため、2099年までが対象です。
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List
+
+MIN_YEAR = 2000
+MAX_YEAR = 2099
+
+
+def _nth_monday(year: int, month: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(7 - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _equinox_day(year: int, base: float) -> int:
+    return int(base + 0.242194 * (year - 1980) - (year - 1980) // 4)
+
+
+def _statutory_holidays(year: int) -> Dict[date, str]:
+    holidays = {
+        date(year, 1, 1): "元日",
+        _nth_monday(year, 1, 2): "成人の日",
+        date(year, 2, 11): "建国記念の日",
+        date(year, 3, _equinox_day(year, 20.8431)): "春分の日",
+        date(year, 5, 3): "憲法記念日",
+        date(year, 5, 5): "こどもの日",
+        date(year, 9, _equinox_day(year, 23.2488)): "秋分の日",
+        date(year, 11, 3): "文化の日",
+        date(year, 11, 23): "勤労感謝の日",
+    }
+    holidays[date(year, 4, 29)] = "昭和の日" if year >= 2007 else "みどりの日"
+    if year >= 2007:
+        holidays[date(year, 5, 4)] = "みどりの日"
+
+    if year >= 2020:
+        holidays[date(year, 2, 23)] = "天皇誕生日"
+    elif year <= 2018:
+        holidays[date(year, 12, 23)] = "天皇誕生日"
+
+    # 東京オリンピック・パラリンピックに伴う2020・2021年の移動
+    moved = {
+        2020: {"海の日": date(2020, 7, 23), "スポーツの日": date(2020, 7, 24), "山の日": date(2020, 8, 10)},
+        2021: {"海の日": date(2021, 7, 22), "スポーツの日": date(2021, 7, 23), "山の日": date(2021, 8, 8)},
+    }.get(year, {})
+    if year >= 2003:
+        holidays[moved.get("海の日", _nth_monday(year, 7, 3))] = "海の日"
+        holidays[_nth_monday(year, 9, 3)] = "敬老の日"
+    else:
+        holidays[date(year, 7, 20)] = "海の日"
+        holidays[date(year, 9, 15)] = "敬老の日"
+    if year >= 2016:
+        holidays[moved.get("山の日", date(year, 8, 11))] = "山の日"
+    sports_day = "スポーツの日" if year >= 2020 else "体育の日"
+    holidays[moved.get("スポーツの日", _nth_monday(year, 10, 2))] = sports_day
+
+    if year == 2019:
+        holidays[date(2019, 5, 1)] = "即位の日"
+        holidays[date(2019, 10, 22)] = "即位礼正殿の儀の行われる日"
+    return holidays
+
+
+@lru_cache(maxsize=None)
+def _holidays_for_year(year: int) -> Dict[date, str]:
+    holidays = _statutory_holidays(year)
+
+    # 国民の休日: 前後を祝日に挟まれた平日
+    for day in sorted(holidays):
+        between = day + timedelta(days=1)
+        if (
+            between not in holidays
+            and between + timedelta(days=1) in holidays
+            and between.weekday() != 6
+        ):
+            holidays[between] = "国民の休日"
+
+    # 振替休日: 日曜日の祝日の後、最初の祝日でない日
+    for day in sorted(holidays):
+        if day.weekday() == 6:
+            substitute = day + timedelta(days=1)
+            while substitute in holidays:
+                substitute += timedelta(days=1)
+            holidays[substitute] = "振替休日"
+    return dict(sorted(holidays.items()))
+
+
+def japanese_holidays(year: int) -> Dict[date, str]:
+    """その年の祝日と名称"""
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise ValueError(f"祝日は{MIN_YEAR}年から{MAX_YEAR}年まで計算できます")
+    return dict(_holidays_for_year(year))
+
+
+def japanese_holidays_between(start: date, end: date) -> List[date]:
+    """start から end（両端を含む）までの祝日"""
+    days = []
+    for year in range(max(start.year, MIN_YEAR), min(end.year, MAX_YEAR) + 1):
+        days.extend(d for d in _holidays_for_year(year) if start <= d <= end)
+    return days
@@ -0,0 +1,307 @@
+"""Resource-constrained scheduling that levels over-allocated users.
+
+Every active task assignment puts a daily demand on one or two resource rows:
+the user as a whole (capacity ``User.daily_capacity``) and, when the user is
+allocated to the project part-time, the user's share of that project
+(``daily_capacity * ProjectMember.allocation_percentage``). Demand per day is
+the calendar's hours per day scaled by ``TaskAssignment.allocation_percentage``.
+
+Load is kept in a dense (resources x working days) array. Tasks are placed
+by a serial schedule generation scheme: among the tasks whose predecessors
+are placed, the one ranked first by the priority rule gets the earliest
+start at which every resource row it uses has room for its whole duration.
+Finding that start is a window scan over a slice of the load array, so the
+Python loop runs once per task rather than once per task and day.
+
+By default a task is only delayed within its total float, which never moves
+the project finish; tasks that cannot be fitted there take the start with the
+fewest over-allocated days and are reported as unresolved. With ``allow_project_delay`` tasks are
+delayed as far as needed.
+"""
+import heapq
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from ..models import TaskStatus
+from .schedule_network import ScheduleNetwork
+from .scheduling import critical_path
+from .work_calendar import WorkingCalendar
+
+PRIORITY_RULES = ("priority", "float", "wbs")
+# Load comparisons tolerate float error from summing allocation shares
+LOAD_TOLERANCE = 1e-6
+# Upper bound on how far a task may be pushed when the project may slip
+MAX_DELAY_DAYS = 5000
+
+
+@dataclass
+class ResourcePool:
+    """Resource rows and the (task, resource, hours per day) demand entries"""
+    user_ids: np.ndarray          # (R,) user of each resource row
+    project_ids: np.ndarray       # (R,) project of a per-project row, 0 for the user as a whole
+    capacity: np.ndarray          # (R,) hours per day
+    entry_task: np.ndarray        # (E,) network row, sorted
+    entry_resource: np.ndarray    # (E,) resource row
+    entry_demand: np.ndarray      # (E,) hours per day, at most the row's capacity
+
+    @property
+    def size(self) -> int:
+        return len(self.user_ids)
+
+    def user_rows(self) -> np.ndarray:
+        return self.project_ids == 0
+
+
+@dataclass
+class LevelingResult:
+    start: np.ndarray             # (T,) working-day offsets after leveling
+    durations: np.ndarray         # (T,) whole working days
+    early_start: np.ndarray       # (T,) offsets before leveling
+    total_float: np.ndarray       # (T,) working days before leveling
+    critical: np.ndarray          # (T,) bool, before leveling
+    unresolved: np.ndarray        # (T,) bool, placed while a resource stays over-allocated
+    load: np.ndarray              # (R, H) hours per day after leveling
+    overallocated_hours_before: float   # hours above capacity summed over resources and days
+    overallocated_hours_after: float
+
+    @property
+    def delay(self) -> np.ndarray:
+        return self.start - self.early_start
+
+    @property
+    def finish(self) -> np.ndarray:
+        """Offset of the last working day of each task"""
+        return self.start + np.maximum(self.durations - 1, 0)
+
+
+def load_resource_pool(
+    db: Session, network: ScheduleNetwork, hours_per_day: float
+) -> ResourcePool:
+    """Active assignments of the network's tasks as resource demand"""
+    rows = db.execute(
+        text("""
+            SELECT ta.task_id, ta.user_id, ta.allocation_percentage, u.daily_capacity,
+                   t.project_id, pm.allocation_percentage AS member_allocation
+            FROM task_assignments ta
+            JOIN tasks t ON t.id = ta.task_id
+            JOIN users u ON u.id = ta.user_id
+            LEFT JOIN project_members pm
+                   ON pm.project_id = t.project_id AND pm.user_id = ta.user_id AND pm.left_at IS NULL
+            WHERE ta.unassigned_at IS NULL AND t.project_id IN :project_ids
+            ORDER BY ta.task_id, ta.user_id
+        """).bindparams(bindparam("project_ids", expanding=True)),
+        {"project_ids": np.unique(network.project_ids).tolist() or [0]},
+    ).fetchall()
+
+    index = network.index_of()
+    resources: Dict[tuple, int] = {}
+    user_ids, project_ids, capacity = [], [], []
+    entry_task, entry_resource, entry_share = [], [], []
+
+    def resource_row(user_id: int, project_id: int, hours: float) -> int:
+        key = (user_id, project_id)
+        if key not in resources:
+            resources[key] = len(user_ids)
+            user_ids.append(user_id)
+            project_ids.append(project_id)
+            capacity.append(hours)
+        return resources[key]
+
+    for row in rows:
+        task_row = index.get(row.task_id)
+        if task_row is None:
+            continue  # summary task
+        daily = hours_per_day if row.daily_capacity is None else float(row.daily_capacity)
+        share = (100.0 if row.allocation_percentage is None else row.allocation_percentage) / 100.0
+        targets = [resource_row(row.user_id, 0, daily)]
+        if row.member_allocation is not None and row.member_allocation < 100:
+            targets.append(resource_row(row.user_id, row.project_id, daily * row.member_allocation / 100.0))
+        for target in targets:
+            entry_task.append(task_row)
+            entry_resource.append(target)
+            entry_share.append(share)
+
+    capacity = np.array(capacity, dtype=np.float64)
+    entry_resource = np.array(entry_resource, dtype=np.int64)
+    demand = np.array(entry_share, dtype=np.float64) * hours_per_day
+    # A task that alone needs more than a row offers still runs, using all of it
+    demand = np.minimum(demand, capacity[entry_resource]) if len(demand) else demand
+    order = np.argsort(np.array(entry_task, dtype=np.int64), kind="stable")
+    return ResourcePool(
+        user_ids=np.array(user_ids, dtype=np.int64),
+        project_ids=np.array(project_ids, dtype=np.int64),
+        capacity=capacity,
+        entry_task=np.array(entry_task, dtype=np.int64)[order],
+        entry_resource=entry_resource[order],
+        entry_demand=demand[order],
+    )
+
+
+def daily_load(
+    pool: ResourcePool, start: np.ndarray, durations: np.ndarray, horizon: int
+) -> np.ndarray:
+    """(resources x horizon) hours per day when every task runs from `start`"""
+    load = np.zeros((pool.size, horizon + 1), dtype=np.float64)
+    begin = np.clip(start[pool.entry_task], 0, horizon)
+    end = np.clip(start[pool.entry_task] + durations[pool.entry_task], 0, horizon)
+    np.add.at(load, (pool.entry_resource, begin), pool.entry_demand)
+    np.add.at(load, (pool.entry_resource, end), -pool.entry_demand)
+    return np.cumsum(load, axis=1)[:, :horizon]
+
+
+def overallocated_hours(load: np.ndarray, capacity: np.ndarray) -> float:
+    """Hours above capacity summed over all resources and days"""
+    return float(np.clip(load - capacity[:, None], 0, None).sum())
+
+
+def _wbs_key(code: Optional[str]):
+    """Natural sort key for WBS codes such as '1.2.10'"""
+    if not code:
+        return ()
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.split(r"[.\-]", code))
+
+
+def _priority_order(network: ScheduleNetwork, total_float: np.ndarray, rule: str) -> np.ndarray:
+    """Rank of every task under a priority rule; in-progress tasks always come first"""
+    if rule not in PRIORITY_RULES:
+        raise ValueError(f"Unknown priority rule: {rule}")
+    wbs = sorted(range(network.size), key=lambda i: (network.wbs_codes[i] is None,
+                                                     _wbs_key(network.wbs_codes[i]),
+                                                     int(network.task_ids[i])))
+    wbs_rank = np.empty(network.size, dtype=np.int64)
+    wbs_rank[wbs] = np.arange(network.size)
+    keys = {"priority": -network.priorities, "float": total_float, "wbs": wbs_rank}
+    secondary = [k for k in ("wbs", "float", "priority") if k != rule]
+    started = network.status_mask(TaskStatus.IN_PROGRESS)
+    # np.lexsort sorts by the last key first
+    order = np.lexsort((*(keys[k] for k in secondary), keys[rule], ~started))
+    rank = np.empty(network.size, dtype=np.int64)
+    rank[order] = np.arange(network.size)
+    return rank
+
+
+class _Leveler:
+    def __init__(self, pool: ResourcePool, horizon: int):
+        self.capacity = pool.capacity + LOAD_TOLERANCE
+        self.load = np.zeros((pool.size, max(horizon, 1)), dtype=np.float64)
+
+    def _reserve(self, end: int) -> None:
+        if end > self.load.shape[1]:
+            grown = np.zeros((self.load.shape[0], max(end, 2 * self.load.shape[1])), dtype=np.float64)
+            grown[:, :self.load.shape[1]] = self.load
+            self.load = grown
+
+    def earliest_fit(self, rows, demand, duration: int, earliest: int, latest: int) -> Tuple[int, bool]:
+        """First start in [earliest, latest] where `demand` fits on every row for `duration` days
+
+        When no start fits, the one with the fewest over-allocated days is
+        returned together with False.
+        """
+        end = latest + duration
+        self._reserve(end)
+        window = self.load[rows, earliest:end]
+        window += demand[:, None]
+        fits = (window <= self.capacity[rows, None]).all(axis=0)
+        blocked = np.r_[0, np.cumsum(~fits)]
+        conflicts = blocked[duration:] - blocked[:-duration]
+        best = int(np.argmin(conflicts))
+        return earliest + best, bool(conflicts[best] == 0)
+
+    def place(self, rows, demand, start: int, duration: int) -> None:
+        self._reserve(start + duration)
+        self.load[rows, start:start + duration] += demand[:, None]
+
+
+def level_resources(
+    network: ScheduleNetwork,
+    pool: ResourcePool,
+    durations: np.ndarray,
+    floor: np.ndarray,
+    calendar: WorkingCalendar,
+    origin,
+    *,
+    rule: str = "priority",
+    allow_project_delay: bool = False,
+) -> LevelingResult:
+    """Delay tasks so that no user is loaded beyond capacity on any working day"""
+    size = network.size
+    durations = np.ceil(np.asarray(durations, dtype=np.float64) - 1e-6).clip(min=0).astype(np.int64)
+    floor = np.ceil(np.asarray(floor, dtype=np.float64) - 1e-6).astype(np.int64)
+    schedule = critical_path(network, durations, floor, calendar, origin)
+    early_start = np.ceil(schedule.early_start - 1e-6).astype(np.int64)
+    total_float = np.floor(schedule.total_float + 1e-6).astype(np.int64).clip(min=0)
+    rank = _priority_order(network, total_float, rule)
+
+    src, dst = network.edge_src, network.edge_dst
+    incoming = np.argsort(dst, kind="stable")
+    in_bounds = np.searchsorted(dst[incoming], np.arange(size + 1))
+    in_src = src[incoming]
+    in_weight = (network.edge_lag + network.edge_pred_term * durations[src]
+                 - network.edge_succ_term * durations[dst])[incoming]
+    outgoing = np.argsort(src, kind="stable")
+    out_bounds = np.searchsorted(src[outgoing], np.arange(size + 1))
+    out_dst = dst[outgoing].tolist()
+    entry_bounds = np.searchsorted(pool.entry_task, np.arange(size + 1))
+
+    horizon = int((early_start + durations).max()) + 1 if size else 1
+    leveler = _Leveler(pool, horizon)
+    started = network.status_mask(TaskStatus.IN_PROGRESS)
+    start = np.zeros(size, dtype=np.int64)
+    unresolved = np.zeros(size, dtype=bool)
+    pending = np.bincount(dst, minlength=size)
+    ready = [(int(rank[i]), i) for i in np.flatnonzero(pending == 0).tolist()]
+    heapq.heapify(ready)
+
+    while ready:
+        _, i = heapq.heappop(ready)
+        a, b = in_bounds[i], in_bounds[i + 1]
+        earliest = int(floor[i])
+        if b > a:
+            earliest = max(earliest, int(np.ceil((start[in_src[a:b]] + in_weight[a:b]).max() - 1e-6)))
+        earliest = max(earliest, 0)
+        duration = int(durations[i])
+        e, f = entry_bounds[i], entry_bounds[i + 1]
+        placed = earliest
+        if duration and f > e:
+            rows, demand = pool.entry_resource[e:f], pool.entry_demand[e:f]
+            if allow_project_delay and not started[i]:
+                # Scan ever larger windows rather than the whole delay range at once
+                lo, span = earliest, max(64, 4 * duration)
+                while True:
+                    hi = min(lo + span, earliest + MAX_DELAY_DAYS)
+                    placed, fits = leveler.earliest_fit(rows, demand, duration, lo, hi)
+                    if fits or hi == earliest + MAX_DELAY_DAYS:
+                        break
+                    lo, span = hi + 1, span * 2
+                unresolved[i] = not fits
+            elif not started[i]:
+                latest = max(earliest, int(early_start[i] + total_float[i]))
+                placed, fits = leveler.earliest_fit(rows, demand, duration, earliest, latest)
+                unresolved[i] = not fits
+            leveler.place(rows, demand, placed, duration)
+        start[i] = placed
+        for k in range(out_bounds[i], out_bounds[i + 1]):
+            succ = out_dst[k]
+            pending[succ] -= 1
+            if pending[succ] == 0:
+                heapq.heappush(ready, (int(rank[succ]), succ))
+
+    load = leveler.load[:, :max(int((start + durations).max()) if size else 0, horizon)]
+    before = daily_load(pool, early_start, durations, load.shape[1])
+    return LevelingResult(
+        start=start,
+        durations=durations,
+        early_start=early_start,
+        total_float=total_float,
+        critical=schedule.critical,
+        unresolved=unresolved,
+        load=load,
+        overallocated_hours_before=overallocated_hours(before, pool.capacity),
+        overallocated_hours_after=overallocated_hours(load, pool.capacity),
+    )
+
@@ -0,0 +1,237 @@
+"""Array representation of a project's task network for the schedule engines.
+
+Rows are read with plain SQL because tasks created through the simplified
+endpoints store enum values ('in_progress') while ORM rows store enum names
+('IN_PROGRESS'); both spellings are normalised here.
+
+Summary tasks (tasks with children) are not scheduled themselves. A
+dependency on a summary task is attached to zero-duration nodes standing for
+the summary's start or finish, which are linked once to each child, so a
+phase-to-phase link stays one edge however many tasks the phases hold. Those
+node rows follow the leaf rows and are flagged in `summary_node`; engines
+schedule them like any row and callers leave them out of their results.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Type
+
+import numpy as np
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.orm import Session
+
+from ..models import DependencyType, Priority, TaskStatus
+from .work_calendar import to_datetime64
+
+# Dependency types as (predecessor duration counts, successor duration counts)
+# in the constraint ES_succ >= ES_pred + lag + a * D_pred - b * D_succ
+DEPENDENCY_TERMS = {
+    DependencyType.FINISH_TO_START: (1, 0),
+    DependencyType.START_TO_START: (0, 0),
+    DependencyType.FINISH_TO_FINISH: (1, 1),
+    DependencyType.START_TO_FINISH: (0, 1),
+}
+
+
+class CyclicDependencyError(ValueError):
+    pass
+
+
+def parse_enum(enum_cls: Type, raw, default=None):
+    """Match a stored enum by name or value, case-insensitively"""
+    if raw is None:
+        return default
+    if isinstance(raw, enum_cls):
+        return raw
+    key = str(raw).lower()
+    for member in enum_cls:
+        if member.name.lower() == key or str(member.value).lower() == key:
+            return member
+    return default
+
+
+@dataclass
+class ScheduleNetwork:
+    """Leaf tasks of one or more projects, then summary nodes, as parallel arrays"""
+    task_ids: np.ndarray          # (T,) task id per row
+    project_ids: np.ndarray       # (T,)
+    names: List[str]
+    wbs_codes: List[Optional[str]]
+    statuses: List[TaskStatus]
+    priorities: np.ndarray        # (T,) Priority value, 1..5
+    estimated_hours: np.ndarray   # (T,)
+    remaining_hours: np.ndarray   # (T,)
+    planned_start: np.ndarray     # (T,) datetime64[D], NaT when unset
+    planned_end: np.ndarray
+    actual_start: np.ndarray
+    must_start_on: np.ndarray
+    # Edges between rows, sorted by (successor level, successor)
+    edge_src: np.ndarray
+    edge_dst: np.ndarray
+    edge_lag: np.ndarray
+    edge_pred_term: np.ndarray    # 1 when the predecessor's duration is added
+    edge_succ_term: np.ndarray    # 1 when the successor's duration is subtracted
+    level: np.ndarray             # (T,) topological level of each row
+    summary_node: np.ndarray      # (T,) True for the zero-duration start/finish rows of summary tasks
+
+    @property
+    def size(self) -> int:
+        return len(self.task_ids)
+
+    def index_of(self) -> Dict[int, int]:
+        return {int(task_id): i for i, task_id in enumerate(self.task_ids) if not self.summary_node[i]}
+
+    def status_mask(self, *statuses: TaskStatus) -> np.ndarray:
+        return np.array([s in statuses for s in self.statuses], dtype=bool)
+
+    def remaining_work_hours(self) -> np.ndarray:
+        """Hours still to be worked: zero when completed, else remaining or estimate"""
+        hours = np.where(self.remaining_hours > 0, self.remaining_hours, self.estimated_hours)
+        return np.where(self.status_mask(TaskStatus.COMPLETED), 0.0, hours)
+
+
+def topological_levels(size: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Longest-path level of every node; raises CyclicDependencyError on cycles"""
+    level = np.zeros(size, dtype=np.int64)
+    indegree = np.bincount(dst, minlength=size)
+    outgoing = defaultdict(list)
+    for s, d in zip(src.tolist(), dst.tolist()):
+        outgoing[s].append(d)
+    frontier = [i for i in range(size) if indegree[i] == 0]
+    visited = 0
+    while frontier:
+        visited += len(frontier)
+        next_frontier = []
+        for node in frontier:
+            for succ in outgoing.get(node, ()):
+                level[succ] = max(level[succ], level[node] + 1)
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    next_frontier.append(succ)
+        frontier = next_frontier
+    if visited != size:
+        raise CyclicDependencyError("Task dependencies contain a cycle")
+    return level
+
+
+def level_segments(keys: np.ndarray):
+    """Start offsets of runs of equal values in a sorted key array"""
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def load_schedule_network(db: Session, project_ids: Sequence[int]) -> ScheduleNetwork:
+    """Read the leaf tasks and dependencies of the given projects"""
+    task_rows = db.execute(
+        text("""
+            SELECT id, project_id, parent_id, name, wbs_code, status, priority,
+                   estimated_hours, remaining_hours, planned_start_date, planned_end_date,
+                   actual_start_date, must_start_on
+            FROM tasks WHERE project_id IN :project_ids
+            ORDER BY project_id, id
+        """).bindparams(bindparam("project_ids", expanding=True)).columns(
+            planned_start_date=DateTime, planned_end_date=DateTime,
+            actual_start_date=DateTime, must_start_on=DateTime,
+        ),
+        {"project_ids": list(project_ids)},
+    ).fetchall()
+    dependency_rows = db.execute(
+        text("""
+            SELECT td.predecessor_id, td.successor_id, td.dependency_type, td.lag_days
+            FROM task_dependencies td
+            JOIN tasks t ON td.successor_id = t.id
+            WHERE t.project_id IN :project_ids
+        """).bindparams(bindparam("project_ids", expanding=True)),
+        {"project_ids": list(project_ids)},
+    ).fetchall()
+
+    parents = {row.id: row.parent_id for row in task_rows}
+    children = defaultdict(list)
+    for row in task_rows:
+        if row.parent_id is not None:
+            children[row.parent_id].append(row.id)
+    leaves = [row for row in task_rows if row.id not in children]
+    index = {row.id: i for i, row in enumerate(leaves)}
+    summaries = {row.id: row for row in task_rows if row.id in children}
+
+    edges = {}
+
+    def link(src: int, dst: int, pred_term: int, succ_term: int, lag: float) -> None:
+        # Keep the most constraining link when several dependencies meet
+        key = (src, dst, pred_term, succ_term)
+        edges[key] = max(edges.get(key, float("-inf")), lag)
+
+    # (summary id, incoming, finish) -> row. Incoming nodes push the summary's
+    # children to start (or finish) no earlier than the node; outgoing nodes
+    # are pushed by the children's latest start (or finish).
+    nodes: Dict[tuple, int] = {}
+
+    def endpoint(task_id: int, incoming: bool, finish: int) -> int:
+        if task_id in index:
+            return index[task_id]
+        key = (task_id, incoming, finish)
+        if key not in nodes:
+            row = nodes[key] = len(leaves) + len(nodes)
+            for child in children[task_id]:
+                if incoming:
+                    link(row, endpoint(child, incoming, finish), 0, finish, 0.0)
+                else:
+                    link(endpoint(child, incoming, finish), row, finish, 0, 0.0)
+        return nodes[key]
+
+    def ancestors(task_id: int):
+        while parents.get(task_id) is not None:
+            task_id = parents[task_id]
+            yield task_id
+
+    for dep in dependency_rows:
+        if dep.predecessor_id not in parents:
+            continue  # predecessor in a project outside the network
+        if dep.predecessor_id in ancestors(dep.successor_id) or dep.successor_id in ancestors(dep.predecessor_id):
+            continue  # a link to a task's own summary would close a cycle through its nodes
+        dep_type = parse_enum(DependencyType, dep.dependency_type, DependencyType.FINISH_TO_START)
+        pred_term, succ_term = DEPENDENCY_TERMS[dep_type]
+        link(endpoint(dep.predecessor_id, False, pred_term), endpoint(dep.successor_id, True, succ_term),
+             pred_term, succ_term, float(dep.lag_days or 0))
+
+    # Node rows carry their summary's identity but no work or dates of their own
+    rows = leaves + [summaries[task_id] for task_id, _, _ in nodes]
+    size = len(rows)
+    summary_node = np.arange(size) >= len(leaves)
+    no_hours, no_dates = [0.0] * len(nodes), [None] * len(nodes)
+    if edges:
+        keys = np.array(list(edges.keys()), dtype=np.int64)
+        lags = np.array(list(edges.values()), dtype=np.float64)
+    else:
+        keys = np.zeros((0, 4), dtype=np.int64)
+        lags = np.zeros(0, dtype=np.float64)
+    level = topological_levels(size, keys[:, 0], keys[:, 1])
+    order = np.lexsort((keys[:, 1], level[keys[:, 1]])) if len(keys) else np.zeros(0, dtype=np.int64)
+    keys, lags = keys[order], lags[order]
+
+    return ScheduleNetwork(
+        task_ids=np.array([row.id for row in rows], dtype=np.int64),
+        project_ids=np.array([row.project_id for row in rows], dtype=np.int64),
+        names=[row.name for row in rows],
+        wbs_codes=[row.wbs_code for row in rows],
+        statuses=[
+            TaskStatus.NOT_STARTED if node else parse_enum(TaskStatus, row.status, TaskStatus.NOT_STARTED)
+            for row, node in zip(rows, summary_node)
+        ],
+        priorities=np.array(
+            [parse_enum(Priority, row.priority, Priority.MEDIUM).value for row in rows], dtype=np.int64
+        ),
+        estimated_hours=np.array([row.estimated_hours or 0.0 for row in leaves] + no_hours, dtype=np.float64),
+        remaining_hours=np.array([row.remaining_hours or 0.0 for row in leaves] + no_hours, dtype=np.float64),
+        planned_start=to_datetime64([row.planned_start_date for row in leaves] + no_dates),
+        planned_end=to_datetime64([row.planned_end_date for row in leaves] + no_dates),
+        actual_start=to_datetime64([row.actual_start_date for row in leaves] + no_dates),
+        must_start_on=to_datetime64([row.must_start_on for row in leaves] + no_dates),
+        edge_src=keys[:, 0].copy(),
+        edge_dst=keys[:, 1].copy(),
+        edge_lag=lags,
+        edge_pred_term=keys[:, 2].astype(np.float64),
+        edge_succ_term=keys[:, 3].astype(np.float64),
+        level=level,
+        summary_node=summary_node,
+    )
@@ -0,0 +1,66 @@
+"""Deterministic critical-path scheduling on a working calendar.
+
+Runs the same level-by-level passes as the Monte Carlo simulation with a
+single iteration, then maps working-day offsets back to calendar dates with
+the project's business-day calendar.
+"""
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+from ..models import TaskStatus
+from .schedule_network import ScheduleNetwork
+from .schedule_risk import CRITICAL_TOLERANCE, _PassPlan, backward_pass, forward_pass
+from .work_calendar import WorkingCalendar, finish_offsets, to_datetime64
+
+
+@dataclass
+class PlannedSchedule:
+    early_start: np.ndarray    # (T,) working-day offsets from the origin
+    early_finish: np.ndarray
+    total_float: np.ndarray    # working days
+    start_dates: np.ndarray    # (T,) datetime64[D]
+    end_dates: np.ndarray
+    critical: np.ndarray       # (T,) bool
+    finish_date: np.datetime64  # last end date of a task, NaT without tasks
+
+
+def critical_path(
+    network: ScheduleNetwork,
+    durations: np.ndarray,
+    floor: np.ndarray,
+    calendar: WorkingCalendar,
+    origin: date,
+) -> PlannedSchedule:
+    """Earliest dates, total float and critical tasks for fixed durations in working days"""
+    plan = _PassPlan(network)
+    durations = np.asarray(durations, dtype=np.float64)[:, None]
+    early = forward_pass(plan, durations, np.asarray(floor, dtype=np.float64))
+    early_finish = early + durations
+    finish = early_finish.max(axis=0) if network.size else np.zeros(1)
+    late = backward_pass(plan, durations, finish)
+    total_float = (late - early)[:, 0]
+
+    start_offsets = np.floor(early[:, 0] + 1e-6).astype(np.int64)
+    end_offsets = np.maximum(finish_offsets(early_finish[:, 0]), start_offsets)
+    end_dates = calendar.offsets_to_dates(origin, end_offsets)
+    # A summary's finish node starts the day after its last task ends
+    task_end_dates = end_dates[~network.summary_node]
+    return PlannedSchedule(
+        early_start=early[:, 0],
+        early_finish=early_finish[:, 0],
+        total_float=total_float,
+        start_dates=calendar.offsets_to_dates(origin, start_offsets),
+        end_dates=end_dates,
+        critical=total_float <= CRITICAL_TOLERANCE,
+        finish_date=task_end_dates.max() if len(task_end_dates) else np.datetime64("NaT"),
+    )
+
+
+def overdue_workdays(network: ScheduleNetwork, calendar: WorkingCalendar, as_of: date) -> np.ndarray:
+    """Working days after each unfinished task's planned end up to and including `as_of`"""
+    one_day = np.timedelta64(1, "D")
+    late = calendar.count_workdays(network.planned_end + one_day, to_datetime64(as_of) + one_day)
+    unfinished = ~network.status_mask(TaskStatus.COMPLETED) & ~np.isnat(network.planned_end)
+    return np.where(unfinished, np.maximum(late, 0), 0)
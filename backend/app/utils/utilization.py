@@ -0,0 +1,121 @@
+"""User x day utilization from task assignments.
+
+Assignments are kept as an interval index: parallel arrays of (user, first
+day, last day, allocation share) sorted by first day. A date window selects
+its intervals with one ``searchsorted`` plus a mask, and the per-day load of
+every user is built with a difference array (``np.add.at`` at each interval's
+start and end, then a cumulative sum along the days), so the cost does not
+depend on how long each assignment runs.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .work_calendar import WorkingCalendar, to_datetime64
+
+# Share of a user's capacity above which a day counts as over-allocated
+OVERALLOCATION_TOLERANCE = 1e-6
+
+
+@dataclass
+class AssignmentIntervals:
+    """Active assignments of scheduled leaf tasks, sorted by first day"""
+    user_ids: np.ndarray        # (A,)
+    task_ids: np.ndarray
+    project_ids: np.ndarray
+    start: np.ndarray           # (A,) datetime64[D], first planned day
+    end: np.ndarray             # (A,) datetime64[D], last planned day (inclusive)
+    share: np.ndarray           # (A,) allocation as a fraction of the user's day
+
+    @property
+    def size(self) -> int:
+        return len(self.user_ids)
+
+    def overlapping(self, start: date, end: date) -> np.ndarray:
+        """Positions of intervals that share at least one day with [start, end]"""
+        upper = np.searchsorted(self.start, to_datetime64(end), side="right")
+        return np.flatnonzero(self.end[:upper] >= to_datetime64(start))
+
+
+def load_assignment_intervals(db: Session) -> AssignmentIntervals:
+    """Read assignments of unfinished leaf tasks in projects that are still running"""
+    rows = db.execute(
+        text("""
+            SELECT ta.user_id, ta.allocation_percentage, t.id AS task_id, t.project_id,
+                   date(t.planned_start_date) AS start_day, date(t.planned_end_date) AS end_day
+            FROM task_assignments ta
+            JOIN tasks t ON t.id = ta.task_id
+            JOIN projects p ON p.id = t.project_id
+            WHERE ta.unassigned_at IS NULL
+              AND t.planned_start_date IS NOT NULL AND t.planned_end_date IS NOT NULL
+              AND lower(t.status) NOT IN ('completed', 'cancelled')
+              AND lower(p.status) NOT IN ('completed', 'cancelled')
+              AND (p.is_template IS NULL OR p.is_template = :no)
+              AND NOT EXISTS (SELECT 1 FROM tasks c WHERE c.parent_id = t.id)
+        """),
+        {"no": False},
+    ).fetchall()
+
+    # Columns are converted in bulk; ISO day strings parse directly to datetime64
+    user_ids, shares, task_ids, project_ids, starts, ends = zip(*rows) if rows else ((),) * 6
+    start = np.array(starts, dtype="datetime64[D]")
+    end = np.maximum(start, np.array(ends, dtype="datetime64[D]"))
+    share = np.array([100.0 if s is None else s for s in shares], dtype=np.float64) / 100.0
+    order = np.argsort(start, kind="stable")
+    return AssignmentIntervals(
+        user_ids=np.array(user_ids, dtype=np.int64)[order],
+        task_ids=np.array(task_ids, dtype=np.int64)[order],
+        project_ids=np.array(project_ids, dtype=np.int64)[order],
+        start=start[order],
+        end=end[order],
+        share=share[order],
+    )
+
+
+def working_mask(
+    user_ids: np.ndarray,
+    days: np.ndarray,
+    calendar: WorkingCalendar,
+    personal: Optional[Dict[int, WorkingCalendar]] = None,
+) -> np.ndarray:
+    """(users x days) True where the user works; personal calendars narrow the base one"""
+    base = calendar.is_workday(days)
+    mask = np.repeat(base[None, :], len(user_ids), axis=0)
+    for row, user_id in enumerate(user_ids.tolist()):
+        if personal and user_id in personal:
+            mask[row] = calendar.merge(personal[user_id]).is_workday(days)
+    return mask
+
+
+def allocation_matrix(
+    intervals: AssignmentIntervals, user_ids: np.ndarray, start: date, end: date
+) -> np.ndarray:
+    """(users x days) summed allocation share per calendar day of [start, end]
+
+    `user_ids` must be sorted; intervals of other users are ignored.
+    """
+    first = to_datetime64(start)
+    days = int((to_datetime64(end) - first).astype(np.int64)) + 1
+    matrix = np.zeros((len(user_ids), days + 1), dtype=np.float64)
+    selected = intervals.overlapping(start, end)
+    if len(selected) == 0 or len(user_ids) == 0:
+        return matrix[:, :days]
+
+    rows = np.searchsorted(user_ids, intervals.user_ids[selected])
+    known = (rows < len(user_ids)) & (user_ids[np.minimum(rows, len(user_ids) - 1)] == intervals.user_ids[selected])
+    selected, rows = selected[known], rows[known]
+    begin = np.clip((intervals.start[selected] - first).astype(np.int64), 0, days)
+    finish = np.clip((intervals.end[selected] - first).astype(np.int64) + 1, 0, days)
+    share = intervals.share[selected]
+    np.add.at(matrix, (rows, begin), share)
+    np.add.at(matrix, (rows, finish), -share)
+    return np.cumsum(matrix, axis=1)[:, :days]
+
+
+def overallocated(utilization: np.ndarray) -> np.ndarray:
+    """Cells where the allocation share exceeds the user's capacity"""
+    return utilization > 1.0 + OVERALLOCATION_TOLERANCE
@@ -0,0 +1,136 @@
+"""Working calendars compiled to NumPy business-day calendars.
+
+A WorkingCalendar wraps ``np.busdaycalendar`` (weekmask plus holiday list), so
+workday arithmetic over whole arrays of dates is a single call to
+``np.busday_offset`` / ``np.busday_count`` instead of a per-date loop.
+Offsets are counted in working days from an origin: offset 0 is the first
+working day on or after the origin.
+"""
+from datetime import date, datetime
+from typing import Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .jp_holidays import MAX_YEAR, MIN_YEAR, japanese_holidays_between
+
+DEFAULT_WEEKMASK = "1111100"  # Monday .. Sunday, 1 = working day
+DEFAULT_HOURS_PER_DAY = 8.0
+
+DateLike = Union[date, datetime, str, np.datetime64]
+
+
+def to_datetime64(values) -> np.ndarray:
+    """Dates, datetimes or None (as NaT) to a datetime64[D] array"""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+        return values.astype("datetime64[D]")
+    if isinstance(values, (list, tuple)):
+        return np.array(
+            [np.datetime64(_day(v), "D") if v is not None else np.datetime64("NaT") for v in values],
+            dtype="datetime64[D]",
+        )
+    return np.datetime64(_day(values), "D")
+
+
+def _day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def expand_ranges(ranges: Iterable[Tuple[DateLike, DateLike]]) -> np.ndarray:
+    """Every day covered by inclusive (start, end) ranges"""
+    days = [
+        np.arange(to_datetime64(start), to_datetime64(end) + 1, dtype="datetime64[D]")
+        for start, end in ranges
+    ]
+    return np.concatenate(days) if days else np.array([], dtype="datetime64[D]")
+
+
+class WorkingCalendar:
+    def __init__(
+        self,
+        weekmask: str = DEFAULT_WEEKMASK,
+        holidays: Sequence = (),
+        hours_per_day: float = DEFAULT_HOURS_PER_DAY,
+    ):
+        self.weekmask = weekmask
+        self.holidays = np.unique(np.asarray(holidays, dtype="datetime64[D]"))
+        self.hours_per_day = hours_per_day
+        self.busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=self.holidays)
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        weekmask: str = DEFAULT_WEEKMASK,
+        use_japanese_holidays: bool = True,
+        closures: Iterable[Tuple[DateLike, DateLike]] = (),
+        hours_per_day: float = DEFAULT_HOURS_PER_DAY,
+    ) -> "WorkingCalendar":
+        holidays = [expand_ranges(closures)]
+        if use_japanese_holidays:
+            holidays.append(to_datetime64(
+                japanese_holidays_between(date(MIN_YEAR, 1, 1), date(MAX_YEAR, 12, 31))
+            ))
+        return cls(weekmask, np.concatenate(holidays), hours_per_day)
+
+    def merge(self, other: "WorkingCalendar") -> "WorkingCalendar":
+        """Days that are working days in both calendars (e.g. a user within a project)"""
+        weekmask = "".join("1" if a == b == "1" else "0" for a, b in zip(self.weekmask, other.weekmask))
+        return WorkingCalendar(
+            weekmask, np.concatenate([self.holidays, other.holidays]), other.hours_per_day
+        )
+
+    def is_workday(self, dates) -> np.ndarray:
+        return np.is_busday(to_datetime64(dates), busdaycal=self.busdaycal)
+
+    def roll_forward(self, dates) -> np.ndarray:
+        """The date itself if it is a working day, else the next working day"""
+        return np.busday_offset(to_datetime64(dates), 0, roll="forward", busdaycal=self.busdaycal)
+
+    def add_workdays(self, dates, workdays) -> np.ndarray:
+        """Move `workdays` working days from each date (rolled forward first)"""
+        return np.busday_offset(
+            to_datetime64(dates), np.asarray(workdays, dtype=np.int64),
+            roll="forward", busdaycal=self.busdaycal,
+        )
+
+    def count_workdays(self, start, end) -> np.ndarray:
+        """Working days in [start, end); negative when end is before start. NaT counts as 0"""
+        start, end = to_datetime64(start), to_datetime64(end)
+        valid = ~(np.isnat(start) | np.isnat(end))
+        if np.all(valid):
+            return np.busday_count(start, end, busdaycal=self.busdaycal)
+        start_filled = np.where(np.isnat(start), np.datetime64("1970-01-01"), start)
+        end_filled = np.where(np.isnat(end), np.datetime64("1970-01-01"), end)
+        counts = np.busday_count(start_filled, end_filled, busdaycal=self.busdaycal)
+        return np.where(valid, counts, 0)
+
+    def offsets_to_dates(self, origin: DateLike, offsets) -> np.ndarray:
+        """Working-day offsets from `origin` to dates"""
+        return self.add_workdays(origin, offsets)
+
+    def dates_to_offsets(self, origin: DateLike, dates) -> np.ndarray:
+        """Working days from `origin` to each date (dates on non-working days round up)"""
+        return self.count_workdays(self.roll_forward(origin), dates)
+
+    def workdays(self, start: DateLike, end: DateLike) -> np.ndarray:
+        """Working days in [start, end]"""
+        days = np.arange(to_datetime64(start), to_datetime64(end) + 1, dtype="datetime64[D]")
+        return days[self.is_workday(days)]
+
+
+def to_date(value: np.datetime64) -> Optional[date]:
+    if np.isnat(value):
+        return None
+    return value.astype("datetime64[D]").item()
+
+
+def finish_offsets(days) -> np.ndarray:
+    """Offset of the working day in which a span of `days` from offset 0 ends"""
+    return np.maximum(np.ceil(np.asarray(days, dtype=np.float64) - 1e-6).astype(np.int64) - 1, 0)
+
+
+def default_calendar() -> WorkingCalendar:
+    return _DEFAULT
+
+
+_DEFAULT = WorkingCalendar.build()
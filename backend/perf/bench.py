@@ -0,0 +1,306 @@
+"""API hot-path benchmark suite.
+
+Runs the FastAPI app in-process through httpx's ASGI transport against the
+synthetic dataset and records p50/p95 latency, throughput and peak RSS per
+path. Results can be written to a JSON baseline and later runs are compared
+against it.
+
+Usage (from ``backend/``)::
+
+    python -m perf.bench --size small                    # compare with baseline
+    python -m perf.bench --size small --update-baseline  # record a new baseline
+"""
+import argparse
+import atexit
+import gc
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_ITERATIONS = 20
+DEFAULT_WARMUP = 2
+# A path regresses when it is both this much slower relative to the baseline
+# and slower by more than MIN_DELTA_MS, which keeps sub-millisecond paths from
+# flapping on noisy machines.
+DEFAULT_TOLERANCE = float(os.environ.get("BENCH_TOLERANCE", "1.0"))
+DEFAULT_MIN_DELTA_MS = float(os.environ.get("BENCH_MIN_DELTA_MS", "25"))
+DEFAULT_RSS_TOLERANCE_MB = float(os.environ.get("BENCH_RSS_TOLERANCE_MB", "128"))
+
+API = "/api/v1"
+
+RequestSpec = Tuple[str, str, Dict[str, Any]]
+
+
+@dataclass
+class Case:
+    name: str
+    build: Callable[[int, Dict[str, Any]], RequestSpec]
+    iterations: Optional[int] = None
+    after: Optional[Callable[[httpx.Response, Dict[str, Any]], None]] = None
+
+
+def _auth(ctx: Dict[str, Any]) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {ctx['token']}"}
+
+
+def _remember_task(response: httpx.Response, ctx: Dict[str, Any]) -> None:
+    ctx["created_task_ids"].append(response.json()["id"])
+
+
+def _created_task(i: int, ctx: Dict[str, Any]) -> int:
+    ids = ctx["created_task_ids"]
+    return ids[i % len(ids)]
+
+
+def _login_iterations(iterations: int) -> int:
+    # Every login is a bcrypt verification (~0.2s), keep it bounded
+    return max(3, min(iterations, 10))
+
+
+def build_cases(iterations: int) -> List[Case]:
+    """Describe every benchmarked request"""
+    return [
+        Case("login", lambda i, ctx: (
+            "POST", f"{API}/users/login/simple",
+            {"json": {"username": ctx["username"], "password": ctx["password"]}},
+        ), iterations=_login_iterations(iterations)),
+        Case("read_project_tasks", lambda i, ctx: (
+            "GET", f"{API}/tasks/project/{ctx['project_id']}", {},
+        )),
+        Case("get_gantt_data", lambda i, ctx: (
+            "GET", f"{API}/tasks/project/{ctx['project_id']}/gantt", {},
+        )),
+        Case("get_gantt_compact", lambda i, ctx: (
+            "GET", f"{API}/tasks/project/{ctx['project_id']}/gantt",
+            {"params": {"format": "compact"}, "headers": {"Accept-Encoding": "gzip"}},
+        )),
+        Case("get_gantt_collapsed", lambda i, ctx: (
+            "GET", f"{API}/tasks/project/{ctx['project_id']}/gantt",
+            {"params": {"format": "compact", "expanded": "", "start_date": "2025-01-01", "end_date": "2025-03-31"}},
+        )),
+        Case("get_task_hierarchy", lambda i, ctx: (
+            "GET", f"{API}/tasks/project/{ctx['project_id']}/hierarchy", {"headers": _auth(ctx)},
+        )),
+        Case("get_project_statistics", lambda i, ctx: (
+            "GET", f"{API}/projects/statistics", {},
+        )),
+        Case("export_projects_csv", lambda i, ctx: (
+            "GET", f"{API}/projects/export", {"params": {"format": "csv"}, "headers": _auth(ctx)},
+        )),
+        Case("export_projects_excel", lambda i, ctx: (
+            "GET", f"{API}/projects/export", {"params": {"format": "excel"}, "headers": _auth(ctx)},
+        )),
+        Case("export_projects_pdf", lambda i, ctx: (
+            "GET", f"{API}/projects/export", {"params": {"format": "pdf"}, "headers": _auth(ctx)},
+        )),
+        Case("create_task", lambda i, ctx: (
+            "POST", f"{API}/tasks/",
+            {"json": {
+                "name": f"ベンチマークタスク {i}", "description": "benchmark",
+                "project_id": ctx["write_project_id"], "estimated_hours": 8,
+                "start_date": "2025-02-03", "end_date": "2025-02-07",
+            }},
+        ), after=_remember_task),
+        Case("update_task", lambda i, ctx: (
+            "PUT", f"{API}/tasks/{_created_task(i, ctx)}",
+            {"json": {
+                "name": f"ベンチマークタスク {i} (更新)", "description": "benchmark",
+                "task_type": "task", "status": "in_progress", "priority": "medium",
+                "estimated_hours": 8, "actual_hours": 2, "start_date": "2025-02-04",
+                "end_date": "2025-02-10", "progress_percentage": 25,
+            }},
+        )),
+        Case("delete_task", lambda i, ctx: (
+            "DELETE", f"{API}/tasks/{ctx['created_task_ids'].pop()}", {},
+        )),
+    ]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run_suite(
+    app, dataset, *, iterations: int = DEFAULT_ITERATIONS, warmup: int = DEFAULT_WARMUP,
+    cases: Optional[List[Case]] = None,
+) -> Dict[str, Dict[str, float]]:
+    """Run every case and return latency/throughput/RSS figures keyed by case name"""
+    ctx: Dict[str, Any] = {
+        "username": dataset.admin_username,
+        "password": dataset.admin_password,
+        "project_id": dataset.project_ids[0],
+        "write_project_id": dataset.project_ids[-1],
+        "created_task_ids": [],
+    }
+    results: Dict[str, Dict[str, float]] = {}
+    # Keep full collections from scanning the test runner's long-lived heap
+    # mid-measurement; only objects created by the cases are tracked
+    gc.collect()
+    gc.freeze()
+    try:
+        await _run_cases(app, ctx, results, iterations, warmup, cases)
+    finally:
+        gc.unfreeze()
+    return results
+
+
+async def _run_cases(app, ctx, results, iterations, warmup, cases) -> None:
+    """Issue every case against the app, recording figures into `results`"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login = await client.post(
+            f"{API}/users/login/simple",
+            json={"username": ctx["username"], "password": ctx["password"]},
+        )
+        login.raise_for_status()
+        ctx["token"] = login.json()["access_token"]
+
+        for case in cases or build_cases(iterations):
+            count = case.iterations or iterations
+            # Writes consume what they create, so they are not warmed up
+            rounds = count if case.after or case.name.startswith(("update_", "delete_")) else count + warmup
+            timings: List[float] = []
+            started = time.perf_counter()
+            for i in range(rounds):
+                method, url, kwargs = case.build(i, ctx)
+                t0 = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                elapsed = time.perf_counter() - t0
+                if response.status_code >= 400:
+                    raise RuntimeError(
+                        f"{case.name}: {method} {url} returned {response.status_code}: {response.text[:200]}"
+                    )
+                if case.after:
+                    case.after(response, ctx)
+                if i >= rounds - count:
+                    timings.append(elapsed)
+                else:
+                    started = time.perf_counter()
+            total = time.perf_counter() - started
+            results[case.name] = {
+                "requests": len(timings),
+                "p50_ms": round(percentile(timings, 50) * 1000, 3),
+                "p95_ms": round(percentile(timings, 95) * 1000, 3),
+                "throughput_rps": round(len(timings) / total, 2) if total > 0 else 0.0,
+                "peak_rss_mb": round(_peak_rss_mb(), 1),
+            }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    *,
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+    rss_tolerance_mb: float = DEFAULT_RSS_TOLERANCE_MB,
+) -> List[str]:
+    """Return a human readable line for every metric that regressed"""
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            regressions.append(f"{name}: not measured in this run")
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            limit = max(base[metric] * (1 + tolerance), base[metric] + min_delta_ms)
+            if current[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {current[metric]:.1f} > {limit:.1f} (baseline {base[metric]:.1f})"
+                )
+        rss_limit = base["peak_rss_mb"] + rss_tolerance_mb
+        if current["peak_rss_mb"] > rss_limit:
+            regressions.append(
+                f"{name}: peak_rss_mb {current['peak_rss_mb']:.0f} > {rss_limit:.0f} "
+                f"(baseline {base['peak_rss_mb']:.0f})"
+            )
+    return regressions
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(size_name: str, results: Dict[str, Dict[str, float]], path: Path = BASELINE_PATH) -> None:
+    baseline = load_baseline(path)
+    baseline[size_name] = results
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False, sort_keys=True)
+        f.write("\n")
+
+
+def format_results(results: Dict[str, Dict[str, float]]) -> str:
+    lines = [f"{'path':<26}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>10}{'rss MB':>10}"]
+    for name, r in results.items():
+        lines.append(
+            f"{name:<26}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['throughput_rps']:>10.1f}{r['peak_rss_mb']:>10.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the API hot paths")
+    parser.add_argument("--size", default="small", help="synthetic dataset size (small/medium/large)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="record results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    # The engine is created from settings at import time, so point it at a
+    # scratch database before anything under app/ is imported.
+    scratch = tempfile.mkdtemp(prefix="wbs-bench-")
+    atexit.register(shutil.rmtree, scratch, ignore_errors=True)
+    os.environ["USE_SQLITE"] = "true"
+    os.environ["SQLITE_URL"] = f"sqlite:///{scratch}/bench.db"
+
+    import asyncio
+    from app.database import SessionLocal, create_tables
+    from app.main import app
+    from .dataset import populate
+
+    create_tables()
+    with SessionLocal() as db:
+        dataset = populate(db, args.size)
+    print(f"dataset '{args.size}': {len(dataset.project_ids)} projects, {dataset.task_count} tasks")
+
+    results = asyncio.run(run_suite(app, dataset, iterations=args.iterations))
+    print(format_results(results))
+
+    if args.update_baseline:
+        save_baseline(args.size, results, args.baseline)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline).get(args.size)
+    if not baseline:
+        print(f"no baseline for '{args.size}' in {args.baseline}; run with --update-baseline")
+        return 0
+    regressions = compare(results, baseline, tolerance=args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Synthetic dataset for benchmarks and load tests.
+
+The generator writes straight through the model tables with bulk Core
+inserts, so a medium-sized portfolio (~20k tasks) is created in a couple of
+seconds. Ids are assigned up front which lets the hierarchy, dependencies
+and assignments be built without reading anything back.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.security import get_password_hash
+from app.crud.rollup import task_rollup
+from app.crud.time_totals import time_totals
+from app.models import (
+    User, Project, ProjectMember, Task, TaskDependency, TaskAssignment,
+    TimeTracking, TaskComment, UserRole, ProjectStatus, TaskType, TaskStatus,
+    DependencyType, Priority,
+)
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    users: int
+    projects: int
+    phases_per_project: int
+    tasks_per_phase: int
+    subtasks_per_task: int
+    time_entries_per_task: int = 2
+    comments_per_task: int = 1
+
+    @property
+    def tasks_per_project(self) -> int:
+        tasks = self.phases_per_project * self.tasks_per_phase
+        return self.phases_per_project + tasks + tasks * self.subtasks_per_task
+
+
+SIZES: Dict[str, DatasetSize] = {
+    "small": DatasetSize(users=20, projects=4, phases_per_project=4, tasks_per_phase=15, subtasks_per_task=2),
+    "medium": DatasetSize(users=100, projects=20, phases_per_project=6, tasks_per_phase=40, subtasks_per_task=3),
+    "large": DatasetSize(users=500, projects=50, phases_per_project=10, tasks_per_phase=50, subtasks_per_task=4),
+}
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "admin"
+MEMBER_PASSWORD = "password"
+
+START_DATE = datetime(2025, 1, 6, 9, 0, 0)
+
+
+@dataclass
+class SyntheticDataset:
+    size_name: str
+    admin_username: str = ADMIN_USERNAME
+    admin_password: str = ADMIN_PASSWORD
+    user_ids: List[int] = field(default_factory=list)
+    project_ids: List[int] = field(default_factory=list)
+    task_ids_by_project: Dict[int, List[int]] = field(default_factory=dict)
+
+    @property
+    def task_count(self) -> int:
+        return sum(len(ids) for ids in self.task_ids_by_project.values())
+
+
+def _next_id(db: Session, model) -> int:
+    return (db.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def populate(db: Session, size_name: str = "small", seed: int = 0) -> SyntheticDataset:
+    """Create users, projects and a three level WBS per project"""
+    size = SIZES[size_name]
+    rng = random.Random(seed)
+    dataset = SyntheticDataset(size_name=size_name)
+
+    # Users - bcrypt is slow, so every member shares one hash
+    admin = db.query(User).filter(User.username == ADMIN_USERNAME).first()
+    user_id = _next_id(db, User)
+    users = []
+    if admin is None:
+        users.append({
+            "id": user_id, "username": ADMIN_USERNAME, "email": "admin@example.com",
+            "full_name": "管理者", "hashed_password": get_password_hash(ADMIN_PASSWORD),
+            "role": UserRole.SYSTEM_ADMIN, "is_active": True, "department": None, "hourly_rate": 0.0,
+            "daily_capacity": 8.0,
+        })
+        admin_id = user_id
+        user_id += 1
+    else:
+        admin_id = admin.id
+
+    member_hash = get_password_hash(MEMBER_PASSWORD)
+    departments = ["開発部", "基盤部", "品質保証部", "企画部"]
+    for i in range(size.users):
+        users.append({
+            "id": user_id + i, "username": f"user{user_id + i}",
+            "email": f"user{user_id + i}@example.com", "full_name": f"ユーザー {user_id + i}",
+            "hashed_password": member_hash, "role": UserRole.TEAM_MEMBER, "is_active": True,
+            "department": departments[i % len(departments)],
+            "hourly_rate": float(rng.choice([3000, 4000, 5000, 6000])),
+            "daily_capacity": 8.0,
+        })
+    if users:
+        db.execute(User.__table__.insert(), users)
+    member_ids = [u["id"] for u in users if u["id"] != admin_id] or [admin_id]
+    dataset.user_ids = [admin_id] + member_ids
+
+    project_id = _next_id(db, Project)
+    task_id = _next_id(db, Task)
+    projects, members, tasks, dependencies = [], [], [], []
+    assignments, time_entries, comments = [], [], []
+
+    statuses = list(TaskStatus)
+    priorities = list(Priority)
+
+    for p in range(size.projects):
+        pid = project_id + p
+        project_start = START_DATE + timedelta(days=7 * p)
+        projects.append({
+            "id": pid, "name": f"合成プロジェクト {pid}", "description": f"Synthetic project {pid}",
+            "status": ProjectStatus.ACTIVE, "start_date": project_start,
+            "end_date": project_start + timedelta(days=30 * size.phases_per_project),
+            "budget": 1_000_000.0, "owner_id": admin_id, "is_template": False,
+        })
+        team = rng.sample(member_ids, min(len(member_ids), 8))
+        members.append({"project_id": pid, "user_id": admin_id, "role": UserRole.PROJECT_OWNER, "allocation_percentage": 100.0})
+        for uid in team:
+            if uid != admin_id:
+                members.append({"project_id": pid, "user_id": uid, "role": UserRole.TEAM_MEMBER, "allocation_percentage": 50.0})
+
+        project_task_ids = []
+        for ph in range(size.phases_per_project):
+            phase_id = task_id
+            task_id += 1
+            phase_start = project_start + timedelta(days=30 * ph)
+            tasks.append({
+                "id": phase_id, "project_id": pid, "parent_id": None,
+                "name": f"フェーズ {ph + 1}", "description": f"Phase {ph + 1}",
+                "task_type": TaskType.PHASE, "status": TaskStatus.IN_PROGRESS,
+                "priority": Priority.HIGH, "planned_start_date": phase_start,
+                "planned_end_date": phase_start + timedelta(days=29),
+                "estimated_hours": 0.0, "actual_hours": 0.0, "remaining_hours": 0.0,
+                "progress_percentage": 0.0, "wbs_code": f"{ph + 1}",
+                "path": f"/{phase_id}/", "depth": 0, "sort_order": ph + 1, "sort_key": f"{ph + 1:05d}",
+            })
+            project_task_ids.append(phase_id)
+
+            previous_id = None
+            for t in range(size.tasks_per_phase):
+                tid = task_id
+                task_id += 1
+                start = phase_start + timedelta(days=rng.randint(0, 20))
+                duration = rng.randint(1, 8)
+                estimated = float(duration * 8)
+                progress = float(rng.choice([0, 25, 50, 75, 100]))
+                tasks.append({
+                    "id": tid, "project_id": pid, "parent_id": phase_id,
+                    "name": f"タスク {ph + 1}.{t + 1} 設計・実装", "description": "合成データ " * 10,
+                    "task_type": TaskType.TASK, "status": rng.choice(statuses),
+                    "priority": rng.choice(priorities), "planned_start_date": start,
+                    "planned_end_date": start + timedelta(days=duration),
+                    "estimated_hours": estimated, "actual_hours": 0.0,
+                    "remaining_hours": estimated * (100 - progress) / 100,
+                    "progress_percentage": progress, "wbs_code": f"{ph + 1}.{t + 1}",
+                    "path": f"/{phase_id}/{tid}/", "depth": 1,
+                    "sort_order": t + 1, "sort_key": f"{ph + 1:05d}.{t + 1:05d}",
+                })
+                project_task_ids.append(tid)
+                if previous_id is not None and rng.random() < 0.6:
+                    dependencies.append({
+                        "predecessor_id": previous_id, "successor_id": tid,
+                        "dependency_type": DependencyType.FINISH_TO_START,
+                        "lag_days": rng.choice([0, 0, 1, 2]),
+                    })
+                previous_id = tid
+
+                for s in range(size.subtasks_per_task):
+                    sid = task_id
+                    task_id += 1
+                    assignee = rng.choice(team)
+                    tasks.append({
+                        "id": sid, "project_id": pid, "parent_id": tid,
+                        "name": f"サブタスク {ph + 1}.{t + 1}.{s + 1}", "description": "詳細作業",
+                        "task_type": TaskType.SUBTASK, "status": rng.choice(statuses),
+                        "priority": rng.choice(priorities), "planned_start_date": start,
+                        "planned_end_date": start + timedelta(days=max(1, duration // 2)),
+                        "estimated_hours": 4.0, "actual_hours": 0.0, "remaining_hours": 4.0,
+                        "progress_percentage": 0.0, "wbs_code": f"{ph + 1}.{t + 1}.{s + 1}",
+                        "path": f"/{phase_id}/{tid}/{sid}/", "depth": 2,
+                        "sort_order": s + 1, "sort_key": f"{ph + 1:05d}.{t + 1:05d}.{s + 1:05d}",
+                    })
+                    project_task_ids.append(sid)
+                    assignments.append({"task_id": sid, "user_id": assignee, "allocation_percentage": 50.0})
+                    for e in range(size.time_entries_per_task):
+                        time_entries.append({
+                            "task_id": sid, "user_id": assignee,
+                            "date": start + timedelta(days=e), "hours": float(rng.randint(1, 4)),
+                            "billable": rng.random() < 0.8,
+                        })
+                    for c in range(size.comments_per_task):
+                        comments.append({"task_id": sid, "user_id": assignee, "content": f"コメント {c + 1}"})
+
+        dataset.project_ids.append(pid)
+        dataset.task_ids_by_project[pid] = project_task_ids
+
+    for model, rows in (
+        (Project, projects), (ProjectMember, members), (Task, tasks),
+        (TaskDependency, dependencies), (TaskAssignment, assignments),
+        (TimeTracking, time_entries), (TaskComment, comments),
+    ):
+        if rows:
+            db.execute(model.__table__.insert(), rows)
+    # Bulk inserts bypass the incremental rollup and time totals, so compute them in one pass
+    for pid in dataset.project_ids:
+        task_rollup.rebuild(db, project_id=pid)
+        time_totals.rebuild_daily(db, project_id=pid)
+    db.commit()
+    return dataset
@@ -0,0 +1,132 @@
+"""Encode time and body size of the list endpoints.
+
+Each list payload is fetched from the app once and then timed through the
+steps a response can take:
+
+* ``jsonable_encoder`` - the walk FastAPI applies to dicts a handler returns
+  (skipped by handlers returning ORJSONResponse, and by response models)
+* ``json_dumps``       - how starlette's JSONResponse, the former default, rendered
+* ``orjson``           - how ORJSONResponse, the default now, renders
+
+Body sizes are those sent by the app for each Accept-Encoding (``br`` only
+when the optional brotli package is installed).
+
+Usage (from ``backend/``)::
+
+    python -m perf.encoding --size small
+    python -m perf.encoding --size medium --iterations 50 --json encoding.json
+"""
+import argparse
+import atexit
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+API = "/api/v1"
+DEFAULT_ITERATIONS = 20
+
+# name -> path of a list endpoint, formatted with the dataset's first project
+LIST_ENDPOINTS = {
+    "project_tasks": "/tasks/project/{project_id}",
+    "gantt": "/tasks/project/{project_id}/gantt",
+    "hierarchy": "/tasks/project/{project_id}/hierarchy",
+    "projects": "/projects/",
+}
+
+
+def _json_dumps(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _steps() -> Dict[str, Callable[[Any], Any]]:
+    from fastapi.encoders import jsonable_encoder
+    from app.utils.encoding import dumps
+    return {"jsonable_encoder": jsonable_encoder, "json_dumps": _json_dumps, "orjson": dumps}
+
+
+def _median_ms(step: Callable[[Any], Any], payload: Any, iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        step(payload)
+        timings.append(time.perf_counter() - t0)
+    timings.sort()
+    return round(timings[len(timings) // 2] * 1000, 3)
+
+
+def measure(client, project_id: int, *, iterations: int = DEFAULT_ITERATIONS) -> Dict[str, Dict[str, float]]:
+    """Encode times (ms) and body sizes (bytes) per list endpoint, through a logged in `client`"""
+    from app.utils.encoding import brotli
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    steps = _steps()
+    results: Dict[str, Dict[str, float]] = {}
+    for name, path in LIST_ENDPOINTS.items():
+        url = f"{API}{path.format(project_id=project_id)}"
+        sizes = {}
+        for encoding in encodings:
+            response = client.get(url, headers={"Accept-Encoding": encoding})
+            response.raise_for_status()
+            if encoding == "identity":
+                payload = json.loads(response.content)
+            sizes[f"{encoding}_bytes"] = int(response.headers.get("content-length", len(response.content)))
+        results[name] = {
+            **{f"{key}_ms": _median_ms(step, payload, iterations) for key, step in steps.items()},
+            **sizes,
+        }
+    return results
+
+
+def format_results(results: Dict[str, Dict[str, float]]) -> str:
+    columns = [key for key in next(iter(results.values()))]
+    lines = [f"{'endpoint':<16}" + "".join(f"{key:>22}" for key in columns)]
+    for name, row in results.items():
+        lines.append(f"{name:<16}" + "".join(f"{row[key]:>22,.3f}" if key.endswith("_ms") else f"{row[key]:>22,}"
+                                             for key in columns))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare JSON encode time and body size on the list endpoints")
+    parser.add_argument("--size", default="small", help="synthetic dataset size (small/medium/large)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--json", type=Path, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    # As in perf.bench, point the engine at a scratch database before importing app/
+    scratch = tempfile.mkdtemp(prefix="wbs-encoding-")
+    atexit.register(shutil.rmtree, scratch, ignore_errors=True)
+    os.environ["USE_SQLITE"] = "true"
+    os.environ["SQLITE_URL"] = f"sqlite:///{scratch}/encoding.db"
+
+    from fastapi.testclient import TestClient
+    from app.database import SessionLocal, create_tables
+    from app.main import app
+    from .dataset import populate
+
+    create_tables()
+    with SessionLocal() as db:
+        dataset = populate(db, args.size)
+    print(f"dataset '{args.size}': {len(dataset.project_ids)} projects, {dataset.task_count} tasks")
+
+    client = TestClient(app)
+    login = client.post(f"{API}/users/login/simple", json={
+        "username": dataset.admin_username, "password": dataset.admin_password,
+    })
+    login.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+    results = measure(client, dataset.project_ids[0], iterations=args.iterations)
+    print(format_results(results))
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
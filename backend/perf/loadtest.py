@@ -0,0 +1,323 @@
+"""Load generator simulating concurrent Gantt editors.
+
+Each virtual user opens a project and then loops over a weighted mix of
+actions until the run ends:
+
+* ``open``        - project detail + task list
+* ``poll``        - Gantt data refresh
+* ``drag``        - ``PUT /tasks/{id}`` with shifted dates
+* ``dependency``  - ``POST /tasks/dependencies``
+* ``time``        - ``POST /tasks/{id}/time``
+
+By default a scratch SQLite database is seeded with the synthetic dataset and
+a uvicorn server is started for the run, so the database settings can be
+varied per run (``--journal-mode wal``, ``--busy-timeout``, ``--database-url``).
+Pass ``--url`` to target a server that is already running instead.
+
+Usage (from ``backend/``)::
+
+    python -m perf.loadtest --users 200 --duration 60 --workers 4
+    python -m perf.loadtest --users 200 --journal-mode wal --busy-timeout 5000
+    python -m perf.loadtest --mix open=1,poll=20,drag=2,dependency=0,time=1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from .bench import percentile
+
+API = "/api/v1"
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+ACTIONS = ("open", "poll", "drag", "dependency", "time")
+DEFAULT_MIX = "open=1,poll=10,drag=3,dependency=1,time=2"
+LOCK_PATTERN = re.compile(r"database is locked|database table is locked", re.IGNORECASE)
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse ``open=1,poll=10,...`` into action weights"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ACTIONS:
+            raise argparse.ArgumentTypeError(f"unknown action '{name}' (choose from {', '.join(ACTIONS)})")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("at least one action needs a positive weight")
+    return mix
+
+
+class Stats:
+    """Per-action latency samples and outcome counters"""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.client_errors: Dict[str, int] = defaultdict(int)
+        self.lock_errors = 0
+
+    def record(self, action: str, elapsed: float, response: Optional[httpx.Response]) -> None:
+        self.latencies[action].append(elapsed)
+        if response is None or response.status_code >= 500:
+            self.errors[action] += 1
+            if response is not None and LOCK_PATTERN.search(response.text):
+                self.lock_errors += 1
+        elif response.status_code >= 400:
+            self.client_errors[action] += 1
+
+    def report(self, duration: float, server_lock_errors: Optional[int]) -> Dict:
+        total = sum(len(v) for v in self.latencies.values())
+        errors = sum(self.errors.values())
+        actions = {}
+        for action, samples in sorted(self.latencies.items()):
+            actions[action] = {
+                "requests": len(samples),
+                "throughput_rps": round(len(samples) / duration, 2),
+                "p50_ms": round(percentile(samples, 50) * 1000, 1),
+                "p95_ms": round(percentile(samples, 95) * 1000, 1),
+                "p99_ms": round(percentile(samples, 99) * 1000, 1),
+                "max_ms": round(max(samples) * 1000, 1),
+                "error_rate": round(self.errors[action] / len(samples), 4),
+                "client_errors": self.client_errors[action],
+            }
+        return {
+            "duration_s": round(duration, 1),
+            "requests": total,
+            "throughput_rps": round(total / duration, 2) if duration else 0.0,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "lock_errors": max(self.lock_errors, server_lock_errors or 0),
+            "actions": actions,
+        }
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, token: str, project_ids: List[int],
+                 mix: Dict[str, float], think_ms: float, rng: random.Random, stats: Stats):
+        self.client = client
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.project_ids = project_ids
+        self.actions = list(mix)
+        self.weights = [mix[a] for a in self.actions]
+        self.think_ms = think_ms
+        self.rng = rng
+        self.stats = stats
+        self.project_id: Optional[int] = None
+        self.tasks: List[dict] = []
+
+    async def _request(self, action: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        t0 = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.stats.record(action, time.perf_counter() - t0, response)
+        return response
+
+    async def open(self) -> None:
+        self.project_id = self.rng.choice(self.project_ids)
+        await self._request("open", "GET", f"{API}/projects/{self.project_id}")
+        response = await self._request("open", "GET", f"{API}/tasks/project/{self.project_id}")
+        if response is not None and response.status_code == 200:
+            self.tasks = response.json()
+
+    async def poll(self) -> None:
+        await self._request("poll", "GET", f"{API}/tasks/project/{self.project_id}/gantt")
+
+    async def drag(self) -> None:
+        task = self.rng.choice(self.tasks)
+        shift = timedelta(days=self.rng.choice([-2, -1, 1, 2]))
+        for key in ("start_date", "end_date"):
+            if task.get(key):
+                task[key] = (datetime.fromisoformat(str(task[key])) + shift).isoformat(sep=" ")
+        await self._request("drag", "PUT", f"{API}/tasks/{task['id']}", json=task)
+
+    async def dependency(self) -> None:
+        predecessor, successor = self.rng.sample(self.tasks, 2)
+        await self._request("dependency", "POST", f"{API}/tasks/dependencies", json={
+            "predecessor_id": predecessor["id"], "successor_id": successor["id"],
+            "dependency_type": "FINISH_TO_START", "lag_days": 0,
+        })
+
+    async def time(self) -> None:
+        task = self.rng.choice(self.tasks)
+        await self._request("time", "POST", f"{API}/tasks/{task['id']}/time", json={
+            "task_id": task["id"], "date": datetime.now().isoformat(),
+            "hours": self.rng.choice([0.5, 1.0, 2.0]), "description": "load test",
+        })
+
+    async def run(self, deadline: float) -> None:
+        await self.open()
+        while time.monotonic() < deadline:
+            if self.think_ms:
+                await asyncio.sleep(self.rng.expovariate(1000.0 / self.think_ms))
+            action = self.rng.choices(self.actions, self.weights)[0]
+            if action != "open" and len(self.tasks) < 2:
+                action = "open"
+            await getattr(self, action)()
+
+
+async def run_load(base_url: str, *, users: int, duration: float, mix: Dict[str, float],
+                   think_ms: float, username: str, password: str, seed: int = 0) -> Stats:
+    stats = Stats()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        login = await client.post(f"{API}/users/login/simple", json={"username": username, "password": password})
+        login.raise_for_status()
+        token = login.json()["access_token"]
+        projects = (await client.get(f"{API}/projects/")).json()
+        project_ids = [p["id"] for p in projects]
+        if not project_ids:
+            raise RuntimeError("the target server has no projects")
+
+        deadline = time.monotonic() + duration
+        rng = random.Random(seed)
+        vusers = [
+            VirtualUser(client, token, project_ids, mix, think_ms, random.Random(rng.random()), stats)
+            for _ in range(users)
+        ]
+        await asyncio.gather(*(u.run(deadline) for u in vusers))
+    return stats
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_healthy(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup; see the server log")
+        try:
+            if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not become healthy within {timeout}s")
+
+
+def _seed_scratch_database(env: Dict[str, str], size: str) -> None:
+    """Populate the database in a child process so this one never binds an engine"""
+    code = (
+        "from app.database import SessionLocal, create_tables\n"
+        "from perf.dataset import populate\n"
+        "create_tables()\n"
+        "with SessionLocal() as db:\n"
+        f"    d = populate(db, {size!r})\n"
+        "print(f'seeded {len(d.project_ids)} projects, {d.task_count} tasks')\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True)
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"{'action':<12}{'reqs':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'err %':>8}{'4xx':>6}",
+    ]
+    for action, r in report["actions"].items():
+        lines.append(
+            f"{action:<12}{r['requests']:>8}{r['throughput_rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+            f"{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}{r['error_rate'] * 100:>8.2f}{r['client_errors']:>6}"
+        )
+    lines.append(
+        f"total: {report['requests']} requests in {report['duration_s']}s, "
+        f"{report['throughput_rps']} req/s, error rate {report['error_rate'] * 100:.2f}%, "
+        f"lock errors {report['lock_errors']}"
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate concurrent Gantt editors against a uvicorn server")
+    parser.add_argument("--url", help="target an already running server instead of starting one")
+    parser.add_argument("--server-log", type=Path, help="server log to scan for lock errors (with --url)")
+    parser.add_argument("--users", type=int, default=200, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="run time in seconds")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"action weights (default {DEFAULT_MIX})")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="mean think time between actions")
+    parser.add_argument("--size", default="small", help="synthetic dataset size for the scratch database")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--journal-mode", help="SQLite journal mode for the server, e.g. wal")
+    parser.add_argument("--busy-timeout", type=int, help="SQLite busy timeout (ms) for the server")
+    parser.add_argument("--database-url", help="run the server against this database instead of scratch SQLite")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--json", type=Path, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    server: Optional[subprocess.Popen] = None
+    server_log = args.server_log
+    base_url = args.url
+    if base_url is None:
+        scratch = Path(tempfile.mkdtemp(prefix="wbs-load-"))
+        env = dict(os.environ)
+        if args.database_url:
+            env.update(USE_SQLITE="false", DATABASE_URL=args.database_url)
+        else:
+            env.update(USE_SQLITE="true", SQLITE_URL=f"sqlite:///{scratch}/load.db")
+        if args.journal_mode:
+            env["SQLITE_JOURNAL_MODE"] = args.journal_mode
+        if args.busy_timeout is not None:
+            env["SQLITE_BUSY_TIMEOUT_MS"] = str(args.busy_timeout)
+        _seed_scratch_database(env, args.size)
+
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server_log = scratch / "server.log"
+        # The server writes through its own copy of the descriptor
+        with open(server_log, "w") as log_file:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+                 "--port", str(port), "--workers", str(args.workers), "--no-access-log"],
+                cwd=BACKEND_DIR, env=env, stdout=log_file, stderr=subprocess.STDOUT,
+            )
+
+    try:
+        if server is not None:
+            _wait_until_healthy(base_url, server)
+        started = time.monotonic()
+        stats = asyncio.run(run_load(
+            base_url, users=args.users, duration=args.duration, mix=args.mix,
+            think_ms=args.think_ms, username=args.username, password=args.password,
+        ))
+        elapsed = time.monotonic() - started
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    server_locks = None
+    if server_log and server_log.exists():
+        server_locks = len(LOCK_PATTERN.findall(server_log.read_text(errors="replace")))
+    report = stats.report(elapsed, server_locks)
+    report["config"] = {
+        "users": args.users, "workers": args.workers, "mix": args.mix, "think_ms": args.think_ms,
+        "journal_mode": args.journal_mode, "busy_timeout_ms": args.busy_timeout,
+        "database": "external" if args.url else (args.database_url or "sqlite"),
+    }
+    print(format_report(report))
+    if server_log:
+        print(f"server log: {server_log}")
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import atexit
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+# The engine is created from settings when app.database is imported, so the
+# scratch database has to be configured before any app module is loaded.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+_scratch_dir = tempfile.mkdtemp(prefix="wbs-tests-")
+atexit.register(shutil.rmtree, _scratch_dir, ignore_errors=True)
+os.environ["USE_SQLITE"] = "true"
+os.environ["SQLITE_URL"] = f"sqlite:///{_scratch_dir}/test.db"
+# app.main mounts app/static relative to the working directory
+os.chdir(BACKEND_DIR)
+
+from app.database import SessionLocal, create_tables  # noqa: E402
+from app.main import app as fastapi_app  # noqa: E402
+from perf.dataset import populate  # noqa: E402
+
+DATASET_SIZE = os.environ.get("BENCH_DATASET", "small")
+
+
+@pytest.fixture(scope="session")
+def app():
+    return fastapi_app
+
+
+@pytest.fixture(scope="session")
+def dataset():
+    """Synthetic dataset shared by the whole session"""
+    create_tables()
+    with SessionLocal() as db:
+        return populate(db, DATASET_SIZE)
+
+
+@pytest.fixture
+def db(dataset):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def login(app, dataset):
+    """Factory of TestClients logged in as a user, the dataset's admin by default"""
+    def _login(username=None, password=None):
+        client = TestClient(app)
+        response = client.post("/api/v1/users/login/simple", json={
+            "username": username or dataset.admin_username, "password": password or dataset.admin_password,
+        })
+        assert response.status_code == 200, response.text
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        return client
+    return _login
+
+
+@pytest.fixture(scope="session")
+def client(login):
+    """TestClient logged in as the dataset's admin, shared by the session"""
+    return login()
@@ -0,0 +1,109 @@
+from sqlalchemy import text
+
+from app.cli import main as cli
+from app.models import Project, ProjectScenario, ProjectStatus, ScenarioTaskOverride, Task
+from app.models.archive import ARCHIVE_TABLES
+from test_cascade import attach_dependents, orphans
+from test_query_plans import captured_statements, full_table_scans
+from test_rollup import make_tree
+
+
+def finished_project(db, dataset):
+    user_id = dataset.user_ids[0]
+    outside = db.get(Task, dataset.task_ids_by_project[dataset.project_ids[0]][-1])
+    project, phase, first, second, leaves = make_tree(db, user_id)
+    attach_dependents(db, project, [phase, first, second, *leaves], outside, user_id)
+    scenario = ProjectScenario(project_id=project.id, name="遅延案", created_by=user_id)
+    db.add(scenario)
+    db.flush()
+    db.add(ScenarioTaskOverride(scenario_id=scenario.id, task_id=second.id, estimated_hours=60.0))
+    project.status = ProjectStatus.COMPLETED
+    db.commit()
+    return project.id, [phase.id, first.id, second.id, *(leaf.id for leaf in leaves)]
+
+
+def rows(db, table, project_id):
+    """Rows of a project in a hot or archive table, as sorted tuples"""
+    tasks = "archived_tasks" if table.startswith("archived_") else "tasks"
+    if table.endswith("tasks"):
+        where = "project_id = :p"
+    elif table.endswith("task_dependencies"):
+        where = f"successor_id IN (SELECT id FROM {tasks} WHERE project_id = :p)"
+    else:
+        where = f"task_id IN (SELECT id FROM {tasks} WHERE project_id = :p)"
+    return sorted(tuple(r) for r in db.execute(text(f"SELECT * FROM {table} WHERE {where}"), {"p": project_id}))
+
+
+def snapshot(db, project_id):
+    return {name: rows(db, name, project_id) for name in ARCHIVE_TABLES}
+
+
+def test_archive_moves_rows_and_restore_brings_them_back(client, dataset, db):
+    project_id, task_ids = finished_project(db, dataset)
+    before = snapshot(db, project_id)
+
+    with captured_statements() as statements:
+        response = client.post(f"/api/v1/projects/{project_id}/archive")
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    assert (summary["task_count"], summary["time_entry_count"], summary["logged_hours"]) == (5, 5, 5.0)
+    assert summary["estimated_hours"] == 80.0 and summary["progress_percentage"] == 40.0
+    assert full_table_scans(statements) == []
+
+    # Live tables no longer hold the project; the archive holds exactly what they had
+    assert all(not rows(db, name, project_id) for name in ARCHIVE_TABLES)
+    assert {name: rows(db, f"archived_{name}", project_id) for name in ARCHIVE_TABLES} == before
+    assert orphans(db) == {}
+    assert client.get(f"/api/v1/projects/{project_id}/archive").json()["task_count"] == 5
+    progress = {p["id"]: p for p in client.get("/api/v1/projects/statistics").json()["project_progress"]}
+    assert progress[project_id]["total_tasks"] == 5 and progress[project_id]["archived_at"]
+    assert client.post(f"/api/v1/projects/{project_id}/archive").status_code == 400
+
+    response = client.post(f"/api/v1/projects/{project_id}/restore")
+    assert response.status_code == 200, response.text
+    assert response.json()["restored"]["tasks"] == 5
+    assert response.json()["restored"]["scenario_task_overrides"] == 1
+    assert snapshot(db, project_id) == before
+    assert all(not rows(db, f"archived_{name}", project_id) for name in ARCHIVE_TABLES)
+    assert client.get(f"/api/v1/projects/{project_id}").json()["archived_at"] is None
+    assert client.post(f"/api/v1/projects/{project_id}/restore").status_code == 400
+
+    running = make_tree(db, dataset.user_ids[0])[0]
+    assert client.post(f"/api/v1/projects/{running.id}/archive").status_code == 400
+
+
+def test_restore_shifts_ids_taken_while_archived(client, dataset, db):
+    project_id, task_ids = finished_project(db, dataset)
+    before = snapshot(db, project_id)
+    assert cli(["archive-projects", "--project-id", str(project_id)]) == 0
+
+    # New tasks reuse the freed ids
+    other = db.get(Project, dataset.project_ids[2])
+    reused = Task(id=max(task_ids), project_id=other.id, name="再利用")
+    db.add(reused)
+    db.commit()
+
+    assert client.post(f"/api/v1/projects/{project_id}/restore").status_code == 200
+    after = snapshot(db, project_id)
+    assert {name: len(r) for name, r in after.items()} == {name: len(r) for name, r in before.items()}
+    db.expire_all()
+    restored = db.query(Task).filter(Task.project_id == project_id).order_by(Task.sort_key).all()
+    assert min(t.id for t in restored) > max(task_ids)
+    assert [t.wbs_code.partition(".")[2] for t in restored] == ["", "1", "1.1", "1.2", "2"]
+    by_id = {t.id: t for t in restored}
+    for t in restored:
+        assert t.parent_id is None or t.path == by_id[t.parent_id].path + f"{t.id}/"
+    assert db.get(Task, max(task_ids)).name == "再利用"
+    # Scenario overrides follow their shifted tasks
+    scenario_id = db.query(ProjectScenario.id).filter(ProjectScenario.project_id == project_id).scalar()
+    tasks = {t["id"]: t for t in client.get(f"/api/v1/scenarios/{scenario_id}/tasks").json()}
+    assert tasks[restored[-1].id]["estimated_hours"] == 60.0
+    assert orphans(db) == {}
+
+    # Deleting an archived project clears its archive rows too
+    project_id, _ = finished_project(db, dataset)
+    assert client.post(f"/api/v1/projects/{project_id}/archive").status_code == 200
+    assert client.delete(f"/api/v1/projects/{project_id}").status_code == 200
+    assert all(not rows(db, f"archived_{name}", project_id) for name in ARCHIVE_TABLES)
+    assert db.execute(text("SELECT count(*) FROM project_archives WHERE project_id = :p"),
+                      {"p": project_id}).scalar() == 0
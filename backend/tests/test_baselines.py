@@ -0,0 +1,79 @@
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app import crud
+from app.models import Task
+from app.utils.baseline import TaskVectors, pack, unpack, variance
+from app.utils.work_calendar import default_calendar
+from test_rollup import make_tree
+
+
+def test_variance_reports_slip_and_effort_per_task_and_phase(client, dataset, db):
+    project, phase, first, second, (sub1, sub2) = make_tree(db, dataset.user_ids[0])
+    created = client.post(f"/api/v1/baselines/project/{project.id}", json={"name": "計画承認時"})
+    assert created.status_code == 200, created.text
+    baseline = created.json()
+    assert (baseline["task_count"], baseline["estimated_hours"], baseline["end_date"]) == (
+        5, 80.0, "2025-02-07T00:00:00"
+    )
+    assert client.post(f"/api/v1/baselines/project/{project.id}", json={"name": "計画承認時"}).status_code == 400
+
+    # Replan: the second task finishes a week later with more effort, a leaf is replaced by a new one
+    second.planned_end_date = datetime(2025, 2, 14)
+    second.estimated_hours = 48.0
+    added = Task(project_id=project.id, parent_id=first.id, name="サブ3", estimated_hours=8.0,
+                 planned_start_date=datetime(2025, 1, 20), planned_end_date=datetime(2025, 1, 24))
+    db.add(added)
+    db.commit()
+    removed_id = sub2.id
+    crud.cascade.delete_subtree(db, task_id=removed_id)
+    db.commit()
+
+    response = client.get(f"/api/v1/baselines/{baseline['id']}/variance")
+    assert response.status_code == 200, response.text
+    report = response.json()
+    tasks = {t["task_id"]: t for t in report["tasks"]}
+    # Feb 11 is a holiday, so the week's slip is four working days
+    assert (tasks[second.id]["finish_slip_days"], tasks[second.id]["effort_delta"]) == (4, 8.0)
+    assert (tasks[first.id]["finish_slip_days"], tasks[first.id]["effort_delta"]) == (5, -2.0)
+    assert tasks[sub1.id]["finish_slip_days"] == tasks[sub1.id]["effort_delta"] == 0
+    assert not tasks[added.id]["in_baseline"] and tasks[added.id]["effort_delta"] == 0
+    assert report["added_task_count"] == 1 and report["removed_task_ids"] == [removed_id]
+
+    (phase_row,) = report["phases"]
+    assert (phase_row["task_id"], phase_row["finish_slip_days"], phase_row["effort_delta"]) == (phase.id, 4, 6.0)
+    assert report["project"] == {
+        "baseline_start_date": "2025-01-06", "baseline_end_date": "2025-02-07",
+        "current_start_date": "2025-01-06", "current_end_date": "2025-02-14",
+        "start_slip_days": 0, "finish_slip_days": 4,
+        "baseline_hours": 80.0, "current_hours": 86.0, "effort_delta": 6.0,
+    }
+    changed = client.get(f"/api/v1/baselines/{baseline['id']}/variance", params={"changed_only": True}).json()
+    assert [t["task_id"] for t in changed["tasks"]] == [phase.id, first.id, added.id, second.id]
+
+
+def test_snapshots_are_compact_and_diffed_in_bulk():
+    rng = np.random.default_rng(7)
+    n = 10_000
+    starts = np.datetime64("2025-01-06") + rng.integers(0, 250, n)
+    rows = [
+        (i, str(s), str(s + int(d)), float(h))
+        for i, s, d, h in zip(range(1, n + 1), starts, rng.integers(0, 10, n), rng.integers(1, 5, n) * 8)
+    ]
+    baseline = TaskVectors.from_rows(rows)
+    blob = pack(baseline)
+    assert len(blob) < n * 10, f"{len(blob) / n:.1f} bytes per task"
+    restored = unpack(blob)
+    assert np.array_equal(restored.task_ids, baseline.task_ids)
+    assert np.array_equal(restored.end, baseline.end) and np.array_equal(restored.hours, baseline.hours)
+    assert np.isnat(unpack(pack(TaskVectors.from_rows([(1, None, None, None)]))).start[0])
+
+    current = TaskVectors(baseline.task_ids, baseline.start, baseline.end + 7, baseline.hours + 1)
+    started = time.perf_counter()
+    diff = variance(restored, current, default_calendar())
+    elapsed = time.perf_counter() - started
+    assert elapsed < 0.1, f"variance took {elapsed:.3f}s"
+    assert diff.in_baseline.all() and (diff.effort_delta == 1).all()
+    assert ((diff.finish_slip >= 3) & (diff.finish_slip <= 5)).all()
@@ -0,0 +1,16 @@
+import pytest
+
+from perf import bench
+
+
+@pytest.mark.benchmark
+async def test_api_hot_paths_within_baseline(app, dataset):
+    results = await bench.run_suite(app, dataset)
+    print("\n" + bench.format_results(results))
+
+    baseline = bench.load_baseline().get(dataset.size_name)
+    if not baseline:
+        pytest.skip(f"no '{dataset.size_name}' baseline; run `python -m perf.bench --update-baseline`")
+
+    regressions = bench.compare(results, baseline)
+    assert not regressions, "\n".join(regressions)
@@ -0,0 +1,88 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.utils.jp_holidays import japanese_holidays
+from app.utils.work_calendar import WorkingCalendar, to_date
+
+
+def test_japanese_holidays_2025():
+    holidays = japanese_holidays(2025)
+    assert len(holidays) == 19
+    assert holidays[date(2025, 2, 24)] == "振替休日"       # 天皇誕生日 on a Sunday
+    assert date(2025, 3, 20) in holidays                 # 春分の日
+    assert date(2025, 9, 15) in holidays                 # 敬老の日 (3rd Monday)
+    assert date(2025, 11, 24) in holidays                # 勤労感謝の日 substitute
+    with pytest.raises(ValueError):
+        japanese_holidays(1999)
+
+
+def test_workday_arithmetic_across_golden_week():
+    calendar = WorkingCalendar.build(closures=[(date(2025, 5, 2), date(2025, 5, 2))])
+    # 2025-04-28 (Mon) + 5 workdays skips 4/29, 5/2 (closure) and 5/3-5/6
+    assert to_date(calendar.add_workdays(date(2025, 4, 28), 5)) == date(2025, 5, 9)
+    assert to_date(calendar.roll_forward(date(2025, 5, 3))) == date(2025, 5, 7)
+    assert int(calendar.count_workdays(date(2025, 4, 28), date(2025, 5, 9))) == 5
+    offsets = np.array([0, 1, 2])
+    dates = calendar.offsets_to_dates(date(2025, 5, 3), offsets)
+    assert [to_date(d) for d in dates] == [date(2025, 5, 7), date(2025, 5, 8), date(2025, 5, 9)]
+
+    saturday_shift = WorkingCalendar.build(weekmask="1111110", use_japanese_holidays=False)
+    assert bool(calendar.merge(saturday_shift).is_workday(date(2025, 5, 10))) is False
+
+
+def test_project_calendar_closures(client, dataset):
+    project_id = dataset.project_ids[1]
+    params = {"start_date": "2025-12-22", "end_date": "2026-01-09"}
+    before = client.get(f"/api/v1/calendars/project/{project_id}/workdays", params=params).json()
+    assert before["workday_count"] == 14                  # 2026-01-01 and weekends off
+
+    calendar = client.put(f"/api/v1/calendars/project/{project_id}", json={"name": "年末年始"})
+    assert calendar.status_code == 200, calendar.text
+    calendar_id = calendar.json()["id"]
+    closure = client.post(f"/api/v1/calendars/{calendar_id}/closures", json={
+        "name": "年末年始休業", "start_date": "2025-12-29", "end_date": "2026-01-03",
+    })
+    assert closure.status_code == 200, closure.text
+    during = client.get(f"/api/v1/calendars/project/{project_id}/workdays", params=params).json()
+    assert during["workday_count"] == 10
+    assert "2025-12-30" in during["non_working_days"]
+
+    deleted = client.delete(f"/api/v1/calendars/{calendar_id}/closures/{closure.json()['id']}")
+    assert deleted.status_code == 200
+    after = client.get(f"/api/v1/calendars/project/{project_id}/workdays", params=params).json()
+    assert after["workday_count"] == 14
+
+    bad = client.post(f"/api/v1/calendars/{calendar_id}/closures", json={
+        "name": "逆順", "start_date": "2026-01-03", "end_date": "2025-12-29",
+    })
+    assert bad.status_code == 422
+
+
+def test_reschedule_and_overdue(client, dataset):
+    project_id = dataset.project_ids[2]
+    preview = client.post(
+        f"/api/v1/schedule/project/{project_id}/reschedule", json={"start_date": "2025-04-26"}
+    )
+    assert preview.status_code == 200, preview.text
+    body = preview.json()
+    assert body["start_date"] == "2025-04-28" and body["applied"] is False
+    calendar = WorkingCalendar.build()
+    for task in body["tasks"]:
+        assert bool(calendar.is_workday(date.fromisoformat(task["planned_start_date"])))
+        assert task["planned_start_date"] <= task["planned_end_date"] <= body["finish_date"]
+    assert any(t["is_critical"] for t in body["tasks"])
+
+    applied = client.post(
+        f"/api/v1/schedule/project/{project_id}/reschedule",
+        json={"start_date": "2025-04-26", "apply": True},
+    )
+    assert applied.status_code == 200 and applied.json()["applied"] is True
+
+    overdue = client.get(f"/api/v1/schedule/project/{project_id}/overdue", params={"as_of": body["finish_date"]})
+    assert overdue.status_code == 200, overdue.text
+    late = overdue.json()
+    assert late and all(t["workdays_overdue"] > 0 for t in late)
+    assert all(t["planned_end_date"] < body["finish_date"] for t in late)
+    assert [t["workdays_overdue"] for t in late] == sorted((t["workdays_overdue"] for t in late), reverse=True)
@@ -0,0 +1,136 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app import crud
+from app.crud.cascade import TASK_DEPENDENTS
+from app.models import (
+    CalendarClosure, Notification, NotificationType, ProjectMember, Resource, ResourceAssignment,
+    ResourceType, Task, TaskAssignment, TaskComment, TaskDependency, TaskHistory, TimeTracking,
+    UserRole, WorkCalendar,
+)
+from perf.dataset import MEMBER_PASSWORD
+from test_query_plans import captured_statements, full_table_scans
+from test_rollup import make_tree, rollup_of
+
+
+def attach_dependents(db, project, tasks, outside, user_id):
+    """Give every task one row in each dependent table, plus links to a task outside"""
+    resource = Resource(project_id=project.id, name="検証機", resource_type=ResourceType.EQUIPMENT)
+    calendar = WorkCalendar(project_id=project.id, name="検証カレンダー")
+    db.add_all([resource, calendar])
+    db.flush()
+    db.add_all([
+        ProjectMember(project_id=project.id, user_id=user_id, role=UserRole.PROJECT_OWNER),
+        CalendarClosure(calendar_id=calendar.id, name="夏季休業",
+                        start_date=datetime(2025, 8, 13), end_date=datetime(2025, 8, 15)),
+        Notification(user_id=user_id, notification_type=NotificationType.PROJECT_MILESTONE,
+                     title="マイルストーン", project_id=project.id),
+        TaskDependency(predecessor_id=outside.id, successor_id=tasks[0].id),
+        TaskDependency(predecessor_id=tasks[-1].id, successor_id=outside.id),
+    ])
+    for task in tasks:
+        db.add_all([
+            TaskAssignment(task_id=task.id, user_id=user_id),
+            ResourceAssignment(task_id=task.id, resource_id=resource.id),
+            TimeTracking(task_id=task.id, user_id=user_id, date=datetime(2025, 1, 6), hours=1.0),
+            TaskComment(task_id=task.id, user_id=user_id, content="確認済み"),
+            TaskHistory(task_id=task.id, user_id=user_id, field_name="status", new_value="done"),
+            Notification(user_id=user_id, notification_type=NotificationType.TASK_ASSIGNED,
+                         title="割り当て", project_id=project.id, task_id=task.id),
+        ])
+    db.commit()
+
+
+def orphans(db):
+    """Rows left pointing at a task or project that no longer exists"""
+    found = {}
+    for table, column in TASK_DEPENDENTS:
+        found[f"{table}.{column}"] = db.execute(text(
+            f"SELECT count(*) FROM {table} WHERE {column} IS NOT NULL AND {column} NOT IN (SELECT id FROM tasks)"
+        )).scalar()
+    for table, column in (("tasks", "project_id"), ("resources", "project_id"), ("project_members", "project_id"),
+                          ("work_calendars", "project_id"), ("notifications", "project_id")):
+        found[f"{table}.{column}"] = db.execute(text(
+            f"SELECT count(*) FROM {table} WHERE {column} IS NOT NULL AND {column} NOT IN (SELECT id FROM projects)"
+        )).scalar()
+    found["resource_assignments.resource_id"] = db.execute(text(
+        "SELECT count(*) FROM resource_assignments WHERE resource_id NOT IN (SELECT id FROM resources)"
+    )).scalar()
+    found["calendar_closures.calendar_id"] = db.execute(text(
+        "SELECT count(*) FROM calendar_closures WHERE calendar_id NOT IN (SELECT id FROM work_calendars)"
+    )).scalar()
+    return {name: count for name, count in found.items() if count}
+
+
+def test_subtree_delete_removes_dependents_in_fixed_statements(dataset, db):
+    user_id = dataset.user_ids[0]
+    project, phase, first, second, leaves = make_tree(db, user_id)
+    outside = db.get(Task, dataset.task_ids_by_project[dataset.project_ids[0]][-1])
+    attach_dependents(db, project, [first, *leaves], outside, user_id)
+
+    first_id = first.id
+    with captured_statements() as statements:
+        deleted = crud.cascade.delete_subtree(db, task_id=first_id)
+        db.commit()
+    assert deleted["tasks"] == 3
+    assert deleted["task_dependencies"] == 2
+    for table in ("task_assignments", "resource_assignments", "time_tracking", "task_comments",
+                  "task_history", "notifications"):
+        assert deleted[table] == 3, table
+    # One DELETE per dependent table whatever the size of the subtree
+    deletes = [s for s, _ in statements if s.lstrip().upper().startswith("DELETE")]
+    assert len(deletes) == len(TASK_DEPENDENTS) + 1
+    assert full_table_scans(statements) == []
+
+    assert orphans(db) == {}
+    # The sibling was renumbered and the phase rolled up without the subtree
+    db.expire_all()
+    assert db.get(Task, second.id).wbs_code == f"{db.get(Task, phase.id).wbs_code}.1"
+    assert rollup_of(db, phase.id)[2] == 40.0
+    # Rows of the project itself are untouched
+    assert db.query(Resource).filter(Resource.project_id == project.id).count() == 1
+    assert crud.cascade.delete_subtree(db, task_id=first_id) == {}
+
+
+def test_project_delete_endpoint_leaves_no_orphans(app, client, login, dataset, db):
+    user_id = dataset.user_ids[0]
+    outside = db.get(Task, dataset.task_ids_by_project[dataset.project_ids[0]][-1])
+    project, phase, first, second, leaves = make_tree(db, user_id)
+    attach_dependents(db, project, [phase, first, second, *leaves], outside, user_id)
+    with captured_statements() as statements:
+        response = client.delete(f"/api/v1/projects/{project.id}")
+    assert response.status_code == 200, response.text
+    deleted = response.json()["deleted"]
+    assert (deleted["projects"], deleted["tasks"], deleted["resources"]) == (1, 5, 1)
+    assert deleted["notifications"] == 6
+    assert full_table_scans(statements) == []
+    assert orphans(db) == {}
+    assert client.delete(f"/api/v1/projects/{project.id}").status_code == 404
+
+    # Only project owners and admins may delete
+    project, phase, first, second, leaves = make_tree(db, user_id)
+    attach_dependents(db, project, [phase, first, second, *leaves], outside, user_id)
+    owner_id, manager_id = dataset.user_ids[1:3]
+    db.add_all([
+        ProjectMember(project_id=project.id, user_id=owner_id, role=UserRole.PROJECT_OWNER),
+        ProjectMember(project_id=project.id, user_id=manager_id, role=UserRole.PROJECT_MANAGER),
+    ])
+    db.commit()
+    owner, manager = login(f"user{owner_id}", MEMBER_PASSWORD), login(f"user{manager_id}", MEMBER_PASSWORD)
+    assert TestClient(app).delete(f"/api/v1/projects/{project.id}?background=true").status_code == 403
+    assert manager.delete(f"/api/v1/projects/{project.id}?background=true").status_code == 403
+
+    # Background deletions return at once and report through the job, to its submitter only
+    response = owner.delete(f"/api/v1/projects/{project.id}?background=true")
+    assert response.status_code == 202, response.text
+    job_url = f"/api/v1/projects/deletions/{response.json()['id']}"
+    job = owner.get(job_url).json()
+    assert job["status"] == "completed", job
+    assert job["deleted"]["tasks"] == 5
+    assert orphans(db) == {}
+    assert client.get(job_url).status_code == 404 and TestClient(app).get(job_url).status_code == 403
+    assert client.delete(f"/api/v1/projects/{project.id}?background=true").status_code == 404
+    assert client.get("/api/v1/projects/deletions/unknown").status_code == 404
+
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app import crud
+from app.models import Resource, ResourceAssignment, ScenarioTaskOverride, Task, TaskDependency
+from test_cascade import attach_dependents, orphans
+from test_query_plans import captured_statements, full_table_scans
+from test_rollup import make_tree, rollup_of
+
+
+def source_project(db, dataset):
+    user_id = dataset.user_ids[0]
+    outside = db.get(Task, dataset.task_ids_by_project[dataset.project_ids[0]][-1])
+    project, phase, first, second, leaves = make_tree(db, user_id)
+    tasks = [phase, first, second, *leaves]
+    attach_dependents(db, project, tasks, outside, user_id)
+    db.add(TaskDependency(predecessor_id=first.id, successor_id=second.id))
+    db.commit()
+    return project.id, [t.id for t in tasks]
+
+
+def task_rows(db, project_id):
+    return db.execute(
+        text("""
+            SELECT name, depth, wbs_code, sort_key, planned_start_date, planned_end_date, estimated_hours,
+                   rollup_start_date, rollup_end_date, rollup_estimated_hours, rollup_progress
+            FROM tasks WHERE project_id = :p ORDER BY sort_key
+        """),
+        {"p": project_id},
+    ).fetchall()
+
+
+def test_clone_copies_the_project_in_sql_with_remapped_ids(client, dataset, db):
+    project_id, task_ids = source_project(db, dataset)
+
+    with captured_statements() as statements:
+        response = client.post(f"/api/v1/projects/{project_id}/clone", json={"name": "複製案"})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    clone_id = body["project_id"]
+    assert body["copied"] == {
+        "projects": 1, "project_members": 1, "work_calendars": 1, "calendar_closures": 1, "resources": 1,
+        "tasks": 5, "task_dependencies": 1, "task_assignments": 5, "resource_assignments": 5,
+    }
+    assert full_table_scans(statements) == []
+
+    # Same tree and numbers, on new ids whose paths and rollups are already consistent
+    assert task_rows(db, clone_id) == task_rows(db, project_id)
+    clone_ids = db.execute(text("SELECT id FROM tasks WHERE project_id = :p"), {"p": clone_id}).scalars().all()
+    assert not set(clone_ids) & set(task_ids)
+    assert crud.task_tree.rebuild(db, project_id=clone_id) == 0
+    assert crud.task_rollup.rebuild(db, project_id=clone_id) == 0
+
+    (predecessor, successor), = db.execute(text(
+        "SELECT predecessor_id, successor_id FROM task_dependencies WHERE successor_id IN "
+        "(SELECT id FROM tasks WHERE project_id = :p)"
+    ), {"p": clone_id}).fetchall()
+    assert {predecessor, successor} <= set(clone_ids)
+    resource = db.query(Resource).filter(Resource.project_id == clone_id).one()
+    assert {a.resource_id for a in db.query(ResourceAssignment).filter(ResourceAssignment.task_id.in_(clone_ids))} \
+        == {resource.id}
+    assert client.get(f"/api/v1/projects/{clone_id}").json()["status"] == "PLANNING"
+    assert orphans(db) == {}
+
+    # The original is untouched and both delete cleanly
+    assert len(crud.task.get_by_project(db, project_id=project_id)) == 5
+    crud.cascade.delete_project(db, project_id=clone_id)
+    db.commit()
+    assert len(crud.task.get_by_project(db, project_id=project_id)) == 5
+
+
+def test_scenario_stores_overrides_and_promotes_to_a_project(client, dataset, db):
+    project_id, (phase_id, first_id, second_id, *_) = source_project(db, dataset)
+
+    scenario = client.post(f"/api/v1/scenarios/project/{project_id}", json={"name": "2週間遅延"}).json()
+    override = client.put(f"/api/v1/scenarios/{scenario['id']}/tasks/{second_id}", json={
+        "planned_end_date": "2025-02-21T00:00:00", "estimated_hours": 80,
+    })
+    assert override.status_code == 200, override.text
+    assert override.json()["planned_start_date"] is None
+    # Only the changed task is stored
+    assert db.query(ScenarioTaskOverride).filter(ScenarioTaskOverride.scenario_id == scenario["id"]).count() == 1
+
+    tasks = {t["id"]: t for t in client.get(f"/api/v1/scenarios/{scenario['id']}/tasks").json()}
+    assert (tasks[second_id]["planned_start_date"], tasks[second_id]["planned_end_date"]) == (
+        "2025-02-03T00:00:00", "2025-02-21T00:00:00"
+    )
+    assert tasks[second_id]["overridden"] and not tasks[first_id]["overridden"]
+    assert db.get(Task, second_id).planned_end_date == datetime(2025, 2, 7)
+
+    other = db.query(Task).filter(Task.project_id == dataset.project_ids[0]).first()
+    assert client.put(f"/api/v1/scenarios/{scenario['id']}/tasks/{other.id}",
+                      json={"estimated_hours": 1}).status_code == 404
+
+    promoted = client.post(f"/api/v1/scenarios/{scenario['id']}/promote", json={"name": "遅延案"})
+    assert promoted.status_code == 200, promoted.text
+    new_id = promoted.json()["project_id"]
+    new_phase = db.query(Task).filter(Task.project_id == new_id, Task.parent_id.is_(None)).one()
+    assert rollup_of(db, new_phase.id)[1:3] == (datetime(2025, 2, 21), 120.0)
+    assert rollup_of(db, phase_id)[1:3] == (datetime(2025, 2, 7), 80.0)
+
+    # Setting every field back to null drops the override
+    client.put(f"/api/v1/scenarios/{scenario['id']}/tasks/{second_id}",
+               json={"planned_end_date": None, "estimated_hours": None})
+    assert db.query(ScenarioTaskOverride).filter(ScenarioTaskOverride.scenario_id == scenario["id"]).count() == 0
+
+    # Scenarios go with their project
+    client.put(f"/api/v1/scenarios/{scenario['id']}/tasks/{second_id}", json={"estimated_hours": 1})
+    crud.cascade.delete_project(db, project_id=project_id)
+    db.commit()
+    assert db.execute(text("SELECT count(*) FROM project_scenarios WHERE project_id = :p"),
+                      {"p": project_id}).scalar() == 0
+    assert db.query(ScenarioTaskOverride).filter(ScenarioTaskOverride.task_id == second_id).count() == 0
@@ -0,0 +1,74 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from fastapi import FastAPI, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.main import app as main_app
+from app.models import Priority, TaskStatus
+from app.utils.encoding import CompressionMiddleware, ORJSONResponse
+from perf.encoding import LIST_ENDPOINTS, measure
+
+
+def test_orjson_response_matches_the_standard_encoding():
+    payload = {
+        "status": TaskStatus.IN_PROGRESS, "priority": [Priority.HIGH],
+        "created_at": datetime(2025, 1, 6, 9, 30, 15, 120000), "due": date(2025, 1, 31),
+        "utc": datetime(2025, 1, 6, tzinfo=timezone.utc), "rate": Decimal("4500.5"),
+        "tags": {"a"}, 3: "名前", "nothing": None,
+    }
+    expected = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":"))
+    assert json.loads(ORJSONResponse(payload).body) == json.loads(expected)
+    assert ORJSONResponse(jsonable_encoder(payload)).body == expected.encode("utf-8")
+    assert main_app.router.default_response_class is ORJSONResponse
+
+
+def test_compression_middleware_threshold_streams_and_passthrough():
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/large")
+    def large():
+        return ORJSONResponse([{"id": i, "name": f"タスク{i}"} for i in range(200)])
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"{i},行\n".encode() for i in range(500)), media_type="text/csv")
+
+    @app.get("/pdf")
+    def pdf():
+        return Response(content=b"%PDF" * 100, media_type="application/pdf")
+
+    @app.get("/encoded")
+    def encoded():
+        return ORJSONResponse(content=None, headers={"Content-Encoding": "identity"})
+
+    client = TestClient(app)
+    gzip_only = {"Accept-Encoding": "gzip"}
+    assert "content-encoding" not in client.get("/small", headers=gzip_only).headers
+
+    large = client.get("/large", headers=gzip_only)
+    assert large.headers["content-encoding"] == "gzip" and large.headers["vary"] == "Accept-Encoding"
+    assert int(large.headers["content-length"]) < len(large.content) and large.json()[199]["name"] == "タスク199"
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+
+    streamed = client.get("/stream", headers=gzip_only)
+    assert streamed.headers["content-encoding"] == "gzip" and "content-length" not in streamed.headers
+    assert streamed.text.splitlines()[499] == "499,行"
+    assert client.get("/encoded", headers=gzip_only).headers["content-encoding"] == "identity"
+    assert "content-encoding" not in client.get("/pdf", headers=gzip_only).headers
+
+
+def test_encoding_benchmark_covers_the_list_endpoints(client, dataset):
+    results = measure(client, dataset.project_ids[0], iterations=2)
+    assert set(results) == set(LIST_ENDPOINTS)
+    tasks = results["project_tasks"]
+    assert tasks["gzip_bytes"] * 4 < tasks["identity_bytes"]
+    assert tasks["orjson_ms"] < tasks["json_dumps_ms"] + tasks["jsonable_encoder_ms"]
@@ -0,0 +1,111 @@
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from app import crud
+from app.models import ProjectMember, TaskAssignment, TaskHistory, TimeTracking, User
+from app.utils.evm import EVMInputs, earned_value_curves
+from app.utils.work_calendar import default_calendar
+from test_rollup import make_tree
+
+
+def make_costed_project(db, dataset):
+    """make_tree with rates at every level of the chain, progress history and time entries"""
+    project, phase, first, second, (sub1, sub2) = make_tree(db, dataset.user_ids[0])
+    alice, bob = (db.get(User, user_id) for user_id in dataset.user_ids[1:3])
+    alice.hourly_rate, bob.hourly_rate = 50.0, 40.0
+    db.add_all([
+        # Bob's project rate overrides his own; the unassigned task is planned at the members' mean
+        ProjectMember(project_id=project.id, user_id=bob.id, hourly_rate=60.0),
+        TaskAssignment(task_id=sub1.id, user_id=alice.id, hourly_rate=100.0),
+        TaskAssignment(task_id=sub2.id, user_id=bob.id),
+        TimeTracking(task_id=sub1.id, user_id=alice.id, date=datetime(2025, 1, 6), hours=8.0),
+        TimeTracking(task_id=sub1.id, user_id=alice.id, date=datetime(2025, 1, 7), hours=4.0, hourly_rate=120.0),
+        TimeTracking(task_id=sub2.id, user_id=bob.id, date=datetime(2025, 1, 14, 15), hours=2.0),
+        TaskHistory(task_id=sub1.id, user_id=alice.id, field_name="progress_percentage",
+                    old_value="0", new_value="50", created_at=datetime(2025, 1, 8, 18)),
+        TaskHistory(task_id=sub1.id, user_id=alice.id, field_name="progress_percentage",
+                    old_value="50", new_value="100", created_at=datetime(2025, 1, 10, 18)),
+    ])
+    db.commit()
+    return project, phase, sub1, sub2
+
+
+def test_earned_value_over_the_rate_chain(client, dataset, db):
+    project, phase, sub1, sub2 = make_costed_project(db, dataset)
+    url = f"/api/v1/schedule/project/{project.id}/evm"
+
+    response = client.get(url, params={"as_of": "2025-01-14", "interval": "day"})
+    assert response.status_code == 200, response.text
+    report = response.json()
+    # BAC: 30h x 100 (assignment) + 10h x 60 (member) + 40h x 60 (members' mean for the unassigned task)
+    # PV: sub1 in full, plus one of sub2's four working days (Jan 13 is a holiday)
+    # EV: sub1 in full, 20% of sub2; AC: 8h x 100 + 4h x 120 (entry) + 2h x 60
+    summary = report["summary"]
+    assert (summary["bac"], summary["pv"], summary["ev"], summary["ac"]) == (6000.0, 3150.0, 3120.0, 1400.0)
+    assert (summary["spi"], summary["cpi"]) == (0.99, 2.229)
+    assert summary["sv"] == -30.0 and summary["percent_complete"] == 52.0
+    (phase_row,) = report["phases"]
+    assert phase_row["task_id"] == phase.id and phase_row["summary"] == summary
+
+    days = report["dates"]
+    series = report["series"]
+    assert days[0] == "2025-01-06" and days[-1] == "2025-02-07"
+    at = {day: i for i, day in enumerate(days)}
+    assert [series["pv"][at[d]] for d in ("2025-01-06", "2025-01-08", "2025-01-13", "2025-01-14")] == [
+        600.0, 1800.0, 3000.0, 3150.0,
+    ]
+    assert [series["ev"][at[d]] for d in ("2025-01-07", "2025-01-08", "2025-01-10", "2025-01-14")] == [
+        0.0, 1500.0, 3000.0, 3120.0,
+    ]
+    assert series["ac"][at["2025-01-07"]] == 1280.0
+    assert series["ev"][at["2025-01-15"]] is None and series["pv"][-1] == 6000.0
+
+    weekly = client.get(url, params={"as_of": "2025-01-14"}).json()
+    assert weekly["dates"] == ["2025-01-06", "2025-01-13", "2025-01-20", "2025-01-27", "2025-02-03"]
+    # Past weeks are sampled at their end, the current one at the status date
+    assert weekly["series"]["pv"] == [3000.0, 3150.0, 3600.0, 3600.0, 6000.0]
+    assert weekly["series"]["ev"] == [3000.0, 3120.0, None, None, None]
+    assert weekly["series"]["ac"] == [1280.0, 1400.0, None, None, None]
+    assert weekly["series"]["cpi"][:2] == [2.344, 2.229]
+
+    hours = client.get(url, params={"as_of": "2025-01-14", "unit": "hours"}).json()["summary"]
+    assert (hours["bac"], hours["pv"], hours["ev"], hours["ac"]) == (80.0, 32.5, 32.0, 14.0)
+
+
+def test_reports_are_cached_until_the_inputs_change(dataset, db):
+    project, phase, sub1, sub2 = make_costed_project(db, dataset)
+    as_of = date(2025, 1, 14)
+    report = crud.earned_value.get_report(db, project_id=project.id, as_of=as_of)
+    assert crud.earned_value.get_report(db, project_id=project.id, as_of=as_of) is report
+
+    db.add(TimeTracking(task_id=sub2.id, user_id=dataset.user_ids[2], date=datetime(2025, 1, 14), hours=1.0))
+    db.commit()
+    refreshed = crud.earned_value.get_report(db, project_id=project.id, as_of=as_of)
+    assert refreshed is not report and refreshed["summary"]["ac"] == 1460.0
+
+
+def test_curves_are_computed_over_whole_arrays():
+    rng = np.random.default_rng(3)
+    n_tasks, n_entries, n_phases = 20_000, 200_000, 50
+    start = np.datetime64("2025-01-06") + rng.integers(0, 300, n_tasks)
+    bac = rng.integers(1, 10, n_tasks) * 800.0
+    actual_task = rng.integers(0, n_tasks, n_entries)
+    inputs = EVMInputs(
+        task_ids=np.arange(1, n_tasks + 1), phase_of=rng.integers(0, n_phases, n_tasks),
+        phase_ids=np.arange(1, n_phases + 1), start=start, end=start + rng.integers(0, 20, n_tasks),
+        bac=bac, progress=rng.integers(0, 101, n_tasks).astype(np.float64),
+        actual_task=actual_task, actual_day=start[actual_task] + rng.integers(0, 10, n_entries),
+        actual_amount=np.full(n_entries, 100.0),
+        history_task=np.zeros(0, dtype=np.int64), history_day=np.zeros(0, dtype="datetime64[D]"),
+        history_old=np.zeros(0), history_new=np.zeros(0),
+    )
+    started = time.perf_counter()
+    curves = earned_value_curves(inputs, default_calendar(), date(2025, 6, 30), "day")
+    elapsed = time.perf_counter() - started
+    assert elapsed < 1.0, f"curves took {elapsed:.3f}s"
+    assert np.allclose(curves.pv[:, -1], curves.bac) and np.isclose(curves.bac.sum(), bac.sum())
+    logged = inputs.actual_amount[inputs.actual_day <= np.datetime64("2025-06-30")].sum()
+    assert np.isclose(curves.at_status[2].sum(), logged)
+    assert np.isclose(curves.at_status[1].sum(), (bac * inputs.progress / 100).sum())
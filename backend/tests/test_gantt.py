@@ -0,0 +1,109 @@
+from datetime import date
+
+import orjson
+
+from app.database import engine
+from app.models import Task, TaskDependency
+from app.utils.gantt import _TASK_SQL, GanttScope, dictionary_encode, load_link_rows, load_task_rows
+from test_query_plans import captured_statements, full_table_scans
+from test_rollup import make_tree
+
+
+def epoch_day(value):
+    return (date.fromisoformat(value[:10]) - date(1970, 1, 1)).days if value else None
+
+
+def test_compact_gantt_holds_the_bars_of_the_full_payload(client, dataset, db):
+    project, phase, first, second, (sub1, sub2) = make_tree(db, dataset.user_ids[0])
+    db.get(Task, sub1.id).description = "長い説明" * 50
+    db.add(TaskDependency(predecessor_id=sub1.id, successor_id=sub2.id))
+    db.commit()
+
+    full = client.get(f"/api/v1/tasks/project/{project.id}/gantt").json()
+    response = client.get(f"/api/v1/tasks/project/{project.id}/gantt", params={"format": "compact"})
+    assert response.status_code == 200 and response.headers["content-type"] == "application/json"
+    compact = response.json()
+    assert compact["count"] == len(full["tasks"]) == 5 and "description" not in compact["tasks"]
+
+    tasks, dictionaries = compact["tasks"], compact["dictionaries"]
+    for row, task in enumerate(full["tasks"]):
+        assert tasks["id"][row] == task["id"] and tasks["wbs_code"][row] == task["wbs_code"]
+        assert tasks["start_date"][row] == epoch_day(task["start_date"])
+        assert tasks["rollup_end_date"][row] == epoch_day(task["rollup_end_date"])
+        assert dictionaries["status"][tasks["status"][row]] == task["status"].lower()
+        assert dictionaries["priority"][tasks["priority"][row]] == task["priority"].lower()
+    assert tasks["start_date"][[*tasks["id"]].index(sub1.id)] == 20094  # 2025-01-06
+    links = compact["links"]
+    assert (links["source"], links["target"]) == ([sub1.id], [sub2.id])
+    assert dictionaries["type"][links["type"][0]] == "finish_to_start"
+
+    # Descriptions come one task at a time
+    description = client.get(f"/api/v1/tasks/{sub1.id}/description")
+    assert description.json() == {"id": sub1.id, "description": "長い説明" * 50}
+    assert client.get("/api/v1/tasks/999999/description").status_code == 404
+
+    # Unknown values extend the code list instead of failing
+    assert dictionary_encode(["MEDIUM", None, "urgent", "urgent"], ["low", "medium"]) == [1, None, 2, 2]
+
+
+def test_compact_gantt_is_smaller_and_compressed(client, dataset):
+    url = f"/api/v1/tasks/project/{dataset.project_ids[0]}/gantt"
+    full = client.get(url, headers={"Accept-Encoding": "identity"})
+    compact = client.get(url, params={"format": "compact"}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in compact.headers
+    assert len(compact.content) * 2 < len(full.content)
+
+    gzipped = client.get(url, params={"format": "compact"}, headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert gzipped.headers["content-encoding"] == "gzip" and gzipped.headers["vary"] == "Accept-Encoding"
+    assert int(gzipped.headers["content-length"]) * 4 < len(compact.content)
+    assert orjson.loads(gzipped.content) == orjson.loads(compact.content)
+
+
+def test_window_and_expansion_narrow_the_gantt(client, dataset, db):
+    project, phase, first, second, (sub1, sub2) = make_tree(db, dataset.user_ids[0])
+    db.add_all([
+        TaskDependency(predecessor_id=sub1.id, successor_id=sub2.id),
+        TaskDependency(predecessor_id=sub2.id, successor_id=second.id),
+    ])
+    db.commit()
+    url = f"/api/v1/tasks/project/{project.id}/gantt"
+
+    def shown(**params):
+        payload = client.get(url, params=params).json()
+        return [(t["id"], t.get("child_count"), t.get("collapsed")) for t in payload["tasks"]], payload["links"]
+
+    # Nothing expanded: the phase alone, as a summary row of its subtree
+    tasks, links = shown(expanded="")
+    assert tasks == [(phase.id, 2, True)] and links == []
+    tasks, links = shown(expanded=f"{phase.id}")
+    assert tasks == [(phase.id, 2, False), (first.id, 2, True), (second.id, 0, False)] and links == []
+    # Children of a collapsed parent stay hidden even when they are expanded themselves
+    assert shown(expanded=f"{first.id}")[0] == [(phase.id, 2, True)]
+
+    tasks, links = shown(expanded=f"{phase.id},{first.id}", start_date="2025-01-15", end_date="2025-01-31")
+    assert [t[0] for t in tasks] == [phase.id, first.id, sub2.id] and links == []
+    tasks, links = shown(expanded=f"{phase.id},{first.id}", end_date="2025-01-10")
+    assert [t[0] for t in tasks] == [phase.id, first.id, sub1.id]
+    # A window alone keeps the tree expanded, with the links between the kept tasks
+    tasks, links = shown(start_date="2025-01-13")
+    assert [t[0] for t in tasks] == [phase.id, first.id, sub2.id, second.id] and tasks[0][1] is None
+    assert [(link["source"], link["target"]) for link in links] == [(sub2.id, second.id)]
+
+    compact = client.get(url, params={"format": "compact", "expanded": f"{phase.id}"}).json()
+    assert compact["tasks"]["id"] == [phase.id, first.id, second.id]
+    assert compact["tasks"]["collapsed"] == [False, True, False] and compact["tasks"]["child_count"] == [2, 2, 0]
+    assert client.get(url, params={"expanded": "x"}).status_code == 400
+    assert client.get(url, params={"start_date": "2025-02-01", "end_date": "2025-01-01"}).status_code == 400
+
+
+def test_collapsed_view_reads_only_the_visible_rows(app, dataset, db):
+    project_id = dataset.project_ids[0]
+    root = db.query(Task).filter(Task.project_id == project_id, Task.parent_id.is_(None)).first()
+    scope = GanttScope(project_id, start_date=date(2025, 1, 1), end_date=date(2025, 3, 31), expanded={root.id})
+    with captured_statements() as statements:
+        rows = load_task_rows(db, _TASK_SQL, scope)
+        load_link_rows(db, scope, {row[0] for row in rows})
+    assert full_table_scans(statements) == []
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statements[0][0]}", statements[0][1]).fetchall()
+    assert any("idx_task_project_parent" in row[-1] for row in plan)
@@ -0,0 +1,118 @@
+from sqlalchemy import text
+
+from app.cli import main as cli
+from app.crud import task, task_tree
+from app.models import Task
+from test_query_plans import captured_statements
+from test_rollup import make_tree, rollup_of
+
+
+def _paths(db, project_id):
+    db.expire_all()
+    return {t.id: (t.path, t.depth) for t in db.query(Task).filter(Task.project_id == project_id)}
+
+
+def test_paths_follow_inserts_and_moves(dataset, db):
+    project, phase, first, second, leaves = make_tree(db, dataset.user_ids[0])
+    paths = _paths(db, project.id)
+    assert paths[phase.id] == (f"/{phase.id}/", 0)
+    assert paths[leaves[0].id] == (f"/{phase.id}/{first.id}/{leaves[0].id}/", 2)
+    assert [t.id for t in task_tree.get_subtree(db, task_id=first.id)] == [first.id, *(l.id for l in leaves)]
+    assert task_tree.get_ancestor_ids(db, task_id=leaves[1].id) == [phase.id, first.id]
+
+    # An ORM parent change moves the whole subtree
+    moved = db.get(Task, first.id)
+    moved.parent_id = second.id
+    db.commit()
+    paths = _paths(db, project.id)
+    assert paths[leaves[1].id] == (f"/{phase.id}/{second.id}/{first.id}/{leaves[1].id}/", 3)
+    assert rollup_of(db, second.id)[2] == 40.0
+
+    # Repair recomputes drifted paths from parent_id
+    db.execute(text("UPDATE tasks SET path = NULL, depth = NULL WHERE project_id = :p"), {"p": project.id})
+    db.commit()
+    assert cli(["rebuild-hierarchy", "--project-id", str(project.id)]) == 0
+    assert _paths(db, project.id) == paths
+
+
+def test_move_and_delete_endpoints(client, dataset, db):
+    project, phase, first, second, leaves = make_tree(db, dataset.user_ids[0])
+    cycle = client.put(f"/api/v1/tasks/{phase.id}/move", json={"parent_id": leaves[0].id})
+    assert cycle.status_code == 400
+    foreign = dataset.task_ids_by_project[dataset.project_ids[0]][0]
+    other = client.put(f"/api/v1/tasks/{first.id}/move", json={"parent_id": foreign})
+    assert other.status_code == 400
+
+    with captured_statements() as statements:
+        moved = client.put(f"/api/v1/tasks/{first.id}/move", json={"parent_id": None})
+    assert moved.status_code == 200, moved.text
+    assert moved.json()["path"] == f"/{first.id}/" and moved.json()["depth"] == 0
+    subtree_updates = [s for s, _ in statements if s.lstrip().startswith("UPDATE tasks SET path")]
+    assert len(subtree_updates) == 1
+    assert rollup_of(db, phase.id)[2] == 40.0
+
+    subtree = client.get(f"/api/v1/tasks/{first.id}/subtree").json()
+    assert [t["id"] for t in subtree] == [first.id, *(l.id for l in leaves)]
+
+    deleted = client.delete(f"/api/v1/tasks/{first.id}")
+    assert deleted.status_code == 200
+    remaining = db.execute(text("SELECT id FROM tasks WHERE project_id = :p"), {"p": project.id}).scalars().all()
+    assert sorted(remaining) == sorted([phase.id, second.id])
+
+
+def test_hierarchy_is_loaded_in_one_query(dataset, db):
+    project_id = dataset.project_ids[2]
+    with captured_statements() as statements:
+        tasks = task.get_hierarchy_by_project(db, project_id=project_id)
+        children = {t.id: [c.id for c in t.children] for t in tasks}
+    assert len(statements) == 1
+    phase_id = dataset.task_ids_by_project[project_id][0]
+    assert sorted(children[phase_id]) == sorted(
+        t.id for t in tasks if t.parent_id == phase_id
+    ) != []
+
+
+def _codes(db, project_id):
+    db.expire_all()
+    return {t.id: t.wbs_code for t in db.query(Task).filter(Task.project_id == project_id)}
+
+
+def test_wbs_numbering_renumbers_only_later_siblings(client, dataset, db):
+    project, phase, first, second, leaves = make_tree(db, dataset.user_ids[0])
+    assert _codes(db, project.id) == {
+        phase.id: "1", first.id: "1.1", second.id: "1.2", leaves[0].id: "1.1.1", leaves[1].id: "1.1.2",
+    }
+    with captured_statements() as statements:
+        created = client.post("/api/v1/tasks/", json={
+            "name": "割り込み", "project_id": project.id, "parent_id": phase.id, "position": 1,
+            "task_type": "TASK", "status": "NOT_STARTED", "priority": "MEDIUM",
+        }).json()["id"]
+    assert sum(s.lstrip().startswith("UPDATE tasks SET\n") for s, _ in statements) == 1
+    assert _codes(db, project.id) == {
+        phase.id: "1", created: "1.1", first.id: "1.2", second.id: "1.3",
+        leaves[0].id: "1.2.1", leaves[1].id: "1.2.2",
+    }
+
+    # Reorder among siblings, then reparent a leaf to the front of another task
+    assert client.put(f"/api/v1/tasks/{second.id}/move", json={"parent_id": phase.id, "position": 1}).status_code == 200
+    assert client.put(f"/api/v1/tasks/{leaves[0].id}/move", json={"parent_id": second.id}).status_code == 200
+    assert _codes(db, project.id) == {
+        phase.id: "1", second.id: "1.1", created: "1.2", first.id: "1.3",
+        leaves[0].id: "1.1.1", leaves[1].id: "1.3.1",
+    }
+
+    assert client.delete(f"/api/v1/tasks/{created}").status_code == 200
+    codes = _codes(db, project.id)
+    assert codes == {phase.id: "1", second.id: "1.1", first.id: "1.2", leaves[0].id: "1.1.1", leaves[1].id: "1.2.1"}
+
+    # Tree reads come back in WBS order straight from the index
+    with captured_statements() as statements:
+        gantt = client.get(f"/api/v1/tasks/project/{project.id}/gantt").json()
+    assert [t["wbs_code"] for t in gantt["tasks"]] == ["1", "1.1", "1.1.1", "1.2", "1.2.1"]
+    (query, parameters), = [(s, p) for s, p in statements if "ORDER BY sort_key" in s]
+    plan = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {query}", parameters).fetchall()
+    assert any("idx_task_project_sort" in row[-1] for row in plan)
+    assert not any("TEMP B-TREE" in row[-1] for row in plan)
+
+    # The incremental numbering matches a full recompute
+    assert task_tree.rebuild(db, project_id=project.id) == 0
@@ -0,0 +1,117 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+
+from app.crud import history, task_history
+from app.crud.history import TaskHistoryWriter, diff_task
+from app.database import engine
+from app.models import TaskStatus
+from test_rollup import make_tree
+
+
+@contextmanager
+def history_inserts_outside_writer():
+    """INSERTs into task_history issued by any thread but the writer's"""
+    inserts = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "INSERT INTO task_history" in statement and threading.current_thread().name != "task-history-writer":
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        yield inserts
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+
+def history_of(db, task_id):
+    return db.execute(
+        text("SELECT field_name, old_value, new_value, user_id FROM task_history WHERE task_id = :task_id ORDER BY id"),
+        {"task_id": task_id},
+    ).fetchall()
+
+
+def test_updates_queue_history_without_writing_in_the_request(client, dataset, db):
+    project, phase, first, second, leaves = make_tree(db, dataset.user_ids[0])
+
+    with history_inserts_outside_writer() as inserts:
+        response = client.put(f"/api/v1/tasks/{second.id}", json={
+            "name": "タスク2", "task_type": "TASK", "status": "IN_PROGRESS", "priority": "MEDIUM",
+            "estimated_hours": 40.0, "actual_hours": 0.0, "start_date": "2025-02-03", "end_date": "2025-02-07",
+            "progress_percentage": 25,
+        })
+    assert response.status_code == 200, response.text
+    assert inserts == []
+
+    task_history.flush()
+    assert history_of(db, second.id) == [
+        ("status", "not_started", "in_progress", dataset.user_ids[0]),
+        ("progress_percentage", "0.0", "25.0", dataset.user_ids[0]),
+    ]
+    # Unchanged dates in another format, and enum names against values, are not changes
+    assert diff_task(
+        {"status": TaskStatus.REVIEW, "planned_end_date": datetime(2025, 2, 7)},
+        {"status": "review", "planned_end_date": "2025-02-07 00:00:00.000000"},
+    ) == []
+
+    moved = client.put(f"/api/v1/tasks/{leaves[1].id}/move", json={"parent_id": second.id})
+    assert moved.status_code == 200, moved.text
+    task_history.flush()
+    assert history_of(db, leaves[1].id) == [("parent_id", str(first.id), str(second.id), dataset.user_ids[0])]
+    assert client.get("/health").json()["task_history"]["pending"] == 0
+
+
+def test_writer_batches_applies_backpressure_and_can_write_synchronously(dataset, db):
+    project, phase, first, second, leaves = make_tree(db, dataset.user_ids[0])
+    user_id = dataset.user_ids[0]
+    # Batches larger than the backlog limit, so only backpressure writes before the flush
+    writer = TaskHistoryWriter(batch_size=1000, flush_interval=60, max_pending=250)
+    try:
+        for i in range(300):
+            writer.record(task_id=first.id, user_id=user_id, changes=[("actual_hours", str(i), str(i + 1))])
+        stats = writer.get_stats()
+        # Past 250 waiting rows each new change writes a batch itself
+        assert stats["backpressure_flushes"] > 0 and stats["max_pending_seen"] <= 251
+        writer.flush()
+        stats = writer.get_stats()
+        assert stats["written"] == 300 and stats["pending"] == 0 and stats["batches"] == 2
+        assert len(history_of(db, first.id)) == 300
+        assert writer.record(task_id=first.id, user_id=None, changes=[("name", "a", "b")]) == 0
+    finally:
+        writer.close()
+
+    durable = TaskHistoryWriter(durability="sync")
+    durable.record(task_id=second.id, user_id=user_id, changes=[("name", "タスク2", "結合テスト")])
+    assert durable.get_stats()["pending"] == 0
+    assert history_of(db, second.id) == [("name", "タスク2", "結合テスト", user_id)]
+
+
+def test_failed_batches_are_kept_for_retry_and_sync_writes_raise(dataset, db, monkeypatch):
+    project, phase, first, second, leaves = make_tree(db, dataset.user_ids[0])
+    user_id = dataset.user_ids[0]
+
+    def unavailable():
+        raise OperationalError("INSERT INTO task_history", {}, Exception("database is locked"))
+
+    writer = TaskHistoryWriter(batch_size=1000, flush_interval=60, max_pending=1000)
+    durable = TaskHistoryWriter(durability="sync")
+    try:
+        with monkeypatch.context() as patch:
+            patch.setattr(history, "SessionLocal", unavailable)
+            writer.record(task_id=first.id, user_id=user_id, changes=[("name", "タスク1", "再試行")])
+            assert writer.flush() == 0
+            stats = writer.get_stats()
+            assert (stats["failed"], stats["pending"], stats["written"]) == (1, 1, 0)
+            with pytest.raises(OperationalError):
+                durable.record(task_id=second.id, user_id=user_id, changes=[("name", "タスク2", "同期")])
+        # The kept rows are written once the database is back
+        assert writer.flush() == 1 and writer.get_stats()["pending"] == 0
+        assert history_of(db, first.id) == [("name", "タスク1", "再試行", user_id)]
+        assert history_of(db, second.id) == []
+    finally:
+        writer.close()
@@ -0,0 +1,41 @@
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_baseline_database_upgrades_to_head(tmp_path):
+    path = tmp_path / "baseline.db"
+    shutil.copy(BACKEND_DIR / "project_management.db", path)
+    with sqlite3.connect(path) as conn:
+        project_id, root_id = conn.execute("SELECT project_id, id FROM tasks ORDER BY id LIMIT 1").fetchone()
+        conn.execute(
+            "INSERT INTO tasks (project_id, parent_id, name, task_type, status, priority, estimated_hours,"
+            " progress_percentage, planned_start_date, planned_end_date)"
+            " VALUES (?, ?, '子タスク', 'TASK', 'NOT_STARTED', 'MEDIUM', 6.0, 50.0, '2025-01-06', '2025-01-10')",
+            (project_id, root_id),
+        )
+        child_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+    env = {**os.environ, "USE_SQLITE": "true", "SQLITE_URL": f"sqlite:///{path}"}
+    result = subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    with sqlite3.connect(path) as conn:
+        heads = [row[0] for row in conn.execute("SELECT version_num FROM alembic_version")]
+        child = conn.execute(
+            "SELECT path, depth, sort_key, wbs_code FROM tasks WHERE id = ?", (child_id,)
+        ).fetchone()
+        root = conn.execute(
+            "SELECT path, sort_key, wbs_code, rollup_estimated_hours, rollup_progress FROM tasks WHERE id = ?",
+            (root_id,),
+        ).fetchone()
+    assert heads == ["0015"]
+    assert child == (f"/{root_id}/{child_id}/", 1, f"{root[1]}.00001", f"{root[2]}.1")
+    assert root[0] == f"/{root_id}/" and root[3:] == (6.0, 50.0)
@@ -0,0 +1,107 @@
+from datetime import date
+
+from sqlalchemy import text
+
+from app import crud
+from app.cli import main as cli
+from app.models import Project, ProjectStatus, Task, TaskStatus
+from test_query_plans import captured_statements, full_table_scans
+from test_rollup import make_tree
+
+
+def test_daily_snapshots_feed_burndown_and_burnup(client, dataset, db):
+    project, phase, first, second, (sub1, sub2) = make_tree(db, dataset.user_ids[0])
+    project.end_date = project_end = date(2025, 1, 17)
+    db.get(Task, sub1.id).status = TaskStatus.COMPLETED
+    db.commit()
+    assert crud.progress_snapshot.take(db, snapshot_date=date(2025, 1, 6), project_ids=[project.id]) == 2
+    db.commit()
+
+    done = db.get(Task, sub2.id)
+    done.status, done.remaining_hours, done.actual_hours = TaskStatus.COMPLETED, 0.0, 10.0
+    db.commit()
+    assert crud.progress_snapshot.take(db, snapshot_date=date(2025, 1, 7), project_ids=[project.id]) == 2
+    # Rows are appended once per day unless replaced
+    assert crud.progress_snapshot.take(db, snapshot_date=date(2025, 1, 7), project_ids=[project.id]) == 0
+    db.commit()
+
+    params = {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+    burnup = client.get(f"/api/v1/reports/project/{project.id}/burnup", params=params)
+    assert burnup.status_code == 200, burnup.text
+    assert burnup.json() == {
+        "project_id": project.id, "phase_id": None, "dates": ["2025-01-06", "2025-01-07"],
+        "scope_hours": [80.0, 80.0], "completed_hours": [30.0, 40.0], "actual_hours": [32.0, 40.0],
+        "task_count": [3, 3], "completed_count": [1, 2],
+    }
+
+    burndown = client.get(f"/api/v1/reports/project/{project.id}/burndown", params=params).json()
+    assert burndown["remaining_hours"] == [48.0, 40.0] and burndown["open_task_count"] == [2, 1]
+    # Jan 6 - Jan 17 has nine working days (Jan 13 is a holiday)
+    assert burndown["planned_end_date"] == str(project_end)
+    assert burndown["ideal_remaining_hours"] == [48.0, round(48.0 * 8 / 9, 2)]
+
+    phase_burnup = client.get(
+        f"/api/v1/reports/project/{project.id}/burnup", params={**params, "phase_id": phase.id}
+    ).json()
+    assert phase_burnup["completed_hours"] == [30.0, 40.0]
+    assert client.get(
+        f"/api/v1/reports/project/{project.id}/burnup", params={"start_date": "2025-02-01", "end_date": "2025-01-01"}
+    ).status_code == 400
+
+    # On demand, today's snapshot is taken again with the latest numbers
+    taken = client.post(f"/api/v1/reports/project/{project.id}/snapshot")
+    assert taken.status_code == 200 and taken.json()["rows_written"] == 2
+    assert client.post(f"/api/v1/reports/project/{project.id}/snapshot").json()["rows_written"] == 2
+    today = client.get(f"/api/v1/reports/project/{project.id}/burnup").json()
+    assert today["dates"] == [str(date.today())] and today["completed_count"] == [2]
+
+    with captured_statements() as statements:
+        crud.progress_snapshot.get_burndown(
+            db, project_id=project.id, start_date=date(2024, 1, 1), end_date=date(2025, 12, 31)
+        )
+    assert full_table_scans(statements) == []
+
+
+def test_tasks_without_remaining_hours_count_their_unlogged_estimate(client, dataset, db):
+    project = Project(name="残工数未入力", status=ProjectStatus.ACTIVE, owner_id=dataset.user_ids[0])
+    db.add(project)
+    db.commit()
+    # The simple task endpoint leaves remaining_hours unset
+    for name, estimated, actual, status in [
+        ("未着手", 8.0, 0.0, "not_started"), ("作業中", 10.0, 4.0, "in_progress"),
+        ("超過", 5.0, 7.0, "in_progress"), ("完了", 6.0, 6.0, "completed"),
+    ]:
+        response = client.post("/api/v1/tasks/", json={
+            "project_id": project.id, "name": name, "estimated_hours": estimated, "actual_hours": actual,
+            "status": status,
+        })
+        assert response.status_code == 200, response.text
+    assert db.execute(
+        text("SELECT count(*) FROM tasks WHERE project_id = :id AND remaining_hours IS NULL"), {"id": project.id}
+    ).scalar() == 4
+
+    crud.progress_snapshot.take(db, snapshot_date=date(2025, 1, 6), project_ids=[project.id])
+    db.commit()
+    burndown = client.get(
+        f"/api/v1/reports/project/{project.id}/burndown", params={"start_date": "2025-01-01", "end_date": "2025-01-31"}
+    ).json()
+    assert burndown["remaining_hours"] == [14.0] and burndown["open_task_count"] == [3]
+
+
+def test_nightly_command_snapshots_every_open_project(dataset, db):
+    project, *_ = make_tree(db, dataset.user_ids[0])
+    closed = Project(name="完了済み", status=ProjectStatus.COMPLETED, owner_id=dataset.user_ids[0])
+    db.add(closed)
+    db.flush()
+    db.add(Task(project_id=closed.id, name="終了タスク", estimated_hours=8.0))
+    db.commit()
+
+    assert cli(["snapshot-progress", "--date", "2024-12-31"]) == 0
+    snapshotted = {
+        row[0] for row in db.execute(text(
+            "SELECT project_id FROM progress_snapshots WHERE snapshot_date = '2024-12-31' AND phase_id IS NULL"
+        ))
+    }
+    assert project.id in snapshotted and closed.id not in snapshotted
+    assert set(dataset.project_ids) & snapshotted
+    assert crud.progress_snapshot.take(db, snapshot_date=date(2024, 12, 31)) == 0
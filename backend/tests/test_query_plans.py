@@ -0,0 +1,154 @@
+"""EXPLAIN QUERY PLAN checks for the hot queries in crud/ and api/v1/.
+
+Each case runs a CRUD call or API request while every statement sent to the
+engine is captured, then asks SQLite for the plan of each captured SELECT /
+UPDATE / DELETE. A case fails when any plan scans one of the large tables
+instead of searching it through an index.
+"""
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app import crud
+from app.database import engine
+from app.models import Task, TaskStatus
+
+LARGE_TABLES = {
+    "tasks", "task_dependencies", "task_assignments", "task_comments",
+    "time_tracking", "task_history", "progress_snapshots", "time_tracking_daily",
+}
+# "SCAN tasks", "SCAN t1 USING INDEX ...", "SEARCH t USING AUTOMATIC COVERING INDEX"
+FULL_SCAN = re.compile(r"^(?:SCAN (\w+)|SEARCH (\w+) USING AUTOMATIC)")
+TABLE_ALIAS = re.compile(r"\b(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+SQL_KEYWORDS = {"WHERE", "ON", "LEFT", "RIGHT", "INNER", "OUTER", "JOIN", "ORDER", "GROUP", "LIMIT", "SET", "USING"}
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+
+def _aliases(statement):
+    aliases = {}
+    for table, alias in TABLE_ALIAS.findall(statement):
+        aliases[table] = table
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def full_table_scans(statements):
+    """Return (plan detail, statement) for every scan of a large table"""
+    problems = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            aliases = _aliases(statement)
+            for row in plan:
+                detail = row[-1]
+                match = FULL_SCAN.match(detail)
+                if match and aliases.get(match.group(1) or match.group(2)) in LARGE_TABLES:
+                    problems.append((detail, " ".join(statement.split())))
+    return problems
+
+
+def _sample(dataset, db):
+    project_id = dataset.project_ids[0]
+    phase = db.query(Task).filter(Task.project_id == project_id, Task.parent_id.is_(None)).first()
+    leaf = db.query(Task).filter(Task.parent_id.isnot(None), Task.project_id == project_id).order_by(Task.id.desc()).first()
+    return project_id, phase.id, leaf.id
+
+
+CRUD_CASES = {
+    "task.get_by_project": lambda db, p, ph, t, u: crud.task.get_by_project(db, project_id=p),
+    "task.get_hierarchy_by_project": lambda db, p, ph, t, u: crud.task.get_hierarchy_by_project(db, project_id=p),
+    "task.get_by_parent": lambda db, p, ph, t, u: crud.task.get_by_parent(db, parent_id=ph),
+    "task.get_root_tasks": lambda db, p, ph, t, u: crud.task.get_root_tasks(db, project_id=p),
+    "task.get_by_assignee": lambda db, p, ph, t, u: crud.task.get_by_assignee(db, user_id=u),
+    "task.get_by_status": lambda db, p, ph, t, u: crud.task.get_by_status(db, project_id=p, status=TaskStatus.COMPLETED),
+    "task.get_critical_path_tasks": lambda db, p, ph, t, u: crud.task.get_critical_path_tasks(db, project_id=p),
+    "task.get_milestones": lambda db, p, ph, t, u: crud.task.get_milestones(db, project_id=p),
+    "task.search_tasks": lambda db, p, ph, t, u: crud.task.search_tasks(db, project_id=p, search_term="設計"),
+    "task_tree.get_subtree": lambda db, p, ph, t, u: crud.task_tree.get_subtree(db, task_id=ph),
+    "task_tree.get_subtree_ids": lambda db, p, ph, t, u: crud.task_tree.get_subtree_ids(db, task_id=ph),
+    "task_rollup.refresh": lambda db, p, ph, t, u: crud.task_rollup.refresh(db, [t]),
+    "task_dependency.get_by_project": lambda db, p, ph, t, u: crud.task_dependency.get_by_project(db, project_id=p),
+    "task_dependency.get_predecessors": lambda db, p, ph, t, u: crud.task_dependency.get_predecessors(db, task_id=t),
+    "task_dependency.get_successors": lambda db, p, ph, t, u: crud.task_dependency.get_successors(db, task_id=t),
+    "task_dependency.has_circular_dependency": lambda db, p, ph, t, u: crud.task_dependency.has_circular_dependency(
+        db, predecessor_id=ph, successor_id=t),
+    "task_assignment.get_by_task": lambda db, p, ph, t, u: crud.task_assignment.get_by_task(db, task_id=t),
+    "task_assignment.get_by_user": lambda db, p, ph, t, u: crud.task_assignment.get_by_user(db, user_id=u),
+    "task_assignment.get_by_user_and_task": lambda db, p, ph, t, u: crud.task_assignment.get_by_user_and_task(
+        db, user_id=u, task_id=t),
+    "task_comment.get_by_task": lambda db, p, ph, t, u: crud.task_comment.get_by_task(db, task_id=t),
+    "task_comment.get_by_user": lambda db, p, ph, t, u: crud.task_comment.get_by_user(db, user_id=u),
+    "time_tracking.get_by_task": lambda db, p, ph, t, u: crud.time_tracking.get_by_task(db, task_id=t),
+    "time_tracking.get_by_user": lambda db, p, ph, t, u: crud.time_tracking.get_by_user(db, user_id=u),
+    "time_tracking.get_by_user_and_date_range": lambda db, p, ph, t, u: crud.time_tracking.get_by_user_and_date_range(
+        db, user_id=u, start_date=datetime(2025, 1, 1), end_date=datetime(2025, 12, 31)),
+    "time_tracking.get_total_hours_by_task": lambda db, p, ph, t, u: crud.time_tracking.get_total_hours_by_task(db, task_id=t),
+    "time_tracking.get_total_hours_by_user_and_date_range": lambda db, p, ph, t, u: (
+        crud.time_tracking.get_total_hours_by_user_and_date_range(
+            db, user_id=u, start_date=datetime(2025, 1, 1), end_date=datetime(2025, 12, 31))),
+    "project.get_by_member": lambda db, p, ph, t, u: crud.project.get_by_member(db, user_id=u),
+    "project_member.get_by_project": lambda db, p, ph, t, u: crud.project_member.get_by_project(db, project_id=p),
+    "project_member.has_permission": lambda db, p, ph, t, u: crud.project_member.has_permission(
+        db, user_id=u, project_id=p, required_roles=["TEAM_MEMBER"]),
+}
+
+API_CASES = {
+    "read_project_tasks": "/api/v1/tasks/project/{p}",
+    "get_gantt_data": "/api/v1/tasks/project/{p}/gantt",
+    "get_task_hierarchy": "/api/v1/tasks/project/{p}/hierarchy",
+    "get_project_dependencies": "/api/v1/tasks/project/{p}/dependencies",
+    "read_task": "/api/v1/tasks/{t}",
+    "read_task_subtree": "/api/v1/tasks/{ph}/subtree",
+    "get_task_dependencies": "/api/v1/tasks/{t}/dependencies",
+    "get_task_assignments": "/api/v1/tasks/{t}/assignments",
+    "get_task_comments": "/api/v1/tasks/{t}/comments",
+    "get_task_time_entries": "/api/v1/tasks/{t}/time",
+    "get_my_tasks": "/api/v1/tasks/assigned/me",
+    "get_my_time_entries": "/api/v1/tasks/time/me",
+    "get_project": "/api/v1/projects/{p}",
+    "export_project": "/api/v1/projects/export?format=csv&project_id={p}",
+}
+
+
+@pytest.mark.parametrize("name", sorted(CRUD_CASES))
+def test_crud_queries_use_indexes(name, db, dataset):
+    project_id, phase_id, task_id = _sample(dataset, db)
+    user_id = dataset.user_ids[1]
+    with captured_statements() as statements:
+        CRUD_CASES[name](db, project_id, phase_id, task_id, user_id)
+    assert statements, f"{name} issued no queries"
+    assert full_table_scans(statements) == []
+
+
+@pytest.mark.parametrize("name", sorted(API_CASES))
+def test_api_queries_use_indexes(name, client, db, dataset):
+    project_id, phase_id, task_id = _sample(dataset, db)
+    with captured_statements() as statements:
+        response = client.get(API_CASES[name].format(p=project_id, ph=phase_id, t=task_id))
+    assert response.status_code == 200, response.text
+    assert full_table_scans(statements) == []
+
+
+def test_full_scan_detection(db, dataset):
+    """Guard against the harness silently passing everything"""
+    with captured_statements() as statements:
+        db.query(Task).filter(Task.name == "nothing").all()
+    assert full_table_scans(statements)
@@ -0,0 +1,103 @@
+import time
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.models import DependencyType
+from app.utils.resource_leveling import ResourcePool, daily_load, level_resources
+from app.utils.work_calendar import WorkingCalendar
+from test_schedule_risk import make_network
+
+FS = DependencyType.FINISH_TO_START
+CALENDAR = WorkingCalendar.build(use_japanese_holidays=False)
+ORIGIN = date(2025, 1, 6)
+
+
+def make_pool(assignments, capacity):
+    """assignments: (task row, resource row, hours per day)"""
+    task, resource, demand = (np.array(column) for column in zip(*assignments))
+    order = np.argsort(task, kind="stable")
+    return ResourcePool(
+        user_ids=np.arange(1, len(capacity) + 1), project_ids=np.zeros(len(capacity), dtype=np.int64),
+        capacity=np.array(capacity, dtype=np.float64),
+        entry_task=task[order].astype(np.int64), entry_resource=resource[order].astype(np.int64),
+        entry_demand=demand[order].astype(np.float64),
+    )
+
+
+def test_leveling_delays_within_float_by_priority():
+    # Task 0 is a six-day critical chain; tasks 1-3 share one user for two days each
+    network = make_network(4, [])
+    network.priorities = np.array([3, 2, 3, 5])
+    pool = make_pool([(1, 0, 8.0), (2, 0, 8.0), (3, 0, 8.0)], [8.0])
+    result = level_resources(network, pool, np.array([6, 2, 2, 2]), np.zeros(4), CALENDAR, ORIGIN)
+
+    assert result.early_start.tolist() == [0, 0, 0, 0]
+    assert result.start.tolist() == [0, 4, 2, 0]
+    assert result.overallocated_hours_before == 16.0 * 2
+    assert result.overallocated_hours_after == 0.0
+    assert not result.unresolved.any()
+    assert np.array_equal(daily_load(pool, result.start, result.durations, 6), result.load[:, :6])
+
+    by_wbs = level_resources(network, pool, np.array([6, 2, 2, 2]), np.zeros(4), CALENDAR, ORIGIN, rule="wbs")
+    assert by_wbs.start.tolist() == [0, 0, 2, 4]
+
+
+def test_leveling_beyond_float_extends_the_project():
+    network = make_network(5, [(1, 2, FS, 0)])
+    pool = make_pool([(1, 0, 8.0), (2, 0, 8.0), (3, 0, 8.0), (4, 0, 4.0)], [8.0])
+    durations = np.array([4, 2, 2, 2, 2])
+
+    within = level_resources(network, pool, durations, np.zeros(5), CALENDAR, ORIGIN)
+    assert within.unresolved.tolist() == [False, False, False, True, True]
+    assert (within.start + within.durations).max() == 4
+
+    extended = level_resources(network, pool, durations, np.zeros(5), CALENDAR, ORIGIN, allow_project_delay=True)
+    assert not extended.unresolved.any()
+    assert extended.overallocated_hours_after == 0.0
+    assert (extended.start + extended.durations).max() == 8
+    assert extended.start[2] >= extended.start[1] + 2
+
+
+@pytest.mark.benchmark
+def test_leveling_10k_tasks_is_fast():
+    rng = np.random.default_rng(3)
+    size, users = 10_000, 200
+    edges = [(i - 1 - int(rng.integers(0, 20)), i, FS, 0) for i in range(40, size) if rng.random() < 0.6]
+    network = make_network(size, edges)
+    network.priorities = rng.integers(1, 6, size)
+    pool = make_pool([(i, int(rng.integers(0, users)), 8.0 * rng.choice([0.5, 1.0])) for i in range(size)],
+                     [8.0] * users)
+    durations = rng.integers(1, 6, size).astype(np.float64)
+
+    started = time.perf_counter()
+    result = level_resources(network, pool, durations, np.zeros(size), CALENDAR, ORIGIN,
+                             allow_project_delay=True)
+    elapsed = time.perf_counter() - started
+    assert result.overallocated_hours_after == 0.0
+    assert elapsed < 5.0, f"leveling took {elapsed:.2f}s"
+
+
+def test_leveling_endpoints(client, dataset):
+    project_id = dataset.project_ids[3]
+    response = client.post(
+        f"/api/v1/schedule/project/{project_id}/level",
+        json={"start_date": "2025-01-06", "allow_project_delay": True},
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["overallocated_hours_after"] <= body["overallocated_hours_before"]
+    assert body["finish_date"] >= body["early_finish_date"]
+    assert all(t["delay_days"] >= 0 for t in body["tasks"])
+    assert all(not t["resource_conflict"] for t in body["tasks"])
+
+    portfolio = client.post(
+        "/api/v1/schedule/portfolio/level",
+        json={"project_ids": dataset.project_ids, "start_date": "2025-01-06", "priority_rule": "float"},
+    )
+    assert portfolio.status_code == 200, portfolio.text
+    assert {t["project_id"] for t in portfolio.json()["tasks"]} == set(dataset.project_ids)
+
+    missing = client.post("/api/v1/schedule/portfolio/level", json={"project_ids": [999999]})
+    assert missing.status_code == 404
@@ -0,0 +1,116 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.cli import main as cli
+from app.crud import task_rollup
+from app.models import Project, ProjectStatus, Task, TaskType
+
+
+def rollup_of(db, task_id):
+    db.expire_all()
+    t = db.get(Task, task_id)
+    return (t.rollup_start_date, t.rollup_end_date, t.rollup_estimated_hours,
+            t.rollup_actual_hours, t.rollup_remaining_hours, t.rollup_progress)
+
+
+def make_tree(db, owner_id):
+    """Phase -> two tasks -> two leaves under the first task"""
+    project = Project(name="ロールアップ検証", status=ProjectStatus.ACTIVE, owner_id=owner_id)
+    db.add(project)
+    db.flush()
+    phase = Task(project_id=project.id, name="フェーズ", task_type=TaskType.PHASE)
+    db.add(phase)
+    db.flush()
+    first = Task(project_id=project.id, parent_id=phase.id, name="タスク1")
+    second = Task(project_id=project.id, parent_id=phase.id, name="タスク2",
+                  planned_start_date=datetime(2025, 2, 3), planned_end_date=datetime(2025, 2, 7),
+                  estimated_hours=40.0, remaining_hours=40.0)
+    db.add_all([first, second])
+    db.flush()
+    leaves = [
+        Task(project_id=project.id, parent_id=first.id, name="サブ1",
+             planned_start_date=datetime(2025, 1, 6), planned_end_date=datetime(2025, 1, 10),
+             estimated_hours=30.0, actual_hours=30.0, remaining_hours=0.0, progress_percentage=100.0),
+        Task(project_id=project.id, parent_id=first.id, name="サブ2",
+             planned_start_date=datetime(2025, 1, 13), planned_end_date=datetime(2025, 1, 17),
+             estimated_hours=10.0, actual_hours=2.0, remaining_hours=8.0, progress_percentage=20.0),
+    ]
+    db.add_all(leaves)
+    db.commit()
+    return project, phase, first, second, leaves
+
+
+def test_orm_commits_roll_up_the_ancestor_path(dataset, db):
+    project, phase, first, second, leaves = make_tree(db, dataset.user_ids[0])
+
+    assert rollup_of(db, first.id) == (
+        datetime(2025, 1, 6), datetime(2025, 1, 17), 40.0, 32.0, 8.0, 80.0
+    )
+    # Progress is weighted by estimated hours: (40 * 80 + 40 * 0) / 80
+    assert rollup_of(db, phase.id) == (
+        datetime(2025, 1, 6), datetime(2025, 2, 7), 80.0, 32.0, 48.0, 40.0
+    )
+
+    # Moving a leaf updates both the parent it left and the one it joined
+    moved = db.get(Task, leaves[1].id)
+    moved.parent_id = second.id
+    db.commit()
+    assert rollup_of(db, first.id)[1:3] == (datetime(2025, 1, 10), 30.0)
+    assert rollup_of(db, second.id)[:3] == (datetime(2025, 1, 13), datetime(2025, 1, 17), 10.0)
+
+    db.delete(db.get(Task, leaves[1].id))
+    db.commit()
+    # A parent without children falls back to its own values
+    assert rollup_of(db, second.id) == (
+        datetime(2025, 2, 3), datetime(2025, 2, 7), 40.0, 0.0, 40.0, 0.0
+    )
+
+
+def test_raw_writes_update_only_the_changed_path(client, dataset, db):
+    project, phase, first, second, leaves = make_tree(db, dataset.user_ids[0])
+    untouched = rollup_of(db, second.id)
+
+    created = client.post("/api/v1/tasks/", json={
+        "name": "追加作業", "project_id": project.id, "parent_id": first.id,
+        "estimated_hours": 20, "start_date": "2025-01-20T00:00:00", "end_date": "2025-03-03T00:00:00",
+    })
+    assert created.status_code == 200 and created.json()["parent_task_id"] == first.id
+    assert rollup_of(db, phase.id)[1:3] == (datetime(2025, 3, 3), 100.0)
+
+    updated = client.put(f"/api/v1/tasks/{created.json()['id']}", json={
+        "name": "追加作業", "task_type": "TASK", "status": "IN_PROGRESS", "priority": "MEDIUM",
+        "estimated_hours": 60, "actual_hours": 6, "start_date": "2025-01-20T00:00:00",
+        "end_date": "2025-02-14T00:00:00", "progress_percentage": 10,
+    })
+    assert updated.status_code == 200, updated.text
+    assert rollup_of(db, first.id)[1:4] == (datetime(2025, 2, 14), 100.0, 38.0)
+    assert rollup_of(db, phase.id)[1:3] == (datetime(2025, 2, 14), 140.0)
+    assert rollup_of(db, second.id) == untouched
+
+    # Nothing left to propagate once the path is up to date
+    assert task_rollup.refresh(db, [created.json()["id"]]) == 0
+
+    deleted = client.delete(f"/api/v1/tasks/{created.json()['id']}")
+    assert deleted.status_code == 200
+    assert rollup_of(db, phase.id)[1:3] == (datetime(2025, 2, 7), 80.0)
+
+
+def test_rebuild_repairs_drifted_rollups(dataset, db, capsys):
+    project_id = dataset.project_ids[1]
+    phase_id = dataset.task_ids_by_project[project_id][0]
+    expected = rollup_of(db, phase_id)
+    leaf_hours = db.execute(text("""
+        SELECT sum(estimated_hours) FROM tasks t
+        WHERE project_id = :p AND NOT EXISTS (SELECT 1 FROM tasks c WHERE c.parent_id = t.id)
+          AND (parent_id = :phase OR parent_id IN (SELECT id FROM tasks WHERE parent_id = :phase))
+    """), {"p": project_id, "phase": phase_id}).scalar()
+    assert expected[2] == leaf_hours
+
+    db.execute(text("UPDATE tasks SET rollup_estimated_hours = 0, rollup_start_date = NULL WHERE project_id = :p"),
+               {"p": project_id})
+    db.commit()
+    assert cli(["rebuild-rollups", "--project-id", str(project_id)]) == 0
+    assert "tasks updated" in capsys.readouterr().out
+    assert rollup_of(db, phase_id) == expected
+    assert task_rollup.rebuild(db, project_id=project_id) == 0
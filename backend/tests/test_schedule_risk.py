@@ -0,0 +1,157 @@
+import time
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.models import DependencyType, Project, ProjectStatus, Task, TaskDependency, TaskStatus, TaskType
+from app.utils.schedule_network import (
+    DEPENDENCY_TERMS, CyclicDependencyError, ScheduleNetwork, load_schedule_network, topological_levels,
+)
+from app.utils.schedule_risk import _PassPlan, forward_pass, sample_durations, simulate
+
+FS, SS, FF = DependencyType.FINISH_TO_START, DependencyType.START_TO_START, DependencyType.FINISH_TO_FINISH
+
+
+def make_network(size, edges):
+    """edges: (predecessor row, successor row, type, lag)"""
+    src = np.array([e[0] for e in edges], dtype=np.int64)
+    dst = np.array([e[1] for e in edges], dtype=np.int64)
+    level = topological_levels(size, src, dst)
+    order = np.lexsort((dst, level[dst])) if edges else np.zeros(0, dtype=np.int64)
+    terms = np.array([DEPENDENCY_TERMS[e[2]] for e in edges], dtype=np.float64).reshape(-1, 2)
+    no_dates = np.full(size, np.datetime64("NaT"), dtype="datetime64[D]")
+    return ScheduleNetwork(
+        task_ids=np.arange(1, size + 1), project_ids=np.ones(size, dtype=np.int64),
+        names=[f"t{i}" for i in range(size)], wbs_codes=[None] * size,
+        statuses=[TaskStatus.NOT_STARTED] * size, priorities=np.full(size, 3),
+        estimated_hours=np.zeros(size), remaining_hours=np.zeros(size),
+        planned_start=no_dates, planned_end=no_dates,
+        actual_start=no_dates, must_start_on=no_dates,
+        edge_src=src[order], edge_dst=dst[order],
+        edge_lag=np.array([e[3] for e in edges], dtype=np.float64)[order],
+        edge_pred_term=terms[order, 0], edge_succ_term=terms[order, 1],
+        level=level, summary_node=np.zeros(size, dtype=bool),
+    )
+
+
+def test_forward_pass_applies_dependency_types_and_lags():
+    network = make_network(5, [(0, 1, FS, 2), (0, 2, SS, 1), (0, 3, FF, 0), (1, 4, FS, 0), (3, 4, FS, 0)])
+    durations = np.array([[4.0], [3.0], [1.0], [2.0], [1.0]])
+    early = forward_pass(_PassPlan(network), durations, np.zeros(5))[:, 0]
+    # FS + 2 lag; SS + 1; FF finishes with 0 -> starts at 2; max of both predecessors
+    assert early.tolist() == [0, 6, 1, 2, 9]
+
+
+def test_simulation_without_spread_matches_critical_path():
+    network = make_network(4, [(0, 1, FS, 0), (1, 3, FS, 0), (2, 3, FS, 0)])
+    mode = np.array([2.0, 3.0, 1.0, 1.0])
+    result = simulate(network, low=mode, mode=mode, high=mode, floor=np.zeros(4), iterations=200, seed=1)
+    assert np.allclose(result.finish_days, 6.0)
+    assert result.deterministic_finish_days == 6.0
+    assert result.criticality.tolist() == [1.0, 1.0, 0.0, 1.0]
+
+
+def test_simulation_spreads_completion_and_criticality():
+    network = make_network(3, [(0, 2, FS, 0), (1, 2, FS, 0)])
+    mode = np.array([5.0, 5.0, 1.0])
+    result = simulate(network, low=mode * 0.5, mode=mode, high=mode * 2, floor=np.zeros(3),
+                      iterations=20_000, seed=7)
+    p50, p80, p95 = np.percentile(result.finish_days, [50, 80, 95])
+    assert 6.0 < p50 < p80 < p95 < 16.0
+    # Two identical parallel branches share criticality
+    assert result.criticality[2] == 1.0
+    assert abs(result.criticality[0] - 0.5) < 0.03
+    assert abs(result.criticality[0] + result.criticality[1] - 1.0) < 0.01
+
+
+@pytest.mark.parametrize("distribution,expected_mean", [
+    ("pert", (2 + 4 * 4 + 9) / 6),
+    ("triangular", (2 + 4 + 9) / 3),
+])
+def test_sample_durations_match_distribution_mean(distribution, expected_mean):
+    rng = np.random.default_rng(0)
+    samples = sample_durations(rng, np.array([2.0, 3.0]), np.array([4.0, 3.0]), np.array([9.0, 3.0]),
+                               100_000, distribution)
+    assert abs(samples[0].mean() - expected_mean) < 0.05
+    assert samples[0].min() >= 2.0 and samples[0].max() <= 9.0
+    assert np.all(samples[1] == 3.0)
+
+
+def test_cycles_are_rejected():
+    with pytest.raises(CyclicDependencyError):
+        make_network(3, [(0, 1, FS, 0), (1, 2, FS, 0), (2, 0, FS, 0)])
+
+
+def test_phase_links_go_through_summary_nodes(client, dataset, db):
+    project = Project(name="フェーズ連結", status=ProjectStatus.ACTIVE, owner_id=dataset.user_ids[0])
+    db.add(project)
+    db.flush()
+    design, build = (Task(project_id=project.id, name=name, task_type=TaskType.PHASE) for name in ("設計", "実装"))
+    db.add_all([design, build])
+    db.flush()
+    module = Task(project_id=project.id, parent_id=build.id, name="モジュール")
+    db.add(module)
+    db.flush()
+    design_tasks = [Task(project_id=project.id, parent_id=design.id, name=f"設計{i}", estimated_hours=8.0 * i)
+                    for i in range(1, 21)]
+    build_tasks = [Task(project_id=project.id, parent_id=parent.id, name=f"実装{i}", estimated_hours=8.0)
+                   for i, parent in enumerate([build] * 10 + [module] * 10)]
+    db.add_all(design_tasks + build_tasks)
+    db.flush()
+    db.add_all([
+        TaskDependency(predecessor_id=design.id, successor_id=build.id, lag_days=1),
+        # A link between a task and its own summary is ignored
+        TaskDependency(predecessor_id=build_tasks[0].id, successor_id=build.id),
+    ])
+    db.commit()
+
+    network = load_schedule_network(db, [project.id])
+    # Design finish node, build and module start nodes, no design x build cross product
+    assert network.summary_node.sum() == 3
+    assert len(network.edge_src) == 20 + 1 + 11 + 10
+
+    response = client.post(f"/api/v1/schedule/project/{project.id}/reschedule",
+                           json={"start_date": "2025-01-06", "hours_per_day": 8})
+    assert response.status_code == 200, response.text
+    tasks = {t["task_id"]: t for t in response.json()["tasks"]}
+    assert len(tasks) == 40
+    # The longest design task takes 20 working days (13 January is a holiday), then one day of lag
+    assert max(tasks[t.id]["planned_end_date"] for t in design_tasks) == "2025-02-03"
+    assert {tasks[t.id]["planned_start_date"] for t in build_tasks} == {"2025-02-05"}
+    assert response.json()["finish_date"] == "2025-02-05"
+
+
+@pytest.mark.benchmark
+def test_large_project_simulates_quickly():
+    rng = np.random.default_rng(3)
+    size = 5000
+    edges = [
+        (int(p), i, FS, 0)
+        for i in range(1, size)
+        for p in set(rng.integers(max(0, i - 40), i, size=rng.integers(0, 3)).tolist())
+    ]
+    network = make_network(size, edges)
+    mode = rng.uniform(1, 10, size)
+    started = time.perf_counter()
+    simulate(network, low=mode * 0.8, mode=mode, high=mode * 1.5, floor=np.zeros(size),
+             iterations=10_000, seed=0)
+    assert time.perf_counter() - started < 5.0
+
+
+def test_simulation_endpoint(client, dataset):
+    project_id = dataset.project_ids[0]
+    response = client.post(
+        f"/api/v1/schedule/project/{project_id}/simulation",
+        json={"iterations": 2000, "seed": 1, "start_date": "2025-01-06", "percentiles": [50, 80, 95]},
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    finish_dates = [p["finish_date"] for p in body["percentiles"]]
+    assert finish_dates == sorted(finish_dates)
+    assert body["percentiles"][0]["finish_date"] >= body["start_date"]
+    assert body["tasks"] and all(0 <= t["criticality"] <= 1 for t in body["tasks"])
+    assert body["tasks"][0]["criticality"] == max(t["criticality"] for t in body["tasks"])
+
+    missing = client.post("/api/v1/schedule/project/999999/simulation", json={})
+    assert missing.status_code == 404
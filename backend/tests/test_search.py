@@ -0,0 +1,110 @@
+from sqlalchemy import text
+
+from app import crud
+from app.models import Task, TaskType, User
+from perf.dataset import MEMBER_PASSWORD
+from test_query_plans import captured_statements, full_table_scans
+
+
+def _indexed(db, entity_type, entity_id):
+    return db.execute(
+        text("SELECT title FROM search_index WHERE entity_type = :t AND entity_id = :id"),
+        {"t": entity_type, "id": entity_id},
+    ).scalar()
+
+
+def test_triggers_keep_index_in_sync(db, dataset):
+    project_id = dataset.project_ids[0]
+    new_task = Task(project_id=project_id, name="索引同期テスト", task_type=TaskType.TASK)
+    db.add(new_task)
+    db.commit()
+    assert _indexed(db, "task", new_task.id) == "索引同期テスト"
+
+    new_task.name = "索引更新テスト"
+    db.commit()
+    assert _indexed(db, "task", new_task.id) == "索引更新テスト"
+
+    db.delete(new_task)
+    db.commit()
+    assert _indexed(db, "task", new_task.id) is None
+
+
+def test_search_ranks_title_matches_first(client, dataset):
+    response = client.get("/api/v1/search/", params={"q": "設計・実装", "limit": 5})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["has_more"] is True
+    assert len(body["items"]) == 5
+    assert all(hit["type"] == "task" and "設計・実装" in hit["title"] for hit in body["items"])
+    assert "<mark>" not in body["items"][0]["title"]
+
+    second = client.get("/api/v1/search/", params={"q": "設計・実装", "limit": 5, "skip": 5})
+    first_ids = {hit["id"] for hit in body["items"]}
+    assert first_ids.isdisjoint(hit["id"] for hit in second.json()["items"])
+
+
+def test_search_short_terms_and_type_filter(client, dataset):
+    response = client.get("/api/v1/search/", params={"q": "設計", "types": "task"})
+    assert response.status_code == 200, response.text
+    assert response.json()["items"]
+    assert all(hit["type"] == "task" for hit in response.json()["items"])
+
+    response = client.get("/api/v1/search/", params={"q": "合成プロジェクト", "types": "project"})
+    assert {hit["id"] for hit in response.json()["items"]} >= set(dataset.project_ids)
+
+    response = client.get("/api/v1/search/", params={"q": "x", "types": "milestone"})
+    assert response.status_code == 400
+
+
+def test_search_is_scoped_to_member_projects(login, db, dataset):
+    member_id = dataset.user_ids[1]
+    member = db.get(User, member_id)
+    member_projects = set(crud.project_member.get_project_ids_by_user(db, user_id=member_id))
+    client = login(member.username, MEMBER_PASSWORD)
+
+    response = client.get("/api/v1/search/", params={"q": "設計・実装", "limit": 100})
+    assert response.status_code == 200, response.text
+    assert {hit["project_id"] for hit in response.json()["items"]} <= member_projects
+
+    outside = [p for p in dataset.project_ids if p not in member_projects]
+    if outside:
+        response = client.get("/api/v1/search/", params={"q": "タスク", "project_id": outside[0]})
+        assert response.status_code == 403
+
+
+def test_crud_search_uses_index_for_long_terms(db, dataset):
+    project_id = dataset.project_ids[0]
+    indexed = crud.task.search_tasks(db, project_id=project_id, search_term="設計・実装", limit=500)
+    scanned = (
+        db.query(Task)
+        .filter(Task.project_id == project_id, Task.name.contains("設計・実装"))
+        .all()
+    )
+    assert {t.id for t in indexed} == {t.id for t in scanned}
+    assert [p.id for p in crud.project.search_projects(db, search_term="合成プロジェクト")]
+
+
+def test_two_character_terms_keep_the_search_bounded(db, dataset):
+    def searched(**kwargs):
+        with captured_statements() as statements:
+            hits = crud.search.search(db, **kwargs)
+        (statement, parameters), = [(s, p) for s, p in statements if "search_index" in s]
+        plan = [row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        return hits, plan, statements
+
+    # The long term goes through the index and the short one filters its matches
+    hits, plan, _ = searched(search_term="設計 設計・実装", entity_types=["task"], limit=500)
+    assert hits and all("設計・実装" in hit["title"] for hit in hits)
+    assert any(detail.startswith("SCAN search_index VIRTUAL TABLE INDEX 0:M") for detail in plan)
+    assert len(hits) == len(crud.search.search(db, search_term="設計・実装", entity_types=["task"], limit=500))
+
+    # Only short terms: the scan runs in rowid order so LIMIT ends it, without sorting every hit
+    hits, plan, _ = searched(search_term="設計", limit=5)
+    assert len(hits) == 5 and not any("TEMP B-TREE" in detail for detail in plan)
+
+    # With a project scope, only that project's rows are read, through the task index
+    project_id = dataset.project_ids[0]
+    hits, plan, statements = searched(search_term="設計", project_ids=[project_id], include_users=False, limit=500)
+    assert hits and {hit["project_id"] for hit in hits} == {project_id}
+    assert any("tasks USING COVERING INDEX" in detail for detail in plan)
+    assert full_table_scans(statements) == []
@@ -0,0 +1,121 @@
+import json
+import time
+from datetime import date, datetime
+
+from sqlalchemy import text
+
+from app import crud
+from app.models import TaskDependency, Template, TemplateType
+from test_query_plans import captured_statements
+
+TEMPLATE = {
+    "tasks": [
+        {"key": "req", "name": "要件定義", "task_type": "phase", "children": [
+            {"key": "hearing", "name": "ヒアリング", "duration": 2, "estimated_hours": 16},
+            {"key": "spec", "name": "要件書作成", "start_offset": 2, "duration": 3, "estimated_hours": 24},
+        ]},
+        {"key": "review", "name": "要件レビュー完了", "is_milestone": True, "start_offset": 5},
+    ],
+    "dependencies": [
+        {"predecessor": "hearing", "successor": "spec"},
+        {"predecessor": "spec", "successor": "review", "dependency_type": "fs", "lag_days": 0},
+    ],
+}
+
+
+def large_template(phases, tasks_per_phase):
+    return {
+        "tasks": [
+            {"key": f"p{p}", "name": f"フェーズ {p}", "task_type": "phase", "children": [
+                {"key": f"p{p}t{t}", "name": f"作業 {p}.{t}", "start_offset": p * 5 + t % 5,
+                 "duration": 1 + t % 3, "estimated_hours": 8}
+                for t in range(tasks_per_phase)
+            ]}
+            for p in range(phases)
+        ],
+        "dependencies": [
+            {"predecessor": f"p{p}t{t}", "successor": f"p{p}t{t + 1}"}
+            for p in range(phases) for t in range(tasks_per_phase - 1)
+        ],
+    }
+
+
+def test_instantiate_places_tasks_on_working_days(client, dataset, db):
+    created = client.post("/api/v1/templates/", json={
+        "name": "要件定義テンプレート", "template_type": "web_application", "template_data": TEMPLATE,
+    })
+    assert created.status_code == 200, created.text
+    template_id = created.json()["id"]
+
+    # 2025-01-04 is a Saturday, so the project starts on Monday the 6th
+    response = client.post(f"/api/v1/templates/{template_id}/instantiate", json={
+        "name": "新規案件", "start_date": "2025-01-04",
+    })
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result == {"project_id": result["project_id"], "start_date": "2025-01-06", "end_date": "2025-01-14",
+                      "task_count": 4, "dependency_count": 2}
+
+    tasks = crud.task.get_hierarchy_by_project(db, project_id=result["project_id"])
+    phase, hearing, spec, review = tasks
+    assert phase.children == [hearing, spec] and review.parent_id is None
+    assert [t.wbs_code for t in (phase, hearing, spec, review)] == ["1", "1.1", "1.2", "2"]
+    assert spec.path == f"/{phase.id}/{spec.id}/" and spec.depth == 1
+    assert (hearing.planned_start_date, hearing.planned_end_date) == (datetime(2025, 1, 6), datetime(2025, 1, 7))
+    assert (spec.planned_start_date, spec.planned_end_date) == (datetime(2025, 1, 8), datetime(2025, 1, 10))
+    # Offset 5 skips the weekend and Coming of Age Day (the 13th); a milestone ends on its start day
+    assert review.planned_start_date == review.planned_end_date == datetime(2025, 1, 14)
+    assert (phase.rollup_start_date, phase.rollup_end_date, phase.rollup_estimated_hours) == (
+        datetime(2025, 1, 6), datetime(2025, 1, 10), 40.0
+    )
+    assert {(d.predecessor_id, d.successor_id) for d in
+            db.query(TaskDependency).filter(TaskDependency.successor_id.in_([spec.id, review.id]))} == {
+        (hearing.id, spec.id), (spec.id, review.id),
+    }
+    assert client.get(f"/api/v1/templates/{template_id}").json()["usage_count"] == 1
+    project = client.get(f"/api/v1/projects/{result['project_id']}").json()
+    assert project["status"] == "PLANNING"
+
+    bad = dict(TEMPLATE, dependencies=[{"predecessor": "hearing", "successor": "missing"}])
+    assert client.post("/api/v1/templates/", json={"name": "壊れた", "template_data": bad}).status_code == 422
+    looped = dict(TEMPLATE, dependencies=[
+        {"predecessor": "hearing", "successor": "spec"}, {"predecessor": "spec", "successor": "review"},
+        {"predecessor": "review", "successor": "hearing"},
+    ])
+    response = client.post("/api/v1/templates/", json={"name": "循環", "template_data": looped})
+    assert response.status_code == 422 and "Circular dependency" in response.text
+
+
+def test_large_template_is_compiled_once_and_inserted_in_bulk(dataset, db):
+    db_obj = Template(
+        name="大規模テンプレート", template_type=TemplateType.CUSTOM, created_by=dataset.user_ids[0],
+        template_data=json.dumps(large_template(20, 99)),
+    )
+    db.add(db_obj)
+    db.commit()
+    compiled = crud.template.get_compiled(db, template=db_obj)
+    assert compiled.task_count == 2000
+    assert crud.template.get_compiled(db, template=db_obj) is compiled
+
+    from app.schemas.template import TemplateInstantiate
+    started = time.perf_counter()
+    with captured_statements() as statements:
+        result = crud.template.instantiate(
+            db, template=db_obj, obj_in=TemplateInstantiate(name="大規模案件", start_date=date(2025, 4, 1)),
+            owner_id=dataset.user_ids[0],
+        )
+        db.commit()
+    elapsed = time.perf_counter() - started
+    assert (result["task_count"], result["dependency_count"]) == (2000, 20 * 98)
+    assert elapsed < 1.0, f"instantiation took {elapsed:.2f}s"
+    # executemany inserts are not captured: the statement count does not grow with the template
+    assert len(statements) < 20
+    assert db.execute(text("SELECT count(*) FROM tasks WHERE project_id = :p AND path IS NOT NULL"),
+                      {"p": result["project_id"]}).scalar() == 2000
+    assert crud.task_tree.rebuild(db, project_id=result["project_id"]) == 0
+    assert crud.task_rollup.rebuild(db, project_id=result["project_id"]) == 0
+
+    # Editing the template replaces the cached structure
+    from app.schemas.template import TemplateData, TemplateUpdate
+    crud.template.update(db, db_obj=db_obj, obj_in=TemplateUpdate(template_data=TemplateData(**TEMPLATE)))
+    assert crud.template.get_compiled(db, template=db_obj).task_count == 4
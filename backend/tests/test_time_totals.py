@@ -0,0 +1,92 @@
+from datetime import date, datetime
+
+from sqlalchemy import text
+
+from app import crud
+from app.cli import main as cli
+from app.models import Task, TimeTracking
+from test_rollup import make_tree, rollup_of
+
+
+def daily_of(db, task_id):
+    return db.execute(
+        text("""
+            SELECT day, hours, billable_hours, rated_cost, unrated_hours, entry_count
+            FROM time_tracking_daily WHERE task_id = :task_id ORDER BY day
+        """),
+        {"task_id": task_id},
+    ).fetchall()
+
+
+def test_entry_writes_keep_actual_hours_and_daily_totals_in_step(dataset, db):
+    project, phase, first, second, (sub1, sub2) = make_tree(db, dataset.user_ids[0])
+    user_id = dataset.user_ids[0]
+    billed = TimeTracking(task_id=sub2.id, user_id=user_id, date=datetime(2025, 1, 14, 9), hours=3.0,
+                          billable=True, hourly_rate=5000.0)
+    internal = TimeTracking(task_id=sub2.id, user_id=user_id, date=datetime(2025, 1, 14, 15), hours=1.0,
+                            billable=False)
+    db.add_all([billed, internal])
+    db.commit()
+    assert db.get(Task, sub2.id).actual_hours == 6.0
+    assert rollup_of(db, first.id)[3] == 36.0
+    assert daily_of(db, sub2.id) == [("2025-01-14", 4.0, 3.0, 15000.0, 1.0, 2)]
+
+    # Moving an entry to another day and task takes it off the old totals
+    entry = db.get(TimeTracking, internal.id)
+    entry.date, entry.hours, entry.task_id = datetime(2025, 1, 15), 2.0, sub1.id
+    db.commit()
+    assert daily_of(db, sub2.id) == [("2025-01-14", 3.0, 3.0, 15000.0, 0.0, 1)]
+    assert daily_of(db, sub1.id) == [("2025-01-15", 2.0, 0.0, 0.0, 2.0, 1)]
+    assert (db.get(Task, sub1.id).actual_hours, db.get(Task, sub2.id).actual_hours) == (32.0, 5.0)
+
+    db.delete(db.get(TimeTracking, billed.id))
+    db.commit()
+    assert daily_of(db, sub2.id) == [] and db.get(Task, sub2.id).actual_hours == 2.0
+    assert crud.time_tracking.get_total_hours_by_task(db, task_id=sub1.id) == 2.0
+    assert crud.time_tracking.get_total_hours_by_user_and_date_range(
+        db, user_id=user_id, start_date=date(2025, 1, 15), end_date=datetime(2025, 1, 15)
+    ) >= 2.0
+
+    # A rolled back entry leaves no trace
+    db.add(TimeTracking(task_id=sub2.id, user_id=user_id, date=datetime(2025, 1, 16), hours=8.0))
+    db.flush()
+    db.rollback()
+    assert daily_of(db, sub2.id) == [] and db.get(Task, sub2.id).actual_hours == 2.0
+
+
+def test_task_edits_without_actual_hours_keep_the_logged_total(client, dataset, db):
+    project, phase, first, second, (sub1, sub2) = make_tree(db, dataset.user_ids[0])
+    db.add(TimeTracking(task_id=sub2.id, user_id=dataset.user_ids[0], date=datetime(2025, 1, 14), hours=3.0))
+    db.commit()
+    assert db.get(Task, sub2.id).actual_hours == 5.0
+
+    response = client.put(f"/api/v1/tasks/{sub2.id}", json={
+        "name": "サブ2 改", "task_type": "TASK", "status": "IN_PROGRESS", "priority": "MEDIUM",
+        "estimated_hours": 12.0, "start_date": "2025-01-13", "end_date": "2025-01-17",
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()["actual_hours"] == 5.0
+    db.expire_all()
+    assert (db.get(Task, sub2.id).actual_hours, rollup_of(db, first.id)[3]) == (5.0, 35.0)
+
+
+def test_reconcile_command_recomputes_totals_from_the_entries(dataset, db):
+    project, phase, first, second, (sub1, sub2) = make_tree(db, dataset.user_ids[0])
+    user_id = dataset.user_ids[0]
+    db.add_all([
+        TimeTracking(task_id=sub2.id, user_id=user_id, date=datetime(2025, 1, 14), hours=4.0, hourly_rate=6000.0),
+        TimeTracking(task_id=sub2.id, user_id=user_id, date=datetime(2025, 1, 15), hours=2.0),
+    ])
+    db.commit()
+    # Entries written around the ORM and a hand-edited total drift from the log
+    db.execute(text("DELETE FROM time_tracking_daily WHERE task_id = :task_id"), {"task_id": sub2.id})
+    db.execute(text("UPDATE tasks SET actual_hours = 99 WHERE id = :task_id"), {"task_id": sub2.id})
+    db.commit()
+
+    assert cli(["reconcile-time", "--project-id", str(project.id)]) == 0
+    db.expire_all()
+    assert daily_of(db, sub2.id) == [("2025-01-14", 4.0, 4.0, 24000.0, 0.0, 1), ("2025-01-15", 2.0, 2.0, 0.0, 2.0, 1)]
+    # Tasks without logged time keep the hours entered by hand
+    assert (db.get(Task, sub1.id).actual_hours, db.get(Task, sub2.id).actual_hours) == (30.0, 6.0)
+    assert rollup_of(db, first.id)[3] == 36.0
+    assert crud.time_totals.reconcile(db, project_id=project.id)["tasks_corrected"] == 0
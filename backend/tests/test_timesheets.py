@@ -0,0 +1,128 @@
+from datetime import date, datetime
+
+from sqlalchemy import event, text
+
+from app import crud
+from app.database import engine
+from app.models import ProjectMember, Task, TaskAssignment, TimeTracking, User, UserRole
+from perf.dataset import MEMBER_PASSWORD
+from test_query_plans import captured_statements, full_table_scans
+from test_rollup import make_tree, rollup_of
+
+
+def test_member_submits_a_week_in_one_batch(login, dataset, db):
+    project, phase, first, second, (sub1, sub2) = make_tree(db, dataset.user_ids[0])
+    other, *_, (foreign, _) = make_tree(db, dataset.user_ids[0])
+    member_id = dataset.user_ids[1]
+    db.add(ProjectMember(project_id=project.id, user_id=member_id, role=UserRole.TEAM_MEMBER))
+    db.commit()
+    client = login(f"user{member_id}", MEMBER_PASSWORD)
+
+    week = {"week_start": "2025-01-13", "entries": [
+        {"task_id": sub2.id, "date": "2025-01-14", "hours": 3.0, "hourly_rate": 5000.0},
+        {"task_id": sub2.id, "date": "2025-01-14", "hours": 1.0, "billable": False},
+        {"task_id": second.id, "date": "2025-01-17", "hours": 2.5},
+    ]}
+    executed = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement.split()[0].upper(), statement, executemany))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        response = client.post("/api/v1/timesheets/week", json=week)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    assert response.status_code == 200, response.text
+    sheet = response.json()
+    assert sheet["created"] == 3 and sheet["replaced"] == 0
+    assert sheet["daily_hours"] == [0.0, 4.0, 0.0, 0.0, 2.5, 0.0, 0.0] and sheet["total_hours"] == 6.5
+    assert {row["task_id"]: row["billable_hours"] for row in sheet["rows"]} == {sub2.id: 3.0, second.id: 2.5}
+    # One executemany for the entries, and the rollups refreshed once
+    entry_inserts = [e for e in executed if e[0] == "INSERT" and "INTO time_tracking " in e[1]]
+    assert len(entry_inserts) == 1 and entry_inserts[0][2]
+    assert len([e for e in executed if e[0] == "UPDATE" and "rollup_actual_hours" in e[1]]) == 1
+    db.expire_all()
+    assert db.get(Task, sub2.id).actual_hours == 6.0 and rollup_of(db, phase.id)[3] == 38.5
+
+    # Resubmitting the week with replace swaps the entries instead of adding to them,
+    # within the submitted tasks' projects only
+    db.add(TimeTracking(task_id=foreign.id, user_id=member_id, date=datetime(2025, 1, 15), hours=1.5))
+    db.commit()
+    week["replace"] = True
+    week["entries"] = week["entries"][:1]
+    sheet = client.post("/api/v1/timesheets/week", json=week).json()
+    assert (sheet["created"], sheet["replaced"], sheet["total_hours"]) == (1, 3, 4.5)
+    assert client.get("/api/v1/timesheets/week", params={"week_start": "2025-01-13"}).json()["rows"] == [{
+        "task_id": sub2.id, "project_id": project.id, "task_name": "サブ2",
+        "hours": [0.0, 3.0, 0.0, 0.0, 0.0, 0.0, 0.0], "billable_hours": 3.0,
+    }, {
+        "task_id": foreign.id, "project_id": other.id, "task_name": "サブ1",
+        "hours": [0.0, 0.0, 1.5, 0.0, 0.0, 0.0, 0.0], "billable_hours": 1.5,
+    }]
+    db.expire_all()
+    assert db.get(Task, sub2.id).actual_hours == 5.0 and db.get(Task, second.id).actual_hours == 0.0
+
+    # Nothing is written unless every task can be logged against
+    rejected = client.post("/api/v1/timesheets/week", json={"week_start": "2025-01-13", "entries": [
+        {"task_id": sub1.id, "date": "2025-01-13", "hours": 1.0},
+        {"task_id": foreign.id, "date": "2025-01-13", "hours": 1.0},
+    ]})
+    assert rejected.status_code == 403 and str(foreign.id) in rejected.json()["detail"]
+    assert client.post("/api/v1/timesheets/week", json={"week_start": "2025-01-13", "entries": [
+        {"task_id": sub1.id, "date": "2025-01-20", "hours": 1.0},
+    ]}).status_code == 400
+    assert db.execute(
+        text("SELECT sum(hours) FROM time_tracking WHERE task_id IN (:a, :b)"), {"a": sub1.id, "b": foreign.id}
+    ).scalar() == 1.5
+
+    # Single entries are logged with their user in one commit
+    logged = client.post(f"/api/v1/tasks/{sub1.id}/time", json={
+        "task_id": sub1.id, "date": "2025-01-15T00:00:00", "hours": 2.0,
+    })
+    assert logged.status_code == 200, logged.text
+    assert logged.json()["user"]["id"] == member_id
+
+
+def test_report_pivots_weekly_hours_and_costs_from_the_daily_totals(client, login, dataset, db):
+    project, phase, first, second, (sub1, sub2) = make_tree(db, dataset.user_ids[0])
+    admin_id, member_id = dataset.user_ids[0], dataset.user_ids[1]
+    db.get(User, member_id).daily_capacity = 8.0
+    db.add_all([
+        ProjectMember(project_id=project.id, user_id=member_id, role=UserRole.TEAM_MEMBER, hourly_rate=4500.0),
+        TaskAssignment(task_id=sub1.id, user_id=member_id, hourly_rate=7000.0),
+        # Costed at the assignment rate, the entry's own rate and the member rate
+        TimeTracking(task_id=sub1.id, user_id=member_id, date=datetime(2025, 1, 6), hours=4.0),
+        TimeTracking(task_id=sub2.id, user_id=member_id, date=datetime(2025, 1, 8), hours=2.0,
+                     billable=False, hourly_rate=1000.0),
+        TimeTracking(task_id=second.id, user_id=member_id, date=datetime(2025, 1, 14), hours=4.0),
+        TimeTracking(task_id=sub1.id, user_id=admin_id, date=datetime(2025, 1, 7), hours=1.0),
+    ])
+    db.commit()
+
+    params = {"start_date": "2025-01-06", "end_date": "2025-01-19", "project_id": project.id}
+    report = client.get("/api/v1/reports/timesheet", params=params)
+    assert report.status_code == 200, report.text
+    report = report.json()
+    assert report["weeks"] == ["2025-01-06", "2025-01-13"]
+    assert report["projects"] == [{"project_id": project.id, "name": project.name}]
+    member = next(u for u in report["users"] if u["user_id"] == member_id)
+    assert (member["hours"], member["billable_hours"], member["non_billable_hours"]) == (
+        [6.0, 4.0], [4.0, 4.0], [2.0, 0.0]
+    )
+    assert member["cost"] == [30000.0, 18000.0]
+    # Jan 13 is a holiday, so the second week has four working days
+    assert member["capacity_hours"] == [40.0, 32.0] and member["utilization"] == [15.0, 12.5]
+    assert member["projects"] == [{
+        "project_id": project.id, "hours": [6.0, 4.0], "billable_hours": [4.0, 4.0],
+        "non_billable_hours": [2.0, 0.0], "cost": [30000.0, 18000.0],
+    }]
+    assert report["totals"]["hours"] == 11.0
+
+    # Members without a managed project only see their own time
+    own = login(f"user{member_id}", MEMBER_PASSWORD).get("/api/v1/reports/timesheet", params=params).json()
+    assert [u["user_id"] for u in own["users"]] == [member_id]
+
+    with captured_statements() as statements:
+        crud.time_totals.get_report(db, start_date=date(2025, 1, 1), end_date=date(2025, 1, 31))
+    assert full_table_scans(statements) == []
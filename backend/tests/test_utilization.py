@@ -0,0 +1,147 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.crud import resource_utilization
+from app.models import (
+    Notification, NotificationType, Project, ProjectStatus, Task, TaskAssignment, TaskStatus
+)
+from app.utils.utilization import AssignmentIntervals, allocation_matrix
+from app.utils.work_calendar import default_calendar
+
+WINDOW = {"start_date": "2025-01-06", "end_date": "2025-03-30"}
+
+
+def test_allocation_matrix_matches_day_by_day_sum():
+    rng = np.random.default_rng(7)
+    count, origin = 500, np.datetime64("2025-01-01")
+    start = origin + rng.integers(-30, 90, count).astype("timedelta64[D]")
+    end = start + rng.integers(0, 40, count).astype("timedelta64[D]")
+    order = np.argsort(start, kind="stable")
+    intervals = AssignmentIntervals(
+        user_ids=rng.integers(1, 30, count)[order], task_ids=np.arange(count), project_ids=np.ones(count),
+        start=start[order], end=end[order], share=rng.choice([0.25, 0.5, 1.0], count)[order],
+    )
+    users = np.arange(1, 25)   # users 25-29 are outside the requested set
+    window_start, window_end = date(2025, 1, 15), date(2025, 2, 28)
+    matrix = allocation_matrix(intervals, users, window_start, window_end)
+
+    days = np.arange(np.datetime64(window_start), np.datetime64(window_end) + 1)
+    expected = np.zeros((len(users), len(days)))
+    for u, s, e, share in zip(intervals.user_ids, intervals.start, intervals.end, intervals.share):
+        if u in users:
+            expected[u - 1] += share * ((days >= s) & (days <= e))
+    assert matrix.shape == expected.shape
+    assert np.allclose(matrix, expected)
+
+
+def test_utilization_heatmap_filters_and_cache(client, login, dataset):
+    response = client.get("/api/v1/resources/utilization", params=WINDOW)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert len(body["days"]) == 84
+    assert all(len(u["utilization"]) == 84 for u in body["users"])
+    # Weekends carry no load
+    saturday = body["days"].index("2025-01-11")
+    assert all(u["utilization"][saturday] == 0 for u in body["users"])
+    assert any(u["peak_utilization"] > 0 for u in body["users"])
+
+    cached = resource_utilization.get_heatmap(
+        None, start_date=date(2025, 1, 6), end_date=date(2025, 3, 30)
+    )
+    assert cached["overallocated_user_count"] == body["overallocated_user_count"]
+
+    filtered = client.get("/api/v1/resources/utilization", params={**WINDOW, "department": "基盤部"}).json()
+    assert filtered["users"] and all(u["department"] == "基盤部" for u in filtered["users"])
+
+    too_long = client.get(
+        "/api/v1/resources/utilization",
+        params={"start_date": "2025-01-01", "end_date": "2026-06-01"},
+    )
+    assert too_long.status_code == 400
+
+    member = login(f"user{dataset.user_ids[1]}", "password")
+    forbidden = member.get("/api/v1/resources/utilization", params=WINDOW)
+    assert forbidden.status_code == 403
+
+
+def test_assignment_invalidates_and_notifies_conflict(client, login, dataset, db):
+    user_id = dataset.user_ids[-1]
+    project_id = dataset.project_ids[0]
+    leaves = (
+        db.query(Task)
+        .filter(Task.project_id == project_id, Task.parent_id.isnot(None), ~Task.children.any())
+        .filter(Task.status != TaskStatus.COMPLETED, Task.planned_start_date >= "2025-02-03")
+        .order_by(Task.planned_start_date)
+        .all()
+    )
+    assigned = {a.task_id for a in db.query(TaskAssignment).filter(TaskAssignment.user_id == user_id)}
+    calendar = default_calendar()
+
+    def shared_workdays(a, b):
+        start = max(a.planned_start_date, b.planned_start_date).date()
+        end = min(a.planned_end_date, b.planned_end_date).date()
+        return int(calendar.count_workdays(start, end + timedelta(days=1)))
+
+    first, second = next(
+        (a, b) for a in leaves for b in leaves
+        if a.id < b.id and not {a.id, b.id} & assigned and shared_workdays(a, b) > 0
+    )
+    window = {"start_date": str(min(first.planned_start_date, second.planned_start_date).date()),
+              "end_date": str(max(first.planned_end_date, second.planned_end_date).date())}
+
+    def load_of(user):
+        heatmap = client.get("/api/v1/resources/utilization", params=window).json()
+        return next(u for u in heatmap["users"] if u["user_id"] == user)
+
+    before = load_of(user_id)
+    for task_obj in (first, second):
+        response = client.post(
+            f"/api/v1/tasks/{task_obj.id}/assignments",
+            json={"task_id": task_obj.id, "user_id": user_id, "allocation_percentage": 100.0},
+        )
+        assert response.status_code == 200, response.text
+    after = load_of(user_id)
+    assert after["peak_utilization"] >= before["peak_utilization"] + 200
+    assert after["overallocated_days"] > 0
+
+    assignee = login(f"user{user_id}", "password")
+    notifications = assignee.get("/api/v1/notifications/", params={"unread_only": True}).json()
+    conflicts = [n for n in notifications if n["notification_type"] == NotificationType.RESOURCE_CONFLICT.value]
+    assert conflicts and conflicts[0]["task_id"] == second.id
+
+    # A repeated check of the same conflict does not notify again
+    count = db.query(Notification).filter(Notification.user_id == user_id).count()
+    assert resource_utilization.notify_conflicts(
+        db, user_ids=[user_id], start_date=second.planned_start_date.date(),
+        end_date=second.planned_end_date.date(), task_id=second.id,
+    ) == 0
+    assert db.query(Notification).filter(Notification.user_id == user_id).count() == count
+
+    read = assignee.put(f"/api/v1/notifications/{conflicts[0]['id']}/read")
+    assert read.status_code == 200 and read.json()["is_read"] is True
+
+
+def test_project_status_update_invalidates(client, dataset, db):
+    user_id = dataset.user_ids[-2]
+    project = Project(name="稼働率の更新", status=ProjectStatus.ACTIVE, owner_id=dataset.user_ids[0])
+    db.add(project)
+    db.flush()
+    task_obj = Task(project_id=project.id, name="全日作業",
+                    planned_start_date=datetime(2025, 3, 24), planned_end_date=datetime(2025, 3, 28))
+    db.add(task_obj)
+    db.flush()
+    db.add(TaskAssignment(task_id=task_obj.id, user_id=user_id, allocation_percentage=100.0))
+    db.commit()
+
+    def load_of():
+        heatmap = client.get("/api/v1/resources/utilization", params=WINDOW).json()
+        user = next(u for u in heatmap["users"] if u["user_id"] == user_id)
+        return user["utilization"][heatmap["days"].index("2025-03-24")]
+
+    before = load_of()
+    # The raw-SQL update bypasses the ORM listeners
+    response = client.put(f"/api/v1/projects/{project.id}",
+                          json={"name": project.name, "description": None, "status": "completed"})
+    assert response.status_code == 200, response.text
+    assert load_of() == before - 100